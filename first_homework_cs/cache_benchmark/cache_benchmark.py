@@ -12,13 +12,19 @@ from gem5.components.processors.linear_generator import LinearGenerator
 from gem5.components.processors.simple_processor import SimpleProcessor
 from gem5.isas import ISA
 from gem5.components.processors.cpu_types import CPUTypes
-from gem5.simulate.simulator import Simulator
 from gem5.resources.resource import CustomResource
 from gem5.components.boards.simple_board import SimpleBoard
 from gem5.components.cachehierarchies.classic.private_l1_cache_hierarchy import PrivateL1CacheHierarchy
 
 from two_level_cache import PrivateL1L2Hierarchy
 import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.checkpoints import build_warmup_exit_handlers, get_restore_checkpoint_path, take_checkpoint
+from gem5_tools.simpoints import build_simpoint_interval_exit_handlers, profile_basic_block_vectors, take_simpoint_checkpoints
+from gem5_tools.windowed_simulation import DEFAULT_CONVERGENCE_TOLERANCE, DEFAULT_MIN_WINDOWS, run_simulation
 
 
 # Argument parser
@@ -28,11 +34,40 @@ parser.add_argument("--l2_size", type=str, default="512KiB", help="L2 cache size
 parser.add_argument("--l1_assoc", type=int, default=16, help="L1 cache associativity")
 parser.add_argument("--l2_assoc", type=int, default=16, help="L2 cache associativity")
 parser.add_argument("--mult_version", type=int, default=1, help="1 -- iijjkk version, 2 -- kkjjii version, 3 -- kkiijj version")
+parser.add_argument("--window_insts", type=int, default=0, help="Instructions per statistics window (0 runs to completion without windows)")
+parser.add_argument("--max_insts", type=int, default=0, help="With --window_insts, stop after this many instructions (0 for no budget)")
+parser.add_argument("--convergence_tolerance", type=float, default=DEFAULT_CONVERGENCE_TOLERANCE, help="With --window_insts, stop once the 95%% confidence interval of IPC and every miss rate is within this fraction of the mean")
+parser.add_argument("--min_windows", type=int, default=DEFAULT_MIN_WINDOWS, help="With --window_insts, windows needed (after the first) before stopping early")
+parser.add_argument("--take_checkpoint", type=str, default="", help="Simulate on ATOMIC cores up to --checkpoint_insts or --checkpoint_tick, save a checkpoint to this directory and exit")
+parser.add_argument("--checkpoint_insts", type=int, default=0, help="With --take_checkpoint, instructions (of the first core) before the checkpoint")
+parser.add_argument("--checkpoint_tick", type=int, default=0, help="With --take_checkpoint, tick of the checkpoint instead")
+parser.add_argument("--restore_checkpoint", type=str, default="", help="Start from this checkpoint directory instead of the beginning of the workload")
+parser.add_argument("--warmup_insts", type=int, default=0, help="With --restore_checkpoint, instructions that warm the caches before the statistics are reset")
+parser.add_argument("--bbv_interval", type=int, default=0, help="Profile basic block vectors of intervals of this many instructions on an ATOMIC core and exit")
+parser.add_argument("--take_simpoint_checkpoints", type=str, default="", help="Checkpoint the simulation points of this simpoints.json on an ATOMIC core (next to it) and exit")
+parser.add_argument("--simpoint_interval_insts", type=int, default=0, help="With --restore_checkpoint, measure this many instructions after the warmup and exit")
 
 
 args = parser.parse_args()
 
-cpu_type = CPUTypes.TIMING
+if args.take_checkpoint and (args.checkpoint_insts > 0) == (args.checkpoint_tick > 0):
+    parser.error("--take_checkpoint needs one of --checkpoint_insts or --checkpoint_tick")
+
+if args.take_checkpoint and (args.restore_checkpoint or args.window_insts > 0):
+    parser.error("--take_checkpoint cannot be combined with --restore_checkpoint or --window_insts")
+
+if args.warmup_insts > 0 and (not args.restore_checkpoint or args.window_insts > 0):
+    # A windowed run already leaves its first (cold-cache) window out.
+    parser.error("--warmup_insts needs --restore_checkpoint and cannot be combined with --window_insts")
+
+if args.simpoint_interval_insts > 0 and (not args.restore_checkpoint or args.window_insts > 0):
+    parser.error("--simpoint_interval_insts needs --restore_checkpoint and cannot be combined with --window_insts")
+
+if sum(bool(step) for step in [args.take_checkpoint, args.bbv_interval > 0, args.take_simpoint_checkpoints]) > 1:
+    parser.error("only one of --take_checkpoint, --bbv_interval and --take_simpoint_checkpoints can be given")
+
+# Profiling and checkpoints hold no cache state, so a fast functional CPU runs them.
+cpu_type = CPUTypes.ATOMIC if args.take_checkpoint or args.bbv_interval > 0 or args.take_simpoint_checkpoints else CPUTypes.TIMING
 processor = SimpleProcessor(cpu_type=cpu_type, isa=ISA.X86, num_cores=1)
 
 
@@ -55,5 +90,17 @@ binary = CustomResource("../workload/MatMult/mat_mult" + str(args.mult_version)
 board.set_se_binary_workload(binary)
 
 
-sim = Simulator(board)
-sim.run()
\ No newline at end of file
+if args.take_checkpoint:
+    take_checkpoint(board, args)
+elif args.bbv_interval > 0:
+    profile_basic_block_vectors(board, args)
+elif args.take_simpoint_checkpoints:
+    take_simpoint_checkpoints(board, args)
+else:
+    run_simulation(
+        board,
+        args,
+        on_exit_event=build_simpoint_interval_exit_handlers(board, args) if args.simpoint_interval_insts > 0
+            else build_warmup_exit_handlers(board, args),
+        checkpoint_path=get_restore_checkpoint_path(args)
+    )
@@ -3,39 +3,14 @@ import os
 from pathlib import Path
 from dataclasses import dataclass
 import re
-from typing import List, Self, Tuple
-
-
-def find_and_extract_int_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> int:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return int(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
-
-
-def find_and_extract_float_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> float:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return float(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
-
+import sys
+from typing import List, Optional, Self, Tuple
 
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.parallel_ingest import IngestThroughput, map_in_order, resolve_number_of_jobs
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.stats_index import StatsIndex
 
 
 DIRECTORY_NAME_REGEX: re.Pattern = re.compile(r"L1-(.+)-(\d+)_L2-(.+)-(\d+)_(\d)")
@@ -108,21 +83,16 @@ class RunResults:
 
     @classmethod
     def from_directory_path(cls, directory_path: Path) -> Self:
-        stats_txt_path = directory_path.joinpath("stats.txt")
-        if not stats_txt_path.is_file():
+        stats_txt_path = find_stats_txt_path(directory_path)
+        if stats_txt_path is None:
             raise FileNotFoundError(f"No stats.txt in {directory_path}!")
 
-        with stats_txt_path.open(mode="r", encoding="utf-8") as stats_file:
-            stats_file_contents = stats_file.read()
-            return cls.from_stats_txt(stats_file_contents)
+        return cls.from_stats_index(load_stats_index(stats_txt_path))
 
     @classmethod
-    def from_stats_txt(cls, stats_txt_content: str) -> Self:
-        def extract_int(statistic_name: str) -> int:
-            return find_and_extract_int_statistic(stats_txt_content, statistic_name)
-        
-        def extract_float(statistic_name: str) -> float:
-            return find_and_extract_float_statistic(stats_txt_content, statistic_name)
+    def from_stats_index(cls, stats_index: StatsIndex) -> Self:
+        extract_int = stats_index.get_int
+        extract_float = stats_index.get_float
         
         l1_data_cache_write_misses = extract_int("board.cache_hierarchy.l1_dcache.WriteReq.misses::total")
         l1_data_cache_read_misses = extract_int("board.cache_hierarchy.l1_dcache.ReadReq.misses::total")
@@ -161,6 +131,17 @@ class RunResults:
 
 
 
+def parse_run_directory(dir_entry_path: Path) -> Optional[Tuple[RunSetupParameters, RunResults, int]]:
+    # Module-level so it can be sent to --jobs worker processes.
+    if not dir_entry_path.is_dir():
+        return None
+
+    run_parameters = RunSetupParameters.from_directory_path(dir_entry_path)
+    run_results = RunResults.from_directory_path(dir_entry_path)
+
+    return run_parameters, run_results, find_stats_txt_path(dir_entry_path).stat().st_size
+
+
 def main():
     argument_parser = ArgumentParser()
     
@@ -170,6 +151,14 @@ def main():
         dest="run_directory_path"
     )
 
+    argument_parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse the results (0 = one per CPU)."
+    )
+
     arguments = argument_parser.parse_args()
 
 
@@ -186,17 +175,22 @@ def main():
 
     
     aggregated_results: List[Tuple[RunSetupParameters, RunResults]] = []
+    ingest_throughput = IngestThroughput()
 
-    for dir_entry in os.listdir(benchmarks_directory_path):
-        dir_entry_path: Path = benchmarks_directory_path.joinpath(dir_entry)
+    dir_entry_paths: List[Path] = [
+        benchmarks_directory_path.joinpath(dir_entry)
+        for dir_entry in os.listdir(benchmarks_directory_path)
+    ]
 
-        if dir_entry_path.is_dir():
-            run_parameters = RunSetupParameters.from_directory_path(dir_entry_path)
-            run_results = RunResults.from_directory_path(dir_entry_path)
+    for parsed_run in map_in_order(parse_run_directory, dir_entry_paths, resolve_number_of_jobs(arguments.jobs)):
+        if parsed_run is not None:
+            run_parameters, run_results, stats_txt_size = parsed_run
 
             aggregated_results.append((run_parameters, run_results))
+            ingest_throughput.record(stats_txt_size)
     
     print(f"Found {len(aggregated_results)} results in provided directory.")
+    print(ingest_throughput.describe())
     print()
 
     def extract_aggregated_result_key(value: Tuple[RunSetupParameters, RunResults]):
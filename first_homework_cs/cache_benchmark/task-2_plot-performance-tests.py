@@ -4,40 +4,16 @@ import os
 from pathlib import Path
 from dataclasses import dataclass
 import re
+import sys
 from typing import Dict, List, Optional, Self, Tuple
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 
-
-def find_and_extract_int_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> int:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return int(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
-
-
-def find_and_extract_float_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> float:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return float(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.stats_index import StatsIndex
 
 
 @dataclass(frozen=True, kw_only=True, eq=True)
@@ -134,21 +110,16 @@ class RunResults:
 
     @classmethod
     def from_directory_path(cls, directory_path: Path) -> Self:
-        stats_txt_path = directory_path.joinpath("stats.txt")
-        if not stats_txt_path.is_file():
+        stats_txt_path = find_stats_txt_path(directory_path)
+        if stats_txt_path is None:
             raise FileNotFoundError(f"No stats.txt in {directory_path}!")
 
-        with stats_txt_path.open(mode="r", encoding="utf-8") as stats_file:
-            stats_file_contents = stats_file.read()
-            return cls.from_stats_txt(stats_file_contents)
+        return cls.from_stats_index(load_stats_index(stats_txt_path))
 
     @classmethod
-    def from_stats_txt(cls, stats_txt_content: str) -> Self:
-        def extract_int(statistic_name: str) -> int:
-            return find_and_extract_int_statistic(stats_txt_content, statistic_name)
-        
-        def extract_float(statistic_name: str) -> float:
-            return find_and_extract_float_statistic(stats_txt_content, statistic_name)
+    def from_stats_index(cls, stats_index: StatsIndex) -> Self:
+        extract_int = stats_index.get_int
+        extract_float = stats_index.get_float
         
         l1_data_cache_write_misses = extract_int("board.cache_hierarchy.l1_dcache.WriteReq.misses::total")
         l1_data_cache_read_misses = extract_int("board.cache_hierarchy.l1_dcache.ReadReq.misses::total")
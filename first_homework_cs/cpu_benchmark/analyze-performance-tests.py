@@ -1,40 +1,17 @@
 from argparse import ArgumentParser
 import os
 from pathlib import Path
+import dataclasses
 from dataclasses import dataclass
 import re
-from typing import List, Self, Tuple
-
-
-def find_and_extract_int_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> int:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return int(statistic_value_str)
-
-
-    raise ValueError(f"No such statistic: {statistic_name}")
-
-
-def find_and_extract_float_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> float:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return float(statistic_value_str)
-
-
-    raise ValueError(f"No such statistic: {statistic_name}")
+import sys
+from typing import List, Optional, Self, Tuple
 
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.stats_index import StatsIndex
+from gem5_tools.windowed_simulation import MetricEstimate, WindowSeries
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -76,23 +53,32 @@ class RunResults:
     # (board.processor.cores.core.numCycles)
     total_cycles: int
 
+    # Only for runs with --window_insts: the IPC of the windows and why the run stopped.
+    windowed_ipc: Optional[MetricEstimate] = None
+    window_stop_reason: Optional[str] = None
+
     @classmethod
     def from_directory_path(cls, directory_path: Path) -> Self:
-        stats_txt_path = directory_path.joinpath("stats.txt")
-        if not stats_txt_path.is_file():
+        stats_txt_path = find_stats_txt_path(directory_path)
+        if stats_txt_path is None:
             raise FileNotFoundError(f"No stats.txt in {directory_path}!")
 
-        with stats_txt_path.open(mode="r", encoding="utf-8") as stats_file:
-            stats_file_contents = stats_file.read()
-            return cls.from_stats_txt(stats_file_contents)
+        run_results = cls.from_stats_index(load_stats_index(stats_txt_path))
 
-    @classmethod
-    def from_stats_txt(cls, stats_txt_content: str) -> Self:
-        def extract_int(statistic_name: str) -> int:
-            return find_and_extract_int_statistic(stats_txt_content, statistic_name)
+        window_series: Optional[WindowSeries] = WindowSeries.load(directory_path)
+        if window_series is None:
+            return run_results
 
-        def extract_float(statistic_name: str) -> float:
-            return find_and_extract_float_statistic(stats_txt_content, statistic_name)
+        return dataclasses.replace(
+            run_results,
+            windowed_ipc=window_series.estimate_metrics().get("ipc"),
+            window_stop_reason=window_series.stop_reason
+        )
+
+    @classmethod
+    def from_stats_index(cls, stats_index: StatsIndex) -> Self:
+        extract_int = stats_index.get_int
+        extract_float = stats_index.get_float
 
         cycles_per_instruction = extract_float("board.processor.cores.core.cpi")
         instructions_per_cycle = extract_float("board.processor.cores.core.ipc")
@@ -165,7 +151,18 @@ def main():
         output += f"  Reorder Buffer Size: {run_parameters.rob_size}\n\n"
         output += f"  > Instructions per cycle (IPC): {run_results.instructions_per_cycle:.3}\n"
         output += f"  > Cycles per instruction (CPI): {run_results.cycles_per_instruction:.3}\n"
-        output += f"  > Total cycles: {run_results.total_cycles}\n\n"
+        output += f"  > Total cycles: {run_results.total_cycles}\n"
+
+        if run_results.window_stop_reason is not None:
+            output += f"  > Windowed run stopped: {run_results.window_stop_reason}\n"
+
+        if run_results.windowed_ipc is not None:
+            output += (
+                f"  > IPC over {run_results.windowed_ipc.number_of_windows} windows: "
+                f"{run_results.windowed_ipc.mean:.3} +- {run_results.windowed_ipc.half_width:.2} (95% confidence)\n"
+            )
+
+        output += "\n"
 
     # Write file
     output_file_path: Path = output_directory_path.joinpath("aggregated_results.txt")
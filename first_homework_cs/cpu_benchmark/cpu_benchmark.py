@@ -9,25 +9,53 @@ from gem5.components.processors.cpu_types import CPUTypes
 from gem5.components.processors.simple_processor import SimpleProcessor
 from gem5.isas import ISA
 from gem5.resources.resource import obtain_resource
-from gem5.simulate.simulator import Simulator
 from cpuO3_model import O3CPU
 from gem5.resources.resource import CustomResource
 import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.checkpoints import get_restore_checkpoint_path
+from gem5_tools.simpoints import build_simpoint_interval_exit_handlers, profile_basic_block_vectors, take_simpoint_checkpoints
+from gem5_tools.windowed_simulation import DEFAULT_CONVERGENCE_TOLERANCE, DEFAULT_MIN_WINDOWS, run_simulation
 
 parser = argparse.ArgumentParser(description="CPU Benchmarking Script")
 parser.add_argument("--width", type=int, required=True, help="Width of the CPU")
 parser.add_argument("--rob_size", type=int, required=True, help="Reorder Buffer size")
 parser.add_argument("--num_int_regs", type=int, default=60, help="Number of integer registers")
 parser.add_argument("--num_fp_regs", type=int, default=60, help="Number of floating point registers")
+parser.add_argument("--window_insts", type=int, default=0, help="Instructions per statistics window (0 runs to completion without windows)")
+parser.add_argument("--max_insts", type=int, default=0, help="With --window_insts, stop after this many instructions (0 for no budget)")
+parser.add_argument("--convergence_tolerance", type=float, default=DEFAULT_CONVERGENCE_TOLERANCE, help="With --window_insts, stop once the 95%% confidence interval of IPC and every miss rate is within this fraction of the mean")
+parser.add_argument("--min_windows", type=int, default=DEFAULT_MIN_WINDOWS, help="With --window_insts, windows needed (after the first) before stopping early")
+parser.add_argument("--bbv_interval", type=int, default=0, help="Profile basic block vectors of intervals of this many instructions on an ATOMIC core and exit")
+parser.add_argument("--take_simpoint_checkpoints", type=str, default="", help="Checkpoint the simulation points of this simpoints.json on an ATOMIC core (next to it) and exit")
+parser.add_argument("--restore_checkpoint", type=str, default="", help="Start from this checkpoint directory instead of the beginning of the workload")
+parser.add_argument("--warmup_insts", type=int, default=0, help="With --simpoint_interval_insts, instructions that warm the core and caches before the statistics are reset")
+parser.add_argument("--simpoint_interval_insts", type=int, default=0, help="With --restore_checkpoint, measure this many instructions after the warmup and exit")
 
 args = parser.parse_args()
 
-processorO3 = O3CPU(
-    width=args.width,
-    rob_size=args.rob_size,
-    num_int_regs=args.num_int_regs,
-    num_fp_regs=args.num_fp_regs
-)
+if args.bbv_interval > 0 and args.take_simpoint_checkpoints:
+    parser.error("only one of --bbv_interval and --take_simpoint_checkpoints can be given")
+
+if args.simpoint_interval_insts > 0 and (not args.restore_checkpoint or args.window_insts > 0):
+    parser.error("--simpoint_interval_insts needs --restore_checkpoint and cannot be combined with --window_insts")
+
+if args.warmup_insts > 0 and args.simpoint_interval_insts <= 0:
+    parser.error("--warmup_insts needs --simpoint_interval_insts")
+
+if args.bbv_interval > 0 or args.take_simpoint_checkpoints:
+    # Profiling and checkpoints do not depend on the pipeline, so a fast functional core runs them.
+    processorO3 = SimpleProcessor(cpu_type=CPUTypes.ATOMIC, isa=ISA.X86, num_cores=1)
+else:
+    processorO3 = O3CPU(
+        width=args.width,
+        rob_size=args.rob_size,
+        num_int_regs=args.num_int_regs,
+        num_fp_regs=args.num_fp_regs
+    )
 
 
 cache_hierarchy = PrivateL1CacheHierarchy(l1d_size="32KiB", l1i_size="32KiB")
@@ -53,5 +81,14 @@ board = SimpleBoard(
 binary = CustomResource("../workload/whetstone.bin")
 board.set_se_binary_workload(binary)
 
-simulator = Simulator(board=board)
-simulator.run()
\ No newline at end of file
+if args.bbv_interval > 0:
+    profile_basic_block_vectors(board, args)
+elif args.take_simpoint_checkpoints:
+    take_simpoint_checkpoints(board, args)
+else:
+    run_simulation(
+        board,
+        args,
+        on_exit_event=build_simpoint_interval_exit_handlers(board, args) if args.simpoint_interval_insts > 0 else None,
+        checkpoint_path=get_restore_checkpoint_path(args)
+    )
@@ -11,72 +11,24 @@ import matplotlib.ticker
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
+import numpy as np
 
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from gem5_tools.compressed_stats import STATS_TXT_FILE_NAME, find_stats_txt_path
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.stat_arrays import get_indexed_vectors
 
-SIMULATION_BEGIN_MARKER: str = "---------- Begin Simulation Statistics ----------"
-
-def select_simulation_statistic(full_log_file: str, selected_nth_simulation: int) -> str:
-    """
-    Some stats.txt files contain more than one
-
-    ---------- Begin Simulation Statistics ----------
-    [...]
-    ---------- End Simulation Statistics   ----------
-
-    block, i.e. more than one set of simulation statistics.
-
-    Given a full log file with one or more of those sections, this function returns 
-    a matching subset of the log file (the `nth_simulation`, starting at index 0).
-    """
-
-    valid_selected_lines: List[str] = []
-
-    current_simulation_index: Optional[int] = None
-    for line in full_log_file.splitlines(keepends=True):
-        if line.startswith(SIMULATION_BEGIN_MARKER):
-            if current_simulation_index is None:
-                current_simulation_index = 0
-            else:
-                current_simulation_index += 1
-        
-        if current_simulation_index == selected_nth_simulation:
-            valid_selected_lines.append(line)
-
-    # No need for manual newlines, as we used keepends=True when splitting lines.
-    return "".join(valid_selected_lines)
-
-
-
-
-def find_and_extract_int_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> int:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return int(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
-
-
-def find_and_extract_float_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> float:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return float(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
 
+# Per compute unit statistics that are plotted (as `system.cpu3.CUs<index>.<name>`);
+# everything else in the (large) GPU dump is not loaded.
+COMPUTE_UNIT_STATISTIC_NAMES: List[str] = [
+    "vALUInsts",
+    "groupReads",
+    "groupWrites",
+    "ldsBankAccesses",
+    "totalCycles",
+    "vpc",
+]
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -115,7 +67,10 @@ class RunParameters:
         else:
             raise RuntimeError()
         
-        return results_directory_path.joinpath(f"{impl_abbreviation}_CU{self.number_of_compute_units}_stats").joinpath("stats.txt")
+        stats_directory_path = results_directory_path.joinpath(f"{impl_abbreviation}_CU{self.number_of_compute_units}_stats")
+
+        # Falls back to the plain name so a missing run is reported with the expected path.
+        return find_stats_txt_path(stats_directory_path) or stats_directory_path.joinpath(STATS_TXT_FILE_NAME)
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -130,66 +85,37 @@ class RunTimings:
 
     @classmethod
     def from_stats_txt_file_path(cls, parameters: RunParameters, stats_txt_file_path: Path) -> "RunTimings":
-        with stats_txt_file_path.open(mode="r", encoding="utf-8") as file:
-            stats_contents: str = file.read()
-        
-        stats_contents = select_simulation_statistic(stats_contents, selected_nth_simulation=0)
-
-        mean_load_latency = find_and_extract_float_statistic(stats_contents, "system.cpu3.loadLatencyDist::mean")
-
-
-        executed_vector_alu_instructions: List[float] = []
-        for compute_unit_index in range(parameters.number_of_compute_units):
-            executed_vector_alu_instructions.append(
-                find_and_extract_float_statistic(stats_contents, f"system.cpu3.CUs{compute_unit_index}.vALUInsts")
-            )
-        
-        avg_executed_vector_alu_instructions: float = sum(executed_vector_alu_instructions) / len(executed_vector_alu_instructions)
-
-
-        reads_to_shared_memory: List[float] = []
+        # The first dump covers the GPU kernel execution.
+        statistic_prefixes: List[str] = ["system.cpu3.loadLatencyDist::mean"]
         for compute_unit_index in range(parameters.number_of_compute_units):
-            reads_to_shared_memory.append(
-                find_and_extract_float_statistic(stats_contents, f"system.cpu3.CUs{compute_unit_index}.groupReads")
-            )
-        
-        avg_reads_to_shared_memory: float = sum(reads_to_shared_memory) / len(reads_to_shared_memory)
-
-
-        writes_to_shared_memory: List[float] = []
-        for compute_unit_index in range(parameters.number_of_compute_units):
-            writes_to_shared_memory.append(
-                find_and_extract_float_statistic(stats_contents, f"system.cpu3.CUs{compute_unit_index}.groupWrites")
-            )
-        
-        avg_writes_to_shared_memory: float = sum(writes_to_shared_memory) / len(writes_to_shared_memory)
+            for statistic_name in COMPUTE_UNIT_STATISTIC_NAMES:
+                statistic_prefixes.append(f"system.cpu3.CUs{compute_unit_index}.{statistic_name}")
 
+        stats_index = load_stats_index(
+            stats_txt_file_path,
+            selected_nth_simulation=0,
+            prefixes=statistic_prefixes
+        )
 
-        accesses_of_shared_memory: List[float] = []
-        for compute_unit_index in range(parameters.number_of_compute_units):
-            accesses_of_shared_memory.append(
-                find_and_extract_float_statistic(stats_contents, f"system.cpu3.CUs{compute_unit_index}.ldsBankAccesses")
-            )
-        
-        avg_accesses_of_shared_memory: float = sum(accesses_of_shared_memory) / len(accesses_of_shared_memory)
+        mean_load_latency = stats_index.get_float("system.cpu3.loadLatencyDist::mean")
 
 
-        cycles: List[float] = []
-        for compute_unit_index in range(parameters.number_of_compute_units):
-            cycles.append(
-                find_and_extract_float_statistic(stats_contents, f"system.cpu3.CUs{compute_unit_index}.totalCycles")
-            )
-        
-        avg_number_of_cycles: float = sum(cycles) / len(cycles)
+        # One array per statistic, indexed by compute unit.
+        per_compute_unit = get_indexed_vectors(
+            stats_index,
+            [f"system.cpu3.CUs{{}}.{statistic_name}" for statistic_name in COMPUTE_UNIT_STATISTIC_NAMES],
+            expected_length=parameters.number_of_compute_units
+        )
 
+        def average_over_compute_units(statistic_name: str) -> float:
+            return float(np.mean(per_compute_unit[f"system.cpu3.CUs{{}}.{statistic_name}"]))
 
-        vectors_per_cycle: List[float] = []
-        for compute_unit_index in range(parameters.number_of_compute_units):
-            vectors_per_cycle.append(
-                find_and_extract_float_statistic(stats_contents, f"system.cpu3.CUs{compute_unit_index}.vpc")
-            )
-        
-        avg_number_of_vectors_per_cycle: float = sum(vectors_per_cycle) / len(vectors_per_cycle)
+        avg_executed_vector_alu_instructions: float = average_over_compute_units("vALUInsts")
+        avg_reads_to_shared_memory: float = average_over_compute_units("groupReads")
+        avg_writes_to_shared_memory: float = average_over_compute_units("groupWrites")
+        avg_accesses_of_shared_memory: float = average_over_compute_units("ldsBankAccesses")
+        avg_number_of_cycles: float = average_over_compute_units("totalCycles")
+        avg_number_of_vectors_per_cycle: float = average_over_compute_units("vpc")
 
 
         return cls(
@@ -0,0 +1,6 @@
+"""
+Shared tooling for the gem5 homework scripts (stats.txt parsing and the like).
+
+The per-homework scripts are run directly from their own directories, so they
+put the repository root on `sys.path` before importing from this package.
+"""
@@ -0,0 +1,387 @@
+"""
+Concurrent sbatch submission and batched status polling for the sweep queue scripts.
+
+Submitting a large sweep one blocking `sbatch` at a time spends most of its time
+waiting on the controller. `AsyncSubmitter` collects the job scripts (like
+`JobArray` and `JobPacker` do) and submits them from an asyncio event loop
+with at most `--submit-concurrency` sbatch calls in flight, retrying ones that
+fail transiently. With `--watch`, it then polls the outstanding jobs with one
+`squeue` (and, for jobs that have left the queue, one `sacct`) call per batch
+of job IDs, printing a live queued/running/done/failed summary with an ETA
+extrapolated from how fast jobs have been finishing.
+
+gem5_tools.fake_slurm provides local sbatch/squeue/sacct stand-ins to try this without a cluster:
+
+> python -m gem5_tools.fake_slurm install --bin-directory-path /tmp/fake-slurm-bin --no-container
+> PATH=/tmp/fake-slurm-bin:$PATH python task-1_queue-performance-tests.py ... --submit-concurrency 8 --watch
+"""
+
+from argparse import ArgumentParser
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from gem5_tools.executors import format_slurm_time_limit, parse_sbatch_output
+
+
+# Attempts per job script before its submission counts as failed (sbatch fails transiently when the controller is busy).
+SUBMISSION_ATTEMPTS: int = 3
+SUBMISSION_RETRY_DELAY_SECONDS: float = 2.0
+
+# squeue and sacct are given at most this many job IDs per call.
+POLL_BATCH_SIZE: int = 200
+
+DEFAULT_POLL_INTERVAL_SECONDS: float = 30.0
+
+# When not on a terminal (e.g. a log file), the progress line is printed at most this often.
+PROGRESS_LOG_INTERVAL_SECONDS: float = 10.0
+
+PROGRESS_QUEUED: str = "queued"
+PROGRESS_RUNNING: str = "running"
+PROGRESS_DONE: str = "done"
+PROGRESS_FAILED: str = "failed"
+PROGRESS_UNKNOWN: str = "unknown"
+
+# SLURM job states (squeue %T, sacct State) of jobs that have not finished.
+ACTIVE_SLURM_STATES: Dict[str, str] = {
+    "PENDING": PROGRESS_QUEUED,
+    "REQUEUED": PROGRESS_QUEUED,
+    "CONFIGURING": PROGRESS_RUNNING,
+    "RUNNING": PROGRESS_RUNNING,
+    "COMPLETING": PROGRESS_RUNNING,
+    "SUSPENDED": PROGRESS_RUNNING,
+}
+
+# squeue's error when none of the listed jobs are known to it any more.
+SQUEUE_INVALID_JOB_ERROR: str = "Invalid job id"
+
+
+async def run_command(arguments: List[str]) -> Optional[Tuple[int, str, str]]:
+    """
+    Return code, stdout and stderr of a command, `None` if it is not installed.
+    """
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *arguments,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        return None
+
+    stdout, stderr = await process.communicate()
+    return process.returncode, stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace")
+
+
+def get_progress_state(slurm_state: str) -> str:
+    # sacct reports e.g. "CANCELLED by 1234".
+    slurm_state = slurm_state.split(" ", maxsplit=1)[0]
+
+    if slurm_state in ACTIVE_SLURM_STATES:
+        return ACTIVE_SLURM_STATES[slurm_state]
+
+    return PROGRESS_DONE if slurm_state == "COMPLETED" else PROGRESS_FAILED
+
+
+async def query_squeue(job_ids: List[str]) -> Optional[Dict[str, str]]:
+    """
+    SLURM state of the listed jobs that are still queued or running, `None` if squeue failed.
+    """
+
+    result = await run_command(["squeue", "-h", "-o", "%i|%T", "-j", ",".join(job_ids)])
+    if result is None:
+        return None
+
+    return_code, stdout, stderr = result
+    if return_code != 0:
+        return {} if SQUEUE_INVALID_JOB_ERROR in stderr else None
+
+    slurm_states: Dict[str, str] = {}
+    for line in stdout.splitlines():
+        if "|" in line:
+            job_id, slurm_state = line.strip().split("|", maxsplit=1)
+            slurm_states[job_id] = slurm_state
+
+    return slurm_states
+
+
+async def query_sacct(job_ids: List[str]) -> Optional[Dict[str, str]]:
+    """
+    SLURM state of the listed jobs from accounting, `None` if sacct is not available.
+    """
+
+    result = await run_command(["sacct", "-n", "-X", "-P", "-j", ",".join(job_ids), "--format=JobID,State"])
+    if result is None or result[0] != 0:
+        return None
+
+    slurm_states: Dict[str, str] = {}
+    for line in result[1].splitlines():
+        if "|" in line:
+            job_id, slurm_state = line.strip().split("|", maxsplit=1)
+            slurm_states[job_id] = slurm_state
+
+    return slurm_states
+
+
+async def poll_job_states(job_ids: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Progress state of every listed job (`None` where it could not be determined this time).
+    """
+
+    batches: List[List[str]] = [job_ids[start:start + POLL_BATCH_SIZE] for start in range(0, len(job_ids), POLL_BATCH_SIZE)]
+
+    squeue_results = await asyncio.gather(*(query_squeue(batch) for batch in batches))
+
+    progress_states: Dict[str, Optional[str]] = {}
+    left_queue_job_ids: List[str] = []
+
+    for batch, squeue_states in zip(batches, squeue_results):
+        for job_id in batch:
+            if squeue_states is None:
+                progress_states[job_id] = None
+            elif job_id in squeue_states:
+                progress_states[job_id] = get_progress_state(squeue_states[job_id])
+            else:
+                left_queue_job_ids.append(job_id)
+
+    left_queue_batches: List[List[str]] = [
+        left_queue_job_ids[start:start + POLL_BATCH_SIZE] for start in range(0, len(left_queue_job_ids), POLL_BATCH_SIZE)
+    ]
+
+    sacct_results = await asyncio.gather(*(query_sacct(batch) for batch in left_queue_batches))
+
+    for batch, sacct_states in zip(left_queue_batches, sacct_results):
+        for job_id in batch:
+            if sacct_states is not None and job_id in sacct_states:
+                progress_states[job_id] = get_progress_state(sacct_states[job_id])
+            else:
+                # Left the queue, but its outcome is not recorded anywhere we can see.
+                progress_states[job_id] = PROGRESS_UNKNOWN
+
+    return progress_states
+
+
+@dataclass
+class ProgressLine:
+    """
+    A one-line progress summary, redrawn in place on a terminal and printed now and then otherwise.
+    """
+
+    name: str
+    start_time: float = field(default_factory=time.monotonic)
+    last_line: str = ""
+    last_logged_time: float = 0.0
+
+    def update(self, fields: List[str], finished: int, total: int) -> None:
+        eta: str = "?"
+        if finished == total:
+            eta = "-"
+        elif finished > 0:
+            eta = format_slurm_time_limit((time.monotonic() - self.start_time) / finished * (total - finished))
+
+        line: str = "  ".join([f"[{self.name}]", *fields, f"ETA {eta}"])
+
+        if line == self.last_line:
+            return
+
+        if sys.stdout.isatty():
+            print(f"\r\033[K{line}", end="", flush=True)
+        elif finished == total or time.monotonic() - self.last_logged_time >= PROGRESS_LOG_INTERVAL_SECONDS:
+            print(line, flush=True)
+            self.last_logged_time = time.monotonic()
+
+        self.last_line = line
+
+    def finish(self) -> None:
+        if sys.stdout.isatty() and self.last_line != "":
+            print()
+
+
+async def watch_job_states(job_ids: List[str], name: str, poll_interval_seconds: float) -> Dict[str, str]:
+    """
+    Polls the jobs until none is queued or running, returns their final progress states.
+    """
+
+    progress_line = ProgressLine(name=name)
+    progress_states: Dict[str, str] = {job_id: PROGRESS_QUEUED for job_id in job_ids}
+
+    while True:
+        outstanding_job_ids: List[str] = [
+            job_id for job_id, progress_state in progress_states.items()
+            if progress_state in [PROGRESS_QUEUED, PROGRESS_RUNNING]
+        ]
+
+        if len(outstanding_job_ids) > 0:
+            for job_id, progress_state in (await poll_job_states(outstanding_job_ids)).items():
+                if progress_state is not None:
+                    progress_states[job_id] = progress_state
+
+        counts: Dict[str, int] = {}
+        for progress_state in progress_states.values():
+            counts[progress_state] = counts.get(progress_state, 0) + 1
+
+        fields: List[str] = [
+            f"{progress_state} {counts.get(progress_state, 0)}"
+            for progress_state in [PROGRESS_QUEUED, PROGRESS_RUNNING, PROGRESS_DONE, PROGRESS_FAILED]
+        ]
+
+        if counts.get(PROGRESS_UNKNOWN, 0) > 0:
+            fields.append(f"{PROGRESS_UNKNOWN} {counts[PROGRESS_UNKNOWN]}")
+
+        outstanding_jobs: int = counts.get(PROGRESS_QUEUED, 0) + counts.get(PROGRESS_RUNNING, 0)
+        progress_line.update(fields, len(job_ids) - outstanding_jobs, len(job_ids))
+
+        if outstanding_jobs == 0:
+            progress_line.finish()
+            return progress_states
+
+        await asyncio.sleep(poll_interval_seconds)
+
+
+def watch_jobs(job_ids: List[str], name: str, poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS) -> Dict[str, str]:
+    if len(job_ids) == 0:
+        return {}
+
+    return asyncio.run(watch_job_states(job_ids, name, poll_interval_seconds))
+
+
+@dataclass
+class AsyncSubmitter:
+    """
+    Collects the configurations of a sweep (in place of submitting each one) and
+    submits them with several sbatch calls in flight at once.
+    """
+
+    name: str
+    max_concurrent_submissions: int = 8
+    poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS
+    job_script_file_paths: List[Path] = field(default_factory=list)
+    job_ids: Dict[Path, int] = field(default_factory=dict)
+    failed_submissions: List[Path] = field(default_factory=list)
+
+    def add_job_script(self, job_script_file_path: Path) -> int:
+        """
+        Adds a job script to submit, returns its position in the submission order.
+        """
+
+        self.job_script_file_paths.append(job_script_file_path)
+        return len(self.job_script_file_paths) - 1
+
+    async def _submit(self, job_script_file_path: Path, semaphore: asyncio.Semaphore) -> Optional[int]:
+        error: str = ""
+
+        for attempt in range(SUBMISSION_ATTEMPTS):
+            if attempt > 0:
+                await asyncio.sleep(SUBMISSION_RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+
+            async with semaphore:
+                result = await run_command(["sbatch", job_script_file_path.resolve().as_posix()])
+
+            if result is None:
+                error = "sbatch not found"
+                break
+
+            try:
+                return parse_sbatch_output(result[0], result[1])
+            except (RuntimeError, ValueError) as submission_error:
+                error = f"{submission_error} {result[2].strip()}"
+
+        print(f"  > failed to submit {job_script_file_path}: {error}")
+        return None
+
+    async def _submit_all(self) -> None:
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_submissions))
+        progress_line = ProgressLine(name=self.name)
+        number_of_jobs: int = len(self.job_script_file_paths)
+
+        async def submit_and_report(job_script_file_path: Path) -> None:
+            job_id: Optional[int] = await self._submit(job_script_file_path, semaphore)
+
+            if job_id is None:
+                self.failed_submissions.append(job_script_file_path)
+            else:
+                self.job_ids[job_script_file_path] = job_id
+
+            progress_line.update(
+                [f"submitted {len(self.job_ids)}/{number_of_jobs}", f"failed {len(self.failed_submissions)}"],
+                len(self.job_ids) + len(self.failed_submissions),
+                number_of_jobs
+            )
+
+        await asyncio.gather(*(submit_and_report(job_script_file_path) for job_script_file_path in self.job_script_file_paths))
+        progress_line.finish()
+
+    def submit_all(self) -> Dict[Path, int]:
+        """
+        Submits every collected job script, returns the job ID of each one that was submitted.
+        """
+
+        if len(self.job_script_file_paths) == 0:
+            # E.g. every configuration was served from the result cache.
+            print(f"No jobs to submit for {self.name}")
+            return {}
+
+        print(
+            f"Submitting {len(self.job_script_file_paths)} jobs for {self.name} via sbatch "
+            f"({self.max_concurrent_submissions} at a time)"
+        )
+
+        start_time: float = time.monotonic()
+        asyncio.run(self._submit_all())
+
+        print(f"  > submitted {len(self.job_ids)} jobs in {time.monotonic() - start_time:.1f}s, {len(self.failed_submissions)} failed")
+        return self.job_ids
+
+    def wait(self) -> int:
+        """
+        Polls the submitted jobs until all have finished, returns how many failed (including failed submissions).
+        """
+
+        progress_states: Dict[str, str] = watch_jobs(
+            [str(job_id) for job_id in self.job_ids.values()],
+            self.name,
+            self.poll_interval_seconds
+        )
+
+        failed_job_ids: List[str] = [
+            job_id for job_id, progress_state in progress_states.items() if progress_state == PROGRESS_FAILED
+        ]
+
+        if len(failed_job_ids) > 0:
+            print(f"  > failed jobs: {', '.join(failed_job_ids)}")
+
+        return len(failed_job_ids) + len(self.failed_submissions)
+
+
+def add_async_submission_arguments(argument_parser: ArgumentParser) -> None:
+    argument_parser.add_argument(
+        "--submit-concurrency",
+        required=False,
+        type=int,
+        default=0,
+        dest="submit_concurrency",
+        help="Submit jobs with this many sbatch calls in flight at once, after all job scripts are written (0 to submit each as it is written)."
+    )
+
+    argument_parser.add_argument(
+        "--watch",
+        required=False,
+        action="store_true",
+        dest="watch",
+        help="With --submit-concurrency, poll squeue/sacct and show progress until every job has finished."
+    )
+
+    argument_parser.add_argument(
+        "--poll-interval",
+        required=False,
+        type=float,
+        default=DEFAULT_POLL_INTERVAL_SECONDS,
+        dest="poll_interval_seconds",
+        help="With --watch, seconds between status polls."
+    )
+
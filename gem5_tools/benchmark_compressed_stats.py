@@ -0,0 +1,126 @@
+"""
+Benchmark: disk footprint and end-to-end read time of plain vs. compressed stats.txt.
+
+Every stats.txt under the given root is compressed (into a temporary directory)
+with the same settings the queue scripts use, then fully parsed into a
+`StatsIndex` from each format.
+
+> python -m gem5_tools.benchmark_compressed_stats --root-directory-path .
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import gzip
+from pathlib import Path
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+from gem5_tools.benchmark_stats_index import find_stats_txt_files
+from gem5_tools.compressed_stats import GZIP_SUFFIX, STATS_TXT_FILE_NAME, ZSTD_SUFFIX
+from gem5_tools.stats_index import StatsIndex
+
+
+# Same levels as `build_compression_shell_commands` (gzip -9, zstd -19).
+GZIP_COMPRESSION_LEVEL: int = 9
+ZSTD_COMPRESSION_LEVEL: int = 19
+
+
+@dataclass
+class FormatTotals:
+    disk_bytes: int = 0
+    read_seconds: float = 0.0
+
+
+def write_compressed_copies(stats_txt_path: Path, copy_directory_path: Path, include_zstd: bool) -> Dict[str, Path]:
+    copy_directory_path.mkdir(parents=True)
+
+    plain_copy_path = copy_directory_path.joinpath(STATS_TXT_FILE_NAME)
+    shutil.copyfile(stats_txt_path, plain_copy_path)
+
+    stats_txt_bytes: bytes = plain_copy_path.read_bytes()
+
+    gzip_copy_path = copy_directory_path.joinpath(STATS_TXT_FILE_NAME + GZIP_SUFFIX)
+    gzip_copy_path.write_bytes(gzip.compress(stats_txt_bytes, compresslevel=GZIP_COMPRESSION_LEVEL))
+
+    copies: Dict[str, Path] = {"plain": plain_copy_path, "gzip": gzip_copy_path}
+
+    if include_zstd:
+        import zstandard
+
+        zstd_copy_path = copy_directory_path.joinpath(STATS_TXT_FILE_NAME + ZSTD_SUFFIX)
+        zstd_copy_path.write_bytes(zstandard.ZstdCompressor(level=ZSTD_COMPRESSION_LEVEL).compress(stats_txt_bytes))
+
+        copies["zstd"] = zstd_copy_path
+
+    return copies
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--root-directory-path",
+        dest="root_directory_path",
+        default="."
+    )
+
+    argument_parser.add_argument(
+        "--repetitions",
+        dest="repetitions",
+        type=int,
+        default=3
+    )
+
+    arguments = argument_parser.parse_args()
+
+    stats_txt_paths = find_stats_txt_files(Path(str(arguments.root_directory_path)))
+    if len(stats_txt_paths) == 0:
+        print("No stats.txt files found.")
+        exit(1)
+
+    try:
+        import zstandard  # noqa: F401
+        include_zstd = True
+    except ImportError:
+        print("\"zstandard\" is not installed, only benchmarking gzip.")
+        include_zstd = False
+
+    print(f"Benchmarking {len(stats_txt_paths)} stats.txt files.")
+
+    format_totals: Dict[str, FormatTotals] = {}
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for file_index, stats_txt_path in enumerate(stats_txt_paths):
+            copies = write_compressed_copies(
+                stats_txt_path,
+                Path(temporary_directory).joinpath(str(file_index)),
+                include_zstd
+            )
+
+            for format_name, copy_path in copies.items():
+                totals = format_totals.setdefault(format_name, FormatTotals())
+                totals.disk_bytes += copy_path.stat().st_size
+
+                read_start: float = time.perf_counter()
+                for _ in range(arguments.repetitions):
+                    StatsIndex.from_file_path(copy_path)
+                totals.read_seconds += (time.perf_counter() - read_start) / arguments.repetitions
+
+    plain_totals: FormatTotals = format_totals["plain"]
+
+    for format_name, totals in format_totals.items():
+        format_lines: List[str] = [
+            f"  > {format_name}:",
+            f"      disk: {totals.disk_bytes / (1024 * 1024):.2f} MiB "
+            f"({plain_totals.disk_bytes / totals.disk_bytes:.1f}x smaller than plain)",
+            f"      read + parse: {totals.read_seconds:.3f} s "
+            f"({totals.read_seconds / plain_totals.read_seconds:.2f}x plain)",
+        ]
+
+        print("\n".join(format_lines))
+
+
+if __name__ == "__main__":
+    main()
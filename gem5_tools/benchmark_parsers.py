@@ -0,0 +1,451 @@
+"""
+Benchmark suite: the stats.txt extraction paths, old and new, on the same files.
+
+Every registered path extracts the same statistics from every stats.txt under
+the given root (real results or a tree from `gem5_tools.synthetic_stats`), and
+every replacement must return exactly what the legacy path it replaces returns.
+The fastest of `--repetitions` runs per file is summed per path, and each
+replacement is reported relative to its legacy path timed in the same run. Those
+ratios (not absolute seconds, which only hold on one machine) can be saved as a
+JSON baseline and later runs compared against it, to catch regressions:
+
+> python -m gem5_tools.synthetic_stats --output-directory-path /tmp/synthetic --profile ruby --cores 64 --size 20M --runs 4
+> python -m gem5_tools.benchmark_parsers --root-directory-path /tmp/synthetic --compare-baseline gem5_tools/parser_baseline.json
+
+The committed gem5_tools/parser_baseline.json was recorded on that synthetic tree;
+re-record it with --save-baseline when a parser change is intended to move the numbers.
+A replacement parser is benchmarked by adding it to `PARSER_BENCHMARKS` and the
+legacy path it replaces to `LEGACY_PARSERS`.
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import importlib.util
+import json
+import math
+import os
+from pathlib import Path
+import platform
+import re
+import sys
+import time
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Union
+
+from gem5_tools.benchmark_stats_index import (
+    find_stats_txt_files,
+    legacy_find_and_extract_float_statistic,
+    select_statistic_names,
+)
+from gem5_tools.dump_index import SIMULATION_BEGIN_MARKER, DumpBlockIndex
+from gem5_tools.lazy_stats import load_statistics_with_prefixes
+from gem5_tools.stats_index import StatsIndex
+from gem5_tools.stats_sidecar import index_all_dumps, load_or_build_dump_indexes, sidecar_path_for
+
+
+PROCESS_DATA_PATH: Path = Path(__file__).resolve().parents[1].joinpath("second_homework_cs", "smp_ruby", "process_data.py")
+
+# A replacement is reported as a regression when its time relative to its legacy path grows this much over the baseline's.
+DEFAULT_REGRESSION_TOLERANCE: float = 0.10
+
+# Statistic name (or process_data field) -> extracted value.
+ExtractedValues = Dict[str, Union[float, str]]
+
+
+@dataclass(frozen=True, kw_only=True)
+class BenchmarkInput:
+    stats_txt_path: Path
+    # Statistics spread over the first dump, looked up by the per-key paths.
+    statistic_names: List[str]
+    # Fields read by second_homework_cs/smp_ruby/process_data.py.
+    field_keys: List[str]
+
+
+def legacy_select_simulation_statistic(full_log_file: str, selected_nth_simulation: int) -> str:
+    # Verbatim copy of the dump selection the second homework scripts used before `DumpBlockIndex`.
+    valid_selected_lines: List[str] = []
+
+    current_simulation_index: Optional[int] = None
+    for line in full_log_file.splitlines(keepends=True):
+        if line.startswith(SIMULATION_BEGIN_MARKER):
+            if current_simulation_index is None:
+                current_simulation_index = 0
+            else:
+                current_simulation_index += 1
+
+        if current_simulation_index == selected_nth_simulation:
+            valid_selected_lines.append(line)
+
+    return "".join(valid_selected_lines)
+
+
+def legacy_process_data_extract_stats(file_path, base_keys):
+    # Verbatim copy of process_data.extract_stats before the single matcher pass.
+    def extract_all_core_cpis(file_path):
+        cpi_pattern = re.compile(r'board\.processor\.cores(\d+)\.core\.cpi')
+        core_cpis = {}
+        with open(file_path, 'r') as file:
+            for line in file:
+                match = cpi_pattern.match(line.strip())
+                if match:
+                    parts = re.split(r'\s{2,}', line.strip())
+                    if len(parts) >= 2:
+                        try:
+                            core_cpis[line.strip().split()[0]] = float(parts[1])
+                        except ValueError:
+                            core_cpis[line.strip().split()[0]] = parts[1]
+        return core_cpis
+
+    stats = {}
+    with open(file_path, 'r') as file:
+        for line in file:
+            for key in base_keys:
+                if line.strip().startswith(key):
+                    parts = re.split(r'\s{2,}', line.strip())
+                    if len(parts) >= 2:
+                        try:
+                            stats[key] = float(parts[1])
+                        except ValueError:
+                            stats[key] = parts[1]
+    stats.update(extract_all_core_cpis(file_path))
+    return stats
+
+
+def load_process_data_module() -> ModuleType:
+    # process_data.py is a standalone script, not part of a package.
+    module_specification = importlib.util.spec_from_file_location("process_data", PROCESS_DATA_PATH)
+    process_data = importlib.util.module_from_spec(module_specification)
+    module_specification.loader.exec_module(process_data)
+
+    return process_data
+
+
+process_data: ModuleType = load_process_data_module()
+
+
+def run_legacy_find_and_extract(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    stats_txt_content: str = benchmark_input.stats_txt_path.read_text(encoding="utf-8")
+
+    return {
+        name: legacy_find_and_extract_float_statistic(stats_txt_content, name)
+        for name in benchmark_input.statistic_names
+    }
+
+
+def run_legacy_select_simulation_statistic(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    selected_sim: str = legacy_select_simulation_statistic(
+        benchmark_input.stats_txt_path.read_text(encoding="utf-8"),
+        selected_nth_simulation=0
+    )
+
+    return {
+        name: legacy_find_and_extract_float_statistic(selected_sim, name)
+        for name in benchmark_input.statistic_names
+    }
+
+
+def run_stats_index(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    stats_index = StatsIndex.from_file_path(benchmark_input.stats_txt_path)
+
+    return {name: stats_index.get_float(name) for name in benchmark_input.statistic_names}
+
+
+def run_dump_block_index(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    stats_index = DumpBlockIndex.load_or_scan(benchmark_input.stats_txt_path, write_sidecar=False).index_block(0)
+
+    return {name: stats_index.get_float(name) for name in benchmark_input.statistic_names}
+
+
+def run_prefix_loader(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    stats_index = load_statistics_with_prefixes(benchmark_input.stats_txt_path, benchmark_input.statistic_names)
+
+    return {name: stats_index.get_float(name) for name in benchmark_input.statistic_names}
+
+
+def run_stats_sidecar(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    stats_index = load_or_build_dump_indexes(benchmark_input.stats_txt_path)[0]
+
+    return {name: stats_index.get_float(name) for name in benchmark_input.statistic_names}
+
+
+def run_legacy_process_data(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    return legacy_process_data_extract_stats(benchmark_input.stats_txt_path.as_posix(), benchmark_input.field_keys)
+
+
+def run_process_data(benchmark_input: BenchmarkInput) -> ExtractedValues:
+    return process_data.extract_stats(benchmark_input.stats_txt_path.as_posix(), benchmark_input.field_keys)
+
+
+PARSER_BENCHMARKS: Dict[str, Callable[[BenchmarkInput], ExtractedValues]] = {
+    "legacy_find_and_extract": run_legacy_find_and_extract,
+    "legacy_select_simulation_statistic": run_legacy_select_simulation_statistic,
+    "stats_index": run_stats_index,
+    "dump_block_index": run_dump_block_index,
+    "prefix_loader": run_prefix_loader,
+    # Timed with a warm sidecar, the first (untimed) warm-up run writes it.
+    "stats_sidecar": run_stats_sidecar,
+    "legacy_process_data_extract_stats": run_legacy_process_data,
+    "process_data_extract_stats": run_process_data,
+}
+
+# Replacement -> the legacy path it must agree with and is timed against (the other paths are legacy).
+LEGACY_PARSERS: Dict[str, str] = {
+    "stats_index": "legacy_find_and_extract",
+    "dump_block_index": "legacy_select_simulation_statistic",
+    "prefix_loader": "legacy_find_and_extract",
+    "stats_sidecar": "legacy_find_and_extract",
+    "process_data_extract_stats": "legacy_process_data_extract_stats",
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class BenchmarkResult:
+    name: str
+    seconds: float
+    megabytes_per_second: float
+
+
+def prepare_benchmark_input(stats_txt_path: Path, number_of_lookups: int) -> BenchmarkInput:
+    return BenchmarkInput(
+        stats_txt_path=stats_txt_path,
+        statistic_names=select_statistic_names(index_all_dumps(stats_txt_path)[0], number_of_lookups),
+        field_keys=process_data.load_field_keys(process_data.DEFAULT_FIELDS_FILE)
+    )
+
+
+def values_match(expected_value: Union[float, str], value: Union[float, str]) -> bool:
+    # NaN (e.g. an empty rate) never equals itself.
+    if isinstance(expected_value, float) and isinstance(value, float) and math.isnan(expected_value):
+        return math.isnan(value)
+
+    return type(expected_value) is type(value) and expected_value == value
+
+
+def find_mismatched_values(expected_values: ExtractedValues, values: ExtractedValues) -> List[str]:
+    """
+    The names whose values differ between the two extractions (or that only one of them has).
+    """
+
+    return sorted(
+        name for name in expected_values.keys() | values.keys()
+        if name not in expected_values or name not in values or not values_match(expected_values[name], values[name])
+    )
+
+
+def check_replacements(replacement_names: List[str], benchmark_inputs: List[BenchmarkInput]) -> List[str]:
+    """
+    Runs every replacement and its legacy path on every input, returns a
+    description of each disagreement (none if all of them agree).
+    """
+
+    mismatches: List[str] = []
+
+    for benchmark_input in benchmark_inputs:
+        legacy_values: Dict[str, ExtractedValues] = {}
+
+        for name in replacement_names:
+            legacy_name: str = LEGACY_PARSERS[name]
+            if legacy_name not in legacy_values:
+                legacy_values[legacy_name] = PARSER_BENCHMARKS[legacy_name](benchmark_input)
+
+            mismatched_names: List[str] = find_mismatched_values(legacy_values[legacy_name], PARSER_BENCHMARKS[name](benchmark_input))
+            if len(mismatched_names) > 0:
+                mismatches.append(
+                    f"{name} disagrees with {legacy_name} on {benchmark_input.stats_txt_path}: "
+                    f"{', '.join(mismatched_names[:5])}{' ...' if len(mismatched_names) > 5 else ''}"
+                )
+
+    return mismatches
+
+
+def run_benchmark(
+    name: str,
+    function: Callable[[BenchmarkInput], ExtractedValues],
+    benchmark_inputs: List[BenchmarkInput],
+    total_bytes: int,
+    repetitions: int,
+) -> BenchmarkResult:
+    total_seconds: float = 0.0
+
+    for benchmark_input in benchmark_inputs:
+        # Warm-up: page cache, lazily compiled regexes, sidecars.
+        function(benchmark_input)
+
+        fastest_seconds: float = float("inf")
+        for _ in range(repetitions):
+            run_start: float = time.perf_counter()
+            function(benchmark_input)
+            fastest_seconds = min(fastest_seconds, time.perf_counter() - run_start)
+
+        total_seconds += fastest_seconds
+
+    return BenchmarkResult(
+        name=name,
+        seconds=total_seconds,
+        megabytes_per_second=total_bytes / (1000 * 1000) / max(total_seconds, 1e-9)
+    )
+
+
+def remove_created_sidecars(stats_txt_paths: List[Path], preexisting_sidecar_paths: List[Path]) -> None:
+    for stats_txt_path in stats_txt_paths:
+        sidecar_path = sidecar_path_for(stats_txt_path)
+        if sidecar_path not in preexisting_sidecar_paths and sidecar_path.is_file():
+            sidecar_path.unlink()
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--root-directory-path",
+        dest="root_directory_path",
+        default="."
+    )
+
+    argument_parser.add_argument(
+        "--benchmarks",
+        dest="benchmarks",
+        default=",".join(PARSER_BENCHMARKS),
+        help=f"Comma separated subset of: {', '.join(PARSER_BENCHMARKS)}."
+    )
+
+    argument_parser.add_argument(
+        "--lookups",
+        dest="lookups",
+        type=int,
+        default=16,
+        help="Number of statistics the per-key paths extract from each file."
+    )
+
+    argument_parser.add_argument(
+        "--repetitions",
+        dest="repetitions",
+        type=int,
+        default=3
+    )
+
+    argument_parser.add_argument(
+        "--save-baseline",
+        dest="save_baseline_path",
+        default=None
+    )
+
+    argument_parser.add_argument(
+        "--compare-baseline",
+        dest="compare_baseline_path",
+        default=None
+    )
+
+    argument_parser.add_argument(
+        "--tolerance",
+        dest="tolerance",
+        type=float,
+        default=DEFAULT_REGRESSION_TOLERANCE,
+        help="Relative slowdown (of a replacement against its legacy path) over the baseline that counts as a regression."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    selected_benchmarks: List[str] = [name.strip() for name in str(arguments.benchmarks).split(",") if name.strip()]
+    for name in selected_benchmarks:
+        if name not in PARSER_BENCHMARKS:
+            print(f"Unknown benchmark: {name} (expected one of {', '.join(PARSER_BENCHMARKS)})")
+            exit(1)
+
+    # A replacement is timed relative to its legacy path, so that runs too.
+    timed_benchmarks: List[str] = [
+        name for name in PARSER_BENCHMARKS
+        if name in selected_benchmarks or any(LEGACY_PARSERS.get(selected_name) == name for selected_name in selected_benchmarks)
+    ]
+    replacement_names: List[str] = [name for name in timed_benchmarks if name in LEGACY_PARSERS]
+
+    stats_txt_paths = find_stats_txt_files(Path(str(arguments.root_directory_path)))
+    if len(stats_txt_paths) == 0:
+        print("No stats.txt files found.")
+        exit(1)
+
+    total_bytes: int = sum(stats_txt_path.stat().st_size for stats_txt_path in stats_txt_paths)
+
+    print(
+        f"Benchmarking {len(timed_benchmarks)} parsers on {len(stats_txt_paths)} stats.txt files "
+        f"({total_bytes / (1024 * 1024):.1f} MiB, best of {arguments.repetitions})."
+    )
+
+    benchmark_inputs: List[BenchmarkInput] = [
+        prepare_benchmark_input(stats_txt_path, arguments.lookups)
+        for stats_txt_path in stats_txt_paths
+    ]
+
+    preexisting_sidecar_paths: List[Path] = [
+        sidecar_path_for(stats_txt_path)
+        for stats_txt_path in stats_txt_paths
+        if sidecar_path_for(stats_txt_path).is_file()
+    ]
+
+    results: Dict[str, BenchmarkResult] = {}
+    try:
+        mismatches: List[str] = check_replacements(replacement_names, benchmark_inputs)
+        if len(mismatches) > 0:
+            print("Replacements that do not return what their legacy path returns:")
+            for mismatch in mismatches:
+                print(f"  > {mismatch}")
+            exit(1)
+
+        for name in timed_benchmarks:
+            result = run_benchmark(name, PARSER_BENCHMARKS[name], benchmark_inputs, total_bytes, arguments.repetitions)
+            results[name] = result
+
+            print(f"  > {name}: {result.seconds:.3f} s ({result.megabytes_per_second:.1f} MB/s)")
+    finally:
+        remove_created_sidecars(stats_txt_paths, preexisting_sidecar_paths)
+
+    relative_times: Dict[str, float] = {
+        name: results[name].seconds / max(results[LEGACY_PARSERS[name]].seconds, 1e-9)
+        for name in replacement_names
+    }
+
+    print("Relative to the legacy paths:")
+    for name, relative_time in relative_times.items():
+        print(f"  > {name}: {relative_time:.2f}x {LEGACY_PARSERS[name]}")
+
+    if arguments.compare_baseline_path is not None:
+        baseline = json.loads(Path(str(arguments.compare_baseline_path)).read_text(encoding="utf-8"))
+        baseline_relative_times: Dict[str, float] = baseline["relative_to_legacy"]
+
+        print(f"Compared to {arguments.compare_baseline_path} ({baseline['files']} files, {baseline['python']}):")
+
+        regressions: List[str] = []
+        for name, relative_time in relative_times.items():
+            if name not in baseline_relative_times:
+                print(f"  > {name}: not in baseline")
+                continue
+
+            is_regression: bool = relative_time > baseline_relative_times[name] * (1 + arguments.tolerance)
+            if is_regression:
+                regressions.append(name)
+
+            print(f"  > {name}: {relative_time:.2f}x legacy, baseline {baseline_relative_times[name]:.2f}x{' (REGRESSION)' if is_regression else ''}")
+
+        if len(regressions) > 0:
+            print(f"Regressions: {', '.join(regressions)}")
+            exit(1)
+
+    if arguments.save_baseline_path is not None:
+        baseline = {
+            "root_directory_path": Path(str(arguments.root_directory_path)).resolve().as_posix(),
+            "files": len(stats_txt_paths),
+            "bytes": total_bytes,
+            "repetitions": arguments.repetitions,
+            "lookups": arguments.lookups,
+            "python": sys.version.split()[0],
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "relative_to_legacy": relative_times,
+        }
+
+        Path(str(arguments.save_baseline_path)).write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"Saved baseline to {arguments.save_baseline_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Micro-benchmark: per-key line rescans vs. the single-pass `StatsIndex`.
+
+For every stats.txt under the given root, a fixed set of statistic names spread
+across the file is extracted with both approaches and the timings are compared.
+
+> python -m gem5_tools.benchmark_stats_index --root-directory-path .
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import time
+from typing import List
+
+from gem5_tools.stats_index import StatsIndex
+
+
+def legacy_find_and_extract_float_statistic(
+    stats_txt_content: str,
+    statistic_name: str,
+) -> float:
+    # Verbatim copy of the helper that used to be duplicated in every analyzer script.
+    for line in stats_txt_content.splitlines(keepends=False):
+        if line.startswith(statistic_name):
+            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
+            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
+
+            return float(statistic_value_str)
+
+
+    raise ValueError(f"No such statistic: {statistic_name}")
+
+
+def find_stats_txt_files(root_directory_path: Path) -> List[Path]:
+    stats_txt_paths: List[Path] = []
+
+    for directory_path, _, file_names in os.walk(root_directory_path):
+        if "stats.txt" in file_names:
+            stats_txt_paths.append(Path(directory_path).joinpath("stats.txt"))
+
+    return sorted(stats_txt_paths)
+
+
+def select_statistic_names(index: StatsIndex, number_of_names: int) -> List[str]:
+    """
+    Picks `number_of_names` numeric statistics spread evenly over the file, so the
+    legacy scan is not unfairly favoured by keys that sit at the top of the file.
+    """
+
+    numeric_names: List[str] = []
+    for name, raw_value in index.raw_values.items():
+        try:
+            float(raw_value)
+        except ValueError:
+            continue
+
+        numeric_names.append(name)
+
+    if len(numeric_names) <= number_of_names:
+        return numeric_names
+
+    step: float = len(numeric_names) / number_of_names
+    return [numeric_names[int(i * step)] for i in range(number_of_names)]
+
+
+@dataclass(frozen=True, kw_only=True)
+class FileTimings:
+    stats_txt_path: Path
+    legacy_seconds: float
+    indexed_seconds: float
+
+
+def benchmark_file(stats_txt_path: Path, number_of_lookups: int, repetitions: int) -> FileTimings:
+    with stats_txt_path.open(mode="r", encoding="utf-8") as stats_file:
+        stats_txt_content: str = stats_file.read()
+
+    statistic_names = select_statistic_names(StatsIndex.from_text(stats_txt_content), number_of_lookups)
+
+    legacy_start: float = time.perf_counter()
+    for _ in range(repetitions):
+        for name in statistic_names:
+            legacy_find_and_extract_float_statistic(stats_txt_content, name)
+    legacy_seconds: float = (time.perf_counter() - legacy_start) / repetitions
+
+    indexed_start: float = time.perf_counter()
+    for _ in range(repetitions):
+        index = StatsIndex.from_text(stats_txt_content)
+        for name in statistic_names:
+            index.get_float(name)
+    indexed_seconds: float = (time.perf_counter() - indexed_start) / repetitions
+
+    return FileTimings(
+        stats_txt_path=stats_txt_path,
+        legacy_seconds=legacy_seconds,
+        indexed_seconds=indexed_seconds
+    )
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--root-directory-path",
+        dest="root_directory_path",
+        default="."
+    )
+
+    argument_parser.add_argument(
+        "--lookups",
+        dest="lookups",
+        type=int,
+        default=16,
+        help="Number of statistics to extract from each file."
+    )
+
+    argument_parser.add_argument(
+        "--repetitions",
+        dest="repetitions",
+        type=int,
+        default=3
+    )
+
+    arguments = argument_parser.parse_args()
+
+    stats_txt_paths = find_stats_txt_files(Path(str(arguments.root_directory_path)))
+    if len(stats_txt_paths) == 0:
+        print("No stats.txt files found.")
+        exit(1)
+
+    print(f"Benchmarking {len(stats_txt_paths)} stats.txt files ({arguments.lookups} lookups each).")
+
+    all_timings: List[FileTimings] = [
+        benchmark_file(stats_txt_path, arguments.lookups, arguments.repetitions)
+        for stats_txt_path in stats_txt_paths
+    ]
+
+    total_legacy_seconds: float = sum(timings.legacy_seconds for timings in all_timings)
+    total_indexed_seconds: float = sum(timings.indexed_seconds for timings in all_timings)
+
+    slowest = max(all_timings, key=lambda timings: timings.legacy_seconds)
+
+    print(f"  > per-key rescans: {total_legacy_seconds:.3f} s")
+    print(f"  > single-pass index: {total_indexed_seconds:.3f} s")
+    print(f"  > speedup: {total_legacy_seconds / total_indexed_seconds:.2f}x")
+    print(
+        f"  > slowest file: {slowest.stats_txt_path.as_posix()} "
+        f"({slowest.legacy_seconds * 1000:.1f} ms -> {slowest.indexed_seconds * 1000:.1f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Workload checkpoints that the points of a cache sweep restore instead of
+re-simulating the workload's initialization.
+
+A config script run with `--take_checkpoint` simulates its workload on ATOMIC
+cores up to `--checkpoint_insts` instructions (or `--checkpoint_tick`), saves a
+gem5 checkpoint there and exits. Run with `--restore_checkpoint`, it starts from
+that checkpoint on its own cores and cache hierarchy (caches are not part of a
+checkpoint, so any hierarchy can restore it). It then simulates `--warmup_insts`
+instructions to fill the caches and resets the statistics before measuring the
+rest of the workload.
+
+A sweep (see gem5_tools.sweep_spec) gets one `WorkloadCheckpoint` per workload.
+A checkpoint that is not stored yet is taken by a job of its own
+(`build_take_checkpoint_shell_commands`), which the configurations of that
+workload wait for: on SLURM through `--dependency=afterok` (and
+`--kill-on-invalid-dep`, so they are cancelled if it fails), locally by running
+it first. No file lock is involved, since flock is not supported on every shared
+filesystem (Lustre mounted without `-o flock`, NFS without a lock manager); the
+checkpoint is staged next to its final place and renamed into it, which any
+POSIX filesystem does atomically. Checkpoints are content-addressed like
+gem5_tools.result_cache entries: by the config scripts, the workload binary, the
+gem5 build and the checkpoint position, so later sweeps with the same inputs
+only restore them. They live in `checkpoints/` at the repository root, or
+wherever `GEM5_CHECKPOINT_STORE` points.
+
+The config scripts import this module inside gem5's interpreter, so only the
+standard library is used at module level and gem5 is imported where it is used.
+
+Show the stored checkpoints or clear them with:
+
+> python -m gem5_tools.checkpoints [--clear]
+"""
+
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Dict, List, Optional, Self, Union
+
+from gem5_tools.result_cache import ResultCacheKey
+from gem5_tools.windowed_simulation import schedule_window_end
+
+
+DEFAULT_CHECKPOINT_STORE_PATH: Path = Path(__file__).resolve().parents[1].joinpath("checkpoints")
+
+CHECKPOINT_STORE_PATH_ENVIRONMENT_VARIABLE: str = "GEM5_CHECKPOINT_STORE"
+
+# Inside a checkpoint directory: the gem5 checkpoint, the output directory of the run that took it, and its key.
+CHECKPOINT_SUBDIRECTORY_NAME: str = "cpt"
+CHECKPOINT_OUTPUT_SUBDIRECTORY_NAME: str = "output"
+CHECKPOINT_KEY_FILE_NAME: str = "checkpoint-key.json"
+
+
+def get_checkpoint_store_path() -> Path:
+    overridden_store_path: Optional[str] = os.environ.get(CHECKPOINT_STORE_PATH_ENVIRONMENT_VARIABLE)
+    if overridden_store_path:
+        return Path(overridden_store_path)
+
+    return DEFAULT_CHECKPOINT_STORE_PATH
+
+
+@dataclass(frozen=True, kw_only=True)
+class WorkloadCheckpoint:
+    # Moved into place whole once the checkpoint is taken, so it exists only when complete.
+    directory_path: Path
+    workload_name: str
+    # Where the checkpoint is taken: after this many instructions of the first core, or at this tick.
+    checkpoint_instructions: int
+    checkpoint_tick: int
+    # Simulated after restoring, before the statistics are reset.
+    warmup_instructions: int
+    key: Optional[ResultCacheKey] = None
+
+    @classmethod
+    def from_workload(
+        cls,
+        config_script_path: Path,
+        workload_path: Path,
+        # The gem5 binary and container that take and restore the checkpoint.
+        gem5_build_paths: List[Path],
+        checkpoint_instructions: int,
+        checkpoint_tick: int,
+        warmup_instructions: int,
+        run_directory_path: Path,
+    ) -> Self:
+        """
+        The checkpoint of `workload_path` in the checkpoint store, or in
+        `run_directory_path` if its inputs cannot be read from here (then it is
+        still shared by the jobs of this sweep, but not by later sweeps).
+        """
+
+        key: Optional[ResultCacheKey] = ResultCacheKey.from_job_inputs(
+            config_script_path=config_script_path,
+            parameters={
+                "checkpoint_insts": checkpoint_instructions,
+                "checkpoint_tick": checkpoint_tick,
+            },
+            workload_paths=[workload_path],
+            gem5_build_paths=gem5_build_paths
+        )
+
+        directory_path: Path = run_directory_path.resolve().joinpath("checkpoints", workload_path.stem) if key is None \
+            else get_checkpoint_store_path().resolve().joinpath(key.digest[:2], key.digest)
+
+        return cls(
+            directory_path=directory_path,
+            workload_name=workload_path.name,
+            checkpoint_instructions=checkpoint_instructions,
+            checkpoint_tick=checkpoint_tick,
+            warmup_instructions=warmup_instructions,
+            key=key
+        )
+
+    def exists(self) -> bool:
+        return self.directory_path.joinpath(CHECKPOINT_SUBDIRECTORY_NAME).is_dir()
+
+    def get_result_parameters(self) -> Dict[str, int]:
+        """
+        The parameters that make a restored run's results differ from a full run's (for result cache keys).
+        """
+
+        return {
+            "checkpoint_insts": self.checkpoint_instructions,
+            "checkpoint_tick": self.checkpoint_tick,
+            "warmup_insts": self.warmup_instructions,
+        }
+
+    def get_take_arguments(self, checkpoint_path: str) -> str:
+        position_argument: str = f"--checkpoint_tick=\"{self.checkpoint_tick}\"" if self.checkpoint_tick > 0 \
+            else f"--checkpoint_insts=\"{self.checkpoint_instructions}\""
+
+        return f"--take_checkpoint=\"{checkpoint_path}\" {position_argument}"
+
+    def get_restore_arguments(self) -> str:
+        return \
+            f"--restore_checkpoint=\"{self.directory_path.joinpath(CHECKPOINT_SUBDIRECTORY_NAME).as_posix()}\" " \
+            f"--warmup_insts=\"{self.warmup_instructions}\""
+
+
+def build_take_checkpoint_shell_commands(checkpoint: WorkloadCheckpoint, gem5_command: str, config_script_arguments: str) -> str:
+    """
+    Shell snippet for the job that takes the checkpoint (if no other job has
+    meanwhile), exiting with gem5's exit code. `gem5_command` runs gem5 (up to
+    its options), `config_script_arguments` are the config script and the options
+    that select the workload. The checkpoint is taken into a staging directory of
+    this job and renamed into place, so a failed attempt leaves nothing behind; if
+    another job (e.g. of a concurrent sweep with the same inputs) renamed its copy
+    into place first, that one is kept.
+    """
+
+    directory_path: str = checkpoint.directory_path.as_posix()
+    checkpoint_key_json: str = json.dumps(
+        {"digest": checkpoint.key.digest, "inputs": checkpoint.key.inputs} if checkpoint.key is not None else {},
+        sort_keys=True
+    )
+
+    return f"""
+if [ -d "{directory_path}/{CHECKPOINT_SUBDIRECTORY_NAME}" ]; then
+    echo "The {checkpoint.workload_name} checkpoint {directory_path} is already stored"
+    exit 0
+fi
+
+echo "Taking the {checkpoint.workload_name} checkpoint"
+mkdir -p "{checkpoint.directory_path.parent.as_posix()}"
+CHECKPOINT_STAGING_DIRECTORY=$(mktemp -d "{directory_path}.staging-XXXXXX") || exit 1
+echo '{checkpoint_key_json}' > "$CHECKPOINT_STAGING_DIRECTORY/{CHECKPOINT_KEY_FILE_NAME}"
+{gem5_command} \\
+    --outdir="$CHECKPOINT_STAGING_DIRECTORY/{CHECKPOINT_OUTPUT_SUBDIRECTORY_NAME}" {config_script_arguments} \\
+        {checkpoint.get_take_arguments(f"$CHECKPOINT_STAGING_DIRECTORY/{CHECKPOINT_SUBDIRECTORY_NAME}")}
+GEM5_EXIT_CODE=$?
+if [ "$GEM5_EXIT_CODE" != "0" ]; then
+    echo "Could not take the {checkpoint.workload_name} checkpoint (exit code $GEM5_EXIT_CODE)"
+    rm -rf "$CHECKPOINT_STAGING_DIRECTORY"
+    exit $GEM5_EXIT_CODE
+fi
+
+# Renaming onto a directory fails only if it is not empty, i.e. holds a checkpoint or a stale attempt.
+if ! mv -T "$CHECKPOINT_STAGING_DIRECTORY" "{directory_path}" 2> /dev/null; then
+    if [ -d "{directory_path}/{CHECKPOINT_SUBDIRECTORY_NAME}" ]; then
+        echo "Another job stored the {checkpoint.workload_name} checkpoint first, keeping that one"
+        rm -rf "$CHECKPOINT_STAGING_DIRECTORY"
+    else
+        rm -rf "{directory_path}"
+        mv -T "$CHECKPOINT_STAGING_DIRECTORY" "{directory_path}" || exit 1
+    fi
+fi
+echo "Stored the {checkpoint.workload_name} checkpoint in {directory_path}"
+"""
+
+
+def build_checkpoint_shell_commands(checkpoint: WorkloadCheckpoint) -> str:
+    """
+    Shell snippet for the start of a job script that restores the checkpoint: it
+    fails the job if the checkpoint is missing (its checkpoint job failed).
+    """
+
+    directory_path: str = checkpoint.directory_path.as_posix()
+
+    return f"""
+if [ ! -d "{directory_path}/{CHECKPOINT_SUBDIRECTORY_NAME}" ]; then
+    echo "The {checkpoint.workload_name} checkpoint {directory_path} was not taken, queue the sweep again to take it"
+    exit 1
+fi
+echo "Restoring the {checkpoint.workload_name} checkpoint {directory_path}"
+"""
+
+
+def add_checkpoint_arguments(argument_parser: ArgumentParser, default_checkpoint_instructions: int, default_warmup_instructions: int) -> None:
+    argument_parser.add_argument(
+        "--checkpoint",
+        required=False,
+        action="store_true",
+        dest="use_checkpoints",
+        help="Simulate the initialization of each workload once, checkpoint it, and restore that checkpoint for every configuration."
+    )
+
+    argument_parser.add_argument(
+        "--checkpoint-insts",
+        required=False,
+        type=int,
+        default=default_checkpoint_instructions,
+        dest="checkpoint_instructions",
+        help=f"With --checkpoint, take the checkpoints after this many instructions (default {default_checkpoint_instructions})."
+    )
+
+    argument_parser.add_argument(
+        "--checkpoint-tick",
+        required=False,
+        type=int,
+        default=0,
+        dest="checkpoint_tick",
+        help="With --checkpoint, take the checkpoints at this tick instead (0 to use --checkpoint-insts)."
+    )
+
+    argument_parser.add_argument(
+        "--warmup-insts",
+        required=False,
+        type=int,
+        default=default_warmup_instructions,
+        dest="warmup_instructions",
+        help=f"With --checkpoint, instructions that warm the caches after restoring, before measuring (default {default_warmup_instructions})."
+    )
+
+
+def take_checkpoint(board, arguments: Namespace) -> None:
+    """
+    Simulates up to `--checkpoint_insts` instructions (on the first core) or up
+    to `--checkpoint_tick`, and saves a checkpoint to `--take_checkpoint`. Exits
+    with an error if the workload ends before that.
+    """
+
+    from gem5.simulate.exit_event import ExitEvent
+    from gem5.simulate.simulator import Simulator
+
+    reached_checkpoint: bool = False
+
+    def on_checkpoint_reached():
+        nonlocal reached_checkpoint
+
+        while True:
+            reached_checkpoint = True
+            yield True
+
+    if arguments.checkpoint_tick <= 0:
+        schedule_window_end(board, arguments.checkpoint_insts, instantiated=False)
+
+    simulator = Simulator(
+        board=board,
+        on_exit_event={
+            ExitEvent.MAX_INSTS: on_checkpoint_reached(),
+            ExitEvent.MAX_TICK: on_checkpoint_reached(),
+        }
+    )
+
+    if arguments.checkpoint_tick > 0:
+        simulator.run(max_ticks=arguments.checkpoint_tick)
+    else:
+        simulator.run()
+
+    if not reached_checkpoint:
+        print(f"The workload exited before the checkpoint ({simulator.get_last_exit_event_cause()}).")
+        exit(1)
+
+    simulator.save_checkpoint(Path(arguments.take_checkpoint))
+    print(f"Saved the checkpoint at tick {simulator.get_current_tick()} to {arguments.take_checkpoint}")
+
+
+def build_warmup_exit_handlers(board, arguments: Namespace) -> Dict:
+    """
+    `Simulator` exit event handlers that reset the statistics after the
+    `--warmup_insts` instructions that follow restoring a checkpoint (none without a warmup).
+    """
+
+    if arguments.warmup_insts <= 0:
+        return {}
+
+    import m5
+    from gem5.simulate.exit_event import ExitEvent
+
+    def on_warmup_end():
+        while True:
+            print(f"Cache warmup ends at tick {m5.curTick()}: statistics reset")
+            m5.stats.reset()
+            yield False
+
+    schedule_window_end(board, arguments.warmup_insts, instantiated=False)
+
+    return {ExitEvent.MAX_INSTS: on_warmup_end()}
+
+
+def get_restore_checkpoint_path(arguments: Namespace) -> Optional[Path]:
+    return Path(arguments.restore_checkpoint) if arguments.restore_checkpoint else None
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--clear",
+        required=False,
+        action="store_true",
+        dest="clear",
+        help="Delete every stored checkpoint."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    store_path: Path = get_checkpoint_store_path()
+
+    checkpoint_key_file_paths: List[Path] = sorted(store_path.glob(f"*/*/{CHECKPOINT_KEY_FILE_NAME}")) \
+        if store_path.is_dir() else []
+
+    for checkpoint_key_file_path in checkpoint_key_file_paths:
+        checkpoint_directory_path: Path = checkpoint_key_file_path.parent
+        checkpoint_key: Dict[str, Union[str, Dict]] = json.loads(checkpoint_key_file_path.read_text(encoding="utf8"))
+        checkpoint_inputs: Dict = checkpoint_key.get("inputs", {})
+
+        size_bytes: int = sum(file_path.stat().st_size for file_path in checkpoint_directory_path.rglob("*") if file_path.is_file())
+
+        print(
+            f"{checkpoint_directory_path.name[:12]}  "
+            f"{', '.join(checkpoint_inputs.get('workloads_sha256', {}).keys())}  "
+            f"{json.dumps(checkpoint_inputs.get('parameters', {}), sort_keys=True)}  "
+            f"{size_bytes / 2 ** 20:.1f} MiB"
+        )
+
+    print(f"{len(checkpoint_key_file_paths)} checkpoints in {store_path.as_posix()}")
+
+    if arguments.clear and store_path.is_dir():
+        shutil.rmtree(store_path)
+        print("Cleared.")
+
+
+if __name__ == "__main__":
+    main()
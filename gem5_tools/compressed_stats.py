@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+import gzip
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, TextIO
+
+
+STATS_TXT_FILE_NAME: str = "stats.txt"
+
+GZIP_SUFFIX: str = ".gz"
+ZSTD_SUFFIX: str = ".zst"
+
+# Looked up in this order, so an uncompressed stats.txt (e.g. from a run that is
+# still being written) always takes precedence over an archived one.
+STATS_TXT_FILE_NAMES: List[str] = [
+    STATS_TXT_FILE_NAME,
+    STATS_TXT_FILE_NAME + ZSTD_SUFFIX,
+    STATS_TXT_FILE_NAME + GZIP_SUFFIX,
+]
+
+# Values accepted by the queue scripts' --compress-results option.
+COMPRESSION_METHODS: List[str] = ["none", "gzip", "zstd"]
+
+# gem5 text outputs that are worth compressing once a job has finished.
+COMPRESSED_OUTPUT_FILE_NAMES: List[str] = [STATS_TXT_FILE_NAME, "config.ini"]
+
+
+def is_stats_txt_file_name(file_name: str) -> bool:
+    return file_name in STATS_TXT_FILE_NAMES
+
+
+def find_stats_txt_path(run_directory_path: Path) -> Optional[Path]:
+    """
+    Returns the stats.txt (or stats.txt.zst / stats.txt.gz) in `run_directory_path`, if any.
+    """
+
+    for file_name in STATS_TXT_FILE_NAMES:
+        candidate_path = run_directory_path.joinpath(file_name)
+        if candidate_path.is_file():
+            return candidate_path
+
+    return None
+
+
+@contextmanager
+def open_stats_binary(stats_txt_path: Path) -> Iterator[BinaryIO]:
+    """
+    Opens a (possibly compressed) stats.txt as a binary stream, decompressing on the fly.
+    """
+
+    if stats_txt_path.name.endswith(GZIP_SUFFIX):
+        with gzip.open(stats_txt_path, mode="rb") as stats_file:
+            yield stats_file
+
+    elif stats_txt_path.name.endswith(ZSTD_SUFFIX):
+        try:
+            import zstandard
+        except ImportError as import_error:
+            raise RuntimeError(
+                f"Reading {stats_txt_path} requires the \"zstandard\" package (pip install zstandard)."
+            ) from import_error
+
+        with stats_txt_path.open(mode="rb") as compressed_file:
+            with zstandard.ZstdDecompressor().stream_reader(compressed_file) as stats_file:
+                yield stats_file
+
+    else:
+        with stats_txt_path.open(mode="rb") as stats_file:
+            yield stats_file
+
+
+@contextmanager
+def open_stats_text(stats_txt_path: Path) -> Iterator[TextIO]:
+    with open_stats_binary(stats_txt_path) as stats_file:
+        yield io.TextIOWrapper(stats_file, encoding="utf-8")
+
+
+def read_stats_bytes(stats_txt_path: Path) -> bytes:
+    with open_stats_binary(stats_txt_path) as stats_file:
+        return stats_file.read()
+
+
+def build_compression_shell_commands(output_directory_path: Path, compression_method: str) -> str:
+    """
+    Shell snippet for a job script that compresses the gem5 text outputs in place
+    after the simulation has finished (empty for "none").
+    """
+
+    if compression_method not in COMPRESSION_METHODS:
+        raise ValueError(f"Invalid compression method: {compression_method} (expected one of {COMPRESSION_METHODS})")
+
+    if compression_method == "none":
+        return ""
+
+    compress_command: str = "gzip -9" if compression_method == "gzip" else "zstd -q --rm -19"
+    output_file_paths: str = " ".join(
+        f"\"{output_directory_path.joinpath(file_name).as_posix()}\""
+        for file_name in COMPRESSED_OUTPUT_FILE_NAMES
+    )
+
+    return f"""
+for output_file in {output_file_paths}; do
+    if [ -f "$output_file" ]; then
+        {compress_command} "$output_file"
+    fi
+done
+"""
@@ -0,0 +1,812 @@
+"""
+Adaptive search of the O3 design space for cores with a good IPC for their area.
+
+Instead of simulating every configuration of a cpu_benchmark.py sweep spec (see
+gem5_tools.sweep_spec), the search simulates it in rounds. A latin-hypercube
+sample of the space starts it. After that, a Gaussian process fitted to the IPC
+of every finished simulation (RBF kernel over log2 of the parameters) predicts
+the IPC of each configuration that was not simulated yet, and the next round
+simulates the ones whose optimistic IPC (mean plus `--exploration` standard
+deviations) would add the most hypervolume to the IPC-vs-area Pareto frontier.
+The area of a configuration is known without simulating it (it is
+`O3CPU.get_area_score` of cpuO3_model.py), so only IPC is modelled.
+
+The search stops once no remaining configuration could grow the hypervolume of
+the frontier by more than `--convergence-tolerance`, once the frontier has not
+changed for `--patience` rounds, or once `--max-simulations` are spent. Every
+round is a run directory of its own (scripts/, benchmarks/ and a sweep ledger)
+and the search state is saved after each round, so running the same command
+again resumes the search. Earlier results in out_<width>_<rob>_<int>_<fp>
+directories (as job.sh writes them) can seed the model.
+
+> python -m gem5_tools.design_space_search --spec-path first_homework_cs/cpu_benchmark/design-space.toml --output-directory-path <directory>
+"""
+
+from argparse import ArgumentParser
+import dataclasses
+from dataclasses import dataclass
+import json
+import math
+import os
+from pathlib import Path
+import random
+import tomllib
+from typing import Dict, List, Optional, Self, Set, Tuple
+
+import numpy as np
+
+from gem5_tools.async_submission import DEFAULT_POLL_INTERVAL_SECONDS, watch_jobs
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.executors import JobExecutor, add_executor_arguments, create_executor
+from gem5_tools.result_cache import ResultCache, get_default_result_cache
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.runtime_model import RuntimePredictor
+from gem5_tools.sweep_ledger import (
+    STATE_PENDING,
+    STATE_RUNNING,
+    STATE_SUBMITTED,
+    SWEEP_LEDGER_FILE_NAME,
+    SweepLedger,
+    get_configuration_key
+)
+from gem5_tools.sweep_spec import ParameterValue, SweepSpec, format_point_name, prepare_and_queue_job
+
+
+IPC_STATISTIC_NAME: str = "board.processor.cores.core.ipc"
+
+SEARCH_STATE_FILE_NAME: str = "design_search.json"
+
+# The parameters of cpu_benchmark.py, and the register counts it uses when they are not given.
+O3_PARAMETER_NAMES: List[str] = ["width", "rob_size", "num_int_regs", "num_fp_regs"]
+DEFAULT_REGISTER_COUNT: int = 60
+
+DEFAULT_INITIAL_POINTS: int = 8
+DEFAULT_BATCH_SIZE: int = 4
+DEFAULT_MAX_SIMULATIONS: int = 48
+DEFAULT_EXPLORATION: float = 2.0
+DEFAULT_CONVERGENCE_TOLERANCE: float = 0.005
+DEFAULT_PATIENCE: int = 3
+
+# Length scales (in the unit cube of log2 parameters) tried when fitting the Gaussian process.
+LENGTH_SCALES: List[float] = [0.1, 0.15, 0.25, 0.35, 0.5, 0.75, 1.0, 1.5, 2.0]
+
+# gem5 is deterministic; the noise (in standardized IPC) only keeps the covariance well-conditioned.
+NOISE_VARIANCE: float = 1e-4
+
+# The hypervolume is measured up to this multiple of the largest area in the space.
+REFERENCE_AREA_MARGIN: float = 1.1
+
+
+def compute_area_score(configuration: Dict[str, ParameterValue]) -> float:
+    """
+    `O3CPU.get_area_score` of cpuO3_model.py (which can only be imported inside gem5).
+    """
+
+    width = float(configuration["width"])
+    rob_size = float(configuration["rob_size"])
+    num_int_regs = float(configuration.get("num_int_regs", DEFAULT_REGISTER_COUNT))
+    num_fp_regs = float(configuration.get("num_fp_regs", DEFAULT_REGISTER_COUNT))
+
+    return width * (2 * rob_size + num_int_regs + num_fp_regs) + 4 * width + 2 * rob_size + num_int_regs + num_fp_regs
+
+
+@dataclass(frozen=True, kw_only=True)
+class DesignObservation:
+    configuration: Dict[str, ParameterValue]
+    area_score: float
+    ipc: float
+
+    @classmethod
+    def from_directory_path(cls, configuration: Dict[str, ParameterValue], directory_path: Path) -> Optional[Self]:
+        """
+        The observation of a gem5 output directory, or `None` if it has no (complete) stats.txt.
+        """
+
+        stats_txt_path: Optional[Path] = find_stats_txt_path(directory_path)
+        if stats_txt_path is None:
+            return None
+
+        try:
+            ipc: float = load_stats_index(stats_txt_path).get_float(IPC_STATISTIC_NAME)
+        except (OSError, ValueError):
+            return None
+
+        if not math.isfinite(ipc):
+            return None
+
+        return cls(configuration=configuration, area_score=compute_area_score(configuration), ipc=ipc)
+
+    def get_configuration_key(self) -> str:
+        return get_configuration_key(self.configuration)
+
+
+def read_seed_observations(results_directory_path: Path) -> List[DesignObservation]:
+    """
+    Observations of the out_<width>_<rob_size>_<num_int_regs>_<num_fp_regs> directories of earlier runs.
+    """
+
+    observations: List[DesignObservation] = []
+
+    for directory_path in sorted(results_directory_path.glob("out_*")):
+        name_parts: List[str] = directory_path.name.split("_")[1:]
+        if len(name_parts) != len(O3_PARAMETER_NAMES) or not all(part.isdigit() for part in name_parts):
+            continue
+
+        configuration: Dict[str, ParameterValue] = {
+            name: int(part) for name, part in zip(O3_PARAMETER_NAMES, name_parts)
+        }
+
+        observation: Optional[DesignObservation] = DesignObservation.from_directory_path(configuration, directory_path)
+        if observation is not None:
+            observations.append(observation)
+
+    return observations
+
+
+def fit_seed_observation_to_spec(
+    spec: SweepSpec,
+    # Every configuration of the space.
+    candidates: List[Dict[str, ParameterValue]],
+    observation: DesignObservation
+) -> Optional[DesignObservation]:
+    """
+    The seed with only the parameters of the spec, or `None` if it lies outside the
+    space (a parameter the spec fixes, or leaves at its default, differs, or the
+    varied ones are not one of the candidates).
+    """
+
+    parameter_names: List[str] = spec.get_parameter_names()
+
+    for name in O3_PARAMETER_NAMES:
+        if name in spec.fixed_parameters:
+            expected_value: Optional[ParameterValue] = spec.fixed_parameters[name]
+        elif name not in parameter_names:
+            expected_value = DEFAULT_REGISTER_COUNT
+        else:
+            continue
+
+        if float(observation.configuration[name]) != float(expected_value):
+            return None
+
+    configuration: Dict[str, ParameterValue] = {name: observation.configuration[name] for name in parameter_names}
+
+    is_candidate: bool = any(
+        all(float(candidate[name]) == float(value) for name, value in configuration.items())
+        for candidate in candidates
+    )
+    if not is_candidate:
+        return None
+
+    return dataclasses.replace(observation, configuration=configuration)
+
+
+def get_pareto_frontier(observations: List[DesignObservation]) -> List[DesignObservation]:
+    """
+    The observations no other one beats in both area and IPC, by increasing area (and IPC).
+    """
+
+    frontier: List[DesignObservation] = []
+
+    for observation in sorted(observations, key=lambda observation: (observation.area_score, -observation.ipc)):
+        if len(frontier) == 0 or observation.ipc > frontier[-1].ipc:
+            frontier.append(observation)
+
+    return frontier
+
+
+def compute_hypervolume(points: List[Tuple[float, float]], reference_area: float) -> float:
+    """
+    Area of the (area, IPC) region dominated by `points`, bounded by `reference_area` and an IPC of 0.
+    """
+
+    hypervolume: float = 0.0
+    best_ipc: float = 0.0
+
+    for area, ipc in sorted(points, key=lambda point: (point[0], -point[1])):
+        if area >= reference_area or ipc <= best_ipc:
+            continue
+
+        hypervolume += (ipc - best_ipc) * (reference_area - area)
+        best_ipc = ipc
+
+    return hypervolume
+
+
+class FeatureEncoder:
+    """
+    Maps configurations to the unit cube: log2 of every varied parameter, scaled by its range in the space.
+    """
+
+    def __init__(self, parameter_names: List[str], candidates: List[Dict[str, ParameterValue]]):
+        self.parameter_names = parameter_names
+
+        log_values = np.log2(np.array(
+            [[float(candidate[name]) for name in parameter_names] for candidate in candidates],
+            dtype=np.float64
+        ))
+
+        self.lower_bounds: np.ndarray = log_values.min(axis=0)
+        self.ranges: np.ndarray = np.where(log_values.max(axis=0) > self.lower_bounds, log_values.max(axis=0) - self.lower_bounds, 1.0)
+
+    def encode(self, configurations: List[Dict[str, ParameterValue]]) -> np.ndarray:
+        log_values = np.log2(np.array(
+            [[float(configuration[name]) for name in self.parameter_names] for configuration in configurations],
+            dtype=np.float64
+        ))
+
+        return (log_values - self.lower_bounds) / self.ranges
+
+
+def compute_rbf_covariance(left_features: np.ndarray, right_features: np.ndarray, length_scale: float) -> np.ndarray:
+    squared_distances = ((left_features[:, None, :] - right_features[None, :, :]) ** 2).sum(axis=2)
+    return np.exp(-0.5 * squared_distances / length_scale ** 2)
+
+
+@dataclass(frozen=True, kw_only=True)
+class IpcModel:
+    """
+    Gaussian process regression of (standardized) IPC, with the length scale of the
+    highest marginal likelihood.
+    """
+
+    training_features: np.ndarray
+    cholesky_factor: np.ndarray
+    weights: np.ndarray
+    length_scale: float
+    ipc_mean: float
+    ipc_scale: float
+
+    @classmethod
+    def fit(cls, features: np.ndarray, ipcs: np.ndarray) -> Self:
+        ipc_mean = float(ipcs.mean())
+        ipc_scale = float(ipcs.std()) or 1.0
+        targets = (ipcs - ipc_mean) / ipc_scale
+
+        best_model: Optional[Self] = None
+        best_log_likelihood: float = -math.inf
+
+        for length_scale in LENGTH_SCALES:
+            covariance = compute_rbf_covariance(features, features, length_scale) + NOISE_VARIANCE * np.eye(len(features))
+
+            try:
+                cholesky_factor = np.linalg.cholesky(covariance)
+            except np.linalg.LinAlgError:
+                continue
+
+            weights = np.linalg.solve(cholesky_factor.T, np.linalg.solve(cholesky_factor, targets))
+            log_likelihood = float(-0.5 * targets @ weights - np.log(np.diag(cholesky_factor)).sum())
+
+            if log_likelihood > best_log_likelihood:
+                best_log_likelihood = log_likelihood
+                best_model = cls(
+                    training_features=features,
+                    cholesky_factor=cholesky_factor,
+                    weights=weights,
+                    length_scale=length_scale,
+                    ipc_mean=ipc_mean,
+                    ipc_scale=ipc_scale
+                )
+
+        if best_model is None:
+            raise ValueError("The IPC model cannot be fitted (duplicate configurations with different results?)")
+
+        return best_model
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mean and standard deviation of the IPC of every row of `features`.
+        """
+
+        cross_covariance = compute_rbf_covariance(features, self.training_features, self.length_scale)
+
+        means = cross_covariance @ self.weights
+        projections = np.linalg.solve(self.cholesky_factor, cross_covariance.T)
+        variances = np.clip(1.0 - (projections ** 2).sum(axis=0), 0.0, None)
+
+        return self.ipc_mean + self.ipc_scale * means, self.ipc_scale * np.sqrt(variances)
+
+
+def propose_configurations(
+    candidates: List[Dict[str, ParameterValue]],
+    observations: List[DesignObservation],
+    encoder: FeatureEncoder,
+    number_of_configurations: int,
+    exploration: float,
+    reference_area: float,
+) -> Tuple[List[Dict[str, ParameterValue]], float, IpcModel]:
+    """
+    Greedily picks the candidates whose optimistic IPC adds the most hypervolume to the
+    frontier, each pick joining the frontier (optimistically) before the next one so a
+    round spreads over the frontier. Also returns the relative hypervolume improvement
+    of the first pick, which tells whether the search has converged.
+    """
+
+    model = IpcModel.fit(
+        encoder.encode([observation.configuration for observation in observations]),
+        np.array([observation.ipc for observation in observations], dtype=np.float64)
+    )
+
+    ipc_means, ipc_deviations = model.predict(encoder.encode(candidates))
+    optimistic_ipcs: np.ndarray = ipc_means + exploration * ipc_deviations
+    candidate_areas: List[float] = [compute_area_score(candidate) for candidate in candidates]
+
+    frontier_points: List[Tuple[float, float]] = [
+        (observation.area_score, observation.ipc) for observation in get_pareto_frontier(observations)
+    ]
+
+    observed_hypervolume: float = compute_hypervolume(frontier_points, reference_area)
+    hypervolume: float = observed_hypervolume
+
+    selected_indices: List[int] = []
+    first_improvement: float = 0.0
+
+    for _ in range(number_of_configurations):
+        best_index: Optional[int] = None
+        best_improvement: float = 0.0
+
+        for index, (area, optimistic_ipc) in enumerate(zip(candidate_areas, optimistic_ipcs)):
+            if index in selected_indices:
+                continue
+
+            improvement = compute_hypervolume(frontier_points + [(area, float(optimistic_ipc))], reference_area) - hypervolume
+            if improvement > best_improvement:
+                best_index, best_improvement = index, improvement
+
+        if best_index is None:
+            break
+
+        if len(selected_indices) == 0:
+            first_improvement = best_improvement
+
+        selected_indices.append(best_index)
+        frontier_points = [
+            point for point in frontier_points
+            if not (point[0] >= candidate_areas[best_index] and point[1] <= optimistic_ipcs[best_index])
+        ] + [(candidate_areas[best_index], float(optimistic_ipcs[best_index]))]
+        hypervolume += best_improvement
+
+    relative_improvement: float = first_improvement / observed_hypervolume if observed_hypervolume > 0 else math.inf
+
+    return [candidates[index] for index in selected_indices], relative_improvement, model
+
+
+def load_search_state(output_directory_path: Path, spec_path: Path) -> Dict:
+    state_file_path = output_directory_path.joinpath(SEARCH_STATE_FILE_NAME)
+
+    if not state_file_path.is_file():
+        return {"spec_path": spec_path.resolve().as_posix(), "rounds": []}
+
+    state: Dict = json.loads(state_file_path.read_text(encoding="utf-8"))
+    if state["spec_path"] != spec_path.resolve().as_posix():
+        raise ValueError(f"{state_file_path} belongs to a search of {state['spec_path']}")
+
+    return state
+
+
+def save_search_state(output_directory_path: Path, state: Dict) -> None:
+    state_file_path = output_directory_path.joinpath(SEARCH_STATE_FILE_NAME)
+
+    # Written next to the state and renamed over it, so an interrupted save keeps the previous rounds.
+    temporary_file_path = state_file_path.with_suffix(".json.tmp")
+    temporary_file_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(temporary_file_path, state_file_path)
+
+
+def count_unchanged_rounds(state: Dict) -> int:
+    """
+    How many of the latest rounds left the frontier as the round before them did.
+    """
+
+    frontiers: List[List[str]] = [search_round["frontier"] for search_round in state["rounds"] if "frontier" in search_round]
+
+    unchanged_rounds: int = 0
+    while unchanged_rounds + 1 < len(frontiers) and frontiers[-1 - unchanged_rounds] == frontiers[-2 - unchanged_rounds]:
+        unchanged_rounds += 1
+
+    return unchanged_rounds
+
+
+def get_round_directory_path(output_directory_path: Path, round_number: int) -> Path:
+    return output_directory_path.joinpath(f"round_{round_number:02d}")
+
+
+def collect_round_observations(
+    spec: SweepSpec,
+    output_directory_path: Path,
+    state: Dict,
+) -> Tuple[List[DesignObservation], int]:
+    """
+    The observations of every configuration simulated in the search so far, and how many of them failed.
+    """
+
+    observations: List[DesignObservation] = []
+    number_of_failures: int = 0
+
+    for search_round in state["rounds"]:
+        benchmarks_directory_path = get_round_directory_path(output_directory_path, search_round["round"]).joinpath("benchmarks")
+
+        for configuration in search_round["configurations"]:
+            observation: Optional[DesignObservation] = DesignObservation.from_directory_path(
+                configuration,
+                benchmarks_directory_path.joinpath(format_point_name(spec, configuration))
+            )
+
+            if observation is None:
+                number_of_failures += 1
+            else:
+                observations.append(observation)
+
+    return observations, number_of_failures
+
+
+def wait_for_round_jobs(round_directory_path: Path, poll_interval_seconds: float) -> None:
+    """
+    Waits until no SLURM job of a round is queued or running any more.
+    """
+
+    if not round_directory_path.joinpath(SWEEP_LEDGER_FILE_NAME).is_file():
+        return
+
+    sweep_ledger: SweepLedger = SweepLedger.open(round_directory_path)
+
+    try:
+        watch_jobs(
+            [
+                job.job_id for job in sweep_ledger.refresh()
+                if job.executor_kind == "slurm" and job.state in [STATE_SUBMITTED, STATE_PENDING, STATE_RUNNING]
+            ],
+            round_directory_path.name,
+            poll_interval_seconds
+        )
+
+        sweep_ledger.refresh()
+    finally:
+        sweep_ledger.close()
+
+
+def run_search_round(
+    spec: SweepSpec,
+    configurations: List[Dict[str, ParameterValue]],
+    round_directory_path: Path,
+    executor: JobExecutor,
+    result_cache: Optional[ResultCache],
+    runtime_predictor: RuntimePredictor,
+    poll_interval_seconds: float,
+) -> None:
+    job_scripts_directory_path: Path = round_directory_path.joinpath("scripts")
+    job_scripts_directory_path.mkdir(parents=True, exist_ok=False)
+
+    benchmark_results_directory_path: Path = round_directory_path.joinpath("benchmarks")
+    benchmark_results_directory_path.mkdir(parents=True, exist_ok=False)
+
+    sweep_ledger: SweepLedger = SweepLedger.open(round_directory_path)
+
+    try:
+        for configuration in runtime_predictor.order_longest_first(configurations):
+            prepare_and_queue_job(
+                spec=spec,
+                point=configuration,
+                job_script_output_directory_path=job_scripts_directory_path,
+                benchmark_output_base_directory_path=benchmark_results_directory_path,
+                executor=executor,
+                result_cache=result_cache,
+                time_limit=runtime_predictor.predict_time_limit(configuration),
+                sweep_ledger=sweep_ledger
+            )
+    finally:
+        sweep_ledger.close()
+
+    executor.wait()
+    wait_for_round_jobs(round_directory_path, poll_interval_seconds)
+
+
+def print_frontier(frontier: List[DesignObservation], parameter_names: List[str], hypervolume: float) -> None:
+    print(f"Pareto frontier: {len(frontier)} configurations, hypervolume {hypervolume:.4g}")
+    print("  " + "".join(f"{name:>14}" for name in [*parameter_names, "area score", "IPC"]))
+
+    for observation in frontier:
+        print("  " + "".join(
+            f"{value:>14}" for value in [
+                *(str(observation.configuration[name]) for name in parameter_names),
+                f"{observation.area_score:.0f}",
+                f"{observation.ipc:.4f}",
+            ]
+        ))
+
+    print()
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--spec-path",
+        required=True,
+        dest="spec_path",
+        help="Sweep spec of cpu_benchmark.py whose (cartesian) space is searched."
+    )
+
+    argument_parser.add_argument(
+        "--output-directory-path",
+        required=True,
+        dest="output_directory_path",
+        help="Directory of the search; running again with the same one resumes the search."
+    )
+
+    argument_parser.add_argument(
+        "--seed-results-directory-path",
+        required=False,
+        action="append",
+        default=[],
+        dest="seed_results_directory_paths",
+        help="Directory with out_<width>_<rob>_<int>_<fp> results of earlier runs to start from (repeatable)."
+    )
+
+    argument_parser.add_argument(
+        "--initial-points",
+        required=False,
+        type=int,
+        default=DEFAULT_INITIAL_POINTS,
+        dest="initial_points",
+        help="Configurations (latin-hypercube sampled) to simulate before the model proposes any."
+    )
+
+    argument_parser.add_argument(
+        "--batch-size",
+        required=False,
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        dest="batch_size",
+        help="Configurations simulated per round."
+    )
+
+    argument_parser.add_argument(
+        "--max-simulations",
+        required=False,
+        type=int,
+        default=DEFAULT_MAX_SIMULATIONS,
+        dest="max_simulations",
+        help="Budget of simulations of the whole search."
+    )
+
+    argument_parser.add_argument(
+        "--exploration",
+        required=False,
+        type=float,
+        default=DEFAULT_EXPLORATION,
+        dest="exploration",
+        help="Standard deviations of predicted IPC added to its mean when proposing (higher explores more)."
+    )
+
+    argument_parser.add_argument(
+        "--convergence-tolerance",
+        required=False,
+        type=float,
+        default=DEFAULT_CONVERGENCE_TOLERANCE,
+        dest="convergence_tolerance",
+        help="Stop once no configuration could add more than this fraction to the hypervolume of the frontier."
+    )
+
+    argument_parser.add_argument(
+        "--patience",
+        required=False,
+        type=int,
+        default=DEFAULT_PATIENCE,
+        dest="patience",
+        help="Stop once the frontier has not changed for this many rounds (0 to never)."
+    )
+
+    argument_parser.add_argument(
+        "--report",
+        required=False,
+        action="store_true",
+        dest="report_only",
+        help="Only print the frontier of the search so far."
+    )
+
+    argument_parser.add_argument(
+        "--no-result-cache",
+        required=False,
+        action="store_false",
+        dest="use_result_cache",
+        help="Simulate every configuration, even ones with a cached result, and cache nothing."
+    )
+
+    argument_parser.add_argument(
+        "--no-runtime-model",
+        required=False,
+        action="store_false",
+        dest="use_runtime_model",
+        help="Request the spec's time for every job instead of predicting it from earlier runs."
+    )
+
+    argument_parser.add_argument(
+        "--poll-interval",
+        required=False,
+        type=float,
+        default=DEFAULT_POLL_INTERVAL_SECONDS,
+        dest="poll_interval_seconds",
+        help="Seconds between status polls while waiting for a round of SLURM jobs."
+    )
+
+    add_executor_arguments(argument_parser)
+
+    arguments = argument_parser.parse_args()
+
+    spec_path = Path(str(arguments.spec_path))
+    output_directory_path = Path(str(arguments.output_directory_path)).resolve()
+
+    try:
+        spec = SweepSpec.from_file(spec_path)
+        spec.validate_against_config_script()
+
+        if spec.config_script_path is None or spec.config_script_path.name != "cpu_benchmark.py":
+            raise ValueError("the search needs a spec of cpu_benchmark.py")
+
+        # Every configuration of the space is a candidate, whatever sampling the spec would use on its own.
+        candidates: List[Dict[str, ParameterValue]] = dataclasses.replace(spec, sampling="cartesian", points=None).expand()
+        if len(candidates) == 0:
+            raise ValueError("no configuration satisfies the constraints")
+
+        non_numeric_parameters: Set[str] = {
+            name for candidate in candidates for name, value in candidate.items()
+            if isinstance(value, (str, bool)) or value <= 0
+        }
+        if non_numeric_parameters:
+            raise ValueError(f"{', '.join(sorted(non_numeric_parameters))} must be positive numbers")
+
+        output_directory_path.mkdir(parents=True, exist_ok=True)
+        state: Dict = load_search_state(output_directory_path, spec_path)
+    except (OSError, ValueError, tomllib.TOMLDecodeError) as spec_error:
+        print(f"Invalid design space search of {spec_path}: {spec_error}")
+        exit(1)
+
+    varied_parameter_names: List[str] = [name for axis in spec.axes for name in axis.names]
+    encoder = FeatureEncoder(varied_parameter_names, candidates)
+    reference_area: float = REFERENCE_AREA_MARGIN * max(compute_area_score(candidate) for candidate in candidates)
+
+    seed_observations: List[DesignObservation] = [
+        fitted_observation
+        for seed_results_directory_path in arguments.seed_results_directory_paths
+        for observation in read_seed_observations(Path(seed_results_directory_path))
+        if (fitted_observation := fit_seed_observation_to_spec(spec, candidates, observation)) is not None
+    ]
+
+    print(f"Design space {spec.name}: {len(candidates)} configurations, {len(seed_observations)} seed results")
+    print()
+
+    result_cache: Optional[ResultCache] = get_default_result_cache() if arguments.use_result_cache else None
+    runtime_sweep_name: str = spec.runtime_sweep_name
+
+    if len(state["rounds"]) > 0 and not arguments.report_only:
+        wait_for_round_jobs(get_round_directory_path(output_directory_path, state["rounds"][-1]["round"]), arguments.poll_interval_seconds)
+
+    while True:
+        round_observations, number_of_failures = collect_round_observations(spec, output_directory_path, state)
+        observations: List[DesignObservation] = seed_observations + round_observations
+
+        number_of_simulations: int = sum(len(search_round["configurations"]) for search_round in state["rounds"])
+        frontier: List[DesignObservation] = get_pareto_frontier(observations)
+        hypervolume: float = compute_hypervolume(
+            [(observation.area_score, observation.ipc) for observation in frontier],
+            reference_area
+        )
+
+        print(
+            f"After {len(state['rounds'])} rounds: {number_of_simulations} of {len(candidates)} configurations "
+            f"simulated ({number_of_failures} failed), {len(seed_observations)} seeded"
+        )
+        print_frontier(frontier, varied_parameter_names, hypervolume)
+
+        if arguments.report_only:
+            return
+
+        if len(state["rounds"]) > 0:
+            state["rounds"][-1]["frontier"] = sorted(observation.get_configuration_key() for observation in frontier)
+
+        state["frontier"] = [dataclasses.asdict(observation) for observation in frontier]
+        save_search_state(output_directory_path, state)
+
+        observed_keys: Set[str] = {observation.get_configuration_key() for observation in observations} | {
+            get_configuration_key(configuration)
+            for search_round in state["rounds"] for configuration in search_round["configurations"]
+        }
+        remaining_candidates: List[Dict[str, ParameterValue]] = [
+            candidate for candidate in candidates if get_configuration_key(candidate) not in observed_keys
+        ]
+
+        remaining_budget: int = arguments.max_simulations - number_of_simulations
+        stop_reason: Optional[str] = None
+
+        if remaining_budget <= 0:
+            stop_reason = f"the budget of {arguments.max_simulations} simulations is spent"
+        elif len(state["rounds"]) > 0 and not any(
+            observation.configuration in state["rounds"][-1]["configurations"] for observation in round_observations
+        ):
+            stop_reason = f"every simulation of round {len(state['rounds'])} failed (see its sweep ledger)"
+        elif len(remaining_candidates) == 0:
+            stop_reason = "every configuration of the space is simulated"
+        elif arguments.patience > 0 and count_unchanged_rounds(state) >= arguments.patience:
+            stop_reason = f"the frontier has not changed for {arguments.patience} rounds"
+
+        proposals: List[Dict[str, ParameterValue]] = []
+        round_kind: str = "model"
+
+        if stop_reason is None and len(observations) < max(2, arguments.initial_points):
+            round_kind = "initial"
+
+            initial_sample: List[Dict[str, ParameterValue]] = dataclasses.replace(
+                spec,
+                sampling="latin-hypercube",
+                points=arguments.initial_points,
+                seed=spec.seed + len(state["rounds"])
+            ).expand()
+
+            remaining_keys: Set[str] = {get_configuration_key(candidate) for candidate in remaining_candidates}
+            proposals = [configuration for configuration in initial_sample if get_configuration_key(configuration) in remaining_keys]
+
+            if len(proposals) == 0:
+                proposals = random.Random(spec.seed + len(state["rounds"])).sample(
+                    remaining_candidates,
+                    min(arguments.initial_points, len(remaining_candidates))
+                )
+
+            proposals = proposals[:max(1, min(arguments.initial_points - len(observations), remaining_budget))]
+        elif stop_reason is None:
+            proposals, relative_improvement, model = propose_configurations(
+                remaining_candidates,
+                observations,
+                encoder,
+                min(arguments.batch_size, remaining_budget),
+                arguments.exploration,
+                reference_area
+            )
+
+            print(
+                f"IPC model: length scale {model.length_scale}, "
+                f"best optimistic hypervolume gain {relative_improvement:.2%}"
+            )
+
+            if relative_improvement < arguments.convergence_tolerance or len(proposals) == 0:
+                stop_reason = "no configuration is likely to improve the frontier (converged)"
+
+        if stop_reason is not None:
+            state["stop_reason"] = stop_reason
+            save_search_state(output_directory_path, state)
+
+            print(f"Search stopped: {stop_reason}.")
+            print(f"Simulated {number_of_simulations} of {len(candidates)} configurations.")
+            print("DONE")
+            return
+
+        round_number: int = len(state["rounds"]) + 1
+        print(f"Round {round_number} ({round_kind}): simulating {len(proposals)} configurations")
+        print()
+
+        runtime_predictor: RuntimePredictor = RuntimePredictor.from_history(
+            sweep_name=runtime_sweep_name,
+            default_time_limit=spec.time_limit,
+            record_root_directory_path=output_directory_path
+        ) if arguments.use_runtime_model else RuntimePredictor(runtime_sweep_name, spec.time_limit, None, {})
+
+        round_directory_path: Path = get_round_directory_path(output_directory_path, round_number)
+
+        # Recorded before the jobs run, so a search interrupted mid-round waits for them when resumed.
+        state["rounds"].append({"round": round_number, "kind": round_kind, "configurations": proposals})
+        state.pop("stop_reason", None)
+        save_search_state(output_directory_path, state)
+
+        run_search_round(
+            spec=spec,
+            configurations=proposals,
+            round_directory_path=round_directory_path,
+            # A local executor is done once it has waited, so every round gets a new one.
+            executor=create_executor(arguments),
+            result_cache=result_cache,
+            runtime_predictor=runtime_predictor,
+            poll_interval_seconds=arguments.poll_interval_seconds
+        )
+
+
+if __name__ == "__main__":
+    main()
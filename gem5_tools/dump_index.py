@@ -0,0 +1,230 @@
+from dataclasses import dataclass
+import json
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Self, Tuple
+
+from gem5_tools.compressed_stats import open_stats_binary
+from gem5_tools.stats_index import StatsIndex
+
+
+SIMULATION_BEGIN_MARKER: str = "---------- Begin Simulation Statistics ----------"
+SIMULATION_END_MARKER: str = "---------- End Simulation Statistics   ----------"
+
+# Written next to the stats.txt, e.g. "stats.txt.dumps.json".
+DUMP_INDEX_SIDECAR_SUFFIX: str = ".dumps.json"
+
+SCAN_CHUNK_SIZE: int = 1024 * 1024
+
+
+def find_marker_offsets(stats_file: BinaryIO, markers: List[bytes]) -> List[Tuple[int, int]]:
+    """
+    Returns `(byte offset, marker index)` for every occurrence of any of `markers`
+    in the file, ordered by offset.
+
+    The file is read once, in fixed-size chunks (keeping a marker-sized overlap
+    between them), so a scan never holds more than one chunk in memory.
+    """
+
+    found_markers: List[Tuple[int, int]] = []
+    overlap_length: int = max(len(marker) for marker in markers) - 1
+
+    chunk_start_offset: int = 0
+    carried_over: bytes = b""
+
+    while True:
+        chunk: bytes = stats_file.read(SCAN_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        buffer: bytes = carried_over + chunk
+        buffer_start_offset: int = chunk_start_offset - len(carried_over)
+
+        for marker_index, marker in enumerate(markers):
+            found_at: int = buffer.find(marker)
+            while found_at != -1:
+                # Matches lying entirely inside the carried-over tail were already
+                # reported while scanning the previous chunk.
+                if found_at + len(marker) > len(carried_over):
+                    found_markers.append((buffer_start_offset + found_at, marker_index))
+
+                found_at = buffer.find(marker, found_at + len(marker))
+
+        carried_over = buffer[-overlap_length:] if overlap_length > 0 else b""
+        chunk_start_offset += len(chunk)
+
+    found_markers.sort()
+    return found_markers
+
+
+@dataclass(frozen=True, kw_only=True)
+class DumpBlock:
+    # Offset of the "Begin Simulation Statistics" marker.
+    begin_offset: int
+
+    # Offset just past the matching "End Simulation Statistics" marker
+    # (or the start of the next block / end of file if the dump was cut off).
+    end_offset: int
+
+
+def find_dump_blocks(stats_file: BinaryIO) -> List[DumpBlock]:
+    """
+    Pairs up the begin/end markers of every dump in the (remaining) stream.
+    """
+
+    found_markers = find_marker_offsets(
+        stats_file,
+        [SIMULATION_BEGIN_MARKER.encode("utf-8"), SIMULATION_END_MARKER.encode("utf-8")]
+    )
+
+    blocks: List[DumpBlock] = []
+    current_begin_offset: Optional[int] = None
+
+    for offset, marker_index in found_markers:
+        is_begin_marker: bool = marker_index == 0
+
+        if is_begin_marker:
+            # A begin marker without an end marker before it (truncated dump):
+            # the previous block runs up to this one.
+            if current_begin_offset is not None:
+                blocks.append(DumpBlock(begin_offset=current_begin_offset, end_offset=offset))
+
+            current_begin_offset = offset
+        elif current_begin_offset is not None:
+            blocks.append(
+                DumpBlock(begin_offset=current_begin_offset, end_offset=offset + len(SIMULATION_END_MARKER))
+            )
+
+            current_begin_offset = None
+
+    if current_begin_offset is not None:
+        # The scan has consumed the whole stream, so this is the (decompressed) end of file.
+        blocks.append(DumpBlock(begin_offset=current_begin_offset, end_offset=stats_file.tell()))
+
+    return blocks
+
+
+@dataclass(frozen=True, kw_only=True)
+class DumpBlockIndex:
+    """
+    Byte offsets of every statistics dump in a stats.txt.
+
+    GPU runs dump their statistics twice and periodic `m5.stats.dump()` calls can
+    produce hundreds of blocks. Instead of splitting and re-joining the whole file
+    to pick one of them, the offsets are recorded in a single scan (and cached in a
+    small sidecar file), after which any block can be read with one seek.
+    """
+
+    stats_txt_path: Path
+    file_size: int
+    file_mtime_ns: int
+    blocks: List[DumpBlock]
+
+    @classmethod
+    def scan(cls, stats_txt_path: Path) -> Self:
+        if not stats_txt_path.is_file():
+            raise FileNotFoundError(f"No stats.txt at {stats_txt_path}!")
+
+        file_stat = stats_txt_path.stat()
+
+        # For compressed files the offsets refer to the decompressed text.
+        with open_stats_binary(stats_txt_path) as stats_file:
+            blocks = find_dump_blocks(stats_file)
+
+        return cls(
+            stats_txt_path=stats_txt_path,
+            file_size=file_stat.st_size,
+            file_mtime_ns=file_stat.st_mtime_ns,
+            blocks=blocks
+        )
+
+    @classmethod
+    def sidecar_path_for(cls, stats_txt_path: Path) -> Path:
+        return stats_txt_path.with_name(stats_txt_path.name + DUMP_INDEX_SIDECAR_SUFFIX)
+
+    @classmethod
+    def load_sidecar(cls, stats_txt_path: Path) -> Optional[Self]:
+        """
+        Returns the cached index, or `None` if there is no sidecar or it was
+        written for a different version of the stats.txt (size or mtime changed).
+        """
+
+        sidecar_path = cls.sidecar_path_for(stats_txt_path)
+        if not sidecar_path.is_file():
+            return None
+
+        try:
+            with sidecar_path.open(mode="r", encoding="utf-8") as sidecar_file:
+                sidecar = json.load(sidecar_file)
+        except (OSError, ValueError):
+            return None
+
+        file_stat = stats_txt_path.stat()
+        if sidecar.get("file_size") != file_stat.st_size or sidecar.get("file_mtime_ns") != file_stat.st_mtime_ns:
+            return None
+
+        return cls(
+            stats_txt_path=stats_txt_path,
+            file_size=file_stat.st_size,
+            file_mtime_ns=file_stat.st_mtime_ns,
+            blocks=[
+                DumpBlock(begin_offset=begin_offset, end_offset=end_offset)
+                for begin_offset, end_offset in sidecar["blocks"]
+            ]
+        )
+
+    def save_sidecar(self) -> None:
+        sidecar = {
+            "file_size": self.file_size,
+            "file_mtime_ns": self.file_mtime_ns,
+            "blocks": [[block.begin_offset, block.end_offset] for block in self.blocks],
+        }
+
+        with self.sidecar_path_for(self.stats_txt_path).open(mode="w", encoding="utf-8") as sidecar_file:
+            json.dump(sidecar, sidecar_file)
+
+    @classmethod
+    def load_or_scan(cls, stats_txt_path: Path, write_sidecar: bool = True) -> Self:
+        cached_index = cls.load_sidecar(stats_txt_path)
+        if cached_index is not None:
+            return cached_index
+
+        scanned_index = cls.scan(stats_txt_path)
+
+        if write_sidecar:
+            try:
+                scanned_index.save_sidecar()
+            except OSError:
+                # Result trees are sometimes read-only (e.g. copied off the cluster);
+                # the sidecar is only an optimization.
+                pass
+
+        return scanned_index
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def get_block_byte_range(self, selected_nth_simulation: int) -> Tuple[int, int]:
+        if not 0 <= selected_nth_simulation < len(self.blocks):
+            raise ValueError(
+                f"No simulation statistics block {selected_nth_simulation} in {self.stats_txt_path} "
+                f"(found {len(self.blocks)})"
+            )
+
+        block = self.blocks[selected_nth_simulation]
+        return block.begin_offset, block.end_offset
+
+    def read_block(self, selected_nth_simulation: int) -> str:
+        """
+        Returns the text of the `selected_nth_simulation`-th dump (starting at 0),
+        reading only that block from disk.
+        """
+
+        begin_offset, end_offset = self.get_block_byte_range(selected_nth_simulation)
+
+        with open_stats_binary(self.stats_txt_path) as stats_file:
+            # Compressed streams only support forward seeks (by decompressing up to the block).
+            stats_file.seek(begin_offset)
+            return stats_file.read(end_offset - begin_offset).decode("utf-8")
+
+    def index_block(self, selected_nth_simulation: int) -> StatsIndex:
+        return StatsIndex.from_text(self.read_block(selected_nth_simulation))
@@ -0,0 +1,342 @@
+"""
+Backends that run the job scripts written by the queue scripts.
+
+- `slurm` submits every job script with `sbatch` (the cluster setup).
+- `local` runs the same job scripts on this machine, on a bounded pool of
+  concurrent jobs, so a workstation or CI box can run a whole sweep without a
+  scheduler. Output and error go to the `#SBATCH --output/--error` paths, and
+  `#SBATCH --time` is enforced as a per-job timeout.
+
+The job scripts launch gem5 as `srun apptainer exec <image> gem5.opt ...` from
+`$GEM5_WORKSPACE` (the shared cluster workspace unless set). The local backend
+puts an `srun` that just runs its arguments on the PATH and, with
+`--local-no-container`, an `apptainer` that drops `exec <image>`, so a native
+gem5 build in `$GEM5_WORKSPACE` is run directly.
+"""
+
+from abc import ABC, abstractmethod
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import math
+import os
+from pathlib import Path
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from gem5_tools.parallel_ingest import resolve_number_of_jobs
+
+
+# Values accepted by the queue scripts' --executor option.
+EXECUTOR_NAMES: List[str] = ["slurm", "local"]
+
+SBATCH_DIRECTIVE_REGEX: re.Pattern = re.compile(r"^#SBATCH\s+--([\w-]+)(?:=(.*))?$")
+
+# Set to the executor's kind for the jobs that do not run under SLURM, whose SLURM_JOB_ID is the executor's own counter.
+EXECUTOR_KIND_ENVIRONMENT_VARIABLE: str = "GEM5_EXECUTOR_KIND"
+
+# How long a timed-out job gets to exit after SIGTERM before it is killed.
+TERMINATION_GRACE_PERIOD_SECONDS: float = 10.0
+
+SRUN_SHIM: str = """#!/bin/sh
+# Local stand-in for srun: run the step in this job's process.
+exec "$@"
+"""
+
+APPTAINER_SHIM: str = """#!/bin/sh
+# Local stand-in for "apptainer exec <image> <command...>": run the command natively.
+if [ "$1" = "exec" ]; then
+    shift 2
+fi
+exec "$@"
+"""
+
+
+def parse_sbatch_directives(job_script: str) -> Dict[str, Optional[str]]:
+    """
+    `#SBATCH --name=value` lines of a job script as name -> value (None for flags), without quotes.
+    """
+
+    directives: Dict[str, Optional[str]] = {}
+
+    for line in job_script.splitlines():
+        matched_directive = SBATCH_DIRECTIVE_REGEX.match(line.strip())
+        if matched_directive is None:
+            continue
+
+        value: Optional[str] = matched_directive.group(2)
+        directives[matched_directive.group(1)] = value.strip().strip("\"") if value is not None else None
+
+    return directives
+
+
+def submit_job_script(job_script_file_path: Path) -> int:
+    submission_process = subprocess.run(
+        args=["sbatch", job_script_file_path.resolve().as_posix()],
+        capture_output=True,
+        encoding="utf-8"
+    )
+
+    return parse_sbatch_output(submission_process.returncode, str(submission_process.stdout))
+
+
+def parse_sbatch_output(return_code: int, sbatch_stdout: str) -> int:
+    """
+    Job ID from the "Submitted batch job <id>" line of sbatch, raises `RuntimeError` if it failed.
+    """
+
+    if not sbatch_stdout.startswith("Submitted batch job") or return_code != 0:
+        raise RuntimeError(f"failed to submit (code {return_code}): {sbatch_stdout}")
+
+    return int(sbatch_stdout.rsplit(" ", maxsplit=1)[1])
+
+
+def parse_slurm_time_limit(time_limit: str) -> Optional[float]:
+    """
+    Seconds of a SLURM `--time` value ("minutes", "minutes:seconds", "hours:minutes:seconds",
+    "days-hours", "days-hours:minutes" or "days-hours:minutes:seconds"), `None` for no limit.
+    """
+
+    time_limit = time_limit.strip()
+    if time_limit in ["", "0", "infinite", "UNLIMITED"]:
+        return None
+
+    days: int = 0
+    if "-" in time_limit:
+        days_part, time_limit = time_limit.split("-", 1)
+        days = int(days_part)
+
+        # With days, the first field is hours ("1-12" is a day and a half).
+        fields: List[int] = [int(field) for field in time_limit.split(":")]
+        fields += [0] * (3 - len(fields))
+        hours, minutes, seconds = fields
+    else:
+        fields = [int(field) for field in time_limit.split(":")]
+
+        if len(fields) == 1:
+            hours, minutes, seconds = 0, fields[0], 0
+        elif len(fields) == 2:
+            hours, minutes, seconds = 0, fields[0], fields[1]
+        elif len(fields) == 3:
+            hours, minutes, seconds = fields
+        else:
+            raise ValueError(f"Invalid SLURM time limit: {time_limit}")
+
+    return float(((days * 24 + hours) * 60 + minutes) * 60 + seconds)
+
+
+def format_slurm_time_limit(seconds: float) -> str:
+    """
+    A `--time` value ("hours:minutes:seconds", with a "days-" prefix past a day), rounded up to a second.
+    """
+
+    total_seconds: int = max(1, math.ceil(seconds))
+
+    days, remaining_seconds = divmod(total_seconds, 24 * 60 * 60)
+    hours, remaining_seconds = divmod(remaining_seconds, 60 * 60)
+    minutes, seconds_part = divmod(remaining_seconds, 60)
+
+    time_limit: str = f"{hours:02d}:{minutes:02d}:{seconds_part:02d}"
+    return f"{days}-{time_limit}" if days > 0 else time_limit
+
+
+@dataclass(frozen=True, kw_only=True)
+class LocalJobResult:
+    job_id: int
+    job_script_file_path: Path
+    return_code: int
+    timed_out: bool
+    wall_time_seconds: float
+
+
+class JobExecutor(ABC):
+    name: str = ""
+    # One of EXECUTOR_NAMES.
+    kind: str = ""
+
+    @abstractmethod
+    def submit(self, job_script_file_path: Path) -> int:
+        """
+        Starts (or queues) a job script, returns its job ID.
+        """
+
+    def wait(self) -> int:
+        """
+        Waits for the jobs that run in this process, returns how many of them failed.
+        """
+
+        return 0
+
+
+class SlurmExecutor(JobExecutor):
+    name = "sbatch"
+    kind = "slurm"
+
+    def submit(self, job_script_file_path: Path) -> int:
+        return submit_job_script(job_script_file_path)
+
+
+class LocalExecutor(JobExecutor):
+    name = "the local executor"
+    kind = "local"
+
+    def __init__(self, number_of_jobs: int = 0, run_without_container: bool = False):
+        self.number_of_jobs: int = resolve_number_of_jobs(number_of_jobs)
+        self.pool = ThreadPoolExecutor(max_workers=self.number_of_jobs)
+        self.futures: List[Future] = []
+        self.next_job_id: int = 1
+        # Jobs finish on pool threads; keeps their status lines from interleaving.
+        self.print_lock = threading.Lock()
+
+        self.shim_directory_path = Path(tempfile.mkdtemp(prefix="gem5-local-executor-"))
+        self._write_shim("srun", SRUN_SHIM)
+        if run_without_container:
+            self._write_shim("apptainer", APPTAINER_SHIM)
+
+    def _write_shim(self, command_name: str, shim_script: str) -> None:
+        shim_path = self.shim_directory_path.joinpath(command_name)
+        shim_path.write_text(shim_script, encoding="utf-8")
+        shim_path.chmod(0o755)
+
+    def submit(self, job_script_file_path: Path) -> int:
+        job_id: int = self.next_job_id
+        self.next_job_id += 1
+
+        self.futures.append(self.pool.submit(self._run_job, job_id, job_script_file_path.resolve()))
+        return job_id
+
+    def _run_job(self, job_id: int, job_script_file_path: Path) -> LocalJobResult:
+        directives = parse_sbatch_directives(job_script_file_path.read_text(encoding="utf-8"))
+
+        output_path = Path(directives.get("output") or f"slurm-{job_id}.out")
+        error_path = Path(directives.get("error") or output_path)
+        timeout_seconds: Optional[float] = parse_slurm_time_limit(directives.get("time") or "")
+
+        environment: Dict[str, str] = dict(os.environ)
+        environment["PATH"] = self.shim_directory_path.as_posix() + os.pathsep + environment.get("PATH", "")
+        environment["SLURM_JOB_ID"] = str(job_id)
+        environment["SLURM_JOB_NAME"] = directives.get("job-name") or job_script_file_path.stem
+        environment[EXECUTOR_KIND_ENVIRONMENT_VARIABLE] = self.kind
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        error_path.parent.mkdir(parents=True, exist_ok=True)
+
+        timed_out: bool = False
+        start_time: float = time.perf_counter()
+
+        with output_path.open(mode="w", encoding="utf-8") as output_file:
+            error_file = output_file if error_path == output_path else error_path.open(mode="w", encoding="utf-8")
+
+            try:
+                # Its own session, so a timeout can stop gem5 together with the shell running it.
+                job_process = subprocess.Popen(
+                    args=["bash", job_script_file_path.as_posix()],
+                    stdin=subprocess.DEVNULL,
+                    stdout=output_file,
+                    stderr=error_file,
+                    env=environment,
+                    start_new_session=True
+                )
+
+                try:
+                    return_code: int = job_process.wait(timeout=timeout_seconds)
+                except subprocess.TimeoutExpired:
+                    timed_out = True
+                    return_code = self._terminate(job_process)
+
+                    error_file.write(f"*** JOB {job_id} CANCELLED DUE TO TIME LIMIT ***\n")
+            finally:
+                if error_file is not output_file:
+                    error_file.close()
+
+        job_result = LocalJobResult(
+            job_id=job_id,
+            job_script_file_path=job_script_file_path,
+            return_code=return_code,
+            timed_out=timed_out,
+            wall_time_seconds=time.perf_counter() - start_time
+        )
+
+        status: str = "timed out" if timed_out else f"exited with code {return_code}"
+        with self.print_lock:
+            print(f"Local job {job_id} ({job_script_file_path.name}) {status} after {job_result.wall_time_seconds:.1f} s")
+
+        return job_result
+
+    @staticmethod
+    def _terminate(job_process: subprocess.Popen) -> int:
+        os.killpg(job_process.pid, signal.SIGTERM)
+
+        try:
+            return job_process.wait(timeout=TERMINATION_GRACE_PERIOD_SECONDS)
+        except subprocess.TimeoutExpired:
+            os.killpg(job_process.pid, signal.SIGKILL)
+            return job_process.wait()
+
+    def wait(self) -> int:
+        print(f"Waiting for {len(self.futures)} local jobs ({self.number_of_jobs} at a time)")
+
+        try:
+            job_results: List[LocalJobResult] = [future.result() for future in self.futures]
+        finally:
+            self.pool.shutdown(wait=True)
+            shutil.rmtree(self.shim_directory_path, ignore_errors=True)
+
+        failed_jobs: List[LocalJobResult] = [
+            job_result for job_result in job_results
+            if job_result.timed_out or job_result.return_code != 0
+        ]
+
+        print(f"  > {len(job_results) - len(failed_jobs)} succeeded, {len(failed_jobs)} failed")
+        for job_result in failed_jobs:
+            print(f"    - job {job_result.job_id}: {job_result.job_script_file_path}")
+
+        return len(failed_jobs)
+
+
+def add_executor_arguments(argument_parser: ArgumentParser) -> None:
+    argument_parser.add_argument(
+        "--executor",
+        required=False,
+        choices=EXECUTOR_NAMES,
+        default="slurm",
+        dest="executor_name",
+        help="Submit jobs with sbatch (slurm) or run them on this machine (local)."
+    )
+
+    argument_parser.add_argument(
+        "--local-jobs",
+        required=False,
+        type=int,
+        default=0,
+        dest="local_jobs",
+        help="With --executor local, run at most this many jobs at the same time (0 for one per CPU)."
+    )
+
+    argument_parser.add_argument(
+        "--local-no-container",
+        required=False,
+        action="store_true",
+        dest="local_no_container",
+        help="With --executor local, run gem5 from $GEM5_WORKSPACE directly instead of through apptainer."
+    )
+
+
+def create_executor(arguments: Namespace) -> JobExecutor:
+    """
+    Builds the executor selected by the options of `add_executor_arguments`.
+    """
+
+    if arguments.executor_name == "local":
+        return LocalExecutor(
+            number_of_jobs=arguments.local_jobs,
+            run_without_container=arguments.local_no_container
+        )
+
+    return SlurmExecutor()
@@ -0,0 +1,574 @@
+"""
+Local stand-in for the SLURM commands the sweep tooling uses, for testing without a cluster.
+
+`sbatch` runs the job script in the background on this machine (with its
+`#SBATCH --output/--error` redirections and `--time` as a timeout) and prints
+"Submitted batch job <id>"; `squeue`, `sacct` and `scancel` report on and stop
+those jobs, in the output formats the tooling parses. Job state is kept in
+`$FAKE_SLURM_STATE` (a directory under the system temp directory by default);
+`$FAKE_SLURM_MAX_RUNNING` keeps extra jobs PENDING until a slot frees up.
+
+A `--array` job becomes one job per task, like on the cluster: each gets its own
+job ID and `SLURM_ARRAY_JOB_ID`/`SLURM_ARRAY_TASK_ID`, `%A`/`%a` in its log paths
+are substituted, squeue and sacct list it as `<array job>_<task>`, and a `%K`
+suffix limits how many of its tasks run at once. A `--dependency=afterok:<id>[:<id>...]`
+job stays PENDING until those jobs completed, and is cancelled if one of them
+did not (as with `--kill-on-invalid-dep=yes`).
+
+Put the commands (and, like the local executor, a pass-through `srun` and
+optionally `apptainer`) on the PATH with:
+
+> python -m gem5_tools.fake_slurm install --bin-directory-path /tmp/fake-slurm-bin [--no-container]
+> PATH=/tmp/fake-slurm-bin:$PATH python task-1_queue-performance-tests.py ...
+"""
+
+from argparse import ArgumentParser
+import fcntl
+import json
+import os
+from pathlib import Path
+import re
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from gem5_tools.executors import APPTAINER_SHIM, SRUN_SHIM, parse_sbatch_directives, parse_slurm_time_limit
+
+
+STATE_DIRECTORY_ENVIRONMENT_VARIABLE: str = "FAKE_SLURM_STATE"
+MAX_RUNNING_ENVIRONMENT_VARIABLE: str = "FAKE_SLURM_MAX_RUNNING"
+
+COMMANDS: List[str] = ["sbatch", "squeue", "sacct", "scancel"]
+
+# States squeue lists; everything else is only in sacct.
+ACTIVE_STATES: List[str] = ["PENDING", "RUNNING"]
+
+SLOT_POLL_INTERVAL_SECONDS: float = 0.2
+
+# Exit code of coreutils `timeout` when the command timed out.
+TIMEOUT_EXIT_CODE: int = 124
+
+# One element of an `--array` specification: "3", "0-9" or "0-9:2".
+ARRAY_RANGE_REGEX: re.Pattern = re.compile(r"^(\d+)(?:-(\d+)(?::(\d+))?)?$")
+
+# The only `--dependency` type supported: "afterok:<job ID>[:<job ID>...]".
+AFTEROK_DEPENDENCY_REGEX: re.Pattern = re.compile(r"^afterok((?::\d+)+)$")
+
+COMMAND_SHIM_TEMPLATE: str = """#!/bin/sh
+PYTHONPATH="{repository_path}${{PYTHONPATH:+:$PYTHONPATH}}" exec "{python_path}" -m gem5_tools.fake_slurm {command} "$@"
+"""
+
+
+def get_state_directory_path() -> Path:
+    state_directory_path = Path(
+        os.environ.get(STATE_DIRECTORY_ENVIRONMENT_VARIABLE)
+        or Path(tempfile.gettempdir()).joinpath(f"fake-slurm-{os.getuid()}")
+    )
+
+    state_directory_path.joinpath("jobs").mkdir(parents=True, exist_ok=True)
+    return state_directory_path
+
+
+def get_job_file_path(job_id: str) -> Path:
+    return get_state_directory_path().joinpath("jobs", f"{job_id}.json")
+
+
+def read_job(job_id: str) -> Optional[Dict]:
+    try:
+        return json.loads(get_job_file_path(job_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def write_job(job: Dict) -> None:
+    job_file_path = get_job_file_path(job["job_id"])
+
+    # Readers must never see a half-written file.
+    temporary_file_path = job_file_path.with_suffix(".tmp")
+    temporary_file_path.write_text(json.dumps(job), encoding="utf-8")
+    os.replace(temporary_file_path, job_file_path)
+
+
+def list_job_ids() -> List[str]:
+    return sorted(
+        (job_file_path.stem for job_file_path in get_state_directory_path().joinpath("jobs").glob("*.json")),
+        key=int
+    )
+
+
+def allocate_job_ids(number_of_jobs: int) -> List[str]:
+    """
+    `number_of_jobs` consecutive job IDs (an array's first task ID is the array's ID).
+    """
+
+    counter_file_path = get_state_directory_path().joinpath("next-job-id")
+
+    with counter_file_path.open(mode="a+", encoding="utf-8") as counter_file:
+        fcntl.flock(counter_file, fcntl.LOCK_EX)
+
+        counter_file.seek(0)
+        job_id: int = int(counter_file.read().strip() or "1000")
+
+        counter_file.seek(0)
+        counter_file.truncate()
+        counter_file.write(str(job_id + number_of_jobs))
+
+    return [str(job_id + offset) for offset in range(number_of_jobs)]
+
+
+def parse_array_specification(array_specification: str) -> Optional[Tuple[List[int], int]]:
+    """
+    Task IDs and concurrency limit (0 for none) of e.g. "0-99%10" or "1,3,5-7", `None` if malformed.
+    """
+
+    range_list, _, max_running_tasks = array_specification.partition("%")
+    if max_running_tasks and not max_running_tasks.isdigit():
+        return None
+
+    task_ids: List[int] = []
+    for array_range in range_list.split(","):
+        matched_range = ARRAY_RANGE_REGEX.match(array_range.strip())
+        if matched_range is None:
+            return None
+
+        first_task_id: int = int(matched_range.group(1))
+        last_task_id: int = int(matched_range.group(2) or first_task_id)
+        step: int = int(matched_range.group(3) or 1)
+        if last_task_id < first_task_id or step == 0:
+            return None
+
+        task_ids.extend(range(first_task_id, last_task_id + 1, step))
+
+    return sorted(set(task_ids)), int(max_running_tasks or 0)
+
+
+def get_display_job_id(job: Dict) -> str:
+    """
+    The ID squeue and sacct show: `<array job>_<task>` for an array task.
+    """
+
+    if "array_job_id" in job:
+        return f"{job['array_job_id']}_{job['array_task_id']}"
+
+    return job["job_id"]
+
+
+def is_process_alive(process_id: Optional[int]) -> bool:
+    if process_id is None:
+        return False
+
+    try:
+        os.kill(process_id, 0)
+    except OSError:
+        return False
+
+    return True
+
+
+def get_current_state(job: Dict) -> str:
+    # A runner that died without recording an outcome (e.g. the machine rebooted).
+    if job["state"] in ACTIVE_STATES and not is_process_alive(job.get("runner_process_id")):
+        return "NODE_FAIL"
+
+    return job["state"]
+
+
+def sbatch(arguments: List[str]) -> None:
+    argument_parser = ArgumentParser(prog="sbatch")
+    argument_parser.add_argument("-a", "--array", dest="array_specification", default=None)
+    argument_parser.add_argument("-d", "--dependency", dest="dependency_specification", default=None)
+    argument_parser.add_argument("job_script_path")
+    sbatch_arguments, _ = argument_parser.parse_known_args(arguments)
+
+    job_script_path = Path(sbatch_arguments.job_script_path).resolve()
+    if not job_script_path.is_file():
+        print(f"sbatch: error: Unable to open file {job_script_path}", file=sys.stderr)
+        exit(1)
+
+    directives = parse_sbatch_directives(job_script_path.read_text(encoding="utf-8"))
+
+    # Like sbatch, the command line overrides the script's directive.
+    array_specification: Optional[str] = sbatch_arguments.array_specification or directives.get("array")
+
+    task_ids: List[Optional[int]] = [None]
+    max_running_tasks: int = 0
+    if array_specification is not None:
+        parsed_specification = parse_array_specification(array_specification)
+        if parsed_specification is None:
+            print(f"sbatch: error: Invalid job array specification: {array_specification}", file=sys.stderr)
+            exit(1)
+
+        task_ids, max_running_tasks = parsed_specification
+
+    dependency_specification: Optional[str] = sbatch_arguments.dependency_specification or directives.get("dependency")
+
+    dependency_job_ids: List[str] = []
+    if dependency_specification is not None:
+        matched_dependency = AFTEROK_DEPENDENCY_REGEX.match(dependency_specification.strip())
+        if matched_dependency is None:
+            print(f"sbatch: error: Unsupported job dependency specification: {dependency_specification}", file=sys.stderr)
+            exit(1)
+
+        dependency_job_ids = matched_dependency.group(1).strip(":").split(":")
+
+    job_ids: List[str] = allocate_job_ids(len(task_ids))
+
+    for job_id, task_id in zip(job_ids, task_ids):
+        job: Dict = {
+            "job_id": job_id,
+            "job_name": directives.get("job-name") or job_script_path.name,
+            "job_script_path": job_script_path.as_posix(),
+            "working_directory_path": Path.cwd().as_posix(),
+            "time_limit_seconds": parse_slurm_time_limit(directives.get("time") or ""),
+            "state": "PENDING",
+            "submitted_at": time.time(),
+            "dependency_job_ids": dependency_job_ids,
+        }
+
+        if task_id is not None:
+            job.update({"array_job_id": job_ids[0], "array_task_id": task_id, "array_max_running": max_running_tasks})
+
+        output_path: str = substitute_file_name_pattern(directives.get("output") or "slurm-%j.out", job)
+        error_path: str = substitute_file_name_pattern(directives.get("error"), job) if directives.get("error") else output_path
+
+        job.update({
+            "output_path": Path(output_path).resolve().as_posix(),
+            "error_path": Path(error_path).resolve().as_posix(),
+        })
+
+        write_job(job)
+
+        runner_process = subprocess.Popen(
+            args=[sys.executable, "-m", "gem5_tools.fake_slurm", "run-job", job_id],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+        job["runner_process_id"] = runner_process.pid
+        write_job(job)
+
+    print(f"Submitted batch job {job_ids[0]}")
+
+
+def substitute_file_name_pattern(file_name_pattern: str, job: Dict) -> str:
+    """
+    `%j` (job ID), and for an array task `%A` (array job ID) and `%a` (task ID), of an --output/--error path.
+    """
+
+    file_name: str = file_name_pattern.replace("%j", job["job_id"])
+
+    if "array_job_id" in job:
+        file_name = file_name.replace("%A", job["array_job_id"]).replace("%a", str(job["array_task_id"]))
+
+    return file_name
+
+
+def acquire_slot(max_running_jobs: int, slot_directory_name: str = "slots"):
+    """
+    Blocks until one of `max_running_jobs` slot locks is free, returns its open (locked) file.
+    """
+
+    slot_directory_path = get_state_directory_path().joinpath(slot_directory_name)
+    slot_directory_path.mkdir(exist_ok=True)
+
+    while True:
+        for slot_index in range(max_running_jobs):
+            slot_file = slot_directory_path.joinpath(f"slot-{slot_index}").open(mode="a")
+
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return slot_file
+            except BlockingIOError:
+                slot_file.close()
+
+        time.sleep(SLOT_POLL_INTERVAL_SECONDS)
+
+
+def wait_for_dependencies(dependency_job_ids: List[str]) -> bool:
+    """
+    Blocks until the jobs (or all tasks of the array jobs) of an afterok dependency
+    finished, returns whether all of them completed.
+    """
+
+    while True:
+        dependency_states: List[str] = []
+        for dependency_job_id in dependency_job_ids:
+            dependency_jobs: List[Dict] = select_jobs(dependency_job_id)
+            if len(dependency_jobs) == 0:
+                return False
+
+            dependency_states += [get_current_state(dependency_job) for dependency_job in dependency_jobs]
+
+        if all(state == "COMPLETED" for state in dependency_states):
+            return True
+        if any(state not in ACTIVE_STATES for state in dependency_states):
+            return False
+
+        time.sleep(SLOT_POLL_INTERVAL_SECONDS)
+
+
+def run_job(arguments: List[str]) -> None:
+    job_id: str = arguments[0]
+
+    # sbatch may still be recording this runner's process ID.
+    while read_job(job_id).get("runner_process_id") is None:
+        time.sleep(0.05)
+
+    # Pending on its dependencies holds no slot, like on the cluster.
+    if not wait_for_dependencies(read_job(job_id).get("dependency_job_ids", [])):
+        job: Dict = read_job(job_id)
+        if job["state"] == "PENDING":
+            job.update({"state": "CANCELLED", "finished_at": time.time()})
+            write_job(job)
+        return
+
+    job = read_job(job_id)
+
+    # The array's own limit first: a task holding a global slot never waits for its array.
+    max_running_tasks: int = job.get("array_max_running", 0)
+    array_slot_file = acquire_slot(max_running_tasks, f"slots-{job['array_job_id']}") if max_running_tasks > 0 else None
+
+    max_running_jobs: int = int(os.environ.get(MAX_RUNNING_ENVIRONMENT_VARIABLE) or 0)
+    slot_file = acquire_slot(max_running_jobs) if max_running_jobs > 0 else None
+
+    job = read_job(job_id)
+    if job["state"] != "PENDING":
+        return
+
+    environment: Dict[str, str] = dict(os.environ)
+    environment["SLURM_JOB_ID"] = job_id
+    environment["SLURM_JOB_NAME"] = job["job_name"]
+    if "array_job_id" in job:
+        environment["SLURM_ARRAY_JOB_ID"] = job["array_job_id"]
+        environment["SLURM_ARRAY_TASK_ID"] = str(job["array_task_id"])
+
+    Path(job["output_path"]).parent.mkdir(parents=True, exist_ok=True)
+    Path(job["error_path"]).parent.mkdir(parents=True, exist_ok=True)
+
+    start_time: float = time.time()
+    job.update({"state": "RUNNING", "started_at": start_time})
+    write_job(job)
+
+    with open(job["output_path"], mode="w", encoding="utf-8") as output_file:
+        error_file = output_file if job["error_path"] == job["output_path"] \
+            else open(job["error_path"], mode="w", encoding="utf-8")
+
+        job_process = subprocess.Popen(
+            args=["bash", job["job_script_path"]],
+            cwd=job["working_directory_path"],
+            stdin=subprocess.DEVNULL,
+            stdout=output_file,
+            stderr=error_file,
+            env=environment
+        )
+
+        try:
+            exit_code: int = job_process.wait(timeout=job["time_limit_seconds"])
+            state: str = "COMPLETED" if exit_code == 0 else "FAILED"
+        except subprocess.TimeoutExpired:
+            job_process.terminate()
+            exit_code = job_process.wait()
+            state = "TIMEOUT"
+
+            error_file.write(f"slurmstepd: error: *** JOB {job_id} ON localhost CANCELLED AT {time.strftime('%Y-%m-%dT%H:%M:%S')} DUE TO TIME LIMIT ***\n")
+
+        if error_file is not output_file:
+            error_file.close()
+
+    # scancel may have recorded the job as cancelled in the meantime.
+    job = read_job(job_id)
+    if job["state"] == "RUNNING":
+        job.update({
+            "state": state,
+            "exit_code": exit_code,
+            "finished_at": time.time(),
+            # Of the largest process of the job (Linux reports KiB).
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        })
+        write_job(job)
+
+    if slot_file is not None:
+        slot_file.close()
+    if array_slot_file is not None:
+        array_slot_file.close()
+
+
+def select_jobs(job_ids: Optional[str]) -> List[Dict]:
+    """
+    The jobs a `-j` list (or scancel's arguments) names, all of them without one.
+    An array job ID names all of its tasks, `<array job>_<task>` one of them.
+    """
+
+    requested_job_ids: List[str] = [job_id.strip() for job_id in (job_ids or "").split(",") if job_id.strip()]
+
+    selected_jobs: List[Dict] = []
+    for job_id in list_job_ids():
+        job: Optional[Dict] = read_job(job_id)
+        if job is None:
+            continue
+
+        job_aliases: List[str] = [job_id, get_display_job_id(job), job.get("array_job_id", job_id)]
+        if len(requested_job_ids) == 0 or any(alias in requested_job_ids for alias in job_aliases):
+            selected_jobs.append(job)
+
+    return selected_jobs
+
+
+def squeue(arguments: List[str]) -> None:
+    argument_parser = ArgumentParser(prog="squeue", add_help=False)
+    argument_parser.add_argument("-h", "--noheader", action="store_true", dest="no_header")
+    argument_parser.add_argument("-o", "--format", dest="format", default="%i %j %T")
+    argument_parser.add_argument("-j", "--jobs", dest="job_ids", default=None)
+    squeue_arguments, _ = argument_parser.parse_known_args(arguments)
+
+    if not squeue_arguments.no_header:
+        print(squeue_arguments.format.replace("%i", "JOBID").replace("%j", "NAME").replace("%T", "STATE"))
+
+    for job in select_jobs(squeue_arguments.job_ids):
+        if get_current_state(job) not in ACTIVE_STATES:
+            continue
+
+        print(
+            squeue_arguments.format
+            .replace("%i", get_display_job_id(job))
+            .replace("%j", job["job_name"])
+            .replace("%T", job["state"])
+        )
+
+
+def format_sacct_field(job: Dict, field_name: str) -> str:
+    state: str = get_current_state(job)
+
+    if field_name == "JobID":
+        return get_display_job_id(job)
+    if field_name == "JobName":
+        return job["job_name"]
+    if field_name == "State":
+        return state
+    if field_name == "ExitCode":
+        exit_code: int = job.get("exit_code", 0)
+
+        # "<exit code>:<signal>", a job killed by a signal has a negative return code here.
+        return f"0:{-exit_code}" if exit_code < 0 else f"{exit_code}:0"
+    if field_name == "ElapsedRaw":
+        if "started_at" not in job:
+            return "0"
+
+        return str(int(job.get("finished_at", time.time()) - job["started_at"]))
+    if field_name in ["Submit", "Start"]:
+        timestamp: Optional[float] = job.get("submitted_at" if field_name == "Submit" else "started_at")
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)) if timestamp is not None else "Unknown"
+    if field_name == "MaxRSS":
+        return f"{job['max_rss_kib']}K" if "max_rss_kib" in job else ""
+
+    return ""
+
+
+def sacct(arguments: List[str]) -> None:
+    argument_parser = ArgumentParser(prog="sacct", add_help=False)
+    argument_parser.add_argument("-j", "--jobs", dest="job_ids", default=None)
+    argument_parser.add_argument("-n", "--noheader", action="store_true", dest="no_header")
+    argument_parser.add_argument("-P", "--parsable2", action="store_true", dest="parsable")
+    argument_parser.add_argument("-o", "--format", dest="format", default="JobID,JobName,State,ExitCode")
+    sacct_arguments, _ = argument_parser.parse_known_args(arguments)
+
+    field_names: List[str] = sacct_arguments.format.split(",")
+    separator: str = "|" if sacct_arguments.parsable else " "
+
+    if not sacct_arguments.no_header:
+        print(separator.join(field_names))
+
+    for job in select_jobs(sacct_arguments.job_ids):
+        print(separator.join(format_sacct_field(job, field_name) for field_name in field_names))
+
+
+def scancel(arguments: List[str]) -> None:
+    if len(arguments) == 0:
+        return
+
+    for job in select_jobs(",".join(arguments)):
+        if get_current_state(job) not in ACTIVE_STATES:
+            continue
+
+        job.update({"state": "CANCELLED", "finished_at": time.time()})
+        write_job(job)
+
+        try:
+            os.killpg(job["runner_process_id"], signal.SIGTERM)
+        except OSError:
+            pass
+
+
+def install(arguments: List[str]) -> None:
+    argument_parser = ArgumentParser(prog="python -m gem5_tools.fake_slurm install")
+
+    argument_parser.add_argument(
+        "--bin-directory-path",
+        required=True,
+        dest="bin_directory_path"
+    )
+
+    argument_parser.add_argument(
+        "--no-container",
+        required=False,
+        action="store_true",
+        dest="no_container",
+        help="Also shim apptainer, to run a native gem5 build from $GEM5_WORKSPACE."
+    )
+
+    install_arguments = argument_parser.parse_args(arguments)
+
+    bin_directory_path = Path(str(install_arguments.bin_directory_path))
+    bin_directory_path.mkdir(parents=True, exist_ok=True)
+
+    shims: Dict[str, str] = {
+        command: COMMAND_SHIM_TEMPLATE.format(
+            repository_path=Path(__file__).resolve().parents[1].as_posix(),
+            python_path=sys.executable,
+            command=command
+        )
+        for command in COMMANDS
+    }
+
+    shims["srun"] = SRUN_SHIM
+    if install_arguments.no_container:
+        shims["apptainer"] = APPTAINER_SHIM
+
+    for command_name, shim_script in shims.items():
+        shim_path = bin_directory_path.joinpath(command_name)
+        shim_path.write_text(shim_script, encoding="utf-8")
+        shim_path.chmod(0o755)
+
+    print(f"Installed {', '.join(sorted(shims))} into {bin_directory_path} (state in {get_state_directory_path()})")
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] not in [*COMMANDS, "run-job", "install"]:
+        print(f"Usage: python -m gem5_tools.fake_slurm {{{','.join([*COMMANDS, 'install'])}}} [arguments...]")
+        exit(1)
+
+    command: str = sys.argv[1]
+    arguments: List[str] = sys.argv[2:]
+
+    if command == "sbatch":
+        sbatch(arguments)
+    elif command == "squeue":
+        squeue(arguments)
+    elif command == "sacct":
+        sacct(arguments)
+    elif command == "scancel":
+        scancel(arguments)
+    elif command == "run-job":
+        run_job(arguments)
+    else:
+        install(arguments)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Fast-forwarding the gem5 config scripts to the region of interest of their workload.
+
+With `--fast_forward`, a config script starts its cores as fast functional cores
+and switches them to its detailed CPU model once the workload reaches its region
+of interest. The ROI starts either at the `m5_work_begin` marker
+(ExitEvent.WORKBEGIN, as cholesky.c calls it) or, with `--fast_forward_insts`,
+after that many instructions of the first core (for workloads without markers).
+The functional cores are ATOMIC, or TIMING with Ruby cache hierarchies, which
+cannot serve atomic accesses. Statistics are reset at the switch. At `m5_work_end`
+they are dumped and the simulation ends, so the first dump of stats.txt covers
+only the measured kernel instead of the OpenMP startup and teardown.
+
+Like gem5_tools.windowed_simulation, this module runs inside gem5's interpreter
+and imports gem5 only where it is used.
+"""
+
+from argparse import Namespace
+from typing import Dict
+
+
+def create_processor(arguments: Namespace, cpu_type, num_cores: int, isa, fast_forward_cpu_type):
+    """
+    The processor of a config script: `cpu_type` cores, or with `--fast_forward`,
+    `fast_forward_cpu_type` cores that `build_fast_forward_exit_handlers` switches to `cpu_type`.
+    """
+
+    from gem5.components.processors.simple_processor import SimpleProcessor
+    from gem5.components.processors.simple_switchable_processor import SimpleSwitchableProcessor
+
+    if not arguments.fast_forward:
+        return SimpleProcessor(cpu_type=cpu_type, num_cores=num_cores, isa=isa)
+
+    return SimpleSwitchableProcessor(
+        starting_core_type=fast_forward_cpu_type,
+        switch_core_type=cpu_type,
+        num_cores=num_cores,
+        isa=isa
+    )
+
+
+def build_fast_forward_exit_handlers(processor, arguments: Namespace) -> Dict:
+    """
+    `Simulator` exit event handlers that switch a processor of `create_processor` to
+    its detailed cores at the ROI and end the simulation after it (none without `--fast_forward`).
+    """
+
+    if not arguments.fast_forward:
+        return {}
+
+    import m5
+    from gem5.simulate.exit_event import ExitEvent
+
+    switched: bool = False
+
+    def switch_to_detailed_cores(cause: str) -> None:
+        nonlocal switched
+
+        if switched:
+            return
+
+        processor.switch()
+        m5.stats.reset()
+        switched = True
+
+        print(f"Region of interest begins ({cause}) at tick {m5.curTick()}: switched to the detailed cores, statistics reset")
+
+    def on_work_begin():
+        while True:
+            switch_to_detailed_cores("m5_work_begin")
+            yield False
+
+    def on_max_instructions():
+        while True:
+            switch_to_detailed_cores(f"{arguments.fast_forward_insts} instructions")
+            yield False
+
+    def on_work_end():
+        while True:
+            print(f"Region of interest ends (m5_work_end) at tick {m5.curTick()}: statistics dumped")
+            m5.stats.dump()
+            yield True
+
+    exit_event_handlers: Dict = {
+        ExitEvent.WORKBEGIN: on_work_begin(),
+        ExitEvent.WORKEND: on_work_end(),
+    }
+
+    if arguments.fast_forward_insts > 0:
+        # The switchable processor lists its starting (fast-forward) cores until it switches.
+        processor.get_cores()[0].core.max_insts_any_thread = arguments.fast_forward_insts
+        exit_event_handlers[ExitEvent.MAX_INSTS] = on_max_instructions()
+
+    return exit_event_handlers
@@ -0,0 +1,210 @@
+"""
+SLURM job array submission for the sweep queue scripts.
+
+Instead of one `sbatch` per configuration, every configuration's job script is
+written as before, listed in a tab-separated manifest, and run by a single array
+job (`#SBATCH --array=0-N%K`). Each array task looks up its row by
+`SLURM_ARRAY_TASK_ID` and runs that job script with its output and error
+redirected to the same log files a standalone job would have used, so the
+analysis scripts find the results and logs exactly where they expect them.
+"""
+
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Self, Union
+
+from gem5_tools.executors import (
+    format_slurm_time_limit,
+    parse_sbatch_directives,
+    parse_slurm_time_limit,
+    submit_job_script,
+)
+
+
+SBATCH_DIRECTIVE_PREFIX: str = "#SBATCH "
+
+# Directives that differ between the configurations of a sweep; everything else
+# (reservation, CPUs, ...) must be the same to share one array job. The array
+# requests the longest of the tasks' time limits.
+PER_TASK_DIRECTIVES: List[str] = ["job-name", "output", "error", "time"]
+
+MANIFEST_COLUMNS: List[str] = ["task_id", "job_name", "output_path", "error_path", "job_script_path", "parameters"]
+
+
+@dataclass(frozen=True, kw_only=True)
+class ArrayTask:
+    job_name: str
+    output_path: str
+    error_path: str
+    job_script_file_path: Path
+    time_limit: Optional[str] = None
+    parameters: Dict[str, Union[str, int, float]] = field(default_factory=dict)
+    # The job script's directives that are shared by the whole array.
+    shared_directives: Dict[str, Optional[str]] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_job_script(
+        cls,
+        job_script_file_path: Path,
+        parameters: Optional[Dict[str, Union[str, int, float]]] = None,
+    ) -> Self:
+        directives = parse_sbatch_directives(job_script_file_path.read_text(encoding="utf-8"))
+
+        job_name: str = directives.get("job-name") or job_script_file_path.stem
+        output_path: str = directives.get("output") or job_script_file_path.with_suffix(".log").resolve().as_posix()
+
+        return cls(
+            job_name=job_name,
+            output_path=output_path,
+            # Like sbatch: without --error, stderr goes to the output file.
+            error_path=directives.get("error") or output_path,
+            job_script_file_path=job_script_file_path.resolve(),
+            time_limit=directives.get("time"),
+            parameters=parameters or {},
+            shared_directives={
+                name: value for name, value in directives.items()
+                if name not in PER_TASK_DIRECTIVES
+            }
+        )
+
+
+@dataclass
+class JobArray:
+    """
+    Collects the configurations of a sweep (in place of submitting each one) and
+    submits them as a single array job.
+    """
+
+    name: str
+    # At most this many tasks run at the same time (0 for no limit).
+    max_concurrent_tasks: int = 0
+    tasks: List[ArrayTask] = field(default_factory=list)
+
+    def add_job_script(
+        self,
+        job_script_file_path: Path,
+        parameters: Optional[Dict[str, Union[str, int, float]]] = None,
+    ) -> int:
+        """
+        Adds a job script as the next array task, returns its task ID.
+        """
+
+        task = ArrayTask.from_job_script(job_script_file_path, parameters)
+
+        if len(self.tasks) > 0 and task.shared_directives != self.tasks[0].shared_directives:
+            raise ValueError(
+                f"{job_script_file_path} needs different resources than the rest of the array "
+                f"({task.shared_directives} vs. {self.tasks[0].shared_directives})"
+            )
+
+        self.tasks.append(task)
+        return len(self.tasks) - 1
+
+    def get_array_range(self) -> str:
+        array_range: str = f"0-{len(self.tasks) - 1}"
+        if self.max_concurrent_tasks > 0:
+            array_range += f"%{self.max_concurrent_tasks}"
+
+        return array_range
+
+    def get_time_limit(self) -> Optional[str]:
+        time_limits_seconds: List[Optional[float]] = [
+            parse_slurm_time_limit(task.time_limit or "") for task in self.tasks
+        ]
+
+        # A task without a limit leaves the whole array without one.
+        if None in time_limits_seconds:
+            return None
+
+        return format_slurm_time_limit(max(time_limits_seconds))
+
+    def write(self, output_directory_path: Path) -> Path:
+        """
+        Writes `<name>.manifest.tsv` and `<name>.sh` into `output_directory_path`,
+        returns the path of the array job script.
+        """
+
+        if len(self.tasks) == 0:
+            raise ValueError("Cannot write an empty job array.")
+
+        output_directory_path = output_directory_path.resolve()
+
+        manifest_file_path = output_directory_path.joinpath(f"{self.name}.manifest.tsv")
+        array_script_file_path = output_directory_path.joinpath(f"{self.name}.sh")
+
+        assert not manifest_file_path.exists() and not array_script_file_path.exists()
+
+        manifest_rows: List[str] = ["\t".join(MANIFEST_COLUMNS)]
+        for task_id, task in enumerate(self.tasks):
+            manifest_rows.append("\t".join([
+                str(task_id),
+                task.job_name,
+                task.output_path,
+                task.error_path,
+                task.job_script_file_path.as_posix(),
+                json.dumps(task.parameters, sort_keys=True),
+            ]))
+
+        with manifest_file_path.open(mode="w", encoding="utf8") as manifest_file:
+            manifest_file.write("\n".join(manifest_rows) + "\n")
+
+        shared_directive_lines: List[str] = [
+            f"{SBATCH_DIRECTIVE_PREFIX}--{name}" if value is None else f"{SBATCH_DIRECTIVE_PREFIX}--{name}={value}"
+            for name, value in self.tasks[0].shared_directives.items()
+        ]
+
+        time_limit: Optional[str] = self.get_time_limit()
+        if time_limit is not None:
+            shared_directive_lines.append(f"{SBATCH_DIRECTIVE_PREFIX}--time={time_limit}")
+
+        shared_directives: str = "\n".join(shared_directive_lines)
+        array_log_file_path = output_directory_path.joinpath(f"{self.name}_%A_%a.log")
+
+        array_script = f"""#!/bin/bash
+#SBATCH --job-name={self.name}
+#SBATCH --array={self.get_array_range()}
+#SBATCH --output="{array_log_file_path.as_posix()}"
+{shared_directives}
+
+MANIFEST="{manifest_file_path.as_posix()}"
+
+# Row of this task, skipping the header.
+TASK_ROW=$(awk -F '\\t' -v task_id="$SLURM_ARRAY_TASK_ID" 'NR > 1 && $1 == task_id' "$MANIFEST")
+if [ -z "$TASK_ROW" ]; then
+    echo "No manifest row for array task $SLURM_ARRAY_TASK_ID" >&2
+    exit 1
+fi
+
+JOB_NAME=$(printf '%s' "$TASK_ROW" | cut -f 2)
+OUTPUT_PATH=$(printf '%s' "$TASK_ROW" | cut -f 3)
+ERROR_PATH=$(printf '%s' "$TASK_ROW" | cut -f 4)
+JOB_SCRIPT_PATH=$(printf '%s' "$TASK_ROW" | cut -f 5)
+
+echo "Array task $SLURM_ARRAY_TASK_ID: $JOB_NAME ($JOB_SCRIPT_PATH)"
+
+if [ "$ERROR_PATH" = "$OUTPUT_PATH" ]; then
+    bash "$JOB_SCRIPT_PATH" > "$OUTPUT_PATH" 2>&1
+else
+    bash "$JOB_SCRIPT_PATH" > "$OUTPUT_PATH" 2> "$ERROR_PATH"
+fi
+"""
+
+        with array_script_file_path.open(mode="w", encoding="utf8") as script_file:
+            script_file.write(array_script)
+
+        return array_script_file_path
+
+    def write_and_submit(self, output_directory_path: Path) -> Optional[int]:
+        if len(self.tasks) == 0:
+            # E.g. every configuration was served from the result cache.
+            print(f"No jobs to submit as array {self.name}")
+            return None
+
+        array_script_file_path = self.write(output_directory_path)
+
+        print(f"Submitting {len(self.tasks)} jobs as array {self.name} ({self.get_array_range()}) via sbatch")
+        job_id: int = submit_job_script(array_script_file_path)
+        print(f"  > submitted as array job {job_id}")
+
+        return job_id
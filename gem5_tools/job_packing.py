@@ -0,0 +1,287 @@
+"""
+Packing of many short simulations into few SLURM allocations.
+
+Instead of one small allocation (and one queue wait) per configuration, the
+configurations of a sweep are grouped into packs. Each pack is a single job that
+requests one CPU per configuration slot, enters the gem5 container once
+(`srun apptainer exec <image> ...`) and runs the packed job scripts in there on
+a small in-job scheduler, longest predicted runtime first, at most one per CPU.
+
+The per-configuration job scripts are written exactly as before and run with
+their output and error redirected to the same log files a standalone job would
+have used, so the analysis scripts find everything where they expect it. Inside
+the pack, `srun` and `apptainer exec <image>` in those scripts are replaced by
+pass-through shims, since the pack already holds the CPUs and runs in the container.
+"""
+
+from dataclasses import dataclass, field
+import heapq
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from gem5_tools.executors import (
+    APPTAINER_SHIM,
+    SRUN_SHIM,
+    format_slurm_time_limit,
+    parse_slurm_time_limit,
+    submit_job_script,
+)
+from gem5_tools.job_array import SBATCH_DIRECTIVE_PREFIX, ArrayTask
+
+
+# Directives every pack sets itself; the others are taken over from the packed job scripts.
+PACK_DIRECTIVES: List[str] = ["cpus-per-task", "time"]
+
+# Set for the job scripts run inside a pack: their SLURM_JOB_ID (and thus sacct's accounting) is the whole pack's.
+PACKED_TASK_ENVIRONMENT_VARIABLE: str = "GEM5_PACKED_TASK"
+
+PACK_MANIFEST_COLUMNS: List[str] = ["task_id", "job_name", "output_path", "error_path", "job_script_path", "predicted_runtime_seconds"]
+
+PACK_RUNNER_SCRIPT: str = """#!/bin/bash
+# Runs the job scripts of a pack manifest (already ordered longest first), at most SLOTS at a time.
+MANIFEST="$1"
+SLOTS="$2"
+SHIM_DIRECTORY="$3"
+
+export PATH="$SHIM_DIRECTORY:$PATH"
+# See PACKED_TASK_ENVIRONMENT_VARIABLE.
+export GEM5_PACKED_TASK=1
+
+run_task() {
+    local JOB_NAME="$1" OUTPUT_PATH="$2" ERROR_PATH="$3" JOB_SCRIPT_PATH="$4"
+
+    echo "$(date +%H:%M:%S) started $JOB_NAME ($JOB_SCRIPT_PATH)"
+
+    if [ "$ERROR_PATH" = "$OUTPUT_PATH" ]; then
+        bash "$JOB_SCRIPT_PATH" > "$OUTPUT_PATH" 2>&1
+    else
+        bash "$JOB_SCRIPT_PATH" > "$OUTPUT_PATH" 2> "$ERROR_PATH"
+    fi
+    local TASK_EXIT_CODE=$?
+
+    echo "$(date +%H:%M:%S) finished $JOB_NAME with exit code $TASK_EXIT_CODE"
+}
+
+while IFS=$'\\t' read -r TASK_ID JOB_NAME OUTPUT_PATH ERROR_PATH JOB_SCRIPT_PATH PREDICTED_RUNTIME_SECONDS; do
+    if [ "$TASK_ID" = "task_id" ]; then
+        continue
+    fi
+
+    # Wait for a free slot.
+    while [ "$(jobs -rp | wc -l)" -ge "$SLOTS" ]; do
+        wait -n
+    done
+
+    run_task "$JOB_NAME" "$OUTPUT_PATH" "$ERROR_PATH" "$JOB_SCRIPT_PATH" &
+done < "$MANIFEST"
+
+wait
+"""
+
+
+@dataclass(frozen=True, kw_only=True)
+class PackedTask:
+    task: ArrayTask
+    # Used to balance the packs and to order each pack; falls back to the job's --time.
+    predicted_runtime_seconds: float
+    time_limit_seconds: float
+
+
+def estimate_makespan(runtimes_seconds: List[float], number_of_slots: int) -> float:
+    """
+    Finishing time of running the given jobs in this order, each on the first free slot.
+    """
+
+    slot_finish_times: List[float] = [0.0] * max(1, number_of_slots)
+
+    for runtime_seconds in runtimes_seconds:
+        heapq.heapreplace(slot_finish_times, slot_finish_times[0] + runtime_seconds)
+
+    return max(slot_finish_times)
+
+
+@dataclass
+class JobPacker:
+    """
+    Collects the configurations of a sweep (in place of submitting each one) and
+    submits them as packs of at most `configurations_per_pack` configurations.
+    """
+
+    name: str
+    configurations_per_pack: int
+    # CPUs each pack requests, i.e. how many of its configurations run at once (0 for one per configuration).
+    cpus_per_pack: int = 0
+    # Shell expression for the image the packed job scripts run gem5 in.
+    container_image: str = ""
+    # Shell lines that define the variables `container_image` refers to.
+    container_image_preamble: str = ""
+    tasks: List[PackedTask] = field(default_factory=list)
+    # Task IDs of every pack, in the order `write` wrote (and `write_and_submit` submitted) them.
+    pack_task_ids: List[List[int]] = field(default_factory=list)
+
+    def add_job_script(
+        self,
+        job_script_file_path: Path,
+        parameters: Optional[Dict[str, Union[str, int, float]]] = None,
+        predicted_runtime_seconds: Optional[float] = None,
+    ) -> int:
+        """
+        Adds a job script to the next pack assignment, returns its task ID.
+        """
+
+        task = ArrayTask.from_job_script(job_script_file_path, parameters)
+
+        if len(self.tasks) > 0 and task.shared_directives != self.tasks[0].task.shared_directives:
+            raise ValueError(
+                f"{job_script_file_path} needs different resources than the rest of the sweep "
+                f"({task.shared_directives} vs. {self.tasks[0].task.shared_directives})"
+            )
+
+        time_limit_seconds: Optional[float] = parse_slurm_time_limit(task.time_limit or "")
+        if time_limit_seconds is None:
+            raise ValueError(f"{job_script_file_path} has no --time, cannot size its pack")
+
+        self.tasks.append(PackedTask(
+            task=task,
+            predicted_runtime_seconds=predicted_runtime_seconds if predicted_runtime_seconds is not None else time_limit_seconds,
+            time_limit_seconds=time_limit_seconds
+        ))
+
+        return len(self.tasks) - 1
+
+    def assign_packs(self) -> List[List[int]]:
+        """
+        Task IDs of every pack, longest predicted runtime first. Tasks are dealt out
+        longest first, each to the least loaded pack that still has room, so the
+        packs finish at about the same time.
+        """
+
+        number_of_packs: int = -(-len(self.tasks) // self.configurations_per_pack)
+
+        task_ids_by_runtime: List[int] = sorted(
+            range(len(self.tasks)),
+            key=lambda task_id: (-self.tasks[task_id].predicted_runtime_seconds, task_id)
+        )
+
+        packs: List[List[int]] = [[] for _ in range(number_of_packs)]
+        pack_loads: List[float] = [0.0] * number_of_packs
+
+        for task_id in task_ids_by_runtime:
+            pack_index: int = min(
+                (index for index in range(number_of_packs) if len(packs[index]) < self.configurations_per_pack),
+                key=lambda index: (pack_loads[index], index)
+            )
+
+            packs[pack_index].append(task_id)
+            pack_loads[pack_index] += self.tasks[task_id].predicted_runtime_seconds
+
+        return packs
+
+    def write(self, output_directory_path: Path) -> List[Path]:
+        """
+        Writes the runner, shims, and a manifest and job script per pack into
+        `output_directory_path`, returns the paths of the pack job scripts.
+        """
+
+        if len(self.tasks) == 0:
+            raise ValueError("Cannot write an empty job pack.")
+
+        output_directory_path = output_directory_path.resolve()
+
+        runner_script_file_path = output_directory_path.joinpath(f"{self.name}.pack-runner.sh")
+        shim_directory_path = output_directory_path.joinpath(f"{self.name}.pack-shims")
+
+        assert not runner_script_file_path.exists() and not shim_directory_path.exists()
+
+        runner_script_file_path.write_text(PACK_RUNNER_SCRIPT, encoding="utf8")
+
+        shim_directory_path.mkdir()
+        for command_name, shim_script in [("srun", SRUN_SHIM), ("apptainer", APPTAINER_SHIM)]:
+            shim_path = shim_directory_path.joinpath(command_name)
+            shim_path.write_text(shim_script, encoding="utf8")
+            shim_path.chmod(0o755)
+
+        pack_directives: Dict[str, Optional[str]] = {
+            name: value for name, value in self.tasks[0].task.shared_directives.items()
+            if name not in PACK_DIRECTIVES
+        }
+
+        pack_script_file_paths: List[Path] = []
+
+        self.pack_task_ids = self.assign_packs()
+
+        for pack_index, task_ids in enumerate(self.pack_task_ids):
+            pack_name: str = f"{self.name}-pack{pack_index}"
+            number_of_slots: int = min(len(task_ids), self.cpus_per_pack) if self.cpus_per_pack > 0 else len(task_ids)
+
+            manifest_file_path = output_directory_path.joinpath(f"{pack_name}.manifest.tsv")
+            pack_script_file_path = output_directory_path.joinpath(f"{pack_name}.sh")
+            pack_log_file_path = output_directory_path.joinpath(f"{pack_name}.log")
+
+            assert not manifest_file_path.exists() and not pack_script_file_path.exists()
+
+            manifest_rows: List[str] = ["\t".join(PACK_MANIFEST_COLUMNS)]
+            for task_id in task_ids:
+                packed_task = self.tasks[task_id]
+                manifest_rows.append("\t".join([
+                    str(task_id),
+                    packed_task.task.job_name,
+                    packed_task.task.output_path,
+                    packed_task.task.error_path,
+                    packed_task.task.job_script_file_path.as_posix(),
+                    f"{packed_task.predicted_runtime_seconds:.0f}",
+                ]))
+
+            with manifest_file_path.open(mode="w", encoding="utf8") as manifest_file:
+                manifest_file.write("\n".join(manifest_rows) + "\n")
+
+            # Every job already fits its own limit, so the pack fits the same schedule run with those limits.
+            pack_time_limit_seconds: float = estimate_makespan(
+                [self.tasks[task_id].time_limit_seconds for task_id in task_ids],
+                number_of_slots
+            )
+
+            directive_lines: List[str] = [
+                f"{SBATCH_DIRECTIVE_PREFIX}--{name}" if value is None else f"{SBATCH_DIRECTIVE_PREFIX}--{name}={value}"
+                for name, value in pack_directives.items()
+            ]
+
+            pack_script = f"""#!/bin/bash
+#SBATCH --job-name={pack_name}
+#SBATCH --cpus-per-task={number_of_slots}
+#SBATCH --time={format_slurm_time_limit(pack_time_limit_seconds)}
+#SBATCH --output="{pack_log_file_path.as_posix()}"
+{chr(10).join(directive_lines)}
+
+{self.container_image_preamble}
+
+echo "Running {len(task_ids)} packed jobs on {number_of_slots} CPUs"
+srun apptainer exec {self.container_image} bash "{runner_script_file_path.as_posix()}" \\
+    "{manifest_file_path.as_posix()}" {number_of_slots} "{shim_directory_path.as_posix()}"
+"""
+
+            with pack_script_file_path.open(mode="w", encoding="utf8") as script_file:
+                script_file.write(pack_script)
+
+            pack_script_file_paths.append(pack_script_file_path)
+
+        return pack_script_file_paths
+
+    def write_and_submit(self, output_directory_path: Path) -> List[int]:
+        if len(self.tasks) == 0:
+            # E.g. every configuration was served from the result cache.
+            print(f"No jobs to submit as packs of {self.name}")
+            return []
+
+        pack_script_file_paths: List[Path] = self.write(output_directory_path)
+
+        print(f"Submitting {len(self.tasks)} jobs as {len(pack_script_file_paths)} packs of {self.name} via sbatch")
+
+        job_ids: List[int] = []
+        for pack_script_file_path in pack_script_file_paths:
+            job_id: int = submit_job_script(pack_script_file_path)
+            print(f"  > {pack_script_file_path.stem} submitted as job {job_id}")
+
+            job_ids.append(job_id)
+
+        return job_ids
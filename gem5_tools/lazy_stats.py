@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+import mmap
+from pathlib import Path
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from gem5_tools.compressed_stats import GZIP_SUFFIX, ZSTD_SUFFIX, read_stats_bytes
+from gem5_tools.stats_index import StatsIndex, extract_raw_value
+
+
+@dataclass
+class PrefixTrieNode:
+    children: Dict[str, "PrefixTrieNode"] = field(default_factory=dict)
+
+    # True if a requested prefix ends at this node.
+    is_terminal: bool = False
+
+
+class StatisticPrefixTrie:
+    """
+    Character trie of requested statistic name prefixes
+    (e.g. "board.cache_hierarchy.ruby_system.network." or "system.cpu3.CUs").
+    """
+
+    def __init__(self, prefixes: Iterable[str]):
+        self.root = PrefixTrieNode()
+
+        for prefix in prefixes:
+            self.insert(prefix)
+
+    def insert(self, prefix: str) -> None:
+        if not prefix:
+            raise ValueError("Empty statistic prefix would match every line, load the full file instead.")
+
+        node = self.root
+        for character in prefix:
+            node = node.children.setdefault(character, PrefixTrieNode())
+
+        node.is_terminal = True
+
+    def build_pattern(self, node: Optional[PrefixTrieNode] = None) -> bytes:
+        """
+        A regex (over UTF-8 bytes) that follows the trie from `node`: one
+        alternative per child, ending where a requested prefix ends. A prefix
+        covered by a shorter one (e.g. "system.cpu3.CUs1." by "system.cpu3.CUs")
+        is never reached, so no line is parsed twice.
+        """
+
+        node = node if node is not None else self.root
+        if node.is_terminal:
+            return b""
+
+        alternatives: List[bytes] = [
+            re.escape(character.encode("utf-8")) + self.build_pattern(child)
+            for character, child in sorted(node.children.items())
+        ]
+
+        return alternatives[0] if len(alternatives) == 1 else b"(?:" + b"|".join(alternatives) + b")"
+
+
+def find_statistics_with_prefixes(
+    stats_txt_bytes: Union[mmap.mmap, bytes],
+    trie: StatisticPrefixTrie,
+    byte_range: Optional[Tuple[int, int]],
+    found_statistics: List[Tuple[int, str, str]],
+) -> None:
+    range_start, range_end = byte_range if byte_range is not None else (0, len(stats_txt_bytes))
+
+    trie_pattern: bytes = trie.build_pattern()
+
+    # The range may begin directly at a matching line (no preceding newline).
+    line_starts: List[int] = [range_start] if re.compile(trie_pattern).match(stats_txt_bytes, range_start, range_end) else []
+
+    # One pass over the range: the regex engine walks the trie at every line start.
+    line_starts += [
+        matched_line.start() + 1
+        for matched_line in re.compile(b"\n" + trie_pattern).finditer(stats_txt_bytes, range_start, range_end)
+    ]
+
+    for line_start in line_starts:
+        line_end: int = stats_txt_bytes.find(b"\n", line_start, range_end)
+        if line_end == -1:
+            line_end = range_end
+
+        parts = stats_txt_bytes[line_start:line_end].decode("utf-8").split(None, 2)
+        if len(parts) >= 2:
+            found_statistics.append((line_start, parts[0], extract_raw_value(parts)))
+
+
+def load_statistics_with_prefixes(
+    stats_txt_path: Path,
+    prefixes: Iterable[str],
+    byte_range: Optional[Tuple[int, int]] = None,
+) -> StatsIndex:
+    """
+    Builds a `StatsIndex` containing only the statistics whose names start with
+    one of `prefixes`, without reading the whole file into a Python string.
+
+    The file is memory-mapped and the trie of the prefixes is compiled into one
+    regex, so a single C-level scan finds the matching line starts, however many
+    prefixes there are (e.g. one per core); only those lines are copied out and
+    tokenized. Python-side work and memory therefore scale with the number of
+    requested statistics, not with the size of the file.
+
+    `byte_range` restricts the search to part of the file, e.g. a single dump block
+    from `DumpBlockIndex.get_block_byte_range`.
+    """
+
+    if not stats_txt_path.is_file():
+        raise FileNotFoundError(f"No stats.txt at {stats_txt_path}!")
+
+    trie = StatisticPrefixTrie(prefixes)
+
+    # (line offset, name, raw value), in file order, so the first-occurrence-wins
+    # rule of `StatsIndex` holds.
+    found_statistics: List[Tuple[int, str, str]] = []
+
+    if stats_txt_path.name.endswith((GZIP_SUFFIX, ZSTD_SUFFIX)):
+        # Compressed archives cannot be mapped; search the decompressed bytes instead
+        # (they support the same find/slice operations as the mapping).
+        find_statistics_with_prefixes(read_stats_bytes(stats_txt_path), trie, byte_range, found_statistics)
+    else:
+        with stats_txt_path.open(mode="rb") as stats_file:
+            if stats_txt_path.stat().st_size == 0:
+                return StatsIndex(raw_values={})
+
+            with mmap.mmap(stats_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                find_statistics_with_prefixes(mapped_file, trie, byte_range, found_statistics)
+
+    raw_values: Dict[str, str] = {}
+    for _, name, raw_value in found_statistics:
+        raw_values.setdefault(name, raw_value)
+
+    return StatsIndex(raw_values=raw_values)
@@ -0,0 +1,75 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import os
+import time
+from typing import Callable, Iterator, List, TypeVar
+
+from gem5_tools.results_store import get_default_results_store
+
+
+ItemType = TypeVar("ItemType")
+ResultType = TypeVar("ResultType")
+
+
+def resolve_number_of_jobs(requested_jobs: int) -> int:
+    """
+    `--jobs 0` means one worker per available CPU.
+    """
+
+    if requested_jobs < 0:
+        raise ValueError(f"Invalid number of jobs: {requested_jobs}")
+
+    if requested_jobs == 0:
+        return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+    return requested_jobs
+
+
+def _initialize_worker() -> None:
+    # A forked worker must not reuse the parent's SQLite connection, it opens its own on first use.
+    get_default_results_store.cache_clear()
+
+
+def map_in_order(
+    function: Callable[[ItemType], ResultType],
+    items: List[ItemType],
+    number_of_jobs: int,
+) -> Iterator[ResultType]:
+    """
+    Applies `function` (which must be a picklable, module-level function) to every
+    item on a pool of `number_of_jobs` processes, yielding results in the order of
+    `items` as soon as each one (and every one before it) is done.
+
+    With a single job everything runs in-process, exactly like a plain loop.
+    """
+
+    if number_of_jobs <= 1 or len(items) <= 1:
+        yield from map(function, items)
+        return
+
+    # A few chunks per worker keeps the pool busy without paying pickling
+    # overhead once per tiny directory.
+    chunk_size: int = max(1, len(items) // (number_of_jobs * 4))
+
+    with ProcessPoolExecutor(max_workers=number_of_jobs, initializer=_initialize_worker) as executor:
+        yield from executor.map(function, items, chunksize=chunk_size)
+
+
+@dataclass
+class IngestThroughput:
+    parsed_files: int = 0
+    parsed_bytes: int = 0
+    start_time: float = field(default_factory=time.perf_counter)
+
+    def record(self, file_size: int) -> None:
+        self.parsed_files += 1
+        self.parsed_bytes += file_size
+
+    def describe(self) -> str:
+        elapsed_seconds: float = max(time.perf_counter() - self.start_time, 1e-9)
+        parsed_megabytes: float = self.parsed_bytes / (1000 * 1000)
+
+        return (
+            f"Parsed {self.parsed_files} files ({parsed_megabytes:.1f} MB) in {elapsed_seconds:.2f} s "
+            f"({self.parsed_files / elapsed_seconds:.1f} files/s, {parsed_megabytes / elapsed_seconds:.1f} MB/s)."
+        )
@@ -0,0 +1,228 @@
+"""
+What the sweep jobs cost, ranked, from the runtime history (see gem5_tools.runtime_model).
+
+Every job recorded into the runtime history, failed and timed-out ones as well,
+carries its wall time and queue wait, `hostSeconds` and simulation rate
+(simulated instructions per host second), peak resident memory and output size.
+The report ranks the entry points (the queue scripts and sweep specs, by their
+sweep name) and the single runs by total wall time. For every parameter of a
+sweep, it shows how its values change gem5's simulation rate and memory. Use it
+to size allocations and to see which model parameters slow the simulator down.
+
+Record a results directory and print the report with:
+
+> python -m gem5_tools.resource_report [--root-directory-path <results directory>] [--sweep-name <sweep>]
+"""
+
+from argparse import ArgumentParser
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gem5_tools.runtime_model import (
+    OUTCOME_COMPLETED,
+    RuntimeHistory,
+    RuntimeObservation,
+    get_default_runtime_history_path
+)
+
+
+DEFAULT_TOP_RUNS: int = 20
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+
+    return f"{int(seconds // 3600)}:{int(seconds % 3600 // 60):02d}:{int(seconds % 60):02d}"
+
+
+def format_bytes(size: Optional[float]) -> str:
+    if size is None:
+        return "-"
+
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} TiB"
+
+
+def format_rate(instructions_per_second: Optional[float]) -> str:
+    if instructions_per_second is None:
+        return "-"
+
+    return f"{instructions_per_second / 1000:.1f} kIPS"
+
+
+def get_median(values: List[Optional[float]]) -> Optional[float]:
+    present_values: List[float] = [value for value in values if value is not None]
+    return float(np.median(present_values)) if len(present_values) > 0 else None
+
+
+def get_total(values: List[Optional[float]]) -> float:
+    return sum(value for value in values if value is not None)
+
+
+def get_maximum(values: List[Optional[float]]) -> Optional[float]:
+    present_values: List[float] = [value for value in values if value is not None]
+    return max(present_values) if len(present_values) > 0 else None
+
+
+def print_entry_point_report(observations: List[RuntimeObservation]) -> None:
+    observations_by_sweep: Dict[str, List[RuntimeObservation]] = {}
+    for observation in observations:
+        observations_by_sweep.setdefault(observation.sweep_name, []).append(observation)
+
+    print("Entry points by total wall time:")
+    print(
+        f"  {'sweep':<32} {'runs':>5} {'failed':>6} {'wall':>11} {'host':>11} {'med. queue':>11} "
+        f"{'med. rate':>12} {'max RSS':>11} {'output':>11}"
+    )
+
+    for sweep_name, sweep_observations in sorted(
+        observations_by_sweep.items(),
+        key=lambda item: -get_total([observation.get_wall_seconds() for observation in item[1]])
+    ):
+        failed_runs: int = sum(1 for observation in sweep_observations if observation.outcome != OUTCOME_COMPLETED)
+
+        print(
+            f"  {sweep_name:<32} {len(sweep_observations):>5} {failed_runs:>6} "
+            f"{format_duration(get_total([observation.get_wall_seconds() for observation in sweep_observations])):>11} "
+            f"{format_duration(get_total([observation.host_seconds for observation in sweep_observations])):>11} "
+            f"{format_duration(get_median([observation.queue_wait_seconds for observation in sweep_observations])):>11} "
+            f"{format_rate(get_median([observation.host_instruction_rate for observation in sweep_observations])):>12} "
+            f"{format_bytes(get_maximum([observation.peak_rss_bytes for observation in sweep_observations])):>11} "
+            f"{format_bytes(get_total([observation.output_bytes for observation in sweep_observations])):>11}"
+        )
+
+
+def print_run_report(observations: List[RuntimeObservation], number_of_runs: int) -> None:
+    print(f"Most expensive runs (top {number_of_runs} by wall time):")
+
+    for observation in sorted(observations, key=lambda observation: -(observation.get_wall_seconds() or 0.0))[:number_of_runs]:
+        print(
+            f"  {format_duration(observation.get_wall_seconds()):>11} {format_rate(observation.host_instruction_rate):>12} "
+            f"{format_bytes(observation.peak_rss_bytes):>11} {observation.outcome:<9} "
+            f"{observation.sweep_name}: {json.dumps(observation.parameters, sort_keys=True)}"
+        )
+
+
+def print_parameter_report(observations: List[RuntimeObservation]) -> None:
+    """
+    Per sweep and parameter, the median simulation rate, wall time and peak memory
+    of the completed runs with each of its values, the parameters that change the
+    rate the most first.
+    """
+
+    observations_by_sweep: Dict[str, List[RuntimeObservation]] = {}
+    for observation in observations:
+        if observation.outcome == OUTCOME_COMPLETED:
+            observations_by_sweep.setdefault(observation.sweep_name, []).append(observation)
+
+    print("Simulation rate by parameter value (completed runs):")
+
+    for sweep_name, sweep_observations in sorted(observations_by_sweep.items()):
+        parameter_names: List[str] = sorted({name for observation in sweep_observations for name in observation.parameters})
+
+        parameter_rows: List[Tuple[float, str, List[str]]] = []
+
+        for parameter_name in parameter_names:
+            observations_by_value: Dict[str, List[RuntimeObservation]] = {}
+            for observation in sweep_observations:
+                if parameter_name in observation.parameters:
+                    observations_by_value.setdefault(json.dumps(observation.parameters[parameter_name]), []).append(observation)
+
+            if len(observations_by_value) < 2:
+                continue
+
+            median_rates: Dict[str, Optional[float]] = {
+                value: get_median([observation.host_instruction_rate for observation in value_observations])
+                for value, value_observations in observations_by_value.items()
+            }
+
+            present_rates: List[float] = [rate for rate in median_rates.values() if rate is not None and rate > 0]
+            # How much slower the slowest value simulates than the fastest.
+            rate_spread: float = max(present_rates) / min(present_rates) if len(present_rates) >= 2 else 1.0
+
+            value_lines: List[str] = [
+                f"      {value:<24} {len(value_observations):>5} runs {format_rate(median_rates[value]):>12} "
+                f"{format_duration(get_median([observation.get_wall_seconds() for observation in value_observations])):>11} "
+                f"{format_bytes(get_maximum([observation.peak_rss_bytes for observation in value_observations])):>11}"
+                for value, value_observations in sorted(observations_by_value.items(), key=lambda item: -(median_rates[item[0]] or 0.0))
+            ]
+
+            parameter_rows.append((rate_spread, parameter_name, value_lines))
+
+        if len(parameter_rows) == 0:
+            continue
+
+        print(f"  {sweep_name}:")
+
+        for rate_spread, parameter_name, value_lines in sorted(parameter_rows, key=lambda row: -row[0]):
+            print(f"    {parameter_name} (fastest value {rate_spread:.2f}x the rate of the slowest):")
+            for value_line in value_lines:
+                print(value_line)
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--root-directory-path",
+        required=False,
+        default=None,
+        dest="root_directory_path",
+        help="First record the jobs of every runtime record under this directory into the runtime history."
+    )
+
+    argument_parser.add_argument(
+        "--sweep-name",
+        required=False,
+        default=None,
+        dest="sweep_name",
+        help="Only report on this sweep (e.g. cache_benchmark or sweep_spec/<name>)."
+    )
+
+    argument_parser.add_argument(
+        "--top",
+        required=False,
+        type=int,
+        default=DEFAULT_TOP_RUNS,
+        dest="number_of_runs",
+        help="Number of most expensive runs to list."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    history = RuntimeHistory.open(get_default_runtime_history_path())
+
+    if arguments.root_directory_path is not None:
+        root_directory_path = Path(str(arguments.root_directory_path))
+        if not root_directory_path.is_dir():
+            print(f"Not a directory: {root_directory_path}")
+            exit(1)
+
+        recorded_observations: int = history.record_directory(root_directory_path)
+        print(f"Recorded {recorded_observations} new jobs into {get_default_runtime_history_path()}")
+        print()
+
+    observations: List[RuntimeObservation] = history.load_observations(arguments.sweep_name)
+    history.close()
+
+    if len(observations) == 0:
+        print("No jobs recorded.")
+        return
+
+    print_entry_point_report(observations)
+    print()
+    print_run_report(observations, arguments.number_of_runs)
+    print()
+    print_parameter_report(observations)
+
+
+if __name__ == "__main__":
+    main()
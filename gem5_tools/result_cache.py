@@ -0,0 +1,340 @@
+"""
+Content-addressed cache of finished gem5 simulations.
+
+A configuration is keyed by a SHA-256 over everything that determines its
+results: the gem5 config script (and the modules next to it and in gem5_tools
+that it imports, directly or through each other), the parameters passed on its
+command line, the contents of the workload binaries, and the identity of the
+gem5 build and container image. When a sweep is queued, configurations whose key
+is already in the cache get symlinks to the cached stats.txt/config.ini instead
+of a job; every other job copies its outputs into the cache once gem5 has exited
+successfully.
+
+The cache lives in `result_cache/` at the repository root, or wherever
+`GEM5_RESULT_CACHE` points. Show its size or clear it with:
+
+> python -m gem5_tools.result_cache [--clear]
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+from typing import Dict, List, Optional, Self, Union
+
+from gem5_tools.compressed_stats import COMPRESSED_OUTPUT_FILE_NAMES, STATS_TXT_FILE_NAMES, find_stats_txt_path
+from gem5_tools.stats_sidecar import hash_file_contents
+from gem5_tools.windowed_simulation import WINDOW_SERIES_FILE_NAME
+
+
+DEFAULT_RESULT_CACHE_PATH: Path = Path(__file__).resolve().parents[1].joinpath("result_cache")
+
+RESULT_CACHE_PATH_ENVIRONMENT_VARIABLE: str = "GEM5_RESULT_CACHE"
+
+# The job scripts read this (falling back to the cluster path), see gem5_tools.executors.
+GEM5_WORKSPACE_ENVIRONMENT_VARIABLE: str = "GEM5_WORKSPACE"
+DEFAULT_GEM5_WORKSPACE_PATH: Path = Path("/d/hpc/projects/FRI/GEM5/gem5_workspace")
+
+# Bumped whenever the key inputs change, so older entries are never matched.
+RESULT_CACHE_KEY_VERSION: int = 1
+
+# Written into every output directory (and cache entry) the key applies to.
+RESULT_CACHE_KEY_FILE_NAME: str = "result-cache-key.json"
+
+# gem5 outputs kept in the cache (in whichever compressed form the job left them).
+CACHED_OUTPUT_FILE_NAMES: List[str] = sorted({
+    *STATS_TXT_FILE_NAMES,
+    *(f"{file_name}{suffix}" for file_name in COMPRESSED_OUTPUT_FILE_NAMES for suffix in ["", ".zst", ".gz"]),
+    "config.json",
+    WINDOW_SERIES_FILE_NAME,
+})
+
+IMPORT_REGEX: re.Pattern = re.compile(r"^\s*(?:from|import)\s+(\w+)", re.MULTILINE)
+
+# `from gem5_tools.x import ...`, `import gem5_tools.x` and `from gem5_tools import x, y`.
+GEM5_TOOLS_IMPORT_REGEX: re.Pattern = re.compile(
+    r"^\s*(?:from|import)\s+gem5_tools(?:\.(\w+)|\s+import\s+\(?([\w ,]+))",
+    re.MULTILINE
+)
+
+GEM5_TOOLS_PATH: Path = Path(__file__).resolve().parent
+
+# Checked in a job script right after gem5, so failed simulations are never cached.
+GEM5_EXIT_CODE_VARIABLE: str = "GEM5_EXIT_CODE"
+
+
+def get_gem5_workspace_path() -> Path:
+    return Path(os.environ.get(GEM5_WORKSPACE_ENVIRONMENT_VARIABLE) or DEFAULT_GEM5_WORKSPACE_PATH)
+
+
+def describe_build_file(file_path: Path) -> Optional[str]:
+    """
+    Identity of a gem5 binary or container image: its resolved path, size and
+    mtime (hashing hundreds of megabytes per queued job would dominate queueing).
+    """
+
+    try:
+        resolved_path = file_path.resolve(strict=True)
+        file_stat = resolved_path.stat()
+    except OSError:
+        return None
+
+    return f"{resolved_path.as_posix()}:{file_stat.st_size}:{file_stat.st_mtime_ns}"
+
+
+def find_gem5_tools_imports(module_source: str) -> List[Path]:
+    """
+    Files of the gem5_tools modules `module_source` imports (some may not exist, e.g. for a subpackage).
+    """
+
+    gem5_tools_paths: List[Path] = []
+
+    for module_name, imported_names in GEM5_TOOLS_IMPORT_REGEX.findall(module_source):
+        for imported_name in [module_name] if module_name else imported_names.split(","):
+            gem5_tools_paths.append(GEM5_TOOLS_PATH.joinpath(f"{imported_name.strip()}.py"))
+
+    return gem5_tools_paths
+
+
+def find_local_imports(config_script_path: Path) -> List[Path]:
+    """
+    The config script and the modules it imports, directly or through each other:
+    those next to it and those in gem5_tools (the windowing, checkpoint, SimPoint
+    and fast-forward helpers run inside gem5 and shape its results).
+    """
+
+    module_paths: List[Path] = [config_script_path]
+    pending_paths: List[Path] = [config_script_path]
+
+    while len(pending_paths) > 0:
+        module_path: Path = pending_paths.pop()
+        module_source: str = module_path.read_text(encoding="utf-8", errors="replace")
+
+        imported_paths: List[Path] = find_gem5_tools_imports(module_source)
+        if module_path.parent != GEM5_TOOLS_PATH:
+            imported_paths += [
+                config_script_path.parent.joinpath(f"{imported_name}.py")
+                for imported_name in IMPORT_REGEX.findall(module_source)
+            ]
+
+        for imported_path in imported_paths:
+            if imported_path.is_file() and imported_path not in module_paths:
+                module_paths.append(imported_path)
+                pending_paths.append(imported_path)
+
+    return sorted(module_paths)
+
+
+def get_module_name(module_path: Path) -> str:
+    if module_path.parent == GEM5_TOOLS_PATH:
+        return f"{GEM5_TOOLS_PATH.name}/{module_path.name}"
+
+    return module_path.name
+
+
+def hash_config_scripts(config_script_path: Path) -> Optional[str]:
+    if not config_script_path.is_file():
+        return None
+
+    config_hash = hashlib.sha256()
+
+    for module_path in find_local_imports(config_script_path):
+        config_hash.update(get_module_name(module_path).encode("utf-8") + b"\0")
+        config_hash.update(bytes.fromhex(hash_file_contents(module_path)))
+
+    return config_hash.hexdigest()
+
+
+@dataclass(frozen=True, kw_only=True)
+class ResultCacheKey:
+    digest: str
+    inputs: Dict[str, Union[str, int, float, Dict, List]]
+
+    @classmethod
+    def from_job_inputs(
+        cls,
+        config_script_path: Path,
+        parameters: Dict[str, Union[str, int, float]],
+        workload_paths: List[Path],
+        gem5_build_paths: List[Path],
+    ) -> Optional[Self]:
+        """
+        The key of a configuration, or `None` if one of its inputs cannot be read
+        from here (such a configuration is simply simulated and not cached).
+        Relative paths are resolved like the job resolves them, against the
+        directory the sweep is queued from.
+        """
+
+        config_script_path = config_script_path.resolve()
+        config_hash: Optional[str] = hash_config_scripts(config_script_path)
+        if config_hash is None:
+            return None
+
+        workload_hashes: Dict[str, str] = {}
+        for workload_path in workload_paths:
+            workload_path = workload_path.resolve()
+            if not workload_path.is_file():
+                return None
+
+            workload_hashes[workload_path.name] = hash_file_contents(workload_path)
+
+        gem5_build: List[str] = []
+        for gem5_build_path in gem5_build_paths:
+            build_description: Optional[str] = describe_build_file(gem5_build_path)
+            if build_description is None:
+                return None
+
+            gem5_build.append(build_description)
+
+        inputs: Dict[str, Union[str, int, float, Dict, List]] = {
+            "version": RESULT_CACHE_KEY_VERSION,
+            "config_script": config_script_path.name,
+            "config_scripts_sha256": config_hash,
+            "parameters": parameters,
+            "workloads_sha256": workload_hashes,
+            "gem5_build": gem5_build,
+        }
+
+        digest: str = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+        return cls(digest=digest, inputs=inputs)
+
+    def write_to_directory(self, directory_path: Path) -> Path:
+        key_file_path = directory_path.joinpath(RESULT_CACHE_KEY_FILE_NAME)
+
+        with key_file_path.open(mode="w", encoding="utf8") as key_file:
+            key_file.write(json.dumps({"digest": self.digest, "inputs": self.inputs}, indent=4, sort_keys=True))
+
+        return key_file_path
+
+
+class ResultCache:
+    def __init__(self, root_directory_path: Path):
+        self.root_directory_path = root_directory_path.resolve()
+
+    def get_entry_path(self, cache_key: ResultCacheKey) -> Path:
+        return self.root_directory_path.joinpath(cache_key.digest[:2], cache_key.digest)
+
+    def lookup(self, cache_key: ResultCacheKey) -> Optional[Path]:
+        """
+        The cache entry of `cache_key`, if a job has finished storing one.
+        """
+
+        entry_path = self.get_entry_path(cache_key)
+
+        # Entries are moved into place whole, so any entry with a stats.txt is complete.
+        if entry_path.is_dir() and find_stats_txt_path(entry_path) is not None:
+            return entry_path
+
+        return None
+
+    def link_cached_outputs(self, cache_key: ResultCacheKey, output_directory_path: Path) -> bool:
+        """
+        Symlinks the cached outputs of `cache_key` into `output_directory_path`,
+        returns False (and links nothing) on a cache miss.
+        """
+
+        entry_path: Optional[Path] = self.lookup(cache_key)
+        if entry_path is None:
+            return False
+
+        for cached_file_path in sorted(entry_path.iterdir()):
+            output_directory_path.joinpath(cached_file_path.name).symlink_to(cached_file_path)
+
+        return True
+
+    def build_store_shell_commands(self, cache_key: ResultCacheKey, output_directory_path: Path) -> str:
+        """
+        Shell snippet for the end of a job script that copies the gem5 outputs (and
+        the key file, written by `ResultCacheKey.write_to_directory`) into the cache
+        if gem5 exited successfully. The entry is staged next to the cache and
+        renamed into place, so concurrent readers never see a partial entry and a
+        concurrent duplicate job simply loses the rename.
+        """
+
+        entry_path = self.get_entry_path(cache_key)
+        output_file_paths: str = " ".join(
+            f"\"{output_directory_path.joinpath(file_name).as_posix()}\""
+            for file_name in [*CACHED_OUTPUT_FILE_NAMES, RESULT_CACHE_KEY_FILE_NAME]
+        )
+
+        return f"""
+if [ "${GEM5_EXIT_CODE_VARIABLE}" = "0" ] && [ ! -e "{entry_path.as_posix()}" ]; then
+    mkdir -p "{entry_path.parent.as_posix()}"
+    CACHE_STAGING_DIRECTORY=$(mktemp -d "{entry_path.parent.as_posix()}/.staging-XXXXXX")
+    for output_file in {output_file_paths}; do
+        if [ -f "$output_file" ]; then
+            cp "$output_file" "$CACHE_STAGING_DIRECTORY/"
+        fi
+    done
+    mv -T "$CACHE_STAGING_DIRECTORY" "{entry_path.as_posix()}" 2> /dev/null || rm -rf "$CACHE_STAGING_DIRECTORY"
+fi
+"""
+
+
+def get_default_result_cache_path() -> Path:
+    overridden_cache_path: Optional[str] = os.environ.get(RESULT_CACHE_PATH_ENVIRONMENT_VARIABLE)
+    if overridden_cache_path:
+        return Path(overridden_cache_path)
+
+    return DEFAULT_RESULT_CACHE_PATH
+
+
+def get_default_result_cache() -> ResultCache:
+    return ResultCache(get_default_result_cache_path())
+
+
+def build_result_cache_shell_commands(
+    result_cache: Optional[ResultCache],
+    cache_key: Optional[ResultCacheKey],
+    output_directory_path: Path,
+) -> str:
+    """
+    `ResultCache.build_store_shell_commands`, or nothing for an uncached job.
+    """
+
+    if result_cache is None or cache_key is None:
+        return ""
+
+    return result_cache.build_store_shell_commands(cache_key, output_directory_path)
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--clear",
+        dest="clear_cache",
+        action="store_true",
+        help="Remove every cached result (runs that symlink into the cache lose their outputs)."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    result_cache = get_default_result_cache()
+
+    entry_paths: List[Path] = sorted(
+        entry_path
+        for prefix_path in result_cache.root_directory_path.glob("??")
+        for entry_path in prefix_path.iterdir()
+        if entry_path.is_dir() and not entry_path.name.startswith(".")
+    ) if result_cache.root_directory_path.is_dir() else []
+
+    total_bytes: int = sum(
+        file_path.stat().st_size
+        for entry_path in entry_paths
+        for file_path in entry_path.iterdir()
+    )
+
+    print(f"{len(entry_paths)} cached results ({total_bytes / (1024 * 1024):.1f} MiB) in {result_cache.root_directory_path}")
+
+    if arguments.clear_cache and result_cache.root_directory_path.is_dir():
+        shutil.rmtree(result_cache.root_directory_path)
+        print("Cleared.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Persistent (SQLite) store of parsed stats.txt files.
+
+Every stats.txt is parsed once and its statistics are saved per dump block. Runs
+are keyed by the stats.txt path and validated by its size and mtime (and, if
+those changed, its content hash), so re-running an analyzer or the ingest
+command only parses results that are new or have changed.
+
+Ingest everything under a directory ahead of time with:
+
+> python -m gem5_tools.results_store --root-directory-path .
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from functools import cache
+import os
+from pathlib import Path
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Self, Tuple
+
+from gem5_tools.compressed_stats import find_stats_txt_path, is_stats_txt_file_name
+from gem5_tools.stats_index import StatsIndex
+from gem5_tools.stats_sidecar import hash_file_contents, load_or_build_dump_indexes
+from gem5_tools.windowed_simulation import WindowSeries, merge_window_stats_indexes
+
+
+DEFAULT_RESULTS_STORE_PATH: Path = Path(__file__).resolve().parents[1].joinpath("results_store.sqlite")
+
+# Overrides the default location, e.g. to keep the store on node-local or shared storage.
+RESULTS_STORE_PATH_ENVIRONMENT_VARIABLE: str = "GEM5_RESULTS_STORE"
+
+# Sorts after any character that appears in a statistic name, used for prefix range queries.
+PREFIX_RANGE_END_CHARACTER: str = "\U0010ffff"
+
+# Bumped whenever stored values change meaning; an older store is dropped and re-ingested.
+STORE_FORMAT_VERSION: int = 1
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    stats_txt_path TEXT NOT NULL UNIQUE,
+    run_directory_path TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    file_mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    number_of_dumps INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS runs_by_directory ON runs (run_directory_path);
+
+CREATE TABLE IF NOT EXISTS statistics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    dump_number INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    raw_value TEXT NOT NULL,
+    PRIMARY KEY (run_id, dump_number, name)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True, kw_only=True)
+class StoredRun:
+    run_id: int
+    file_size: int
+    file_mtime_ns: int
+    content_hash: str
+    number_of_dumps: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class IngestSummary:
+    ingested_files: int
+    unchanged_files: int
+    ingested_bytes: int
+
+
+class ResultsStore:
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    @classmethod
+    def open(cls, store_path: Path) -> Self:
+        connection = sqlite3.connect(store_path.as_posix(), timeout=60)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+
+        if connection.execute("PRAGMA user_version").fetchone()[0] != STORE_FORMAT_VERSION:
+            # Re-checked under the write lock, parallel workers may race to upgrade the same store.
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != STORE_FORMAT_VERSION:
+                connection.execute("DROP TABLE IF EXISTS statistics")
+                connection.execute("DROP TABLE IF EXISTS runs")
+                connection.execute(f"PRAGMA user_version = {STORE_FORMAT_VERSION}")
+            connection.execute("COMMIT")
+
+        connection.executescript(SCHEMA)
+
+        return cls(connection)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _get_stored_run(self, stats_txt_path: Path) -> Optional[StoredRun]:
+        row = self.connection.execute(
+            "SELECT run_id, file_size, file_mtime_ns, content_hash, number_of_dumps FROM runs WHERE stats_txt_path = ?",
+            (stats_txt_path.as_posix(),)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return StoredRun(
+            run_id=row[0],
+            file_size=row[1],
+            file_mtime_ns=row[2],
+            content_hash=row[3],
+            number_of_dumps=row[4]
+        )
+
+    def ingest(self, stats_txt_path: Path) -> Tuple[StoredRun, bool]:
+        """
+        Makes sure the store holds the current contents of `stats_txt_path`.
+        Returns the stored run and whether the file had to be (re)parsed.
+        """
+
+        if not stats_txt_path.is_file():
+            raise FileNotFoundError(f"No stats.txt at {stats_txt_path}!")
+
+        stats_txt_path = stats_txt_path.resolve()
+        file_stat = stats_txt_path.stat()
+
+        stored_run = self._get_stored_run(stats_txt_path)
+        if stored_run is not None \
+                and stored_run.file_size == file_stat.st_size \
+                and stored_run.file_mtime_ns == file_stat.st_mtime_ns:
+            return stored_run, False
+
+        content_hash: str = hash_file_contents(stats_txt_path)
+
+        # Touched or copied, but not changed: only refresh the recorded size/mtime.
+        if stored_run is not None and stored_run.content_hash == content_hash:
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE runs SET file_size = ?, file_mtime_ns = ? WHERE run_id = ?",
+                    (file_stat.st_size, file_stat.st_mtime_ns, stored_run.run_id)
+                )
+
+            return self._get_stored_run(stats_txt_path), False
+
+        # A valid stats.txt.idx next to the file (e.g. written by another store) saves the tokenizing.
+        dump_indexes = load_or_build_dump_indexes(stats_txt_path, content_hash=content_hash)
+
+        with self.connection:
+            if stored_run is not None:
+                self.connection.execute("DELETE FROM runs WHERE run_id = ?", (stored_run.run_id,))
+
+            run_id: int = self.connection.execute(
+                "INSERT INTO runs "
+                "(stats_txt_path, run_directory_path, file_size, file_mtime_ns, content_hash, number_of_dumps, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    stats_txt_path.as_posix(),
+                    stats_txt_path.parent.as_posix(),
+                    file_stat.st_size,
+                    file_stat.st_mtime_ns,
+                    content_hash,
+                    len(dump_indexes),
+                    time.time()
+                )
+            ).lastrowid
+
+            for dump_number, dump_index in enumerate(dump_indexes):
+                self.connection.executemany(
+                    "INSERT INTO statistics (run_id, dump_number, name, raw_value) VALUES (?, ?, ?, ?)",
+                    (
+                        (run_id, dump_number, name, raw_value)
+                        for name, raw_value in dump_index.raw_values.items()
+                    )
+                )
+
+        return self._get_stored_run(stats_txt_path), True
+
+    def load_stats_index(
+        self,
+        stats_txt_path: Path,
+        selected_nth_simulation: int = 0,
+        prefixes: Optional[Iterable[str]] = None,
+    ) -> StatsIndex:
+        """
+        Returns the statistics of the `selected_nth_simulation`-th dump (starting at 0),
+        ingesting the file first if it is new or has changed. With `prefixes`, only
+        statistics whose names start with one of them are loaded.
+        """
+
+        stored_run, _ = self.ingest(stats_txt_path)
+
+        if not 0 <= selected_nth_simulation < stored_run.number_of_dumps:
+            raise ValueError(
+                f"No simulation statistics block {selected_nth_simulation} in {stats_txt_path} "
+                f"(found {stored_run.number_of_dumps})"
+            )
+
+        raw_values: Dict[str, str] = {}
+
+        if prefixes is None:
+            rows = self.connection.execute(
+                "SELECT name, raw_value FROM statistics WHERE run_id = ? AND dump_number = ?",
+                (stored_run.run_id, selected_nth_simulation)
+            )
+            raw_values.update(rows)
+        else:
+            for prefix in prefixes:
+                rows = self.connection.execute(
+                    "SELECT name, raw_value FROM statistics "
+                    "WHERE run_id = ? AND dump_number = ? AND name >= ? AND name < ?",
+                    (stored_run.run_id, selected_nth_simulation, prefix, prefix + PREFIX_RANGE_END_CHARACTER)
+                )
+                raw_values.update(rows)
+
+        return StatsIndex(raw_values=raw_values)
+
+    def ingest_directory(self, root_directory_path: Path) -> IngestSummary:
+        ingested_files: int = 0
+        unchanged_files: int = 0
+        ingested_bytes: int = 0
+
+        for directory_path, _, file_names in os.walk(root_directory_path):
+            if not any(is_stats_txt_file_name(file_name) for file_name in file_names):
+                continue
+
+            stored_run, was_parsed = self.ingest(find_stats_txt_path(Path(directory_path)))
+
+            if was_parsed:
+                ingested_files += 1
+                ingested_bytes += stored_run.file_size
+            else:
+                unchanged_files += 1
+
+        return IngestSummary(
+            ingested_files=ingested_files,
+            unchanged_files=unchanged_files,
+            ingested_bytes=ingested_bytes
+        )
+
+    def prune_missing_runs(self) -> int:
+        """
+        Removes runs whose stats.txt no longer exists. Returns the number of removed runs.
+        """
+
+        missing_run_ids: List[Tuple[int]] = [
+            (run_id,)
+            for run_id, stats_txt_path in self.connection.execute("SELECT run_id, stats_txt_path FROM runs")
+            if not Path(stats_txt_path).is_file()
+        ]
+
+        with self.connection:
+            self.connection.executemany("DELETE FROM runs WHERE run_id = ?", missing_run_ids)
+
+        return len(missing_run_ids)
+
+
+def get_default_results_store_path() -> Path:
+    overridden_store_path: Optional[str] = os.environ.get(RESULTS_STORE_PATH_ENVIRONMENT_VARIABLE)
+    if overridden_store_path:
+        return Path(overridden_store_path)
+
+    return DEFAULT_RESULTS_STORE_PATH
+
+
+@cache
+def get_default_results_store() -> ResultsStore:
+    return ResultsStore.open(get_default_results_store_path())
+
+
+def load_stats_index(
+    stats_txt_path: Path,
+    selected_nth_simulation: int = 0,
+    prefixes: Optional[Iterable[str]] = None,
+) -> StatsIndex:
+    """
+    `ResultsStore.load_stats_index` on the shared default store, for the analyzer scripts.
+    For a simulation run in instruction windows (see gem5_tools.windowed_simulation),
+    the first "simulation" is the totals of its window dumps (the ones in windows.json,
+    not the dump gem5 adds when it exits).
+    """
+
+    results_store: ResultsStore = get_default_results_store()
+
+    window_series: Optional[WindowSeries] = WindowSeries.load(stats_txt_path.parent) if selected_nth_simulation == 0 else None
+
+    if window_series is not None and len(window_series.windows) > 0:
+        stored_run, _ = results_store.ingest(stats_txt_path)
+        number_of_windows: int = min(len(window_series.windows), stored_run.number_of_dumps)
+
+        # The windows are weighted by their simSeconds.
+        window_prefixes: Optional[List[str]] = [*prefixes, "simSeconds"] if prefixes is not None else None
+
+        return merge_window_stats_indexes([
+            results_store.load_stats_index(stats_txt_path, selected_nth_simulation=dump_number, prefixes=window_prefixes)
+            for dump_number in range(number_of_windows)
+        ])
+
+    return results_store.load_stats_index(
+        stats_txt_path,
+        selected_nth_simulation=selected_nth_simulation,
+        prefixes=prefixes
+    )
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--root-directory-path",
+        dest="root_directory_path",
+        default="."
+    )
+
+    argument_parser.add_argument(
+        "--store-path",
+        dest="store_path",
+        default=None,
+        help=f"Defaults to ${RESULTS_STORE_PATH_ENVIRONMENT_VARIABLE} or {DEFAULT_RESULTS_STORE_PATH.name} in the repository root."
+    )
+
+    argument_parser.add_argument(
+        "--prune",
+        dest="prune",
+        action="store_true",
+        help="Also remove runs whose stats.txt no longer exists."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    root_directory_path = Path(str(arguments.root_directory_path))
+    if not root_directory_path.is_dir():
+        print(f"Not a directory: {root_directory_path}")
+        exit(1)
+
+    store_path = Path(str(arguments.store_path)) if arguments.store_path is not None \
+        else get_default_results_store_path()
+
+    results_store = ResultsStore.open(store_path)
+
+    print(f"Ingesting stats.txt files under {root_directory_path.as_posix()} into {store_path.as_posix()}.")
+
+    ingest_start: float = time.perf_counter()
+    summary = results_store.ingest_directory(root_directory_path)
+    ingest_seconds: float = time.perf_counter() - ingest_start
+
+    print(f"  > ingested: {summary.ingested_files} ({summary.ingested_bytes / (1024 * 1024):.1f} MiB)")
+    print(f"  > unchanged: {summary.unchanged_files}")
+    print(f"  > took: {ingest_seconds:.2f} s")
+
+    if arguments.prune:
+        print(f"  > pruned: {results_store.prune_missing_runs()}")
+
+    results_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,760 @@
+"""
+Historical runtimes of sweep jobs and a model that predicts their time limits.
+
+Every generated job script writes a `*.runtime.json` record: when it starts
+(with its SLURM job ID and time limit) and again when it finishes (with its wall
+time). Recording a results directory adds the records of the jobs that ended to
+the runtime history, together with what the job cost:
+- the elapsed time, queue wait and peak RSS from `sacct` (which also tells which
+  unfinished jobs hit their limit), or else the job's own wall time and gem5's
+  `hostMemory`: without SLURM, for jobs of the local executor, and for the
+  configurations of a job pack (whose accounting is the whole pack's, they only
+  take its state),
+- `hostSeconds`, `simSeconds` and `simInsts` from the job's stats.txt, and the
+  resulting simulation rate,
+- the size of its output directory.
+Failed jobs are recorded too (without a runtime), so their records are not looked
+up again, and a record that is rewritten (a job resubmitted into the same
+directory) is recorded again. gem5_tools.resource_report ranks what the sweeps cost.
+
+Per sweep, a ridge regression of log(runtime) over the job parameters (log2 of
+numeric values such as core counts and cache sizes, one-hot categorical values
+such as the workload) predicts each new job's runtime. The queue scripts request
+the upper end of that prediction times a safety margin as `--time`, and submit
+the longest jobs first. Sweeps without enough history keep their fixed limits.
+
+Record a results directory and show the fitted models with:
+
+> python -m gem5_tools.runtime_model --root-directory-path .
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import datetime
+import json
+import math
+import os
+from pathlib import Path
+import re
+import sqlite3
+import subprocess
+import time
+from typing import Dict, List, Optional, Self, Tuple, Union
+
+import numpy as np
+
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.executors import EXECUTOR_KIND_ENVIRONMENT_VARIABLE, format_slurm_time_limit, parse_slurm_time_limit
+from gem5_tools.job_packing import PACKED_TASK_ENVIRONMENT_VARIABLE
+from gem5_tools.stats_index import parse_float_token
+from gem5_tools.stats_sidecar import load_or_build_dump_indexes
+
+
+DEFAULT_RUNTIME_HISTORY_PATH: Path = Path(__file__).resolve().parents[1].joinpath("runtime_history.sqlite")
+
+RUNTIME_HISTORY_PATH_ENVIRONMENT_VARIABLE: str = "GEM5_RUNTIME_HISTORY"
+
+RUNTIME_RECORD_SUFFIX: str = ".runtime.json"
+
+# Name of the record written into a gem5 output directory.
+GEM5_RUNTIME_RECORD_FILE_NAME: str = "job" + RUNTIME_RECORD_SUFFIX
+
+# A job needs at least this many finished observations of its sweep to be predicted.
+MINIMUM_OBSERVATIONS: int = 4
+
+# Requested time = (predicted runtime + this many residual standard deviations, in log space) * margin.
+PREDICTION_STANDARD_DEVIATIONS: float = 2.0
+TIME_LIMIT_SAFETY_MARGIN: float = 1.5
+MINIMUM_TIME_LIMIT_SECONDS: float = 5 * 60
+
+# A job that hit its limit needed at least that long; it is modelled as needing this much more.
+TIMED_OUT_RUNTIME_FACTOR: float = 2.0
+
+RIDGE_PENALTY: float = 1e-3
+
+SIZE_REGEX: re.Pattern = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B\s*$", re.IGNORECASE)
+
+SIZE_MULTIPLIERS: Dict[str, int] = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+SACCT_TIME_FORMAT: str = "%Y-%m-%dT%H:%M:%S"
+
+# sacct memory sizes, e.g. "1843200K"; a bare number is bytes.
+SACCT_MEMORY_REGEX: re.Pattern = re.compile(r"^(\d+(?:\.\d+)?)([KMGT]?)$")
+
+# Outcomes of a recorded job.
+OUTCOME_COMPLETED: str = "completed"
+OUTCOME_TIMED_OUT: str = "timed_out"
+OUTCOME_FAILED: str = "failed"
+
+# sacct states of a job that has no outcome yet.
+UNFINISHED_SACCT_STATES: List[str] = ["PENDING", "CONFIGURING", "RUNNING", "COMPLETING", "SUSPENDED", "REQUEUED", "RESIZING"]
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS observations (
+    record_path TEXT PRIMARY KEY,
+    -- Of the record file when it was recorded, a rewritten record is recorded again.
+    record_mtime_ns INTEGER NOT NULL,
+    slurm_job_id TEXT,
+    sweep_name TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    time_limit_seconds REAL,
+    wall_seconds REAL,
+    sacct_elapsed_seconds REAL,
+    host_seconds REAL,
+    sim_seconds REAL,
+    hostname TEXT,
+    queue_wait_seconds REAL,
+    sim_instructions REAL,
+    host_instruction_rate REAL,
+    peak_rss_bytes REAL,
+    output_bytes INTEGER,
+    recorded_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS observations_by_sweep ON observations (sweep_name);
+"""
+
+ParameterValue = Union[str, int, float]
+
+
+def escape_for_heredoc(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("$", "\\$").replace("`", "\\`")
+
+
+def build_runtime_record_shell_commands(
+    record_file_path: Path,
+    sweep_name: str,
+    parameters: Dict[str, ParameterValue],
+    time_limit: str,
+    # "started" at the top of the job script, "finished" after the simulation.
+    state: str,
+) -> str:
+    """
+    Shell snippet for a job script that writes its runtime record. The finished
+    record carries the shell's `$SECONDS` (time since the job script started) and
+    gem5's exit code, if the script saved it in `$GEM5_EXIT_CODE`. Both tell
+    which executor ran the job and whether it ran in a job pack.
+    """
+
+    static_fields: str = escape_for_heredoc(json.dumps({
+        "sweep_name": sweep_name,
+        "parameters": parameters,
+        "time_limit_seconds": parse_slurm_time_limit(time_limit),
+        "state": state,
+    }, sort_keys=True))
+
+    wall_seconds: str = "$SECONDS" if state == "finished" else "null"
+    exit_code: str = "${GEM5_EXIT_CODE:-0}" if state == "finished" else "null"
+
+    return f"""
+cat > "{record_file_path.as_posix()}" << RUNTIME_RECORD_END
+{{"job": {static_fields}, "slurm_job_id": "${{SLURM_JOB_ID:-}}", "executor_kind": "${{{EXECUTOR_KIND_ENVIRONMENT_VARIABLE}:-slurm}}", "packed_task": "${{{PACKED_TASK_ENVIRONMENT_VARIABLE}:-}}", "hostname": "$(hostname)", "wall_seconds": {wall_seconds}, "exit_code": {exit_code}}}
+RUNTIME_RECORD_END
+"""
+
+
+def parse_size(value: str) -> Optional[float]:
+    matched_size = SIZE_REGEX.match(value)
+    if matched_size is None:
+        return None
+
+    return float(matched_size.group(1)) * SIZE_MULTIPLIERS[matched_size.group(2).upper()]
+
+
+def encode_parameter(value: ParameterValue) -> Union[float, str]:
+    """
+    Numeric values (including sizes such as "32 KiB") as log2(1 + value), anything else as a category.
+    """
+
+    numeric_value: Optional[float] = None
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        numeric_value = float(value)
+    elif isinstance(value, str):
+        numeric_value = parse_size(value)
+
+    if numeric_value is None or numeric_value < 0:
+        return str(value)
+
+    return math.log2(1 + numeric_value)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SacctAccounting:
+    state: str
+    elapsed_seconds: float
+    # From submission to start.
+    queue_wait_seconds: Optional[float]
+    max_rss_bytes: Optional[float]
+
+
+def parse_sacct_time(value: str) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.strptime(value, SACCT_TIME_FORMAT)
+    except ValueError:
+        # "Unknown" or "None" for a job that has not started.
+        return None
+
+
+def parse_sacct_memory(value: str) -> Optional[float]:
+    matched_memory = SACCT_MEMORY_REGEX.match(value.strip())
+    if matched_memory is None:
+        return None
+
+    return float(matched_memory.group(1)) * SIZE_MULTIPLIERS[matched_memory.group(2)]
+
+
+def query_sacct(slurm_job_id: str) -> Optional[SacctAccounting]:
+    """
+    What `sacct` accounted for a job, `None` if unavailable. MaxRSS is only
+    reported for job steps, so it is the largest over all of them.
+    """
+
+    try:
+        sacct_process = subprocess.run(
+            args=["sacct", "-j", slurm_job_id, "-n", "-P", "--format=State,ElapsedRaw,Submit,Start,MaxRSS"],
+            capture_output=True,
+            encoding="utf-8",
+            timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    lines: List[str] = sacct_process.stdout.strip().splitlines()
+    if sacct_process.returncode != 0 or len(lines) == 0:
+        return None
+
+    # The first line is the allocation, the rest its steps.
+    state, elapsed_seconds, submit_time, start_time = (lines[0].split("|") + [""] * 4)[:4]
+
+    submitted_at: Optional[datetime.datetime] = parse_sacct_time(submit_time)
+    started_at: Optional[datetime.datetime] = parse_sacct_time(start_time)
+
+    max_rss_values: List[float] = []
+    for line in lines:
+        fields: List[str] = line.split("|")
+        max_rss: Optional[float] = parse_sacct_memory(fields[4]) if len(fields) > 4 else None
+        if max_rss is not None:
+            max_rss_values.append(max_rss)
+
+    return SacctAccounting(
+        state=state.split(" ")[0],
+        elapsed_seconds=float(elapsed_seconds or 0),
+        queue_wait_seconds=(started_at - submitted_at).total_seconds() if submitted_at and started_at else None,
+        max_rss_bytes=max(max_rss_values) if len(max_rss_values) > 0 else None
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class StatsResources:
+    # Summed over the dumps.
+    host_seconds: Optional[float] = None
+    sim_seconds: Optional[float] = None
+    # The largest: simInsts and hostMemory are not reset with the statistics.
+    sim_instructions: Optional[float] = None
+    host_memory_bytes: Optional[float] = None
+
+    @classmethod
+    def from_directory(cls, directory_path: Path) -> Self:
+        """
+        Of the stats.txt in `directory_path` (all `None` without one).
+        """
+
+        stats_txt_path: Optional[Path] = find_stats_txt_path(directory_path)
+        if stats_txt_path is None:
+            return cls()
+
+        values: Dict[str, List[float]] = {name: [] for name in ["hostSeconds", "simSeconds", "simInsts", "hostMemory"]}
+
+        for dump_index in load_or_build_dump_indexes(stats_txt_path):
+            for name, name_values in values.items():
+                value: float = parse_float_token(dump_index.raw_values.get(name, "nan"))
+                if not math.isnan(value):
+                    name_values.append(value)
+
+        return cls(
+            host_seconds=sum(values["hostSeconds"]) if len(values["hostSeconds"]) > 0 else None,
+            sim_seconds=sum(values["simSeconds"]) if len(values["simSeconds"]) > 0 else None,
+            sim_instructions=max(values["simInsts"]) if len(values["simInsts"]) > 0 else None,
+            host_memory_bytes=max(values["hostMemory"]) if len(values["hostMemory"]) > 0 else None
+        )
+
+
+def get_directory_size(directory_path: Path) -> int:
+    """
+    Bytes of the regular files under `directory_path` (symbolic links, e.g. to the result cache, are not counted).
+    """
+
+    size: int = 0
+
+    for parent_directory_path, _, file_names in os.walk(directory_path):
+        for file_name in file_names:
+            file_path = Path(parent_directory_path).joinpath(file_name)
+            if not file_path.is_symlink() and file_path.is_file():
+                size += file_path.stat().st_size
+
+    return size
+
+
+@dataclass(frozen=True, kw_only=True)
+class RuntimeObservation:
+    record_path: str
+    record_mtime_ns: int
+    slurm_job_id: str
+    sweep_name: str
+    parameters: Dict[str, ParameterValue]
+    outcome: str
+    time_limit_seconds: Optional[float]
+    wall_seconds: Optional[float]
+    sacct_elapsed_seconds: Optional[float]
+    host_seconds: Optional[float]
+    sim_seconds: Optional[float]
+    hostname: Optional[str] = None
+    queue_wait_seconds: Optional[float] = None
+    sim_instructions: Optional[float] = None
+    # Simulated instructions per host second.
+    host_instruction_rate: Optional[float] = None
+    peak_rss_bytes: Optional[float] = None
+    output_bytes: Optional[int] = None
+
+    @classmethod
+    def from_record_file(cls, record_file_path: Path) -> Optional[Self]:
+        """
+        The observation of a runtime record, or `None` for a job that is still
+        running or whose outcome cannot be told.
+        """
+
+        try:
+            record_mtime_ns: int = record_file_path.stat().st_mtime_ns
+            record = json.loads(record_file_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        job: Dict = record["job"]
+        # The local executor numbers its jobs itself, sacct would report an unrelated cluster job.
+        slurm_job_id: str = (record.get("slurm_job_id") or "") if record.get("executor_kind", "slurm") == "slurm" else ""
+
+        sacct_accounting: Optional[SacctAccounting] = query_sacct(slurm_job_id) if slurm_job_id else None
+
+        # A configuration of a job pack shares the pack's job: only the pack's state says something about it.
+        job_accounting: Optional[SacctAccounting] = sacct_accounting if not record.get("packed_task") else None
+
+        outcome: str = OUTCOME_COMPLETED
+        if job["state"] != "finished":
+            # The job was killed (or is still running) before it could finish its record.
+            if sacct_accounting is None or sacct_accounting.state in UNFINISHED_SACCT_STATES:
+                return None
+
+            outcome = OUTCOME_TIMED_OUT if sacct_accounting.state == "TIMEOUT" else OUTCOME_FAILED
+        elif record.get("exit_code") != 0:
+            outcome = OUTCOME_FAILED
+
+        # A record written outside a gem5 output directory (e.g. by a job pack) has no statistics of its own.
+        output_directory_path: Optional[Path] = record_file_path.parent \
+            if record_file_path.name == GEM5_RUNTIME_RECORD_FILE_NAME else None
+
+        stats_resources: StatsResources = StatsResources.from_directory(output_directory_path) \
+            if output_directory_path is not None else StatsResources()
+
+        peak_rss_bytes: Optional[float] = stats_resources.host_memory_bytes
+        if job_accounting is not None and job_accounting.max_rss_bytes is not None:
+            peak_rss_bytes = job_accounting.max_rss_bytes
+
+        return cls(
+            record_path=record_file_path.resolve().as_posix(),
+            record_mtime_ns=record_mtime_ns,
+            slurm_job_id=slurm_job_id,
+            sweep_name=job["sweep_name"],
+            parameters=job["parameters"],
+            outcome=outcome,
+            time_limit_seconds=job.get("time_limit_seconds"),
+            wall_seconds=record.get("wall_seconds"),
+            sacct_elapsed_seconds=job_accounting.elapsed_seconds if job_accounting is not None else None,
+            host_seconds=stats_resources.host_seconds,
+            sim_seconds=stats_resources.sim_seconds,
+            hostname=record.get("hostname") or None,
+            queue_wait_seconds=job_accounting.queue_wait_seconds if job_accounting is not None else None,
+            sim_instructions=stats_resources.sim_instructions,
+            host_instruction_rate=stats_resources.sim_instructions / stats_resources.host_seconds
+                if stats_resources.sim_instructions is not None and stats_resources.host_seconds else None,
+            peak_rss_bytes=peak_rss_bytes,
+            output_bytes=get_directory_size(output_directory_path) if output_directory_path is not None else None
+        )
+
+    def get_runtime_seconds(self) -> Optional[float]:
+        """
+        What the job needed: what SLURM accounted (or the job measured), or, for a
+        job that hit its limit, a multiple of that limit. Unknown for a failed job.
+        """
+
+        if self.outcome == OUTCOME_FAILED:
+            return None
+
+        if self.outcome == OUTCOME_TIMED_OUT:
+            return self.time_limit_seconds * TIMED_OUT_RUNTIME_FACTOR if self.time_limit_seconds else None
+
+        if self.sacct_elapsed_seconds is not None:
+            return self.sacct_elapsed_seconds
+
+        return self.wall_seconds
+
+    def get_wall_seconds(self) -> Optional[float]:
+        """
+        How long the job held its allocation, as the job measured it or else as SLURM accounted it.
+        """
+
+        return self.wall_seconds if self.wall_seconds is not None else self.sacct_elapsed_seconds
+
+
+class RuntimeHistory:
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    @classmethod
+    def open(cls, history_path: Path) -> Self:
+        connection = sqlite3.connect(history_path.as_posix(), timeout=60)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.executescript(SCHEMA)
+
+        return cls(connection)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def is_recorded(self, record_file_path: Path) -> bool:
+        """
+        Whether the record is in the history as it is now (not rewritten since).
+        """
+
+        try:
+            record_mtime_ns: int = record_file_path.stat().st_mtime_ns
+        except OSError:
+            return False
+
+        return self.connection.execute(
+            "SELECT 1 FROM observations WHERE record_path = ? AND record_mtime_ns = ?",
+            (record_file_path.resolve().as_posix(), record_mtime_ns)
+        ).fetchone() is not None
+
+    def record(self, observation: RuntimeObservation) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO observations "
+                "(record_path, record_mtime_ns, slurm_job_id, sweep_name, parameters, outcome, time_limit_seconds, "
+                "wall_seconds, sacct_elapsed_seconds, host_seconds, sim_seconds, hostname, queue_wait_seconds, "
+                "sim_instructions, host_instruction_rate, peak_rss_bytes, output_bytes, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    observation.record_path,
+                    observation.record_mtime_ns,
+                    observation.slurm_job_id,
+                    observation.sweep_name,
+                    json.dumps(observation.parameters, sort_keys=True),
+                    observation.outcome,
+                    observation.time_limit_seconds,
+                    observation.wall_seconds,
+                    observation.sacct_elapsed_seconds,
+                    observation.host_seconds,
+                    observation.sim_seconds,
+                    observation.hostname,
+                    observation.queue_wait_seconds,
+                    observation.sim_instructions,
+                    observation.host_instruction_rate,
+                    observation.peak_rss_bytes,
+                    observation.output_bytes,
+                    time.time()
+                )
+            )
+
+    def record_directory(self, root_directory_path: Path) -> int:
+        """
+        Records every runtime record under `root_directory_path` that is not in the
+        history yet or changed since (and whose job has an outcome). Returns how many were added.
+        """
+
+        recorded_observations: int = 0
+
+        for directory_path, _, file_names in os.walk(root_directory_path):
+            for file_name in file_names:
+                if not file_name.endswith(RUNTIME_RECORD_SUFFIX):
+                    continue
+
+                record_file_path = Path(directory_path).joinpath(file_name)
+                if self.is_recorded(record_file_path):
+                    continue
+
+                observation = RuntimeObservation.from_record_file(record_file_path)
+                if observation is not None:
+                    self.record(observation)
+                    recorded_observations += 1
+
+        return recorded_observations
+
+    def load_observations(self, sweep_name: Optional[str]) -> List[RuntimeObservation]:
+        """
+        Observations of a sweep (of every sweep for `None`), oldest first.
+        """
+
+        rows = self.connection.execute(
+            "SELECT record_path, record_mtime_ns, slurm_job_id, sweep_name, parameters, outcome, time_limit_seconds, "
+            "wall_seconds, sacct_elapsed_seconds, host_seconds, sim_seconds, hostname, queue_wait_seconds, "
+            "sim_instructions, host_instruction_rate, peak_rss_bytes, output_bytes "
+            "FROM observations WHERE ? IS NULL OR sweep_name = ? ORDER BY record_mtime_ns, record_path",
+            (sweep_name, sweep_name)
+        )
+
+        return [
+            RuntimeObservation(
+                record_path=row[0],
+                record_mtime_ns=row[1],
+                slurm_job_id=row[2] or "",
+                sweep_name=row[3],
+                parameters=json.loads(row[4]),
+                outcome=row[5],
+                time_limit_seconds=row[6],
+                wall_seconds=row[7],
+                sacct_elapsed_seconds=row[8],
+                host_seconds=row[9],
+                sim_seconds=row[10],
+                hostname=row[11],
+                queue_wait_seconds=row[12],
+                sim_instructions=row[13],
+                host_instruction_rate=row[14],
+                peak_rss_bytes=row[15],
+                output_bytes=row[16]
+            )
+            for row in rows
+        ]
+
+    def get_sweep_names(self) -> List[str]:
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT sweep_name FROM observations ORDER BY sweep_name")]
+
+
+@dataclass(frozen=True, kw_only=True)
+class RuntimeModel:
+    # Feature names: "name" for a numeric parameter, "name=value" for a category.
+    feature_names: List[str]
+    coefficients: np.ndarray
+    # Of log(runtime seconds).
+    residual_standard_deviation: float
+    number_of_observations: int
+
+    @staticmethod
+    def _encode_features(parameters: Dict[str, ParameterValue]) -> Dict[str, float]:
+        features: Dict[str, float] = {}
+
+        for name, value in parameters.items():
+            encoded_value = encode_parameter(value)
+            if isinstance(encoded_value, str):
+                features[f"{name}={encoded_value}"] = 1.0
+            else:
+                features[name] = encoded_value
+
+        return features
+
+    def _build_row(self, parameters: Dict[str, ParameterValue]) -> np.ndarray:
+        features: Dict[str, float] = self._encode_features(parameters)
+
+        # Categories never seen in the history fall back to the baseline.
+        return np.array([1.0] + [features.get(name, 0.0) for name in self.feature_names], dtype=np.float64)
+
+    @classmethod
+    def fit(cls, observations: List[RuntimeObservation]) -> Optional[Self]:
+        """
+        Fits the model, or returns `None` with fewer than `MINIMUM_OBSERVATIONS` usable observations.
+        """
+
+        samples: List[Tuple[Dict[str, float], float]] = []
+        for observation in observations:
+            runtime_seconds: Optional[float] = observation.get_runtime_seconds()
+            if runtime_seconds is not None and runtime_seconds > 0:
+                samples.append((cls._encode_features(observation.parameters), math.log(runtime_seconds)))
+
+        if len(samples) < MINIMUM_OBSERVATIONS:
+            return None
+
+        feature_names: List[str] = sorted({name for features, _ in samples for name in features})
+
+        design_matrix = np.array(
+            [[1.0] + [features.get(name, 0.0) for name in feature_names] for features, _ in samples],
+            dtype=np.float64
+        )
+        log_runtimes = np.array([log_runtime for _, log_runtime in samples], dtype=np.float64)
+
+        # A small ridge keeps the solve well-posed with few samples or collinear one-hot columns.
+        penalty = RIDGE_PENALTY * np.eye(design_matrix.shape[1])
+        penalty[0, 0] = 0.0
+
+        coefficients = np.linalg.solve(design_matrix.T @ design_matrix + penalty, design_matrix.T @ log_runtimes)
+
+        residuals = log_runtimes - design_matrix @ coefficients
+        degrees_of_freedom: int = max(1, len(samples) - design_matrix.shape[1])
+
+        return cls(
+            feature_names=feature_names,
+            coefficients=coefficients,
+            residual_standard_deviation=float(np.sqrt(np.sum(residuals ** 2) / degrees_of_freedom)),
+            number_of_observations=len(samples)
+        )
+
+    def predict_log_runtime(self, parameters: Dict[str, ParameterValue]) -> float:
+        return float(self._build_row(parameters) @ self.coefficients)
+
+    def predict_runtime_seconds(self, parameters: Dict[str, ParameterValue]) -> float:
+        return math.exp(self.predict_log_runtime(parameters))
+
+    def predict_time_limit_seconds(self, parameters: Dict[str, ParameterValue]) -> float:
+        upper_log_runtime: float = \
+            self.predict_log_runtime(parameters) + PREDICTION_STANDARD_DEVIATIONS * self.residual_standard_deviation
+
+        return max(MINIMUM_TIME_LIMIT_SECONDS, math.exp(upper_log_runtime) * TIME_LIMIT_SAFETY_MARGIN)
+
+
+class RuntimePredictor:
+    """
+    Time limits and submission order for the jobs of one sweep, from its history
+    (or the sweep's fixed time limit, while there is not enough of it).
+    """
+
+    def __init__(
+        self,
+        sweep_name: str,
+        default_time_limit: str,
+        model: Optional[RuntimeModel],
+        timed_out_parameters: Dict[str, float],
+    ):
+        self.sweep_name = sweep_name
+        self.default_time_limit = default_time_limit
+        self.model = model
+        # Parameters (as JSON) of jobs that hit their limit -> the largest such limit.
+        self.timed_out_parameters = timed_out_parameters
+
+    @classmethod
+    def from_history(
+        cls,
+        sweep_name: str,
+        default_time_limit: str,
+        # Runtime records under this directory (e.g. earlier runs of the sweep) are recorded first.
+        record_root_directory_path: Optional[Path] = None,
+    ) -> Self:
+        history = RuntimeHistory.open(get_default_runtime_history_path())
+
+        try:
+            if record_root_directory_path is not None and record_root_directory_path.is_dir():
+                history.record_directory(record_root_directory_path)
+
+            observations: List[RuntimeObservation] = history.load_observations(sweep_name)
+        finally:
+            history.close()
+
+        # Observations come oldest first: a configuration that completed after timing out no longer needs a longer limit.
+        timed_out_parameters: Dict[str, float] = {}
+        for observation in observations:
+            parameters_key: str = json.dumps(observation.parameters, sort_keys=True)
+
+            if observation.outcome == OUTCOME_COMPLETED:
+                timed_out_parameters.pop(parameters_key, None)
+            elif observation.outcome == OUTCOME_TIMED_OUT and observation.time_limit_seconds is not None:
+                timed_out_parameters[parameters_key] = max(
+                    timed_out_parameters.get(parameters_key, 0.0),
+                    observation.time_limit_seconds
+                )
+
+        model: Optional[RuntimeModel] = RuntimeModel.fit(observations)
+
+        if model is None:
+            print(f"Runtime history of {sweep_name}: not enough observations, using --time={default_time_limit}")
+        else:
+            print(
+                f"Runtime history of {sweep_name}: model fitted on {model.number_of_observations} jobs "
+                f"(log residual sd {model.residual_standard_deviation:.2f})"
+            )
+
+        return cls(sweep_name, default_time_limit, model, timed_out_parameters)
+
+    def predict_runtime_seconds(self, parameters: Dict[str, ParameterValue]) -> float:
+        """
+        Predicted runtime, or the fixed time limit without a model.
+        """
+
+        if self.model is None:
+            return parse_slurm_time_limit(self.default_time_limit) or 0.0
+
+        return self.model.predict_runtime_seconds(parameters)
+
+    def predict_time_limit(self, parameters: Dict[str, ParameterValue]) -> str:
+        time_limit_seconds: Optional[float] = None
+
+        if self.model is not None:
+            time_limit_seconds = self.model.predict_time_limit_seconds(parameters)
+
+        # Never request less than a limit this exact configuration already ran out of.
+        previous_limit_seconds: Optional[float] = self.timed_out_parameters.get(json.dumps(parameters, sort_keys=True))
+        if previous_limit_seconds is not None:
+            time_limit_seconds = max(
+                time_limit_seconds or 0.0,
+                parse_slurm_time_limit(self.default_time_limit) or 0.0,
+                previous_limit_seconds * TIMED_OUT_RUNTIME_FACTOR
+            )
+
+        if time_limit_seconds is None:
+            return self.default_time_limit
+
+        # Whole minutes read better in squeue and change less between sweeps.
+        return format_slurm_time_limit(math.ceil(time_limit_seconds / 60) * 60)
+
+    def order_longest_first(self, parameter_sets: List[Dict[str, ParameterValue]]) -> List[Dict[str, ParameterValue]]:
+        return sorted(parameter_sets, key=lambda parameters: -self.predict_runtime_seconds(parameters))
+
+
+def get_default_runtime_history_path() -> Path:
+    overridden_history_path: Optional[str] = os.environ.get(RUNTIME_HISTORY_PATH_ENVIRONMENT_VARIABLE)
+    if overridden_history_path:
+        return Path(overridden_history_path)
+
+    return DEFAULT_RUNTIME_HISTORY_PATH
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--root-directory-path",
+        dest="root_directory_path",
+        default="."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    root_directory_path = Path(str(arguments.root_directory_path))
+    if not root_directory_path.is_dir():
+        print(f"Not a directory: {root_directory_path}")
+        exit(1)
+
+    history = RuntimeHistory.open(get_default_runtime_history_path())
+
+    recorded_observations: int = history.record_directory(root_directory_path)
+    print(f"Recorded {recorded_observations} new jobs into {get_default_runtime_history_path()}")
+
+    for sweep_name in history.get_sweep_names():
+        observations: List[RuntimeObservation] = history.load_observations(sweep_name)
+        model: Optional[RuntimeModel] = RuntimeModel.fit(observations)
+
+        timed_out_jobs: int = sum(1 for observation in observations if observation.outcome == OUTCOME_TIMED_OUT)
+        failed_jobs: int = sum(1 for observation in observations if observation.outcome == OUTCOME_FAILED)
+        print(f"{sweep_name}: {len(observations)} jobs ({timed_out_jobs} timed out, {failed_jobs} failed)")
+
+        if model is None:
+            print("  > not enough observations for a model")
+            continue
+
+        print(f"  > log residual sd {model.residual_standard_deviation:.2f}")
+        for feature_name, coefficient in zip(["(intercept)", *model.feature_names], model.coefficients):
+            print(f"    {feature_name:<40} {coefficient:+.3f}")
+
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
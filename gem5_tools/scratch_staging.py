@@ -0,0 +1,121 @@
+"""
+Staging of gem5 outputs in node-local scratch.
+
+With `--scratch`, a job script points gem5's `--outdir` at a fresh directory in
+`$TMPDIR` (node-local on the cluster, `/tmp` without it). The directory is
+bound into the container through `APPTAINER_BIND`, since `$TMPDIR` may be
+outside apptainer's default binds. gem5's many small writes (stats.txt,
+config.ini, config.json, simout, periodic dumps) then stay off the shared
+filesystem. Once gem5 exits, the job:
+1. compresses the outputs like `--compress-results` would,
+2. packs them into one gzipped tar with its SHA-256,
+3. copies that archive into the usual output directory,
+4. verifies the copy's checksum and unpacks it in place.
+The parsers find the same directory layout as without staging. A copy that
+still fails verification after a few attempts leaves the outputs in scratch
+and fails the job (so the result cache never stores it). Without writable
+scratch, gem5 writes to the shared directory as before.
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from gem5_tools.compressed_stats import build_compression_shell_commands
+
+
+# The archive while it is copied back and verified, inside the output directory.
+SCRATCH_ARCHIVE_FILE_NAME: str = ".scratch-outputs.tar.gz"
+
+COPY_BACK_ATTEMPTS: int = 3
+
+# Set by the setup snippet: the directory gem5 writes to, and the scratch directory (empty without staging).
+GEM5_OUTPUT_DIRECTORY_VARIABLE: str = "GEM5_OUTPUT_DIRECTORY"
+GEM5_SCRATCH_DIRECTORY_VARIABLE: str = "GEM5_SCRATCH_DIRECTORY"
+
+
+def get_gem5_output_directory(output_directory_path: Path, stage_in_scratch: bool) -> str:
+    """
+    What a job script passes as gem5's `--outdir`.
+    """
+
+    return f"${GEM5_OUTPUT_DIRECTORY_VARIABLE}" if stage_in_scratch else output_directory_path.as_posix()
+
+
+def build_scratch_setup_shell_commands(output_directory_path: Path, stage_in_scratch: bool) -> str:
+    """
+    Shell snippet for a job script, before gem5, that creates the scratch directory (empty without staging).
+    """
+
+    if not stage_in_scratch:
+        return ""
+
+    return f"""
+{GEM5_OUTPUT_DIRECTORY_VARIABLE}="{output_directory_path.as_posix()}"
+{GEM5_SCRATCH_DIRECTORY_VARIABLE}=$(mktemp -d "${{TMPDIR:-/tmp}}/gem5-outputs-XXXXXX" 2> /dev/null || true)
+if [ -n "${GEM5_SCRATCH_DIRECTORY_VARIABLE}" ]; then
+    {GEM5_OUTPUT_DIRECTORY_VARIABLE}="${GEM5_SCRATCH_DIRECTORY_VARIABLE}"
+    export APPTAINER_BIND="${{APPTAINER_BIND:+$APPTAINER_BIND,}}${GEM5_SCRATCH_DIRECTORY_VARIABLE}"
+    echo "Staging the gem5 outputs in ${GEM5_SCRATCH_DIRECTORY_VARIABLE} on $(hostname)"
+else
+    echo "No writable scratch directory, gem5 writes to the output directory directly"
+fi
+"""
+
+
+def build_scratch_copy_back_shell_commands(output_directory_path: Path, compression_method: str, stage_in_scratch: bool) -> str:
+    """
+    Shell snippet for a job script, right after gem5 (and before its outputs are
+    used), that copies the staged outputs back (empty without staging). It also
+    runs for a failed simulation, whose simout and config are needed for triage.
+    """
+
+    if not stage_in_scratch:
+        return ""
+
+    archive_path: str = output_directory_path.joinpath(SCRATCH_ARCHIVE_FILE_NAME).as_posix()
+    output_directory: str = output_directory_path.as_posix()
+
+    compression_commands: str = build_compression_shell_commands(
+        Path(f"${GEM5_SCRATCH_DIRECTORY_VARIABLE}"),
+        compression_method
+    ).strip().replace("\n", "\n    ")
+
+    return f"""
+if [ -n "${GEM5_SCRATCH_DIRECTORY_VARIABLE}" ]; then
+    {compression_commands}
+    SCRATCH_ARCHIVE="${GEM5_SCRATCH_DIRECTORY_VARIABLE}.tar.gz"
+    tar -C "${GEM5_SCRATCH_DIRECTORY_VARIABLE}" -czf "$SCRATCH_ARCHIVE" .
+    SCRATCH_ARCHIVE_SHA256=$(sha256sum "$SCRATCH_ARCHIVE" | cut -d " " -f 1)
+
+    SCRATCH_COPIED_BACK=0
+    for SCRATCH_COPY_ATTEMPT in $(seq {COPY_BACK_ATTEMPTS}); do
+        if cp "$SCRATCH_ARCHIVE" "{archive_path}" \\
+                && [ "$(sha256sum "{archive_path}" | cut -d " " -f 1)" = "$SCRATCH_ARCHIVE_SHA256" ] \\
+                && tar -C "{output_directory}" --no-overwrite-dir -xzf "{archive_path}"; then
+            SCRATCH_COPIED_BACK=1
+            break
+        fi
+        echo "Copying the staged outputs back failed (attempt $SCRATCH_COPY_ATTEMPT of {COPY_BACK_ATTEMPTS})"
+    done
+    rm -f "{archive_path}"
+
+    if [ "$SCRATCH_COPIED_BACK" = "1" ]; then
+        rm -rf "${GEM5_SCRATCH_DIRECTORY_VARIABLE}" "$SCRATCH_ARCHIVE"
+    else
+        echo "The staged outputs stay in ${GEM5_SCRATCH_DIRECTORY_VARIABLE} ($SCRATCH_ARCHIVE) on $(hostname)"
+        if [ "$GEM5_EXIT_CODE" = "0" ]; then
+            GEM5_EXIT_CODE=1
+        fi
+    fi
+fi
+"""
+
+
+def add_scratch_staging_arguments(argument_parser: ArgumentParser) -> None:
+    argument_parser.add_argument(
+        "--scratch",
+        required=False,
+        action="store_true",
+        dest="stage_in_scratch",
+        help="Let gem5 write to node-local $TMPDIR and copy its outputs back in one verified archive when it exits."
+    )
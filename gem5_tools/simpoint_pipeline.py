@@ -0,0 +1,676 @@
+"""
+SimPoint-style sampled simulation of the single-core sweeps.
+
+Instead of simulating every configuration of a cpu_benchmark.py or
+cache_benchmark.py sweep spec (see gem5_tools.sweep_spec) in detail from the
+first instruction to the last, the pipeline simulates only a few representative
+intervals of each workload:
+1. profile: one ATOMIC run per workload records the basic block vector of every
+   interval of `--interval-insts` instructions.
+2. cluster: the vectors (normalized, randomly projected to a few dimensions) are
+   clustered with k-means for every k up to `--max-clusters`. The smallest k whose
+   BIC is within 90% of the best one is kept. In each cluster, the interval closest
+   to the centroid represents it, weighted by the cluster's share of the intervals.
+3. checkpoint: one ATOMIC run per workload takes a checkpoint `--warmup-insts`
+   instructions before every representative interval.
+4. simulate: every configuration restores each checkpoint on its detailed core,
+   warms up, and measures the one interval.
+
+The CPI of a configuration is the weighted mean of its intervals' CPIs, and the
+miss rate of each cache is its weighted misses over its weighted accesses. With
+`--validate`, that many configurations (spread over the sweep) also run in full,
+and the report shows the error of the sampled estimates and how much detailed
+simulation they saved.
+
+Every step is a run directory of its own under the output directory (with
+scripts/, benchmarks/ and a sweep ledger), and steps that already ran are not
+run again. Running the same command again therefore resumes the pipeline, or
+only reports its results.
+
+> python -m gem5_tools.simpoint_pipeline --spec-path first_homework_cs/cpu_benchmark/sweep.toml --output-directory-path <directory> [--validate 2]
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import gzip
+import json
+import math
+import os
+from pathlib import Path
+import re
+import tomllib
+from typing import Dict, List, Optional, Self, Tuple
+
+import numpy as np
+
+from gem5_tools.async_submission import DEFAULT_POLL_INTERVAL_SECONDS
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.design_space_search import wait_for_round_jobs
+from gem5_tools.executors import JobExecutor, add_executor_arguments, create_executor
+from gem5_tools.result_cache import ResultCache, get_default_result_cache
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.scratch_staging import add_scratch_staging_arguments
+from gem5_tools.simpoints import (
+    BASIC_BLOCK_VECTOR_FILE_NAME,
+    SIMPOINTS_FILE_NAME,
+    SimPoint,
+    SimPointSelection,
+    get_simpoint_checkpoint_name
+)
+from gem5_tools.stats_index import StatsIndex
+from gem5_tools.sweep_ledger import SweepLedger
+from gem5_tools.sweep_spec import ParameterValue, SweepSpec, format_point_name, prepare_and_queue_job
+from gem5_tools.windowed_simulation import SimulationWindow
+
+
+# The config scripts that implement the --bbv_interval, --take_simpoint_checkpoints and --simpoint_interval_insts steps.
+SAMPLED_CONFIG_SCRIPT_NAMES: List[str] = ["cpu_benchmark.py", "cache_benchmark.py"]
+
+SAMPLED_RESULTS_FILE_NAME: str = "sampled_results.json"
+
+DEFAULT_INTERVAL_INSTRUCTIONS: int = 1_000_000
+DEFAULT_WARMUP_INSTRUCTIONS: int = 200_000
+DEFAULT_MAX_CLUSTERS: int = 10
+DEFAULT_VALIDATION_CONFIGURATIONS: int = 2
+
+# Like SimPoint: vectors are projected to this many dimensions, k-means is restarted
+# from this many seeds, and the smallest k whose BIC reaches this fraction of the BIC range is kept.
+PROJECTED_DIMENSIONS: int = 15
+KMEANS_RESTARTS: int = 5
+KMEANS_MAX_ITERATIONS: int = 100
+BIC_SCORE_THRESHOLD: float = 0.9
+
+BASIC_BLOCK_COUNT_PATTERN: re.Pattern = re.compile(r":(\d+):(\d+)")
+
+
+def read_basic_block_vectors(basic_block_vector_file_path: Path) -> np.ndarray:
+    """
+    The vectors of simpoint.bb.gz, one row per interval and one column per basic block
+    (the instructions executed in that block during the interval).
+    """
+
+    intervals: List[Dict[int, int]] = []
+
+    with gzip.open(basic_block_vector_file_path, mode="rt", encoding="utf-8") as basic_block_vector_file:
+        for line in basic_block_vector_file:
+            if line.startswith("T"):
+                intervals.append({
+                    int(block_id): int(count) for block_id, count in BASIC_BLOCK_COUNT_PATTERN.findall(line)
+                })
+
+    block_columns: Dict[int, int] = {
+        block_id: column for column, block_id in enumerate(sorted({block_id for interval in intervals for block_id in interval}))
+    }
+
+    vectors = np.zeros((len(intervals), len(block_columns)))
+    for row, interval in enumerate(intervals):
+        for block_id, count in interval.items():
+            vectors[row, block_columns[block_id]] = count
+
+    return vectors
+
+
+def project_basic_block_vectors(vectors: np.ndarray, random_generator: np.random.Generator) -> np.ndarray:
+    """
+    Every vector normalized to sum 1 (so intervals compare by where they spend their
+    instructions, not how many), then randomly projected to PROJECTED_DIMENSIONS.
+    """
+
+    row_sums: np.ndarray = vectors.sum(axis=1, keepdims=True)
+    normalized_vectors: np.ndarray = vectors / np.where(row_sums > 0, row_sums, 1.0)
+
+    if normalized_vectors.shape[1] <= PROJECTED_DIMENSIONS:
+        return normalized_vectors
+
+    projection: np.ndarray = random_generator.uniform(-1.0, 1.0, size=(normalized_vectors.shape[1], PROJECTED_DIMENSIONS))
+    return normalized_vectors @ projection
+
+
+def run_kmeans(points: np.ndarray, number_of_clusters: int, random_generator: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Lloyd's k-means from a k-means++ initialization: the centroids, the cluster of every point, and the sum of squared distances.
+    """
+
+    centroids: np.ndarray = points[[random_generator.integers(len(points))]]
+
+    while len(centroids) < number_of_clusters:
+        squared_distances: np.ndarray = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        total: float = float(squared_distances.sum())
+
+        next_index: int = int(random_generator.choice(len(points), p=squared_distances / total)) if total > 0 \
+            else int(random_generator.integers(len(points)))
+        centroids = np.vstack([centroids, points[next_index]])
+
+    labels: np.ndarray = np.zeros(len(points), dtype=int)
+
+    for iteration in range(KMEANS_MAX_ITERATIONS):
+        squared_distances = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        new_labels: np.ndarray = squared_distances.argmin(axis=1)
+
+        if iteration > 0 and np.array_equal(new_labels, labels):
+            break
+
+        labels = new_labels
+        for cluster in range(number_of_clusters):
+            members: np.ndarray = points[labels == cluster]
+            if len(members) > 0:
+                centroids[cluster] = members.mean(axis=0)
+
+    sum_of_squares: float = float(((points - centroids[labels]) ** 2).sum())
+    return centroids, labels, sum_of_squares
+
+
+def compute_bic(points: np.ndarray, labels: np.ndarray, number_of_clusters: int, sum_of_squares: float) -> float:
+    """
+    The Bayesian information criterion of a clustering as spherical Gaussians of equal variance (as in X-means).
+    """
+
+    number_of_points, number_of_dimensions = points.shape
+
+    variance: float = max(sum_of_squares / (number_of_dimensions * max(number_of_points - number_of_clusters, 1)), 1e-12)
+    cluster_sizes: np.ndarray = np.bincount(labels, minlength=number_of_clusters)
+    cluster_sizes = cluster_sizes[cluster_sizes > 0]
+
+    log_likelihood: float = float(
+        (cluster_sizes * np.log(cluster_sizes)).sum()
+        - number_of_points * math.log(number_of_points)
+        - number_of_points * number_of_dimensions / 2 * math.log(2 * math.pi * variance)
+        - number_of_dimensions * (number_of_points - number_of_clusters) / 2
+    )
+    number_of_parameters: int = number_of_clusters * (number_of_dimensions + 1)
+
+    return log_likelihood - number_of_parameters / 2 * math.log(number_of_points)
+
+
+def select_simpoints(
+    workload_name: str,
+    vectors: np.ndarray,
+    interval_instructions: int,
+    warmup_instructions: int,
+    max_clusters: int,
+    seed: int,
+) -> SimPointSelection:
+    random_generator = np.random.default_rng(seed)
+    points: np.ndarray = project_basic_block_vectors(vectors, random_generator)
+
+    clusterings: List[Tuple[float, np.ndarray, np.ndarray]] = []
+
+    for number_of_clusters in range(1, min(max_clusters, len(points)) + 1):
+        best_centroids, best_labels, best_sum_of_squares = min(
+            (run_kmeans(points, number_of_clusters, random_generator) for _ in range(KMEANS_RESTARTS)),
+            key=lambda clustering: clustering[2]
+        )
+
+        clusterings.append((
+            compute_bic(points, best_labels, number_of_clusters, best_sum_of_squares),
+            best_centroids,
+            best_labels
+        ))
+
+    bic_scores: List[float] = [clustering[0] for clustering in clusterings]
+    bic_threshold: float = min(bic_scores) + BIC_SCORE_THRESHOLD * (max(bic_scores) - min(bic_scores))
+    _, centroids, labels = next(clustering for clustering in clusterings if clustering[0] >= bic_threshold)
+
+    simpoints: List[SimPoint] = []
+
+    for cluster in range(len(centroids)):
+        member_intervals: np.ndarray = np.flatnonzero(labels == cluster)
+        if len(member_intervals) == 0:
+            continue
+
+        distances: np.ndarray = ((points[member_intervals] - centroids[cluster]) ** 2).sum(axis=1)
+        interval: int = int(member_intervals[distances.argmin()])
+
+        # gem5 cannot stop before the first instruction, so the first interval starts one instruction late.
+        checkpoint_instructions: int = max(1, interval * interval_instructions - warmup_instructions)
+
+        simpoints.append(SimPoint(
+            interval=interval,
+            weight=len(member_intervals) / len(points),
+            checkpoint_instructions=checkpoint_instructions,
+            warmup_instructions=max(0, interval * interval_instructions - checkpoint_instructions)
+        ))
+
+    return SimPointSelection(
+        workload_name=workload_name,
+        interval_instructions=interval_instructions,
+        number_of_intervals=len(points),
+        simpoints=sorted(simpoints, key=lambda simpoint: simpoint.interval)
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class SampledEstimate:
+    # IPC (the inverse of the weighted CPI) and the miss rate of every cache, named like SimulationWindow.get_metrics.
+    metrics: Dict[str, float]
+    # Instructions simulated in detail, warmups included, and the host time spent on them.
+    detailed_instructions: float
+    host_seconds: float
+
+    @classmethod
+    def from_simpoint_windows(cls, selection: SimPointSelection, windows: List[SimulationWindow], host_seconds: float) -> Optional[Self]:
+        """
+        The estimate of a configuration from the window of each of its simulation points (in the order of `selection.simpoints`).
+        """
+
+        weighted_cpi: float = 0.0
+        weighted_misses: Dict[str, float] = {}
+        weighted_accesses: Dict[str, float] = {}
+
+        for simpoint, window in zip(selection.simpoints, windows):
+            if not window.instructions > 0 or not window.cycles > 0:
+                return None
+
+            weighted_cpi += simpoint.weight * window.cycles / window.instructions
+
+            # Per instruction, so that a short last interval weighs like a full one.
+            for cache_name, accesses in window.cache_accesses.items():
+                weighted_accesses[cache_name] = weighted_accesses.get(cache_name, 0.0) + simpoint.weight * accesses / window.instructions
+                weighted_misses[cache_name] = weighted_misses.get(cache_name, 0.0) + \
+                    simpoint.weight * window.cache_misses[cache_name] / window.instructions
+
+        metrics: Dict[str, float] = {"ipc": 1.0 / weighted_cpi}
+        for cache_name, accesses in sorted(weighted_accesses.items()):
+            if accesses > 0:
+                metrics[f"{cache_name}.miss_rate"] = weighted_misses[cache_name] / accesses
+
+        return cls(
+            metrics=metrics,
+            detailed_instructions=sum(
+                simpoint.warmup_instructions + window.instructions
+                for simpoint, window in zip(selection.simpoints, windows)
+            ),
+            host_seconds=host_seconds
+        )
+
+
+def load_run_window(directory_path: Path) -> Optional[Tuple[SimulationWindow, float]]:
+    """
+    The statistics of a gem5 output directory as a window, and its host seconds; `None` without a (complete) stats.txt.
+    """
+
+    stats_txt_path: Optional[Path] = find_stats_txt_path(directory_path)
+    if stats_txt_path is None:
+        return None
+
+    try:
+        stats_index: StatsIndex = load_stats_index(stats_txt_path)
+    except (OSError, ValueError):
+        return None
+
+    host_seconds: float = stats_index.get_float("hostSeconds") if "hostSeconds" in stats_index else 0.0
+    return SimulationWindow.from_stats_index(0, 0, stats_index), host_seconds
+
+
+def get_workload_name(spec: SweepSpec, configuration: Dict[str, ParameterValue]) -> str:
+    return "_".join(workload_path.stem for workload_path in spec.get_workload_paths(configuration)) or spec.name
+
+
+def group_configurations_by_workload(
+    spec: SweepSpec,
+    configurations: List[Dict[str, ParameterValue]],
+) -> Dict[str, List[Dict[str, ParameterValue]]]:
+    configurations_by_workload: Dict[str, List[Dict[str, ParameterValue]]] = {}
+
+    for configuration in configurations:
+        configurations_by_workload.setdefault(get_workload_name(spec, configuration), []).append(configuration)
+
+    return configurations_by_workload
+
+
+def get_interval_point(
+    configuration: Dict[str, ParameterValue],
+    selection: SimPointSelection,
+    simpoint: SimPoint,
+    simpoints_directory_path: Path,
+) -> Dict[str, ParameterValue]:
+    return {
+        **configuration,
+        "restore_checkpoint": simpoints_directory_path.joinpath(
+            get_simpoint_checkpoint_name(simpoint.checkpoint_instructions)
+        ).as_posix(),
+        "warmup_insts": simpoint.warmup_instructions,
+        "simpoint_interval_insts": selection.interval_instructions,
+    }
+
+
+def choose_validation_configurations(configurations: List[Dict[str, ParameterValue]], number_of_configurations: int) -> List[Dict[str, ParameterValue]]:
+    """
+    `number_of_configurations` configurations spread evenly over the sweep.
+    """
+
+    if number_of_configurations <= 0:
+        return []
+
+    indices: List[int] = sorted({
+        round(position) for position in np.linspace(0, len(configurations) - 1, min(number_of_configurations, len(configurations)))
+    })
+
+    return [configurations[index] for index in indices]
+
+
+def run_pipeline_step(
+    spec: SweepSpec,
+    points: List[Dict[str, ParameterValue]],
+    step_directory_path: Path,
+    arguments,
+    result_cache: Optional[ResultCache],
+) -> None:
+    """
+    Runs the jobs of a pipeline step and waits for them; a step that ran before is only waited for.
+    """
+
+    if step_directory_path.exists():
+        wait_for_round_jobs(step_directory_path, arguments.poll_interval_seconds)
+        return
+
+    print(f"Step {step_directory_path.name}: {len(points)} jobs")
+
+    job_scripts_directory_path: Path = step_directory_path.joinpath("scripts")
+    job_scripts_directory_path.mkdir(parents=True, exist_ok=False)
+
+    benchmark_results_directory_path: Path = step_directory_path.joinpath("benchmarks")
+    benchmark_results_directory_path.mkdir(parents=True, exist_ok=False)
+
+    # A local executor cannot take jobs after waiting, so every step gets its own.
+    executor: JobExecutor = create_executor(arguments)
+    sweep_ledger: SweepLedger = SweepLedger.open(step_directory_path)
+
+    try:
+        for point in points:
+            prepare_and_queue_job(
+                spec=spec,
+                point=point,
+                job_script_output_directory_path=job_scripts_directory_path,
+                benchmark_output_base_directory_path=benchmark_results_directory_path,
+                executor=executor,
+                result_cache=result_cache,
+                time_limit=spec.time_limit,
+                sweep_ledger=sweep_ledger,
+                stage_in_scratch=arguments.stage_in_scratch
+            )
+    finally:
+        sweep_ledger.close()
+
+    executor.wait()
+    wait_for_round_jobs(step_directory_path, arguments.poll_interval_seconds)
+
+
+def format_metrics(metrics: Dict[str, float]) -> str:
+    return ", ".join(f"{name} {value:.4f}" for name, value in metrics.items())
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--spec-path",
+        required=True,
+        dest="spec_path",
+        help="Sweep spec of cpu_benchmark.py or cache_benchmark.py whose configurations are simulated."
+    )
+
+    argument_parser.add_argument(
+        "--output-directory-path",
+        required=True,
+        dest="output_directory_path",
+        help="Directory of the pipeline; running again with the same one resumes it."
+    )
+
+    argument_parser.add_argument(
+        "--interval-insts",
+        required=False,
+        type=int,
+        default=DEFAULT_INTERVAL_INSTRUCTIONS,
+        dest="interval_instructions",
+        help="Instructions per interval, the unit that is profiled, clustered and simulated."
+    )
+
+    argument_parser.add_argument(
+        "--warmup-insts",
+        required=False,
+        type=int,
+        default=DEFAULT_WARMUP_INSTRUCTIONS,
+        dest="warmup_instructions",
+        help="Instructions simulated in detail before each interval to warm the core and caches."
+    )
+
+    argument_parser.add_argument(
+        "--max-clusters",
+        required=False,
+        type=int,
+        default=DEFAULT_MAX_CLUSTERS,
+        dest="max_clusters",
+        help="Most simulation points per workload."
+    )
+
+    argument_parser.add_argument(
+        "--validate",
+        required=False,
+        type=int,
+        default=DEFAULT_VALIDATION_CONFIGURATIONS,
+        dest="validation_configurations",
+        help="Also simulate this many configurations in full and report the error of their sampled estimates (0 for none)."
+    )
+
+    argument_parser.add_argument(
+        "--no-result-cache",
+        required=False,
+        action="store_false",
+        dest="use_result_cache",
+        help="Simulate the full validation runs even if a cached result exists, and cache nothing."
+    )
+
+    argument_parser.add_argument(
+        "--poll-interval",
+        required=False,
+        type=float,
+        default=DEFAULT_POLL_INTERVAL_SECONDS,
+        dest="poll_interval_seconds",
+        help="Seconds between status polls while waiting for a step's SLURM jobs."
+    )
+
+    add_scratch_staging_arguments(argument_parser)
+    add_executor_arguments(argument_parser)
+
+    arguments = argument_parser.parse_args()
+
+    spec_path = Path(str(arguments.spec_path))
+    output_directory_path = Path(str(arguments.output_directory_path)).resolve()
+
+    if arguments.interval_instructions <= 0 or arguments.warmup_instructions < 0 or arguments.max_clusters <= 0:
+        print("--interval-insts and --max-clusters must be positive, --warmup-insts cannot be negative.")
+        exit(1)
+
+    try:
+        spec = SweepSpec.from_file(spec_path)
+        spec.validate_against_config_script()
+
+        if spec.config_script_path is None or spec.config_script_path.name not in SAMPLED_CONFIG_SCRIPT_NAMES:
+            raise ValueError(f"sampled simulation needs a spec of {' or '.join(SAMPLED_CONFIG_SCRIPT_NAMES)}")
+
+        configurations: List[Dict[str, ParameterValue]] = spec.expand()
+    except (OSError, ValueError, tomllib.TOMLDecodeError) as spec_error:
+        print(f"Invalid sampled simulation of {spec_path}: {spec_error}")
+        exit(1)
+
+    configurations_by_workload: Dict[str, List[Dict[str, ParameterValue]]] = group_configurations_by_workload(spec, configurations)
+
+    print(f"Sweep {spec.name}: {len(configurations)} configurations of {len(configurations_by_workload)} workloads")
+    print()
+
+    output_directory_path.mkdir(parents=True, exist_ok=True)
+
+    # 1. Profile the basic block vectors of every workload (on the first of its configurations).
+    profile_points: Dict[str, Dict[str, ParameterValue]] = {
+        workload_name: {**workload_configurations[0], "bbv_interval": arguments.interval_instructions}
+        for workload_name, workload_configurations in configurations_by_workload.items()
+    }
+    checkpoint_points: Dict[str, Dict[str, ParameterValue]] = {
+        workload_name: {
+            **workload_configurations[0],
+            "take_simpoint_checkpoints": output_directory_path.joinpath("simpoints", workload_name, SIMPOINTS_FILE_NAME).as_posix(),
+        }
+        for workload_name, workload_configurations in configurations_by_workload.items()
+    }
+    run_pipeline_step(spec, list(profile_points.values()), output_directory_path.joinpath("profile"), arguments, None)
+
+    # 2. Cluster them into simulation points.
+    selections: Dict[str, SimPointSelection] = {}
+
+    for workload_name, profile_point in profile_points.items():
+        simpoints_directory_path = output_directory_path.joinpath("simpoints", workload_name)
+        simpoints_file_path = simpoints_directory_path.joinpath(SIMPOINTS_FILE_NAME)
+
+        if not simpoints_file_path.is_file():
+            basic_block_vector_file_path = output_directory_path.joinpath(
+                "profile", "benchmarks", format_point_name(spec, profile_point), BASIC_BLOCK_VECTOR_FILE_NAME
+            )
+
+            if not basic_block_vector_file_path.is_file():
+                print(f"Profiling {workload_name} failed, no {basic_block_vector_file_path} (see the sweep ledger of the profile step).")
+                exit(1)
+
+            vectors: np.ndarray = read_basic_block_vectors(basic_block_vector_file_path)
+            if len(vectors) == 0:
+                print(f"{workload_name} is shorter than one interval, use a smaller --interval-insts.")
+                exit(1)
+
+            simpoints_directory_path.mkdir(parents=True, exist_ok=True)
+            select_simpoints(
+                workload_name=workload_name,
+                vectors=vectors,
+                interval_instructions=arguments.interval_instructions,
+                warmup_instructions=arguments.warmup_instructions,
+                max_clusters=arguments.max_clusters,
+                seed=spec.seed
+            ).save(simpoints_file_path)
+
+        selection: SimPointSelection = SimPointSelection.load(simpoints_file_path)
+        if selection.interval_instructions != arguments.interval_instructions:
+            print(f"{simpoints_file_path} was selected with --interval-insts {selection.interval_instructions}, use a new output directory.")
+            exit(1)
+
+        selections[workload_name] = selection
+
+        print(
+            f"{workload_name}: {len(selection.simpoints)} simulation points of {selection.number_of_intervals} intervals: " +
+            ", ".join(f"{simpoint.interval} ({simpoint.weight:.1%})" for simpoint in selection.simpoints)
+        )
+
+    print()
+
+    # 3. Checkpoint every simulation point.
+    run_pipeline_step(spec, list(checkpoint_points.values()), output_directory_path.joinpath("checkpoints"), arguments, None)
+
+    # 4. Simulate the simulation points of every configuration (and the validation configurations in full).
+    interval_points: List[Dict[str, ParameterValue]] = [
+        get_interval_point(configuration, selections[workload_name], simpoint, output_directory_path.joinpath("simpoints", workload_name))
+        for workload_name, workload_configurations in configurations_by_workload.items()
+        for configuration in workload_configurations
+        for simpoint in selections[workload_name].simpoints
+    ]
+    run_pipeline_step(spec, interval_points, output_directory_path.joinpath("intervals"), arguments, None)
+
+    validation_configurations: List[Dict[str, ParameterValue]] = choose_validation_configurations(
+        configurations,
+        arguments.validation_configurations
+    )
+    if len(validation_configurations) > 0:
+        run_pipeline_step(
+            spec,
+            validation_configurations,
+            output_directory_path.joinpath("validation"),
+            arguments,
+            get_default_result_cache() if arguments.use_result_cache else None
+        )
+
+    # Recombine the intervals into an estimate per configuration.
+    sampled_results: List[Dict] = []
+    number_of_failures: int = 0
+
+    print(f"Sampled estimates ({sum(len(selection.simpoints) for selection in selections.values())} simulation points):")
+
+    for workload_name, workload_configurations in configurations_by_workload.items():
+        selection = selections[workload_name]
+
+        for configuration in workload_configurations:
+            interval_runs: List[Optional[Tuple[SimulationWindow, float]]] = [
+                load_run_window(output_directory_path.joinpath(
+                    "intervals", "benchmarks",
+                    format_point_name(spec, get_interval_point(configuration, selection, simpoint, output_directory_path.joinpath("simpoints", workload_name)))
+                ))
+                for simpoint in selection.simpoints
+            ]
+
+            estimate: Optional[SampledEstimate] = SampledEstimate.from_simpoint_windows(
+                selection,
+                [interval_run[0] for interval_run in interval_runs],
+                sum(interval_run[1] for interval_run in interval_runs)
+            ) if all(interval_run is not None for interval_run in interval_runs) else None
+
+            if estimate is None:
+                number_of_failures += 1
+                print(f"  {json.dumps(configuration)}: failed (see the sweep ledger of the intervals step)")
+                continue
+
+            print(f"  {json.dumps(configuration)}: {format_metrics(estimate.metrics)}")
+            sampled_results.append({
+                "configuration": configuration,
+                "workload": workload_name,
+                "metrics": estimate.metrics,
+                "detailed_instructions": estimate.detailed_instructions,
+                "host_seconds": estimate.host_seconds,
+            })
+
+    print()
+
+    # Compare the validation configurations with their full runs.
+    for configuration in validation_configurations:
+        sampled_result: Optional[Dict] = next(
+            (sampled_result for sampled_result in sampled_results if sampled_result["configuration"] == configuration),
+            None
+        )
+        full_run: Optional[Tuple[SimulationWindow, float]] = load_run_window(
+            output_directory_path.joinpath("validation", "benchmarks", format_point_name(spec, configuration))
+        )
+
+        print(f"Validation of {json.dumps(configuration)}:")
+
+        if sampled_result is None or full_run is None:
+            print("  > no sampled estimate or full run to compare")
+            continue
+
+        full_window, full_host_seconds = full_run
+        full_metrics: Dict[str, float] = full_window.get_metrics()
+
+        sampled_result["validation"] = {"metrics": full_metrics, "instructions": full_window.instructions, "host_seconds": full_host_seconds}
+
+        for name, full_value in full_metrics.items():
+            sampled_value: Optional[float] = sampled_result["metrics"].get(name)
+            if sampled_value is None:
+                continue
+
+            relative_error: float = abs(sampled_value - full_value) / abs(full_value) if full_value != 0 else 0.0
+            print(f"  > {name}: sampled {sampled_value:.4f}, full {full_value:.4f} ({relative_error:.2%} error)")
+
+        if sampled_result["detailed_instructions"] > 0:
+            print(f"  > detailed instructions: {full_window.instructions / sampled_result['detailed_instructions']:.1f}x fewer sampled")
+
+        if sampled_result["host_seconds"] > 0 and full_host_seconds > 0:
+            print(f"  > host seconds: {full_host_seconds / sampled_result['host_seconds']:.1f}x fewer sampled")
+
+    sampled_results_file_path = output_directory_path.joinpath(SAMPLED_RESULTS_FILE_NAME)
+    temporary_file_path = sampled_results_file_path.with_suffix(".json.tmp")
+    temporary_file_path.write_text(json.dumps(sampled_results, indent=2), encoding="utf-8")
+    os.replace(temporary_file_path, sampled_results_file_path)
+
+    print()
+    print(f"Sampled results of {len(sampled_results)} configurations written to {sampled_results_file_path.as_posix()}")
+
+    if number_of_failures > 0:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+The gem5 side of SimPoint-style sampled simulation (see gem5_tools.simpoint_pipeline).
+
+The single-core config scripts (cpu_benchmark.py, cache_benchmark.py) run one
+step of the pipeline per option:
+- `--bbv_interval`: run the workload on an ATOMIC core and write the basic block
+  vector of every interval of that many instructions to simpoint.bb.gz.
+- `--take_simpoint_checkpoints`: run the workload on an ATOMIC core and take a
+  checkpoint shortly before every simulation point of a simpoints.json (written
+  by the pipeline), next to that file.
+- `--restore_checkpoint` with `--simpoint_interval_insts`: restore one of those
+  checkpoints on the detailed core, warm up for `--warmup_insts` instructions,
+  reset the statistics, measure one interval, dump the statistics and exit.
+
+Like gem5_tools.windowed_simulation, this module runs inside gem5's interpreter
+and imports gem5 only where it is used.
+"""
+
+from argparse import Namespace
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Self
+
+from gem5_tools.windowed_simulation import schedule_window_end
+
+
+# Written by gem5's SimPoint probe into the output directory.
+BASIC_BLOCK_VECTOR_FILE_NAME: str = "simpoint.bb.gz"
+
+SIMPOINTS_FILE_NAME: str = "simpoints.json"
+
+
+def get_simpoint_checkpoint_name(checkpoint_instructions: int) -> str:
+    return f"cpt.{checkpoint_instructions}"
+
+
+@dataclass(frozen=True, kw_only=True)
+class SimPoint:
+    interval: int
+    # Fraction of the workload's intervals this one represents.
+    weight: float
+    # The checkpoint is taken after this many instructions, and `warmup_instructions` later the interval starts.
+    checkpoint_instructions: int
+    warmup_instructions: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class SimPointSelection:
+    workload_name: str
+    interval_instructions: int
+    number_of_intervals: int
+    simpoints: List[SimPoint]
+
+    @classmethod
+    def load(cls, simpoints_file_path: Path) -> Self:
+        selection: Dict = json.loads(simpoints_file_path.read_text(encoding="utf-8"))
+
+        return cls(
+            workload_name=selection["workload_name"],
+            interval_instructions=selection["interval_instructions"],
+            number_of_intervals=selection["number_of_intervals"],
+            simpoints=[SimPoint(**simpoint) for simpoint in selection["simpoints"]]
+        )
+
+    def save(self, simpoints_file_path: Path) -> None:
+        selection: Dict = {
+            "workload_name": self.workload_name,
+            "interval_instructions": self.interval_instructions,
+            "number_of_intervals": self.number_of_intervals,
+            "simpoints": [
+                {
+                    "interval": simpoint.interval,
+                    "weight": simpoint.weight,
+                    "checkpoint_instructions": simpoint.checkpoint_instructions,
+                    "warmup_instructions": simpoint.warmup_instructions,
+                }
+                for simpoint in self.simpoints
+            ],
+        }
+
+        temporary_file_path = simpoints_file_path.with_suffix(".json.tmp")
+        temporary_file_path.write_text(json.dumps(selection, indent=2), encoding="utf-8")
+        os.replace(temporary_file_path, simpoints_file_path)
+
+    def get_checkpoint_positions(self) -> List[int]:
+        return sorted({simpoint.checkpoint_instructions for simpoint in self.simpoints})
+
+
+def profile_basic_block_vectors(board, arguments: Namespace) -> None:
+    """
+    Runs the workload to completion with gem5's SimPoint probe on the first core,
+    which writes a basic block vector every `--bbv_interval` instructions.
+    """
+
+    from gem5.simulate.simulator import Simulator
+
+    board.get_processor().get_cores()[0].core.addSimPointProbe(arguments.bbv_interval)
+    Simulator(board=board).run()
+
+
+def take_simpoint_checkpoints(board, arguments: Namespace) -> None:
+    """
+    Runs the workload up to the last simulation point of `--take_simpoint_checkpoints`,
+    checkpointing at every position it lists. Exits with an error if the workload ends first.
+    """
+
+    import m5
+    from gem5.simulate.exit_event import ExitEvent
+    from gem5.simulate.simulator import Simulator
+
+    simpoints_file_path = Path(arguments.take_simpoint_checkpoints)
+    checkpoint_positions: List[int] = SimPointSelection.load(simpoints_file_path).get_checkpoint_positions()
+
+    number_of_checkpoints: int = 0
+
+    def on_checkpoint_position():
+        nonlocal number_of_checkpoints
+
+        while True:
+            checkpoint_position: int = checkpoint_positions[number_of_checkpoints]
+            checkpoint_path = simpoints_file_path.parent.joinpath(get_simpoint_checkpoint_name(checkpoint_position))
+
+            m5.checkpoint(checkpoint_path.as_posix())
+            number_of_checkpoints += 1
+            print(f"Checkpoint {number_of_checkpoints} of {len(checkpoint_positions)} at instruction {checkpoint_position}")
+
+            if number_of_checkpoints == len(checkpoint_positions):
+                yield True
+            else:
+                schedule_window_end(board, checkpoint_positions[number_of_checkpoints] - checkpoint_position, instantiated=True)
+                yield False
+
+    schedule_window_end(board, checkpoint_positions[0], instantiated=False)
+    Simulator(board=board, on_exit_event={ExitEvent.MAX_INSTS: on_checkpoint_position()}).run()
+
+    if number_of_checkpoints < len(checkpoint_positions):
+        print(f"The workload exited after {number_of_checkpoints} of {len(checkpoint_positions)} checkpoints.")
+        exit(1)
+
+
+def build_simpoint_interval_exit_handlers(board, arguments: Namespace) -> Dict:
+    """
+    `Simulator` exit event handlers that, after restoring a simulation point's checkpoint,
+    reset the statistics after `--warmup_insts` instructions and end the simulation
+    `--simpoint_interval_insts` instructions later with a statistics dump.
+    """
+
+    import m5
+    from gem5.simulate.exit_event import ExitEvent
+
+    warmed_up: bool = arguments.warmup_insts <= 0
+
+    def on_max_instructions():
+        nonlocal warmed_up
+
+        while True:
+            if not warmed_up:
+                print(f"Warmup ends at tick {m5.curTick()}: statistics reset")
+                m5.stats.reset()
+                warmed_up = True
+
+                schedule_window_end(board, arguments.simpoint_interval_insts, instantiated=True)
+                yield False
+            else:
+                print(f"Simulation point ends at tick {m5.curTick()}: statistics dumped")
+                m5.stats.dump()
+                yield True
+
+    schedule_window_end(
+        board,
+        arguments.simpoint_interval_insts if warmed_up else arguments.warmup_insts,
+        instantiated=False
+    )
+
+    return {ExitEvent.MAX_INSTS: on_max_instructions()}
@@ -0,0 +1,160 @@
+"""
+Decoding of indexed statistic families and distributions into NumPy arrays.
+
+gem5 names per-core/per-unit statistics with an index inside the name, e.g.
+`board.processor.cores3.core.cpi` or `system.cpu3.CUs7.vALUInsts`. Such a family
+is written as a template with a `{}` placeholder for the index
+(`board.processor.cores{}.core.cpi`) and decoded into one array ordered by index,
+so aggregates become vectorized NumPy expressions instead of per-index lookups.
+"""
+
+from dataclasses import dataclass
+import re
+from typing import Dict, List, Optional, Self, Sequence, Tuple
+
+import numpy as np
+
+from gem5_tools.stats_index import DISTRIBUTION_ROW_MARKER, StatsIndex, parse_float_token
+
+
+INDEX_PLACEHOLDER: str = "{}"
+
+# Non-compact distributions print one row per bucket, e.g. "...delayHistogram::8-9".
+BUCKET_RANGE_REGEX: re.Pattern = re.compile(r"(-?\d+)-(-?\d+)")
+
+
+def build_family_regex(name_template: str) -> re.Pattern:
+    if name_template.count(INDEX_PLACEHOLDER) != 1:
+        raise ValueError(f"Statistic family template needs exactly one \"{INDEX_PLACEHOLDER}\": {name_template}")
+
+    prefix, suffix = name_template.split(INDEX_PLACEHOLDER)
+    return re.compile(re.escape(prefix) + r"(\d+)" + re.escape(suffix))
+
+
+def get_indexed_vectors(
+    stats_index: StatsIndex,
+    name_templates: Sequence[str],
+    expected_length: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Decodes every family in `name_templates` with a single pass over the statistic
+    names. Each array is ordered by index and must cover 0..N-1 without gaps (and
+    have `expected_length` entries, if given). Non-numeric values become NaN.
+    """
+
+    family_regexes: List[Tuple[str, str, re.Pattern]] = [
+        (name_template, name_template.split(INDEX_PLACEHOLDER, 1)[0], build_family_regex(name_template))
+        for name_template in name_templates
+    ]
+
+    found_values: Dict[str, Dict[int, str]] = {name_template: {} for name_template in name_templates}
+
+    for statistic_name, raw_value in stats_index.raw_values.items():
+        for name_template, family_prefix, family_regex in family_regexes:
+            if not statistic_name.startswith(family_prefix):
+                continue
+
+            matched_name = family_regex.fullmatch(statistic_name)
+            if matched_name is not None:
+                found_values[name_template][int(matched_name.group(1))] = raw_value
+                break
+
+    vectors: Dict[str, np.ndarray] = {}
+
+    for name_template, raw_values_by_index in found_values.items():
+        length: int = len(raw_values_by_index) if expected_length is None else expected_length
+
+        if sorted(raw_values_by_index) != list(range(length)):
+            raise ValueError(
+                f"Statistic family {name_template} has indices {sorted(raw_values_by_index)}, expected 0..{length - 1}"
+            )
+
+        vectors[name_template] = np.array(
+            [parse_float_token(raw_values_by_index[index]) for index in range(length)],
+            dtype=np.float64
+        )
+
+    return vectors
+
+
+def get_indexed_vector(
+    stats_index: StatsIndex,
+    name_template: str,
+    expected_length: Optional[int] = None,
+) -> np.ndarray:
+    return get_indexed_vectors(stats_index, [name_template], expected_length)[name_template]
+
+
+def parse_compact_bucket_counts(raw_row: str) -> np.ndarray:
+    """
+    Bucket counts of a compact distribution row ("| count pct cum | count pct cum | ...").
+    """
+
+    return np.array(
+        [
+            float(column.split(None, 1)[0])
+            for column in raw_row.split(DISTRIBUTION_ROW_MARKER)
+            if column.strip()
+        ],
+        dtype=np.float64
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class Distribution:
+    """
+    A gem5 distribution/histogram: bucket lower edges and counts plus the summary
+    fields gem5 prints next to them (NaN where a field is not printed).
+    """
+
+    bucket_edges: np.ndarray
+    bucket_counts: np.ndarray
+    samples: float
+    mean: float
+    stdev: float
+    underflows: float
+    overflows: float
+
+    @classmethod
+    def from_stats_index(cls, stats_index: StatsIndex, statistic_name: str) -> Self:
+        substatistics: Dict[str, str] = stats_index.get_substatistics(statistic_name)
+
+        def get_field(field_name: str) -> float:
+            raw_value: Optional[str] = substatistics.get(field_name)
+            return parse_float_token(raw_value) if raw_value is not None else float("nan")
+
+        compact_row: Optional[str] = stats_index.raw_values.get(statistic_name)
+
+        if compact_row is not None and compact_row.startswith(DISTRIBUTION_ROW_MARKER):
+            bucket_counts = parse_compact_bucket_counts(compact_row)
+
+            bucket_size: float = get_field("bucket_size")
+            min_bucket: float = get_field("min_bucket")
+            if np.isnan(min_bucket):
+                # Ruby histograms do not print a minimum, their buckets start at 0.
+                min_bucket = 0.0
+
+            bucket_edges = min_bucket + bucket_size * np.arange(len(bucket_counts), dtype=np.float64)
+        else:
+            bucket_rows: List[Tuple[float, float]] = []
+
+            for sub_name, raw_value in substatistics.items():
+                matched_range = BUCKET_RANGE_REGEX.fullmatch(sub_name)
+                if matched_range is not None:
+                    bucket_rows.append((float(matched_range.group(1)), parse_float_token(raw_value)))
+
+            bucket_rows.sort()
+
+            bucket_edges = np.array([edge for edge, _ in bucket_rows], dtype=np.float64)
+            bucket_counts = np.array([count for _, count in bucket_rows], dtype=np.float64)
+
+        return cls(
+            bucket_edges=bucket_edges,
+            bucket_counts=bucket_counts,
+            samples=get_field("samples"),
+            mean=get_field("mean"),
+            stdev=get_field("stdev"),
+            underflows=get_field("underflows"),
+            overflows=get_field("overflows")
+        )
+
@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Self
+
+from gem5_tools.compressed_stats import open_stats_text
+
+
+# gem5 separates vector/distribution sub-statistics from their parent name with "::",
+# e.g. "board.cache_hierarchy.l2_cache.overallMisses::total".
+SUBSTATISTIC_SEPARATOR: str = "::"
+
+# Distributions printed in compact form put every bucket on the parent's line, e.g.
+# "system.cpu3.loadLatencyDist  |  0  0.00%  0.00% |  709  8.65%  8.65% | ...  # description".
+DISTRIBUTION_ROW_MARKER: str = "|"
+
+
+def extract_raw_value(parts: List[str]) -> str:
+    """
+    The raw value of a line split as `line.split(None, 2)`: the first value token,
+    or for a compact distribution row all bucket columns (without the description).
+    """
+
+    if parts[1] != DISTRIBUTION_ROW_MARKER or len(parts) < 3:
+        return parts[1]
+
+    return DISTRIBUTION_ROW_MARKER + " " + parts[2].split("#", 1)[0].rstrip()
+
+
+def parse_float_token(raw_value: str) -> float:
+    """
+    Like `float`, but non-numeric tokens (e.g. a compact distribution row) become NaN.
+    """
+
+    try:
+        return float(raw_value)
+    except ValueError:
+        return float("nan")
+
+
+@dataclass(frozen=True)
+class StatsIndex:
+    """
+    A name -> raw value index of a single stats.txt (or a single dump block of it).
+
+    The file is tokenized once, after which every lookup is a dictionary access
+    instead of a rescan of all lines. Values are kept as the raw text tokens and
+    converted on lookup, so `int`/`float` (including `nan`) behave exactly as they
+    did with the per-key line scans.
+
+    If a statistic appears more than once (e.g. a file with several dumps), the
+    first occurrence wins, again matching the old line-scanning behaviour.
+    """
+
+    raw_values: Dict[str, str]
+
+    # Lazily built on first `get_substatistics` call: parent name -> {sub-name -> raw value}.
+    _substatistics: Dict[str, Dict[str, str]] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> Self:
+        raw_values: Dict[str, str] = {}
+
+        for line in lines:
+            if not line or line[0] == "-":
+                continue
+
+            parts = line.split(None, 2)
+            if len(parts) < 2:
+                continue
+
+            # setdefault keeps the first occurrence of a repeated statistic.
+            raw_values.setdefault(parts[0], extract_raw_value(parts))
+
+        return cls(raw_values=raw_values)
+
+    @classmethod
+    def from_text(cls, stats_txt_content: str) -> Self:
+        return cls.from_lines(stats_txt_content.splitlines())
+
+    @classmethod
+    def from_file_path(cls, stats_txt_path: Path) -> Self:
+        if not stats_txt_path.is_file():
+            raise FileNotFoundError(f"No stats.txt at {stats_txt_path}!")
+
+        # Also streams stats.txt.zst / stats.txt.gz, decompressing on the fly.
+        with open_stats_text(stats_txt_path) as stats_file:
+            return cls.from_lines(stats_file)
+
+    def __contains__(self, statistic_name: str) -> bool:
+        return statistic_name in self.raw_values
+
+    def __len__(self) -> int:
+        return len(self.raw_values)
+
+    def get_raw(self, statistic_name: str) -> str:
+        raw_value: Optional[str] = self.raw_values.get(statistic_name)
+        if raw_value is None:
+            raise ValueError(f"No such statistic: {statistic_name}")
+
+        return raw_value
+
+    def get_int(self, statistic_name: str) -> int:
+        return int(self.get_raw(statistic_name))
+
+    def get_float(self, statistic_name: str) -> float:
+        return float(self.get_raw(statistic_name))
+
+    def get_substatistics(self, statistic_name: str) -> Dict[str, str]:
+        """
+        Returns all `<statistic_name>::<sub-name>` entries (vector elements, `total`,
+        distribution fields, ...) as a sub-name -> raw value mapping.
+        """
+
+        if not self._substatistics and self.raw_values:
+            for full_name, raw_value in self.raw_values.items():
+                parent_name, separator, sub_name = full_name.partition(SUBSTATISTIC_SEPARATOR)
+                if separator:
+                    self._substatistics.setdefault(parent_name, {})[sub_name] = raw_value
+
+        substatistics: Optional[Dict[str, str]] = self._substatistics.get(statistic_name)
+        if substatistics is None:
+            raise ValueError(f"No such vector statistic: {statistic_name}")
+
+        return substatistics
@@ -0,0 +1,319 @@
+"""
+Binary sidecar cache of a parsed stats.txt ("stats.txt.idx" next to the file).
+
+For every dump block the sidecar stores the statistic names and raw value tokens
+as NUL-separated blobs. It is keyed by the stats.txt size, mtime and content
+hash, and is memory-mapped on load, so a cached file is turned back into
+`StatsIndex`es with a few C-level splits instead of tokenizing every text line
+again.
+
+Remove stale (or all) sidecars under a directory with:
+
+> python -m gem5_tools.stats_sidecar --root-directory-path . [--all]
+"""
+
+from argparse import ArgumentParser
+import hashlib
+import io
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import List, Optional, Self, Tuple
+
+from gem5_tools.compressed_stats import read_stats_bytes
+from gem5_tools.dump_index import find_dump_blocks
+from gem5_tools.stats_index import StatsIndex
+
+
+# Written next to the stats.txt, e.g. "stats.txt.idx" or "stats.txt.zst.idx".
+STATS_SIDECAR_SUFFIX: str = ".idx"
+
+# The last digit is the format version.
+SIDECAR_MAGIC: bytes = b"G5STIDX1"
+
+# magic, stats.txt size, stats.txt mtime (ns), number of dumps, sha256 of stats.txt
+HEADER_FORMAT: str = "<8sQqI32s"
+
+# number of entries, names offset, names length, raw tokens offset, raw tokens length
+DUMP_ENTRY_FORMAT: str = "<IQQQQ"
+
+BLOB_SEPARATOR: str = "\0"
+
+HASH_CHUNK_SIZE: int = 1024 * 1024
+
+
+def hash_file_contents(file_path: Path) -> str:
+    content_hash = hashlib.sha256()
+
+    with file_path.open(mode="rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            content_hash.update(chunk)
+
+    return content_hash.hexdigest()
+
+
+def index_all_dumps(stats_txt_path: Path) -> List[StatsIndex]:
+    """
+    Tokenizes the file into one `StatsIndex` per dump block. A file without any
+    dump markers is treated as a single dump.
+    """
+
+    # Read (and, for .zst/.gz archives, decompress) once, then split in memory.
+    stats_txt_bytes: bytes = read_stats_bytes(stats_txt_path)
+    dump_blocks = find_dump_blocks(io.BytesIO(stats_txt_bytes))
+
+    if len(dump_blocks) == 0:
+        return [StatsIndex.from_text(stats_txt_bytes.decode("utf-8"))]
+
+    return [
+        StatsIndex.from_text(stats_txt_bytes[block.begin_offset:block.end_offset].decode("utf-8"))
+        for block in dump_blocks
+    ]
+
+
+def sidecar_path_for(stats_txt_path: Path) -> Path:
+    return stats_txt_path.with_name(stats_txt_path.name + STATS_SIDECAR_SUFFIX)
+
+
+def stats_txt_path_for(sidecar_path: Path) -> Path:
+    return sidecar_path.with_name(sidecar_path.name.removesuffix(STATS_SIDECAR_SUFFIX))
+
+
+def write_sidecar(
+    stats_txt_path: Path,
+    dump_indexes: List[StatsIndex],
+    file_size: int,
+    file_mtime_ns: int,
+    content_hash: str,
+) -> None:
+    header_size: int = struct.calcsize(HEADER_FORMAT)
+    dump_entry_size: int = struct.calcsize(DUMP_ENTRY_FORMAT)
+
+    body = bytearray()
+    dump_entries: List[bytes] = []
+
+    body_start_offset: int = header_size + dump_entry_size * len(dump_indexes)
+
+    for dump_index in dump_indexes:
+        names_blob: bytes = BLOB_SEPARATOR.join(dump_index.raw_values.keys()).encode("utf-8")
+        raw_blob: bytes = BLOB_SEPARATOR.join(dump_index.raw_values.values()).encode("utf-8")
+
+        names_offset: int = body_start_offset + len(body)
+        body += names_blob
+
+        raw_offset: int = body_start_offset + len(body)
+        body += raw_blob
+
+        dump_entries.append(struct.pack(
+            DUMP_ENTRY_FORMAT,
+            len(dump_index),
+            names_offset,
+            len(names_blob),
+            raw_offset,
+            len(raw_blob)
+        ))
+
+    sidecar_path = sidecar_path_for(stats_txt_path)
+    temporary_sidecar_path = sidecar_path.with_name(sidecar_path.name + f".{os.getpid()}.tmp")
+
+    with temporary_sidecar_path.open(mode="wb") as sidecar_file:
+        sidecar_file.write(struct.pack(HEADER_FORMAT, SIDECAR_MAGIC, file_size, file_mtime_ns, len(dump_indexes), bytes.fromhex(content_hash)))
+        sidecar_file.write(b"".join(dump_entries))
+        sidecar_file.write(body)
+
+    # Readers in other processes only ever see a complete sidecar.
+    os.replace(temporary_sidecar_path, sidecar_path)
+
+
+class StatsSidecar:
+    def __init__(self, sidecar_path: Path, mapped_file: mmap.mmap):
+        self.sidecar_path = sidecar_path
+        self.mapped_file = mapped_file
+
+        magic, self.file_size, self.file_mtime_ns, number_of_dumps, content_digest = \
+            struct.unpack_from(HEADER_FORMAT, mapped_file, 0)
+
+        self.content_hash: str = content_digest.hex()
+
+        if magic != SIDECAR_MAGIC:
+            raise ValueError(f"Not a stats sidecar: {sidecar_path}")
+
+        header_size: int = struct.calcsize(HEADER_FORMAT)
+        dump_entry_size: int = struct.calcsize(DUMP_ENTRY_FORMAT)
+
+        self.dump_entries: List[Tuple[int, int, int, int, int]] = [
+            struct.unpack_from(DUMP_ENTRY_FORMAT, mapped_file, header_size + dump_number * dump_entry_size)
+            for dump_number in range(number_of_dumps)
+        ]
+
+    @classmethod
+    def open(cls, sidecar_path: Path) -> Optional[Self]:
+        """
+        Maps the sidecar, or returns `None` if it is missing, empty or not a sidecar.
+        """
+
+        try:
+            with sidecar_path.open(mode="rb") as sidecar_file:
+                mapped_file = mmap.mmap(sidecar_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            return cls(sidecar_path, mapped_file)
+        except (ValueError, struct.error):
+            mapped_file.close()
+            return None
+
+    def close(self) -> None:
+        self.mapped_file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.dump_entries)
+
+    def matches(self, stats_txt_path: Path, content_hash: Optional[str] = None) -> bool:
+        """
+        True if the sidecar was written for the current contents of `stats_txt_path`:
+        same size and mtime, or (e.g. after a copy that did not keep mtimes) same hash.
+        """
+
+        file_stat = stats_txt_path.stat()
+        if file_stat.st_size != self.file_size:
+            return False
+
+        if file_stat.st_mtime_ns == self.file_mtime_ns:
+            return True
+
+        if content_hash is None:
+            content_hash = hash_file_contents(stats_txt_path)
+
+        return content_hash == self.content_hash
+
+    def _read_blob(self, offset: int, length: int) -> List[str]:
+        if length == 0:
+            return []
+
+        return self.mapped_file[offset:offset + length].decode("utf-8").split(BLOB_SEPARATOR)
+
+    def get_names(self, dump_number: int) -> List[str]:
+        _, names_offset, names_length, _, _ = self.dump_entries[dump_number]
+        return self._read_blob(names_offset, names_length)
+
+    def index_dump(self, dump_number: int) -> StatsIndex:
+        _, names_offset, names_length, raw_offset, raw_length = self.dump_entries[dump_number]
+
+        return StatsIndex(raw_values=dict(zip(
+            self._read_blob(names_offset, names_length),
+            self._read_blob(raw_offset, raw_length)
+        )))
+
+    def index_all_dumps(self) -> List[StatsIndex]:
+        return [self.index_dump(dump_number) for dump_number in range(len(self))]
+
+
+def load_or_build_dump_indexes(
+    stats_txt_path: Path,
+    content_hash: Optional[str] = None,
+    write_sidecar_file: bool = True,
+) -> List[StatsIndex]:
+    """
+    Returns one `StatsIndex` per dump, from the sidecar if it is still valid,
+    otherwise by tokenizing the file (and writing a fresh sidecar).
+    """
+
+    sidecar = StatsSidecar.open(sidecar_path_for(stats_txt_path))
+    if sidecar is not None:
+        with sidecar:
+            if sidecar.matches(stats_txt_path, content_hash):
+                return sidecar.index_all_dumps()
+
+    file_stat = stats_txt_path.stat()
+    dump_indexes = index_all_dumps(stats_txt_path)
+
+    if write_sidecar_file:
+        try:
+            write_sidecar(
+                stats_txt_path,
+                dump_indexes,
+                file_size=file_stat.st_size,
+                file_mtime_ns=file_stat.st_mtime_ns,
+                content_hash=content_hash if content_hash is not None else hash_file_contents(stats_txt_path)
+            )
+        except OSError:
+            # Result trees are sometimes read-only (e.g. copied off the cluster);
+            # the sidecar is only an optimization.
+            pass
+
+    return dump_indexes
+
+
+def find_sidecar_files(root_directory_path: Path) -> List[Path]:
+    sidecar_paths: List[Path] = []
+
+    for directory_path, _, file_names in os.walk(root_directory_path):
+        for file_name in file_names:
+            if file_name.startswith("stats.txt") and file_name.endswith(STATS_SIDECAR_SUFFIX):
+                sidecar_paths.append(Path(directory_path).joinpath(file_name))
+
+    return sorted(sidecar_paths)
+
+
+def is_sidecar_stale(sidecar_path: Path) -> bool:
+    stats_txt_path = stats_txt_path_for(sidecar_path)
+    if not stats_txt_path.is_file():
+        return True
+
+    sidecar = StatsSidecar.open(sidecar_path)
+    if sidecar is None:
+        return True
+
+    with sidecar:
+        return not sidecar.matches(stats_txt_path)
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--root-directory-path",
+        dest="root_directory_path",
+        default="."
+    )
+
+    argument_parser.add_argument(
+        "--all",
+        dest="remove_all",
+        action="store_true",
+        help="Remove every sidecar, not just stale ones (changed or deleted stats.txt)."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    root_directory_path = Path(str(arguments.root_directory_path))
+    if not root_directory_path.is_dir():
+        print(f"Not a directory: {root_directory_path}")
+        exit(1)
+
+    removed_sidecars: int = 0
+    removed_bytes: int = 0
+    kept_sidecars: int = 0
+
+    for sidecar_path in find_sidecar_files(root_directory_path):
+        if arguments.remove_all or is_sidecar_stale(sidecar_path):
+            removed_bytes += sidecar_path.stat().st_size
+            sidecar_path.unlink()
+            removed_sidecars += 1
+        else:
+            kept_sidecars += 1
+
+    print(f"Removed {removed_sidecars} sidecars ({removed_bytes / (1024 * 1024):.1f} MiB), kept {kept_sidecars}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,672 @@
+"""
+Persistent ledger of the jobs of a sweep, with resume and failure triage.
+
+The queue scripts register every configuration of a run in
+`sweep-ledger.sqlite` inside the run directory: its job script, the job ID it
+was submitted as (or that it was served from the result cache), and where its
+logs and runtime record (see gem5_tools.runtime_model) are. Refreshing the
+ledger works out each job's state from its runtime record, stats.txt and
+`sacct`. A failed job is classified as a timeout, out of memory, gem5 panic or
+fatal error, cancelled, or another error, and the tail of its log is kept.
+
+Show the state of a run, or resubmit only its failed and never-submitted
+configurations (from the directory the sweep was queued from), with:
+
+> python -m gem5_tools.sweep_ledger --run-directory-path <run directory> [--watch] [--resume]
+
+Without `sacct`, a SLURM job that has no outcome yet (and no recognizable failure
+in its log) stays "submitted", since it may still be queued or running; once
+none can be, `--include-unknown` counts such jobs as failed.
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass, replace
+import json
+import os
+from pathlib import Path
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional, Self, Tuple, Union
+
+from gem5_tools.async_submission import DEFAULT_POLL_INTERVAL_SECONDS, watch_jobs
+from gem5_tools.compressed_stats import STATS_TXT_FILE_NAMES, find_stats_txt_path
+from gem5_tools.executors import (
+    JobExecutor,
+    add_executor_arguments,
+    create_executor,
+    format_slurm_time_limit,
+    parse_sbatch_directives,
+    parse_slurm_time_limit,
+)
+from gem5_tools.job_array import JobArray
+from gem5_tools.job_packing import JobPacker
+from gem5_tools.runtime_model import GEM5_RUNTIME_RECORD_FILE_NAME, RUNTIME_RECORD_SUFFIX, query_sacct
+
+
+SWEEP_LEDGER_FILE_NAME: str = "sweep-ledger.sqlite"
+
+# Registered but not submitted (yet), e.g. the queue script stopped half-way.
+STATE_QUEUED: str = "queued"
+STATE_SUBMITTED: str = "submitted"
+STATE_PENDING: str = "pending"
+STATE_RUNNING: str = "running"
+STATE_COMPLETED: str = "completed"
+STATE_CACHED: str = "cached"
+STATE_FAILED: str = "failed"
+
+# States whose configurations need no further work.
+FINISHED_STATES: List[str] = [STATE_COMPLETED, STATE_CACHED]
+
+FAILURE_TIMEOUT: str = "timeout"
+FAILURE_OUT_OF_MEMORY: str = "oom"
+FAILURE_GEM5_PANIC: str = "gem5_panic"
+FAILURE_GEM5_FATAL: str = "gem5_fatal"
+FAILURE_CANCELLED: str = "cancelled"
+FAILURE_ERROR: str = "error"
+# No outcome and no log: the job never ran or left no trace.
+FAILURE_LOST: str = "lost"
+
+SACCT_ACTIVE_STATES: Dict[str, str] = {
+    "PENDING": STATE_PENDING,
+    "REQUEUED": STATE_PENDING,
+    "CONFIGURING": STATE_RUNNING,
+    "RUNNING": STATE_RUNNING,
+    "COMPLETING": STATE_RUNNING,
+    "SUSPENDED": STATE_RUNNING,
+}
+
+SACCT_FAILURE_CLASSES: Dict[str, str] = {
+    "TIMEOUT": FAILURE_TIMEOUT,
+    "DEADLINE": FAILURE_TIMEOUT,
+    "OUT_OF_MEMORY": FAILURE_OUT_OF_MEMORY,
+    "CANCELLED": FAILURE_CANCELLED,
+    "PREEMPTED": FAILURE_CANCELLED,
+}
+
+# Checked in this order against the tail of a failed job's logs.
+LOG_FAILURE_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    (FAILURE_TIMEOUT, re.compile(r"CANCELLED .*DUE TO TIME LIMIT")),
+    (FAILURE_OUT_OF_MEMORY, re.compile(r"oom[-_ ]kill|[Oo]ut [Oo]f [Mm]emory|std::bad_alloc|MemoryError")),
+    (FAILURE_GEM5_PANIC, re.compile(r"(^|\s)panic: ", re.MULTILINE)),
+    (FAILURE_GEM5_FATAL, re.compile(r"(^|\s)fatal: ", re.MULTILINE)),
+    (FAILURE_CANCELLED, re.compile(r"CANCELLED AT")),
+]
+
+RUNTIME_RECORD_PATH_REGEX: re.Pattern = re.compile(r"^cat > \"(.+" + re.escape(RUNTIME_RECORD_SUFFIX) + r")\"", re.MULTILINE)
+
+LOG_TAIL_LINES: int = 20
+LOG_TAIL_BYTES: int = 64 * 1024
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    configuration_key TEXT PRIMARY KEY,
+    configuration TEXT NOT NULL,
+    job_script_path TEXT,
+    output_log_path TEXT,
+    error_log_path TEXT,
+    runtime_record_path TEXT,
+    executor_kind TEXT,
+    job_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    failure_class TEXT,
+    exit_code INTEGER,
+    runtime_seconds REAL,
+    log_tail TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+ParameterValue = Union[str, int, float]
+
+
+def get_configuration_key(configuration: Dict[str, ParameterValue]) -> str:
+    return json.dumps(configuration, sort_keys=True)
+
+
+def read_log_tail(log_path: Optional[Path]) -> str:
+    if log_path is None or not log_path.is_file():
+        return ""
+
+    with log_path.open(mode="rb") as log_file:
+        log_file.seek(max(0, log_path.stat().st_size - LOG_TAIL_BYTES))
+        lines: List[str] = log_file.read().decode("utf-8", errors="replace").splitlines()
+
+    return "\n".join(lines[-LOG_TAIL_LINES:])
+
+
+def classify_failure(log_tail: str, sacct_state: Optional[str]) -> str:
+    if sacct_state is not None and sacct_state in SACCT_FAILURE_CLASSES:
+        return SACCT_FAILURE_CLASSES[sacct_state]
+
+    for failure_class, pattern in LOG_FAILURE_PATTERNS:
+        if pattern.search(log_tail):
+            return failure_class
+
+    return FAILURE_ERROR
+
+
+@dataclass(frozen=True, kw_only=True)
+class LedgerJob:
+    configuration: Dict[str, ParameterValue]
+    job_script_path: Optional[Path]
+    output_log_path: Optional[Path]
+    error_log_path: Optional[Path]
+    runtime_record_path: Optional[Path]
+    executor_kind: Optional[str]
+    job_id: Optional[str]
+    attempts: int
+    state: str
+    failure_class: Optional[str]
+    exit_code: Optional[int]
+    runtime_seconds: Optional[float]
+    log_tail: str
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> Self:
+        def optional_path(value: Optional[str]) -> Optional[Path]:
+            return Path(value) if value is not None else None
+
+        return cls(
+            configuration=json.loads(row["configuration"]),
+            job_script_path=optional_path(row["job_script_path"]),
+            output_log_path=optional_path(row["output_log_path"]),
+            error_log_path=optional_path(row["error_log_path"]),
+            runtime_record_path=optional_path(row["runtime_record_path"]),
+            executor_kind=row["executor_kind"],
+            job_id=row["job_id"],
+            attempts=row["attempts"],
+            state=row["state"],
+            failure_class=row["failure_class"],
+            exit_code=row["exit_code"],
+            runtime_seconds=row["runtime_seconds"],
+            log_tail=row["log_tail"] or ""
+        )
+
+    def get_configuration_key(self) -> str:
+        return get_configuration_key(self.configuration)
+
+    def get_output_directory_path(self) -> Optional[Path]:
+        """
+        The gem5 output directory, for jobs that write their runtime record into it.
+        """
+
+        if self.runtime_record_path is None or self.runtime_record_path.name != GEM5_RUNTIME_RECORD_FILE_NAME:
+            return None
+
+        return self.runtime_record_path.parent
+
+    def read_log_tails(self) -> str:
+        log_tail: str = read_log_tail(self.output_log_path)
+        if self.error_log_path is not None and self.error_log_path != self.output_log_path:
+            log_tail = "\n".join(part for part in [log_tail, read_log_tail(self.error_log_path)] if part)
+
+        return log_tail
+
+    def has_logs(self) -> bool:
+        return any(
+            log_path is not None and log_path.is_file()
+            for log_path in [self.output_log_path, self.error_log_path]
+        )
+
+
+class SweepLedger:
+    def __init__(self, connection: sqlite3.Connection, ledger_path: Path):
+        self.connection = connection
+        self.ledger_path = ledger_path
+
+    @classmethod
+    def open(cls, run_directory_path: Path) -> Self:
+        ledger_path = run_directory_path.resolve().joinpath(SWEEP_LEDGER_FILE_NAME)
+
+        connection = sqlite3.connect(ledger_path.as_posix(), timeout=60)
+        connection.row_factory = sqlite3.Row
+        connection.executescript(SCHEMA)
+
+        with connection:
+            # Job scripts refer to config scripts and workloads relative to where the sweep was queued.
+            connection.execute(
+                "INSERT OR IGNORE INTO metadata (key, value) VALUES ('submission_directory_path', ?)",
+                (Path.cwd().as_posix(),)
+            )
+
+        return cls(connection, ledger_path)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def get_submission_directory_path(self) -> Path:
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = 'submission_directory_path'").fetchone()
+        return Path(row["value"])
+
+    def _upsert(self, job: LedgerJob) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO jobs "
+                "(configuration_key, configuration, job_script_path, output_log_path, error_log_path, "
+                "runtime_record_path, executor_kind, job_id, attempts, state, failure_class, exit_code, "
+                "runtime_seconds, log_tail, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.get_configuration_key(),
+                    json.dumps(job.configuration, sort_keys=True),
+                    *(
+                        path.as_posix() if path is not None else None
+                        for path in [job.job_script_path, job.output_log_path, job.error_log_path, job.runtime_record_path]
+                    ),
+                    job.executor_kind,
+                    job.job_id,
+                    job.attempts,
+                    job.state,
+                    job.failure_class,
+                    job.exit_code,
+                    job.runtime_seconds,
+                    job.log_tail,
+                    time.time()
+                )
+            )
+
+    def add_job(self, configuration: Dict[str, ParameterValue], job_script_file_path: Path) -> None:
+        """
+        Registers a configuration with the job script that simulates it (the log
+        and runtime record paths are read from the script).
+        """
+
+        job_script_file_path = job_script_file_path.resolve()
+        job_script: str = job_script_file_path.read_text(encoding="utf-8")
+        directives = parse_sbatch_directives(job_script)
+
+        output_log_path: Optional[Path] = Path(directives["output"]) if directives.get("output") else None
+        error_log_path: Optional[Path] = Path(directives["error"]) if directives.get("error") else output_log_path
+
+        matched_record_path = RUNTIME_RECORD_PATH_REGEX.search(job_script)
+
+        self._upsert(LedgerJob(
+            configuration=configuration,
+            job_script_path=job_script_file_path,
+            output_log_path=output_log_path,
+            error_log_path=error_log_path,
+            runtime_record_path=Path(matched_record_path.group(1)).resolve() if matched_record_path is not None else None,
+            executor_kind=None,
+            job_id=None,
+            attempts=0,
+            state=STATE_QUEUED,
+            failure_class=None,
+            exit_code=None,
+            runtime_seconds=None,
+            log_tail=""
+        ))
+
+    def add_cached_job(self, configuration: Dict[str, ParameterValue]) -> None:
+        self._upsert(LedgerJob(
+            configuration=configuration,
+            job_script_path=None,
+            output_log_path=None,
+            error_log_path=None,
+            runtime_record_path=None,
+            executor_kind=None,
+            job_id=None,
+            attempts=0,
+            state=STATE_CACHED,
+            failure_class=None,
+            exit_code=None,
+            runtime_seconds=None,
+            log_tail=""
+        ))
+
+    def mark_submitted(self, job_script_file_path: Path, job_id: Union[int, str], executor_kind: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET job_id = ?, executor_kind = ?, attempts = attempts + 1, state = ?, "
+                "failure_class = NULL, exit_code = NULL, runtime_seconds = NULL, log_tail = NULL, updated_at = ? "
+                "WHERE job_script_path = ?",
+                (str(job_id), executor_kind, STATE_SUBMITTED, time.time(), job_script_file_path.resolve().as_posix())
+            )
+
+    def load_jobs(self) -> List[LedgerJob]:
+        return [
+            LedgerJob.from_row(row)
+            for row in self.connection.execute("SELECT * FROM jobs ORDER BY configuration_key")
+        ]
+
+    def refresh(self) -> List[LedgerJob]:
+        """
+        Updates the state of every job that has not finished, returns all jobs.
+        """
+
+        for job in self.load_jobs():
+            if job.state in FINISHED_STATES or job.state == STATE_QUEUED:
+                continue
+
+            refreshed_job: LedgerJob = self._refresh_job(job)
+            if refreshed_job != job:
+                self._upsert(refreshed_job)
+
+        return self.load_jobs()
+
+    @staticmethod
+    def _refresh_job(job: LedgerJob) -> LedgerJob:
+        record: Optional[Dict] = None
+        if job.runtime_record_path is not None and job.runtime_record_path.is_file():
+            try:
+                record = json.loads(job.runtime_record_path.read_text(encoding="utf-8"))
+            except ValueError:
+                record = None
+
+        finished: bool = record is not None and record["job"]["state"] == "finished"
+        exit_code: Optional[int] = record.get("exit_code") if finished else None
+
+        output_directory_path: Optional[Path] = job.get_output_directory_path()
+        has_results: bool = output_directory_path is None or find_stats_txt_path(output_directory_path) is not None
+
+        if finished and exit_code == 0 and has_results:
+            return replace(
+                job,
+                state=STATE_COMPLETED,
+                failure_class=None,
+                exit_code=0,
+                runtime_seconds=record.get("wall_seconds"),
+                log_tail=""
+            )
+
+        sacct_state: Optional[str] = None
+        if job.executor_kind == "slurm" and job.job_id is not None:
+            sacct_accounting = query_sacct(job.job_id)
+            if sacct_accounting is not None:
+                sacct_state = sacct_accounting.state
+
+        if sacct_state in SACCT_ACTIVE_STATES:
+            return replace(job, state=SACCT_ACTIVE_STATES[sacct_state])
+
+        log_tail: str = job.read_log_tails()
+        failure_class: str = classify_failure(log_tail, sacct_state)
+
+        # A SLURM job without sacct, a finished record or a recognizable failure in its log may still be queued or running.
+        outcome_known: bool = finished \
+            or sacct_state is not None \
+            or job.executor_kind != "slurm" \
+            or failure_class != FAILURE_ERROR
+
+        if not outcome_known:
+            return replace(job, state=STATE_SUBMITTED, log_tail=log_tail)
+
+        if failure_class == FAILURE_ERROR and not finished and not job.has_logs():
+            failure_class = FAILURE_LOST
+
+        return replace(job, state=STATE_FAILED, failure_class=failure_class, exit_code=exit_code, log_tail=log_tail)
+
+    def mark_unknown_as_failed(self, job: LedgerJob) -> LedgerJob:
+        """
+        Takes a submitted job with no known outcome to have failed (see `--include-unknown`).
+        """
+
+        failure_class: str = classify_failure(job.log_tail, None) if job.has_logs() else FAILURE_LOST
+
+        failed_job: LedgerJob = replace(job, state=STATE_FAILED, failure_class=failure_class)
+        self._upsert(failed_job)
+
+        return failed_job
+
+
+def record_array_submission(sweep_ledger: SweepLedger, job_array: JobArray, array_job_id: Optional[int]) -> None:
+    """
+    Marks the tasks of a submitted `JobArray` with their `<array job>_<task>` IDs.
+    """
+
+    if array_job_id is None:
+        return
+
+    for task_id, task in enumerate(job_array.tasks):
+        sweep_ledger.mark_submitted(task.job_script_file_path, f"{array_job_id}_{task_id}", "slurm")
+
+
+def record_pack_submission(sweep_ledger: SweepLedger, job_packer: JobPacker, pack_job_ids: List[int]) -> None:
+    """
+    Marks the tasks of submitted `JobPacker` packs with the ID of their pack job.
+    """
+
+    for pack_job_id, task_ids in zip(pack_job_ids, job_packer.pack_task_ids):
+        for task_id in task_ids:
+            sweep_ledger.mark_submitted(job_packer.tasks[task_id].task.job_script_file_path, pack_job_id, "slurm")
+
+
+def record_async_submission(sweep_ledger: SweepLedger, job_ids: Dict[Path, int]) -> None:
+    """
+    Marks the job scripts an `AsyncSubmitter` submitted with their job IDs.
+    """
+
+    for job_script_file_path, job_id in job_ids.items():
+        sweep_ledger.mark_submitted(job_script_file_path, job_id, "slurm")
+
+
+def prepare_for_resubmission(
+    job: LedgerJob,
+    time_limit_factor: float,
+    memory: Optional[str],
+) -> None:
+    """
+    Removes the partial outputs of a failed job and, for a timeout or running out
+    of memory, raises the limit in its job script. It also drops the dependency on
+    the sweep's checkpoint jobs: those have finished by now, and SLURM forgets
+    finished jobs, which would make the dependency invalid.
+    """
+
+    if job.runtime_record_path is not None and job.runtime_record_path.is_file():
+        job.runtime_record_path.unlink()
+
+    output_directory_path: Optional[Path] = job.get_output_directory_path()
+    if output_directory_path is not None:
+        for file_name in STATS_TXT_FILE_NAMES:
+            stale_stats_path = output_directory_path.joinpath(file_name)
+            if stale_stats_path.is_file():
+                stale_stats_path.unlink()
+
+    job_script: str = job.job_script_path.read_text(encoding="utf-8")
+    job_script_lines: List[str] = [
+        line for line in job_script.splitlines()
+        if not line.startswith(("#SBATCH --dependency=", "#SBATCH --kill-on-invalid-dep="))
+    ]
+
+    if job.failure_class == FAILURE_TIMEOUT:
+        time_limit_seconds: Optional[float] = parse_slurm_time_limit(parse_sbatch_directives(job_script).get("time") or "")
+        if time_limit_seconds is not None:
+            job_script_lines = [
+                f"#SBATCH --time={format_slurm_time_limit(time_limit_seconds * time_limit_factor)}"
+                if line.startswith("#SBATCH --time=") else line
+                for line in job_script_lines
+            ]
+
+    if job.failure_class == FAILURE_OUT_OF_MEMORY and memory is not None:
+        job_script_lines = [line for line in job_script_lines if not line.startswith("#SBATCH --mem=")]
+        job_script_lines.insert(1, f"#SBATCH --mem={memory}")
+
+    job.job_script_path.write_text("\n".join(job_script_lines) + "\n", encoding="utf-8")
+
+
+def print_summary(jobs: List[LedgerJob], show_log_tails: bool) -> None:
+    counts: Dict[str, int] = {}
+    for job in jobs:
+        state: str = job.state if job.failure_class is None else f"{job.state} ({job.failure_class})"
+        counts[state] = counts.get(state, 0) + 1
+
+    print(f"{len(jobs)} configurations:")
+    for state, count in sorted(counts.items()):
+        print(f"  > {state}: {count}")
+
+    failed_jobs: List[LedgerJob] = [job for job in jobs if job.state == STATE_FAILED]
+    if len(failed_jobs) > 0:
+        print()
+        print("Failed:")
+
+    for job in failed_jobs:
+        print(f"  - {job.failure_class} after {job.attempts} attempts (job {job.job_id}): {get_configuration_key(job.configuration)}")
+
+        log_lines: List[str] = job.log_tail.splitlines()
+        for line in (log_lines if show_log_tails else log_lines[-3:]):
+            print(f"      | {line}")
+
+
+def resume(
+    sweep_ledger: SweepLedger,
+    jobs: List[LedgerJob],
+    executor: JobExecutor,
+    time_limit_factor: float,
+    memory: Optional[str],
+) -> int:
+    """
+    Resubmits the failed and never-submitted jobs, returns how many.
+    """
+
+    resubmitted_jobs: int = 0
+
+    for job in jobs:
+        if job.state not in [STATE_FAILED, STATE_QUEUED] or job.job_script_path is None:
+            continue
+
+        prepare_for_resubmission(job, time_limit_factor, memory)
+
+        job_id: int = executor.submit(job.job_script_path)
+        sweep_ledger.mark_submitted(job.job_script_path, job_id, executor.kind)
+
+        print(f"  > resubmitted {job.job_script_path.name} as job {job_id} (was: {job.failure_class or job.state})")
+        resubmitted_jobs += 1
+
+    return resubmitted_jobs
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--run-directory-path",
+        required=True,
+        dest="run_directory_path",
+        help=f"Directory of a queued run (containing {SWEEP_LEDGER_FILE_NAME})."
+    )
+
+    argument_parser.add_argument(
+        "--resume",
+        required=False,
+        action="store_true",
+        dest="resume",
+        help="Resubmit every failed or never-submitted configuration."
+    )
+
+    argument_parser.add_argument(
+        "--include-unknown",
+        required=False,
+        action="store_true",
+        dest="include_unknown",
+        help="Treat submitted jobs with no outcome, log or sacct record as lost (only when none can still be queued)."
+    )
+
+    argument_parser.add_argument(
+        "--time-limit-factor",
+        required=False,
+        type=float,
+        default=2.0,
+        dest="time_limit_factor",
+        help="With --resume, multiply the --time of jobs that timed out by this."
+    )
+
+    argument_parser.add_argument(
+        "--memory",
+        required=False,
+        default=None,
+        dest="memory",
+        help="With --resume, request this --mem (e.g. 16G) for jobs that ran out of memory."
+    )
+
+    argument_parser.add_argument(
+        "--show-log-tails",
+        required=False,
+        action="store_true",
+        dest="show_log_tails",
+        help=f"Print the last {LOG_TAIL_LINES} log lines of every failed job, not just three."
+    )
+
+    argument_parser.add_argument(
+        "--watch",
+        required=False,
+        action="store_true",
+        dest="watch",
+        help="First poll squeue/sacct, showing progress, until no SLURM job of the run is queued or running."
+    )
+
+    argument_parser.add_argument(
+        "--poll-interval",
+        required=False,
+        type=float,
+        default=DEFAULT_POLL_INTERVAL_SECONDS,
+        dest="poll_interval_seconds",
+        help="With --watch, seconds between status polls."
+    )
+
+    add_executor_arguments(argument_parser)
+
+    arguments = argument_parser.parse_args()
+
+    run_directory_path = Path(str(arguments.run_directory_path))
+    if not run_directory_path.joinpath(SWEEP_LEDGER_FILE_NAME).is_file():
+        print(f"No {SWEEP_LEDGER_FILE_NAME} in {run_directory_path}")
+        exit(1)
+
+    sweep_ledger = SweepLedger.open(run_directory_path)
+
+    jobs: List[LedgerJob] = sweep_ledger.refresh()
+
+    if arguments.watch:
+        watch_jobs(
+            [
+                job.job_id for job in jobs
+                if job.executor_kind == "slurm" and job.state in [STATE_SUBMITTED, STATE_PENDING, STATE_RUNNING]
+            ],
+            run_directory_path.name,
+            arguments.poll_interval_seconds
+        )
+
+        jobs = sweep_ledger.refresh()
+
+    if arguments.include_unknown:
+        jobs = [
+            sweep_ledger.mark_unknown_as_failed(job) if job.state == STATE_SUBMITTED else job
+            for job in jobs
+        ]
+
+    print_summary(jobs, arguments.show_log_tails)
+
+    if not arguments.resume:
+        sweep_ledger.close()
+        return
+
+    print()
+    print("Resuming:")
+
+    # The job scripts use paths relative to where the sweep was queued (sbatch runs them from there).
+    os.chdir(sweep_ledger.get_submission_directory_path())
+
+    executor: JobExecutor = create_executor(arguments)
+    resubmitted_jobs: int = resume(sweep_ledger, jobs, executor, arguments.time_limit_factor, arguments.memory)
+
+    print(f"  > {resubmitted_jobs} jobs resubmitted")
+
+    number_of_failed_jobs: int = executor.wait()
+
+    if executor.kind == "local":
+        print()
+        print_summary(sweep_ledger.refresh(), arguments.show_log_tails)
+
+    sweep_ledger.close()
+
+    if number_of_failed_jobs > 0:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
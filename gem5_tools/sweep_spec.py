@@ -0,0 +1,1234 @@
+"""
+Declarative sweep specifications for the gem5 config scripts.
+
+Instead of nested loops over hard-coded lists, a sweep spec (TOML, or YAML
+with PyYAML installed) describes the design space of one gem5 entry point
+(cache_benchmark.py, cpu_benchmark.py, smp_benchmark.py, ruby_benchmark.py,
+network_benchmark.py, ...):
+
+    name = "cache-sizes"
+    config_script = "cache_benchmark.py"      # relative to the spec file
+    sampling = "latin-hypercube"              # "cartesian" (default), "random" or "latin-hypercube"
+    points = 12                               # point budget of random and latin-hypercube sampling
+    seed = 1
+    constraints = ["l1_size < l2_size"]
+    workloads = ["../workload/MatMult/mat_mult{mult_version}.bin"]
+
+    [parameters]
+    l1_size = ["1 KiB", "2 KiB", "4 KiB", "8 KiB"]
+    l2_size = { start = 32, stop = 512, factor = 2, unit = " KiB" }
+    l1_assoc = 16                             # a single value is fixed
+
+    [[zip]]                                   # varied together instead of crossed
+    l1_assoc = [2, 4, 8]
+    l2_assoc = [4, 8, 16]
+
+Every parameter is passed to the config script as `--<name>=<value>` (`true`
+as a bare flag) and must be one of its options. Constraints are expressions
+over the parameters (comparisons, `and`/`or`/`not`, arithmetic), in which sizes
+such as "32 KiB" are numbers of bytes. Random and latin-hypercube sampling pick
+`points` distinct configurations that satisfy the constraints, the latter
+spreading them evenly over the levels of every axis, so a large space is
+covered with far fewer simulations. Jobs run gem5 from `working_directory`
+(relative to the spec, by default the config script's directory), which is also
+what relative `workloads` and path-like parameter values are resolved against.
+Optional `time`, `gem5_build` (default "X86"), `container` (default
+"gem5.sif", in the gem5 workspace) and a `[slurm]` table of extra `#SBATCH`
+directives shape the jobs; `gem5_config_script` runs a config script of the gem5
+tree (e.g. "configs/example/apu_se.py") instead of `config_script`.
+
+Every configuration writes its outputs to `<run>/<results_directory>/<name>`,
+where `results_directory` defaults to "benchmarks" and `output_name` (e.g.
+"{num_cores}-cpus") formats the name from the parameters, by default the varied
+parameters and a short hash. Jobs record their runtimes under `runtime_sweep`
+(default "sweep_spec/<name>"), so specs of the same config script can share one
+runtime history. With `--checkpoint`, the configurations of each workload restore
+one shared checkpoint, taken first by a job they depend on (see gem5_tools.checkpoints).
+
+The queue scripts are thin wrappers that run this with their own spec. List the
+configurations of a spec, or write and submit their jobs, with:
+
+> python -m gem5_tools.sweep_spec --spec-path <spec> [--list] [--output-directory-path <directory>] [--set <name>=<value>]
+"""
+
+from argparse import ArgumentParser, Namespace
+import ast
+import base64
+from dataclasses import dataclass, replace
+import datetime
+import hashlib
+import itertools
+import json
+import math
+import os
+from pathlib import Path
+import random
+import re
+import shlex
+import string
+import tomllib
+from typing import Callable, Dict, List, Optional, Self, Set, Tuple, Union
+
+from gem5_tools.async_submission import AsyncSubmitter, add_async_submission_arguments
+from gem5_tools.checkpoints import (
+    WorkloadCheckpoint,
+    add_checkpoint_arguments,
+    build_checkpoint_shell_commands,
+    build_take_checkpoint_shell_commands
+)
+from gem5_tools.compressed_stats import COMPRESSION_METHODS, build_compression_shell_commands
+from gem5_tools.executors import JobExecutor, add_executor_arguments, create_executor
+from gem5_tools.job_array import JobArray
+from gem5_tools.job_packing import JobPacker
+from gem5_tools.result_cache import (
+    ResultCache,
+    ResultCacheKey,
+    build_result_cache_shell_commands,
+    get_default_result_cache,
+    get_gem5_workspace_path
+)
+from gem5_tools.runtime_model import (
+    GEM5_RUNTIME_RECORD_FILE_NAME,
+    RuntimePredictor,
+    build_runtime_record_shell_commands,
+    parse_size
+)
+from gem5_tools.scratch_staging import (
+    add_scratch_staging_arguments,
+    build_scratch_copy_back_shell_commands,
+    build_scratch_setup_shell_commands,
+    get_gem5_output_directory
+)
+from gem5_tools.sweep_ledger import SweepLedger, record_array_submission, record_async_submission, record_pack_submission
+
+
+ParameterValue = Union[str, int, float]
+
+SAMPLING_METHODS: List[str] = ["cartesian", "random", "latin-hypercube"]
+
+# Random and latin-hypercube sampling give up after this many rejected draws per requested point.
+MAXIMUM_DRAWS_PER_POINT: int = 100
+
+DEFAULT_TIME_LIMIT: str = "00:20:00"
+DEFAULT_GEM5_BUILD: str = "X86"
+DEFAULT_CONTAINER: str = "gem5.sif"
+DEFAULT_RESULTS_DIRECTORY: str = "benchmarks"
+
+# With --checkpoint: where the checkpoints are taken, and instructions that warm the caches after restoring.
+DEFAULT_CHECKPOINT_INSTS: int = 500_000
+DEFAULT_WARMUP_INSTS: int = 500_000
+
+SPEC_KEYS: List[str] = [
+    "name", "config_script", "gem5_config_script", "working_directory", "sampling", "points", "seed", "constraints",
+    "workloads", "time", "gem5_build", "container", "slurm", "output_name", "results_directory", "runtime_sweep",
+    "parameters", "zip",
+]
+
+# Operations allowed in constraints.
+CONSTRAINT_COMPARISONS: Dict[type, Callable] = {
+    ast.Eq: lambda left, right: left == right,
+    ast.NotEq: lambda left, right: left != right,
+    ast.Lt: lambda left, right: left < right,
+    ast.LtE: lambda left, right: left <= right,
+    ast.Gt: lambda left, right: left > right,
+    ast.GtE: lambda left, right: left >= right,
+    ast.In: lambda left, right: left in right,
+    ast.NotIn: lambda left, right: left not in right,
+}
+
+CONSTRAINT_BINARY_OPERATIONS: Dict[type, Callable] = {
+    ast.Add: lambda left, right: left + right,
+    ast.Sub: lambda left, right: left - right,
+    ast.Mult: lambda left, right: left * right,
+    ast.Div: lambda left, right: left / right,
+    ast.FloorDiv: lambda left, right: left // right,
+    ast.Mod: lambda left, right: left % right,
+    ast.Pow: lambda left, right: left ** right,
+}
+
+
+def load_spec_file(spec_path: Path) -> Dict:
+    if spec_path.suffix in [".yaml", ".yml"]:
+        try:
+            import yaml
+        except ImportError as import_error:
+            raise ValueError(
+                f"Reading {spec_path} requires the \"PyYAML\" package (pip install pyyaml), or write the spec as TOML."
+            ) from import_error
+
+        with spec_path.open(mode="r", encoding="utf-8") as spec_file:
+            return yaml.safe_load(spec_file) or {}
+
+    with spec_path.open(mode="rb") as spec_file:
+        return tomllib.load(spec_file)
+
+
+def get_template_field_names(template: str) -> Set[str]:
+    """
+    Parameters a `workloads` or `output_name` template refers to (as `{name}`).
+    """
+
+    return {field_name for _, field_name, _, _ in string.Formatter().parse(template) if field_name}
+
+
+def parse_parameter_assignment(assignment: str) -> Tuple[str, ParameterValue]:
+    """
+    A `--set name=value` assignment, the value read as in a spec (`true`, `4`, `"4 KiB"`) or else as a string.
+    """
+
+    name, separator, value = assignment.partition("=")
+    if not separator or not name:
+        raise ValueError(f"Expected <name>=<value>, got {assignment}")
+
+    try:
+        return name, tomllib.loads(f"value = {value}")["value"]
+    except tomllib.TOMLDecodeError:
+        return name, value
+
+
+def expand_parameter_values(name: str, values: Union[ParameterValue, List, Dict]) -> List[ParameterValue]:
+    """
+    The levels of a parameter: a list as is, a single value as the only level, or a
+    `{start, stop, step}` / `{start, stop, factor}` range (inclusive, with an optional `unit` suffix).
+    """
+
+    if isinstance(values, list):
+        if len(values) == 0:
+            raise ValueError(f"Parameter {name} has no values")
+
+        return values
+
+    if not isinstance(values, dict):
+        return [values]
+
+    unknown_keys: Set[str] = set(values) - {"start", "stop", "step", "factor", "unit"}
+    if unknown_keys or "start" not in values or "stop" not in values or ("step" in values) == ("factor" in values):
+        raise ValueError(f"Range of parameter {name} needs start, stop and either step or factor (got {sorted(values)})")
+
+    levels: List[Union[int, float]] = []
+    level: Union[int, float] = values["start"]
+
+    while level <= values["stop"]:
+        levels.append(level)
+        level = level + values["step"] if "step" in values else level * values["factor"]
+
+        if len(levels) > 1 and level == levels[-1]:
+            raise ValueError(f"Range of parameter {name} does not advance")
+
+    if "unit" in values:
+        return [f"{level}{values['unit']}" for level in levels]
+
+    return levels
+
+
+def get_constraint_value(value: ParameterValue) -> Union[int, float, str]:
+    # Sizes compare by number of bytes ("4 KiB" < "32KiB").
+    if isinstance(value, str):
+        size: Optional[float] = parse_size(value)
+        if size is not None:
+            return size
+
+    return value
+
+
+def evaluate_constraint_node(node: ast.AST, values: Dict[str, Union[int, float, str]]):
+    if isinstance(node, ast.Expression):
+        return evaluate_constraint_node(node.body, values)
+
+    if isinstance(node, ast.Constant):
+        return get_constraint_value(node.value)
+
+    if isinstance(node, ast.Name):
+        if node.id not in values:
+            raise ValueError(f"Unknown parameter {node.id} in constraint")
+
+        return values[node.id]
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [evaluate_constraint_node(element, values) for element in node.elts]
+
+    if isinstance(node, ast.BoolOp):
+        results = [bool(evaluate_constraint_node(value, values)) for value in node.values]
+        return all(results) if isinstance(node.op, ast.And) else any(results)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        operand = evaluate_constraint_node(node.operand, values)
+        return not operand if isinstance(node.op, ast.Not) else -operand
+
+    if isinstance(node, ast.BinOp) and type(node.op) in CONSTRAINT_BINARY_OPERATIONS:
+        return CONSTRAINT_BINARY_OPERATIONS[type(node.op)](
+            evaluate_constraint_node(node.left, values),
+            evaluate_constraint_node(node.right, values)
+        )
+
+    if isinstance(node, ast.Compare):
+        left = evaluate_constraint_node(node.left, values)
+
+        for operator, comparator in zip(node.ops, node.comparators):
+            if type(operator) not in CONSTRAINT_COMPARISONS:
+                break
+
+            right = evaluate_constraint_node(comparator, values)
+            if not CONSTRAINT_COMPARISONS[type(operator)](left, right):
+                return False
+
+            left = right
+        else:
+            return True
+
+    raise ValueError(f"Unsupported expression in constraint: {ast.unparse(node)}")
+
+
+def find_config_script_options(config_script_path: Path) -> Tuple[Set[str], Set[str]]:
+    """
+    Names (without "--") of all options and of the required options a gem5 config script declares with argparse.
+    """
+
+    options: Set[str] = set()
+    required_options: Set[str] = set()
+
+    syntax_tree = ast.parse(config_script_path.read_text(encoding="utf-8"), filename=config_script_path.as_posix())
+
+    for node in ast.walk(syntax_tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "add_argument"):
+            continue
+
+        option_names: List[str] = [
+            argument.value[2:] for argument in node.args
+            if isinstance(argument, ast.Constant) and isinstance(argument.value, str) and argument.value.startswith("--")
+        ]
+
+        options.update(option_names)
+
+        is_required: bool = any(
+            keyword.arg == "required" and isinstance(keyword.value, ast.Constant) and keyword.value.value is True
+            for keyword in node.keywords
+        )
+
+        if is_required:
+            required_options.update(option_names[:1])
+
+    return options, required_options
+
+
+@dataclass(frozen=True, kw_only=True)
+class SweepAxis:
+    """
+    One dimension of the space: a parameter, or zipped parameters that take their levels together.
+    """
+
+    names: List[str]
+    levels: List[Tuple[ParameterValue, ...]]
+
+
+@dataclass(frozen=True, kw_only=True)
+class SweepSpec:
+    name: str
+    config_script_path: Optional[Path]
+    # Set for a config script of the gem5 tree: its path relative to the gem5 root.
+    gem5_config_script: Optional[str]
+    working_directory_path: Path
+    sampling: str
+    points: Optional[int]
+    seed: int
+    constraints: List[str]
+    workloads: List[str]
+    time_limit: str
+    gem5_build: str
+    container: str
+    slurm_directives: Dict[str, str]
+    output_name: Optional[str]
+    results_directory: str
+    runtime_sweep_name: str
+    fixed_parameters: Dict[str, ParameterValue]
+    axes: List[SweepAxis]
+
+    @classmethod
+    def from_file(cls, spec_path: Path) -> Self:
+        return cls.from_dict(load_spec_file(spec_path), spec_path.resolve().parent, spec_path.stem)
+
+    @classmethod
+    def from_dict(cls, spec: Dict, base_directory_path: Path, default_name: str) -> Self:
+        unknown_keys: Set[str] = set(spec) - set(SPEC_KEYS)
+        if unknown_keys:
+            raise ValueError(f"Unknown keys in sweep spec: {', '.join(sorted(unknown_keys))}")
+
+        fixed_parameters: Dict[str, ParameterValue] = {}
+        axes: List[SweepAxis] = []
+
+        for name, values in (spec.get("parameters") or {}).items():
+            levels: List[ParameterValue] = expand_parameter_values(name, values)
+
+            if len(levels) == 1:
+                fixed_parameters[name] = levels[0]
+            else:
+                axes.append(SweepAxis(names=[name], levels=[(level,) for level in levels]))
+
+        for zipped_parameters in spec.get("zip") or []:
+            zipped_levels: List[List[ParameterValue]] = [
+                expand_parameter_values(name, values) for name, values in zipped_parameters.items()
+            ]
+
+            if len({len(levels) for levels in zipped_levels}) != 1:
+                raise ValueError(f"Zipped parameters {', '.join(zipped_parameters)} need the same number of values")
+
+            axes.append(SweepAxis(names=list(zipped_parameters), levels=list(zip(*zipped_levels))))
+
+        parameter_names: List[str] = [*fixed_parameters, *(name for axis in axes for name in axis.names)]
+        if len(set(parameter_names)) != len(parameter_names):
+            raise ValueError("A parameter appears more than once in the sweep spec")
+
+        sampling: str = spec.get("sampling", "cartesian")
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling {sampling} (one of: {', '.join(SAMPLING_METHODS)})")
+
+        points: Optional[int] = spec.get("points")
+        if (points is None) != (sampling == "cartesian"):
+            raise ValueError("points (a budget) is required for random and latin-hypercube sampling, and only for them")
+
+        config_script: Optional[str] = spec.get("config_script")
+        gem5_config_script: Optional[str] = spec.get("gem5_config_script")
+        if config_script and gem5_config_script:
+            raise ValueError("A sweep spec has either a config_script or a gem5_config_script")
+
+        config_script_path: Optional[Path] = base_directory_path.joinpath(config_script).resolve() if config_script else None
+        if gem5_config_script:
+            config_script_path = get_gem5_workspace_path().joinpath("gem5", gem5_config_script)
+
+        working_directory_path: Path = base_directory_path.joinpath(spec["working_directory"]).resolve() \
+            if "working_directory" in spec \
+            else (config_script_path.parent if config_script else base_directory_path)
+
+        name: str = spec.get("name", default_name)
+
+        sweep_spec = cls(
+            name=name,
+            config_script_path=config_script_path,
+            gem5_config_script=gem5_config_script,
+            working_directory_path=working_directory_path,
+            sampling=sampling,
+            points=points,
+            seed=spec.get("seed", 0),
+            constraints=list(spec.get("constraints") or []),
+            workloads=list(spec.get("workloads") or []),
+            time_limit=spec.get("time", DEFAULT_TIME_LIMIT),
+            gem5_build=spec.get("gem5_build", DEFAULT_GEM5_BUILD),
+            container=spec.get("container", DEFAULT_CONTAINER),
+            slurm_directives={name: str(value) for name, value in (spec.get("slurm") or {}).items()},
+            output_name=spec.get("output_name"),
+            results_directory=spec.get("results_directory", DEFAULT_RESULTS_DIRECTORY),
+            runtime_sweep_name=spec.get("runtime_sweep", f"sweep_spec/{name}"),
+            fixed_parameters=fixed_parameters,
+            axes=axes
+        )
+
+        for template in [*sweep_spec.workloads, *([sweep_spec.output_name] if sweep_spec.output_name else [])]:
+            unknown_names: Set[str] = get_template_field_names(template) - set(parameter_names)
+            if unknown_names:
+                raise ValueError(f"{template} uses unknown parameters: {', '.join(sorted(unknown_names))}")
+
+        # Catch typos in constraints before sampling hides them.
+        for constraint in sweep_spec.constraints:
+            try:
+                constraint_tree = ast.parse(constraint, mode="eval")
+            except SyntaxError as syntax_error:
+                raise ValueError(f"Invalid constraint {constraint}: {syntax_error.msg}") from syntax_error
+
+            unknown_names: Set[str] = {
+                node.id for node in ast.walk(constraint_tree) if isinstance(node, ast.Name)
+            } - set(parameter_names)
+
+            if unknown_names:
+                raise ValueError(f"Constraint {constraint} uses unknown parameters: {', '.join(sorted(unknown_names))}")
+
+        return sweep_spec
+
+    def get_parameter_names(self) -> List[str]:
+        return [*self.fixed_parameters, *(name for axis in self.axes for name in axis.names)]
+
+    def with_fixed_parameters(self, parameters: Dict[str, ParameterValue]) -> Self:
+        """
+        The spec with these parameters fixed to one value (in place of their axes, if they are varied).
+        """
+
+        for axis in self.axes:
+            if len(axis.names) > 1 and set(axis.names) & set(parameters):
+                raise ValueError(f"Cannot fix {', '.join(sorted(set(axis.names) & set(parameters)))}, zipped with other parameters")
+
+        return replace(
+            self,
+            fixed_parameters={**self.fixed_parameters, **parameters},
+            axes=[axis for axis in self.axes if axis.names[0] not in parameters]
+        )
+
+    def get_space_size(self) -> int:
+        return math.prod(len(axis.levels) for axis in self.axes)
+
+    def validate_against_config_script(self) -> None:
+        """
+        Checks that every parameter is an option of the config script and every required option is set.
+        """
+
+        if self.config_script_path is None:
+            return
+
+        if not self.config_script_path.is_file():
+            # The gem5 tree may only be readable on the cluster.
+            if self.gem5_config_script is not None:
+                return
+
+            raise ValueError(f"Config script {self.config_script_path} does not exist")
+
+        options, required_options = find_config_script_options(self.config_script_path)
+        parameter_names: Set[str] = set(self.get_parameter_names())
+
+        unknown_parameters: Set[str] = parameter_names - options
+        if unknown_parameters:
+            raise ValueError(
+                f"{self.config_script_path.name} has no options {', '.join(sorted(unknown_parameters))} "
+                f"(it has: {', '.join(sorted(options))})"
+            )
+
+        missing_options: Set[str] = required_options - parameter_names
+        if missing_options:
+            raise ValueError(f"{self.config_script_path.name} requires {', '.join(sorted(missing_options))}")
+
+    def build_point(self, level_indices: Tuple[int, ...]) -> Dict[str, ParameterValue]:
+        point: Dict[str, ParameterValue] = dict(self.fixed_parameters)
+
+        for axis, level_index in zip(self.axes, level_indices):
+            point.update(zip(axis.names, axis.levels[level_index]))
+
+        return point
+
+    def satisfies_constraints(self, point: Dict[str, ParameterValue]) -> bool:
+        constraint_values: Dict[str, Union[int, float, str]] = {
+            name: get_constraint_value(value) for name, value in point.items()
+        }
+
+        return all(
+            bool(evaluate_constraint_node(ast.parse(constraint, mode="eval"), constraint_values))
+            for constraint in self.constraints
+        )
+
+    def _expand_cartesian(self) -> List[Dict[str, ParameterValue]]:
+        points: List[Dict[str, ParameterValue]] = []
+
+        for level_indices in itertools.product(*(range(len(axis.levels)) for axis in self.axes)):
+            point: Dict[str, ParameterValue] = self.build_point(level_indices)
+            if self.satisfies_constraints(point):
+                points.append(point)
+
+        return points
+
+    def _draw_random(self, number_of_draws: int, random_generator: random.Random) -> List[Tuple[int, ...]]:
+        return [
+            tuple(random_generator.randrange(len(axis.levels)) for axis in self.axes)
+            for _ in range(number_of_draws)
+        ]
+
+    def _draw_latin_hypercube(self, number_of_draws: int, random_generator: random.Random) -> List[Tuple[int, ...]]:
+        # Every axis is split into number_of_draws strata, each used by exactly one draw.
+        columns: List[List[int]] = []
+
+        for axis in self.axes:
+            strata: List[int] = list(range(number_of_draws))
+            random_generator.shuffle(strata)
+
+            columns.append([
+                min(len(axis.levels) - 1, int((stratum + random_generator.random()) / number_of_draws * len(axis.levels)))
+                for stratum in strata
+            ])
+
+        return list(zip(*columns))
+
+    def expand(self) -> List[Dict[str, ParameterValue]]:
+        """
+        The configurations of the sweep (each with every parameter), in a stable order.
+        """
+
+        if self.sampling == "cartesian" or self.get_space_size() <= self.points:
+            return self._expand_cartesian()
+
+        random_generator = random.Random(self.seed)
+        draw: Callable = self._draw_random if self.sampling == "random" else self._draw_latin_hypercube
+
+        selected_level_indices: List[Tuple[int, ...]] = []
+        rejected_level_indices: Set[Tuple[int, ...]] = set()
+        remaining_draws: int = MAXIMUM_DRAWS_PER_POINT * self.points
+
+        while len(selected_level_indices) < self.points and remaining_draws > 0:
+            # A latin hypercube stays balanced only as a whole batch, so redraw what is missing as a new one.
+            number_of_draws: int = min(self.points - len(selected_level_indices), remaining_draws)
+            remaining_draws -= number_of_draws
+
+            for level_indices in draw(number_of_draws, random_generator):
+                if level_indices in rejected_level_indices or level_indices in selected_level_indices:
+                    continue
+
+                if self.satisfies_constraints(self.build_point(level_indices)):
+                    selected_level_indices.append(level_indices)
+                else:
+                    rejected_level_indices.add(level_indices)
+
+        if len(selected_level_indices) < self.points:
+            print(
+                f"Sweep {self.name}: only found {len(selected_level_indices)} of {self.points} "
+                "distinct configurations that satisfy the constraints"
+            )
+
+        return [self.build_point(level_indices) for level_indices in sorted(selected_level_indices)]
+
+    def get_workload_paths(self, point: Dict[str, ParameterValue]) -> List[Path]:
+        """
+        The `workloads` (formatted with the configuration) and path-like parameter values.
+        """
+
+        workloads: List[str] = [workload.format(**point) for workload in self.workloads]
+        workloads += [value for value in point.values() if isinstance(value, str) and "/" in value]
+
+        return [self.working_directory_path.joinpath(workload) for workload in workloads]
+
+    def get_workload_parameters(self, point: Dict[str, ParameterValue]) -> Dict[str, ParameterValue]:
+        """
+        The parameters of a configuration that select its workload: those `workloads` refers to and the path-like ones.
+        """
+
+        workload_parameter_names: Set[str] = {
+            name for workload in self.workloads for name in get_template_field_names(workload)
+        }
+
+        return {
+            name: value for name, value in point.items()
+            if name in workload_parameter_names or (isinstance(value, str) and "/" in value)
+        }
+
+    def get_gem5_build_paths(self) -> List[Path]:
+        return [
+            get_gem5_workspace_path().joinpath(f"gem5/build/{self.gem5_build}/gem5.opt"),
+            get_gem5_workspace_path().joinpath(self.container),
+        ]
+
+
+def format_config_script_arguments(point: Dict[str, ParameterValue]) -> List[str]:
+    config_script_arguments: List[str] = []
+
+    for name, value in point.items():
+        if isinstance(value, bool):
+            if value:
+                config_script_arguments.append(f"--{name}")
+        else:
+            config_script_arguments.append(shlex.quote(f"--{name}={value}"))
+
+    return config_script_arguments
+
+
+def hash_point(point: Dict[str, ParameterValue]) -> str:
+    point_hash = hashlib.new("md5")
+    point_hash.update(json.dumps(point, sort_keys=True).encode("utf-8"))
+
+    return base64.b32encode(point_hash.digest()).decode("utf-8")[:6].lower()
+
+
+def format_point_name(spec: SweepSpec, point: Dict[str, ParameterValue]) -> str:
+    """
+    A file name for a configuration: the spec's `output_name`, or else its varied
+    parameters and a short hash of all of them.
+    """
+
+    if spec.output_name is not None:
+        return spec.output_name.format(**point)
+
+    varied_names: List[str] = [name for axis in spec.axes for name in axis.names]
+
+    name_parts: List[str] = []
+    for name in varied_names:
+        value: str = str(point[name])
+        value = Path(value).stem if "/" in value else value
+        name_parts.append(f"{name}-{re.sub(r'[^A-Za-z0-9.]+', '', value)}")
+
+    return "_".join([*name_parts, hash_point(point)])
+
+
+def get_result_cache_key(
+    spec: SweepSpec,
+    point: Dict[str, ParameterValue],
+    workload_checkpoint: Optional[WorkloadCheckpoint] = None
+) -> Optional[ResultCacheKey]:
+    return ResultCacheKey.from_job_inputs(
+        config_script_path=spec.config_script_path,
+        parameters={
+            **point,
+            **(workload_checkpoint.get_result_parameters() if workload_checkpoint is not None else {}),
+        },
+        workload_paths=spec.get_workload_paths(point),
+        gem5_build_paths=spec.get_gem5_build_paths()
+    )
+
+
+def get_slurm_directives(spec: SweepSpec, job_name: str, job_log_file_path: Path, time_limit: str) -> Dict[str, str]:
+    return {
+        "reservation": "fri",
+        "job-name": job_name,
+        "ntasks": "1",
+        "cpus-per-task": "1",
+        **spec.slurm_directives,
+        "output": f"\"{job_log_file_path.as_posix()}\"",
+        "time": time_limit,
+    }
+
+
+def get_gem5_command(spec: SweepSpec) -> str:
+    return f"srun apptainer exec $GEM5_WORKSPACE/{spec.container} $GEM_PATH/gem5.opt"
+
+
+def get_config_script(spec: SweepSpec) -> str:
+    return f"$GEM5_ROOT/{spec.gem5_config_script}" if spec.gem5_config_script is not None \
+        else shlex.quote(os.path.relpath(spec.config_script_path, spec.working_directory_path))
+
+
+def build_gem5_environment_shell_commands(spec: SweepSpec) -> str:
+    return f"""
+GEM5_WORKSPACE=${{GEM5_WORKSPACE:-/d/hpc/projects/FRI/GEM5/gem5_workspace}}
+GEM5_ROOT=$GEM5_WORKSPACE/gem5
+GEM_PATH=$GEM5_ROOT/build/{spec.gem5_build}
+"""
+
+
+def prepare_and_save_checkpoint_job_script(
+    spec: SweepSpec,
+    point: Dict[str, ParameterValue],
+    workload_checkpoint: WorkloadCheckpoint,
+    job_script_output_directory_path: Path,
+    # Tells apart the checkpoint jobs of workloads with the same file name.
+    checkpoint_index: int
+) -> Path:
+    """
+    Writes the job that takes `workload_checkpoint` of the workload of `point`.
+    """
+
+    checkpoint_name: str = f"checkpoint-{checkpoint_index}_{Path(workload_checkpoint.workload_name).stem}"
+
+    job_log_file_path = job_script_output_directory_path.resolve().joinpath(f"{checkpoint_name}.log")
+    job_script_file_path = job_script_output_directory_path.joinpath(f"{checkpoint_name}.sh")
+
+    slurm_directives: Dict[str, str] = get_slurm_directives(spec, f"{spec.name}_{checkpoint_name}", job_log_file_path, spec.time_limit)
+
+    take_checkpoint_commands: str = build_take_checkpoint_shell_commands(
+        workload_checkpoint,
+        gem5_command=get_gem5_command(spec),
+        config_script_arguments=" ".join([get_config_script(spec), *format_config_script_arguments(spec.get_workload_parameters(point))])
+    )
+
+    job_script = f"""#!/bin/bash
+{chr(10).join(f"#SBATCH --{name}={value}" for name, value in slurm_directives.items())}
+{build_gem5_environment_shell_commands(spec)}
+cd \"{spec.working_directory_path.as_posix()}\"
+{take_checkpoint_commands}"""
+
+    assert not job_script_file_path.exists()
+
+    with job_script_file_path.open(mode="w", encoding="utf8") as script_file:
+        script_file.write(job_script)
+
+    return job_script_file_path
+
+
+def prepare_and_save_job_script(
+    spec: SweepSpec,
+    point: Dict[str, ParameterValue],
+    job_script_output_directory_path: Path,
+    benchmark_output_base_directory_path: Path,
+    # One of COMPRESSION_METHODS.
+    compression_method: str = "none",
+    # Reuses a cached result instead of writing a job (returning None), and caches what the job produces.
+    result_cache: Optional[ResultCache] = None,
+    time_limit: str = DEFAULT_TIME_LIMIT,
+    # Restores this checkpoint of the workload instead of simulating from the start.
+    workload_checkpoint: Optional[WorkloadCheckpoint] = None,
+    # Lets gem5 write to node-local scratch and copies its outputs back when it exits (see gem5_tools.scratch_staging).
+    stage_in_scratch: bool = False,
+    # SLURM jobs (taking the checkpoints) that must complete before this one starts; it is cancelled if one fails.
+    dependency_job_ids: Optional[List[int]] = None
+) -> Optional[Path]:
+    point_name: str = format_point_name(spec, point)
+
+    job_log_file_path = job_script_output_directory_path.resolve().joinpath(f"{point_name}.log")
+    job_script_file_path = job_script_output_directory_path.joinpath(f"{point_name}.sh")
+
+    benchmark_output_concrete_directory_path = benchmark_output_base_directory_path.resolve().joinpath(point_name)
+    benchmark_output_concrete_directory_path.mkdir(parents=True)
+
+    result_cache_key: Optional[ResultCacheKey] = None
+    if result_cache is not None:
+        result_cache_key = get_result_cache_key(spec, point, workload_checkpoint)
+
+        if result_cache_key is None:
+            print("  > inputs not readable from here, result will not be cached")
+        elif result_cache.link_cached_outputs(result_cache_key, benchmark_output_concrete_directory_path):
+            print(f"  > reusing cached result {result_cache_key.digest[:12]}")
+            return None
+        else:
+            result_cache_key.write_to_directory(benchmark_output_concrete_directory_path)
+
+    runtime_record_file_path = benchmark_output_concrete_directory_path.joinpath(GEM5_RUNTIME_RECORD_FILE_NAME)
+    runtime_parameters: Dict[str, ParameterValue] = {
+        **point,
+        **({"from_checkpoint": True} if workload_checkpoint is not None else {}),
+    }
+
+    slurm_directives: Dict[str, str] = get_slurm_directives(spec, f"{spec.name}_{hash_point(point)}", job_log_file_path, time_limit)
+    if dependency_job_ids:
+        slurm_directives["dependency"] = f"afterok:{':'.join(str(job_id) for job_id in dependency_job_ids)}"
+        slurm_directives["kill-on-invalid-dep"] = "yes"
+
+    gem5_command: str = get_gem5_command(spec)
+    config_script: str = get_config_script(spec)
+
+    config_script_arguments: str = " \\\n        ".join(format_config_script_arguments(point))
+
+    checkpoint_commands: str = ""
+    if workload_checkpoint is not None:
+        checkpoint_commands = build_checkpoint_shell_commands(workload_checkpoint)
+        config_script_arguments += f" \\\n        {workload_checkpoint.get_restore_arguments()}"
+
+    job_script = f"""#!/bin/bash
+{chr(10).join(f"#SBATCH --{name}={value}" for name, value in slurm_directives.items())}
+{build_gem5_environment_shell_commands(spec)}{build_runtime_record_shell_commands(runtime_record_file_path, spec.runtime_sweep_name, runtime_parameters, time_limit, "started")}
+cd \"{spec.working_directory_path.as_posix()}\"
+{checkpoint_commands}
+{build_scratch_setup_shell_commands(benchmark_output_concrete_directory_path, stage_in_scratch)}{gem5_command} \\
+    --outdir=\"{get_gem5_output_directory(benchmark_output_concrete_directory_path, stage_in_scratch)}\" {config_script} \\
+        {config_script_arguments}
+GEM5_EXIT_CODE=$?
+{build_scratch_copy_back_shell_commands(benchmark_output_concrete_directory_path, compression_method, stage_in_scratch)}
+{build_runtime_record_shell_commands(runtime_record_file_path, spec.runtime_sweep_name, runtime_parameters, time_limit, "finished")}
+{build_compression_shell_commands(benchmark_output_concrete_directory_path, compression_method)}
+{build_result_cache_shell_commands(result_cache, result_cache_key, benchmark_output_concrete_directory_path)}
+exit $GEM5_EXIT_CODE
+"""
+
+    assert not job_script_file_path.exists()
+
+    with job_script_file_path.open(mode="w", encoding="utf8") as script_file:
+        script_file.write(job_script)
+
+    return job_script_file_path
+
+
+def prepare_and_queue_job(
+    spec: SweepSpec,
+    point: Dict[str, ParameterValue],
+    job_script_output_directory_path: Path,
+    benchmark_output_base_directory_path: Path,
+    executor: JobExecutor,
+    compression_method: str = "none",
+    # Collects the job into this array instead of submitting it on its own.
+    job_array: Optional[JobArray] = None,
+    result_cache: Optional[ResultCache] = None,
+    # Collects the job into packs of several configurations per allocation instead.
+    job_packer: Optional[JobPacker] = None,
+    time_limit: str = DEFAULT_TIME_LIMIT,
+    # Balances the job packs; None falls back to the time limit.
+    predicted_runtime_seconds: Optional[float] = None,
+    # Tracks the job for status and resume (see gem5_tools.sweep_ledger).
+    sweep_ledger: Optional[SweepLedger] = None,
+    # Collects the job for concurrent submission once every job script is written.
+    async_submitter: Optional[AsyncSubmitter] = None,
+    workload_checkpoint: Optional[WorkloadCheckpoint] = None,
+    stage_in_scratch: bool = False,
+    dependency_job_ids: Optional[List[int]] = None
+) -> None:
+    print("Preparing job:")
+    for name, value in point.items():
+        print(f"  > {name}: {value}")
+    print(f"  > time limit: {time_limit}")
+    if workload_checkpoint is not None:
+        print(f"  > checkpoint: {workload_checkpoint.directory_path.as_posix()}")
+
+    job_script_file_path = prepare_and_save_job_script(
+        spec=spec,
+        point=point,
+        job_script_output_directory_path=job_script_output_directory_path,
+        benchmark_output_base_directory_path=benchmark_output_base_directory_path,
+        compression_method=compression_method,
+        result_cache=result_cache,
+        time_limit=time_limit,
+        workload_checkpoint=workload_checkpoint,
+        stage_in_scratch=stage_in_scratch,
+        dependency_job_ids=dependency_job_ids
+    )
+
+    if job_script_file_path is None:
+        if sweep_ledger is not None:
+            sweep_ledger.add_cached_job(point)
+
+        print()
+        return
+
+    if sweep_ledger is not None:
+        sweep_ledger.add_job(point, job_script_file_path)
+
+    if job_array is not None:
+        task_id: int = job_array.add_job_script(job_script_file_path, parameters=point)
+
+        print(f"  > added to job array as task {task_id}")
+        print()
+        return
+
+    if job_packer is not None:
+        task_id = job_packer.add_job_script(
+            job_script_file_path,
+            parameters=point,
+            predicted_runtime_seconds=predicted_runtime_seconds
+        )
+
+        print(f"  > added to job packs as task {task_id}")
+        print()
+        return
+
+    if async_submitter is not None:
+        task_id = async_submitter.add_job_script(job_script_file_path)
+
+        print(f"  > added to concurrent submission as job {task_id}")
+        print()
+        return
+
+    print(f"  > submitting via {executor.name}")
+
+    job_id: int = executor.submit(job_script_file_path)
+
+    if sweep_ledger is not None:
+        sweep_ledger.mark_submitted(job_script_file_path, job_id, executor.kind)
+
+    print(f"  > submitted as job {job_id}")
+    print()
+
+
+def add_queue_arguments(argument_parser: ArgumentParser) -> None:
+    argument_parser.add_argument(
+        "--output-directory-path",
+        required=False,
+        dest="output_directory_path"
+    )
+
+    argument_parser.add_argument(
+        "--compress-results",
+        required=False,
+        default="none",
+        choices=COMPRESSION_METHODS,
+        dest="compress_results",
+        help="Compress stats.txt and config.ini of every job once it finishes."
+    )
+
+    argument_parser.add_argument(
+        "--array",
+        required=False,
+        action="store_true",
+        dest="use_job_array",
+        help="Submit all configurations as one SLURM job array instead of one job each."
+    )
+
+    argument_parser.add_argument(
+        "--array-max-concurrent",
+        required=False,
+        type=int,
+        default=0,
+        dest="array_max_concurrent_tasks",
+        help="With --array, run at most this many configurations at the same time (0 for no limit)."
+    )
+
+    argument_parser.add_argument(
+        "--pack",
+        required=False,
+        type=int,
+        default=0,
+        dest="configurations_per_pack",
+        help="Run this many configurations per allocation, concurrently in one container session (0 to submit each on its own)."
+    )
+
+    argument_parser.add_argument(
+        "--pack-cpus",
+        required=False,
+        type=int,
+        default=0,
+        dest="cpus_per_pack",
+        help="With --pack, CPUs per allocation, i.e. configurations running at once (0 for one per configuration)."
+    )
+
+    argument_parser.add_argument(
+        "--no-result-cache",
+        required=False,
+        action="store_false",
+        dest="use_result_cache",
+        help="Simulate every configuration, even ones with a cached result, and cache nothing."
+    )
+
+    argument_parser.add_argument(
+        "--no-runtime-model",
+        required=False,
+        action="store_false",
+        dest="use_runtime_model",
+        help="Request the spec's time for every job instead of predicting it from earlier runs."
+    )
+
+    add_checkpoint_arguments(argument_parser, DEFAULT_CHECKPOINT_INSTS, DEFAULT_WARMUP_INSTS)
+    add_scratch_staging_arguments(argument_parser)
+    add_executor_arguments(argument_parser)
+    add_async_submission_arguments(argument_parser)
+
+
+def queue_sweep(spec: SweepSpec, points: List[Dict[str, ParameterValue]], arguments: Namespace) -> None:
+    """
+    Writes and submits the jobs of the configurations, as `add_queue_arguments` asked, and exits with an error if any failed.
+    """
+
+    if arguments.output_directory_path is None or spec.config_script_path is None:
+        print("Queueing a sweep needs --output-directory-path and a config_script in the spec.")
+        exit(1)
+
+    if arguments.use_job_array and arguments.executor_name != "slurm":
+        print("--array needs --executor slurm.")
+        exit(1)
+
+    if arguments.configurations_per_pack > 0 and (arguments.use_job_array or arguments.executor_name != "slurm"):
+        print("--pack needs --executor slurm and cannot be combined with --array.")
+        exit(1)
+
+    if arguments.submit_concurrency > 0 and \
+            (arguments.use_job_array or arguments.configurations_per_pack > 0 or arguments.executor_name != "slurm"):
+        print("--submit-concurrency needs --executor slurm and cannot be combined with --array or --pack.")
+        exit(1)
+
+    if arguments.watch and arguments.submit_concurrency <= 0:
+        print("--watch needs --submit-concurrency.")
+        exit(1)
+
+    if arguments.use_checkpoints:
+        if arguments.checkpoint_instructions <= 0 and arguments.checkpoint_tick <= 0:
+            print("--checkpoint needs a positive --checkpoint-insts or --checkpoint-tick.")
+            exit(1)
+
+        if len(spec.workloads) == 0 or \
+                (spec.config_script_path.is_file() and "take_checkpoint" not in find_config_script_options(spec.config_script_path)[0]):
+            print(f"--checkpoint needs workloads in the spec and a config script that can take checkpoints, unlike {spec.config_script_path.name}.")
+            exit(1)
+
+    point_names: List[str] = [format_point_name(spec, point) for point in points]
+    if len(set(point_names)) != len(point_names):
+        print(f"The output_name {spec.output_name} of {spec.name} gives several configurations the same name.")
+        exit(1)
+
+    output_directory_path: Path = Path(str(arguments.output_directory_path))
+
+    formatted_timestamp: str = datetime.datetime.now().strftime(r"%Y-%m-%d_%H-%M-%S")
+    timestamped_output_directory_path = output_directory_path.joinpath(f"run_{formatted_timestamp}")
+
+    if timestamped_output_directory_path.exists():
+        print("Output directory already exists (you ran the tool twice in a second), retry in one second.")
+        exit(1)
+
+    job_scripts_base_directory_path: Path = timestamped_output_directory_path.joinpath("scripts")
+    job_scripts_base_directory_path.mkdir(parents=True, exist_ok=False)
+
+    benchmark_results_base_directory_path: Path = timestamped_output_directory_path.joinpath(spec.results_directory)
+    benchmark_results_base_directory_path.mkdir(parents=True, exist_ok=False)
+
+    executor: JobExecutor = create_executor(arguments)
+    sweep_ledger: SweepLedger = SweepLedger.open(timestamped_output_directory_path)
+    result_cache: Optional[ResultCache] = get_default_result_cache() if arguments.use_result_cache else None
+
+    job_array: Optional[JobArray] = JobArray(
+        name=spec.name,
+        max_concurrent_tasks=arguments.array_max_concurrent_tasks
+    ) if arguments.use_job_array else None
+
+    job_packer: Optional[JobPacker] = JobPacker(
+        name=spec.name,
+        configurations_per_pack=arguments.configurations_per_pack,
+        cpus_per_pack=arguments.cpus_per_pack,
+        container_image=f"\"$GEM5_WORKSPACE/{spec.container}\"",
+        container_image_preamble="GEM5_WORKSPACE=${GEM5_WORKSPACE:-/d/hpc/projects/FRI/GEM5/gem5_workspace}"
+    ) if arguments.configurations_per_pack > 0 else None
+
+    async_submitter: Optional[AsyncSubmitter] = AsyncSubmitter(
+        name=spec.name,
+        max_concurrent_submissions=arguments.submit_concurrency,
+        poll_interval_seconds=arguments.poll_interval_seconds
+    ) if arguments.submit_concurrency > 0 else None
+
+    runtime_predictor: RuntimePredictor = RuntimePredictor.from_history(
+        sweep_name=spec.runtime_sweep_name,
+        default_time_limit=spec.time_limit,
+        record_root_directory_path=output_directory_path
+    ) if arguments.use_runtime_model else RuntimePredictor(spec.runtime_sweep_name, spec.time_limit, None, {})
+
+    # One checkpoint per workload, shared by all of its configurations.
+    workload_checkpoints: Dict[str, WorkloadCheckpoint] = {}
+    if arguments.use_checkpoints:
+        for point in points:
+            workload_key: str = json.dumps(spec.get_workload_parameters(point), sort_keys=True)
+
+            if workload_key not in workload_checkpoints:
+                workload_checkpoints[workload_key] = WorkloadCheckpoint.from_workload(
+                    config_script_path=spec.config_script_path,
+                    workload_path=spec.get_workload_paths(point)[0],
+                    gem5_build_paths=spec.get_gem5_build_paths(),
+                    checkpoint_instructions=arguments.checkpoint_instructions,
+                    checkpoint_tick=arguments.checkpoint_tick,
+                    warmup_instructions=arguments.warmup_instructions,
+                    run_directory_path=timestamped_output_directory_path
+                )
+
+    # The checkpoints some configuration restores (that has no cached result) and that are not stored yet.
+    checkpoint_points: Dict[str, Dict[str, ParameterValue]] = {}
+    for point in points:
+        workload_key = json.dumps(spec.get_workload_parameters(point), sort_keys=True)
+        workload_checkpoint: Optional[WorkloadCheckpoint] = workload_checkpoints.get(workload_key)
+        if workload_checkpoint is None or workload_checkpoint.exists() or workload_key in checkpoint_points:
+            continue
+
+        result_cache_key: Optional[ResultCacheKey] = get_result_cache_key(spec, point, workload_checkpoint) \
+            if result_cache is not None else None
+        if result_cache_key is None or result_cache.lookup(result_cache_key) is None:
+            checkpoint_points[workload_key] = point
+
+    for workload_key, workload_checkpoint in workload_checkpoints.items():
+        checkpoint_state: str = "taken by a job of its own" if workload_key in checkpoint_points else "stored"
+        print(f"Checkpoint of {workload_checkpoint.workload_name}: {checkpoint_state} ({workload_checkpoint.directory_path.as_posix()})")
+
+    # The configurations wait for the checkpoint jobs: on SLURM through a dependency, locally by running them first.
+    checkpoint_job_ids: List[int] = []
+    if len(checkpoint_points) > 0:
+        checkpoint_executor: JobExecutor = executor if executor.kind == "slurm" else create_executor(arguments)
+
+        for checkpoint_index, (workload_key, point) in enumerate(checkpoint_points.items()):
+            workload_checkpoint = workload_checkpoints[workload_key]
+            checkpoint_job_script_file_path: Path = prepare_and_save_checkpoint_job_script(
+                spec=spec,
+                point=point,
+                workload_checkpoint=workload_checkpoint,
+                job_script_output_directory_path=job_scripts_base_directory_path,
+                checkpoint_index=checkpoint_index
+            )
+
+            checkpoint_job_ids.append(checkpoint_executor.submit(checkpoint_job_script_file_path))
+            print(f"Taking the {workload_checkpoint.workload_name} checkpoint via {checkpoint_executor.name} as job {checkpoint_job_ids[-1]}")
+
+        if checkpoint_executor is not executor:
+            if checkpoint_executor.wait() > 0:
+                print(f"Could not take every checkpoint, see the checkpoint-*.log files in {job_scripts_base_directory_path.as_posix()}.")
+                exit(1)
+
+            checkpoint_job_ids = []
+
+        print()
+
+    for point in runtime_predictor.order_longest_first(points):
+        prepare_and_queue_job(
+            spec=spec,
+            point=point,
+            job_script_output_directory_path=job_scripts_base_directory_path,
+            benchmark_output_base_directory_path=benchmark_results_base_directory_path,
+            executor=executor,
+            compression_method=arguments.compress_results,
+            job_array=job_array,
+            result_cache=result_cache,
+            job_packer=job_packer,
+            time_limit=runtime_predictor.predict_time_limit(point),
+            predicted_runtime_seconds=runtime_predictor.predict_runtime_seconds(point),
+            sweep_ledger=sweep_ledger,
+            async_submitter=async_submitter,
+            workload_checkpoint=workload_checkpoints.get(json.dumps(spec.get_workload_parameters(point), sort_keys=True)),
+            stage_in_scratch=arguments.stage_in_scratch,
+            dependency_job_ids=checkpoint_job_ids
+        )
+
+    if job_array is not None:
+        record_array_submission(sweep_ledger, job_array, job_array.write_and_submit(job_scripts_base_directory_path))
+
+    if job_packer is not None:
+        record_pack_submission(sweep_ledger, job_packer, job_packer.write_and_submit(job_scripts_base_directory_path))
+
+    if async_submitter is not None:
+        record_async_submission(sweep_ledger, async_submitter.submit_all())
+
+    number_of_failed_jobs: int = executor.wait()
+
+    if async_submitter is not None:
+        number_of_failed_jobs += async_submitter.wait() if arguments.watch else len(async_submitter.failed_submissions)
+
+    sweep_ledger.close()
+    print(f"Track and resume with: python -m gem5_tools.sweep_ledger --run-directory-path {timestamped_output_directory_path.as_posix()}")
+
+    print("DONE")
+
+    if number_of_failed_jobs > 0:
+        exit(1)
+
+
+def main(default_spec_path: Optional[Path] = None) -> None:
+    """
+    Lists or queues the configurations of `--spec-path`, by default `default_spec_path` (the spec of a queue script).
+    """
+
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--spec-path",
+        "--sweep-spec",
+        required=default_spec_path is None,
+        default=default_spec_path,
+        dest="spec_path",
+        help="Sweep spec (.toml, or .yaml/.yml with PyYAML installed)."
+    )
+
+    argument_parser.add_argument(
+        "--list",
+        required=False,
+        action="store_true",
+        dest="list_only",
+        help="Only print the configurations of the sweep."
+    )
+
+    argument_parser.add_argument(
+        "--set",
+        required=False,
+        action="append",
+        default=[],
+        dest="parameter_assignments",
+        help="Fix a parameter of the config script for every configuration, e.g. --set fast_forward=true (repeatable)."
+    )
+
+    add_queue_arguments(argument_parser)
+
+    arguments = argument_parser.parse_args()
+
+    spec_path = Path(str(arguments.spec_path))
+
+    try:
+        spec = SweepSpec.from_file(spec_path).with_fixed_parameters(
+            dict(parse_parameter_assignment(assignment) for assignment in arguments.parameter_assignments)
+        )
+        spec.validate_against_config_script()
+        points: List[Dict[str, ParameterValue]] = spec.expand()
+    except (OSError, ValueError, tomllib.TOMLDecodeError) as spec_error:
+        print(f"Invalid sweep spec {spec_path}: {spec_error}")
+        exit(1)
+
+    print(
+        f"Sweep {spec.name}: {len(points)} configurations "
+        f"({spec.sampling} sampling of a space of {spec.get_space_size()}, {len(spec.constraints)} constraints)"
+    )
+
+    if arguments.list_only:
+        for point in points:
+            print(f"  {json.dumps(point)}")
+
+        return
+
+    queue_sweep(spec, points, arguments)
+
+
+if __name__ == "__main__":
+    main()
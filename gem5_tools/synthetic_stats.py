@@ -0,0 +1,358 @@
+"""
+Generator of synthetic, gem5-style stats.txt files for benchmarking the analysis tooling.
+
+The files use gem5's text layout (dump markers, padded name/value columns,
+"# description (Unit)" comments) and the statistic families the homework
+scripts read: per-core CPIs, classic cache/bus counters, Ruby controller and
+network counters with histograms, or GPU compute unit counters with a compact
+load latency distribution. Each dump is padded with per-core commit counters
+until it reaches its share of the requested file size.
+
+> python -m gem5_tools.synthetic_stats --output-directory-path /tmp/synthetic --profile ruby --cores 64 --dumps 2 --size 50M --runs 8
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import random
+from typing import Dict, List, TextIO
+
+from gem5_tools.compressed_stats import STATS_TXT_FILE_NAME
+from gem5_tools.dump_index import SIMULATION_BEGIN_MARKER, SIMULATION_END_MARKER
+
+
+PROFILES: List[str] = ["classic", "ruby", "gpu"]
+
+SIZE_SUFFIXES: Dict[str, int] = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+RUBY_SYSTEM_PREFIX: str = "board.cache_hierarchy.ruby_system"
+
+RUBY_MESSAGE_TYPES: List[str] = [
+    "Control", "Request_Control", "Response_Data", "Response_Control",
+    "Writeback_Data", "Writeback_Control", "Broadcast_Control", "Persistent_Control",
+]
+
+CLASSIC_TRANSACTION_TYPES: List[str] = [
+    "ReadReq", "ReadResp", "WritebackDirty", "WritebackClean", "CleanEvict",
+    "UpgradeReq", "UpgradeResp", "ReadExReq", "ReadExResp", "ReadSharedReq",
+]
+
+COMPUTE_UNIT_STATISTICS: List[str] = [
+    "vALUInsts", "sALUInsts", "groupReads", "groupWrites", "ldsBankAccesses",
+    "totalCycles", "vpc", "ipc", "instCyclesVALU", "instCyclesSALU",
+]
+
+OP_CLASSES: List[str] = [
+    "No_OpClass", "IntAlu", "IntMult", "IntDiv", "FloatAdd", "FloatCmp", "FloatCvt",
+    "FloatMult", "FloatMultAcc", "FloatDiv", "FloatMisc", "FloatSqrt", "SimdAdd",
+    "SimdAlu", "SimdCmp", "SimdMult", "MemRead", "MemWrite", "FloatMemRead",
+    "FloatMemWrite", "IprAccess", "InstPrefetch", "total",
+]
+
+
+def parse_size(size: str) -> int:
+    """
+    "100K", "50M", "1G" (binary units) or a plain number of bytes.
+    """
+
+    suffix: str = size[-1:].upper()
+    if suffix in SIZE_SUFFIXES:
+        return int(float(size[:-1]) * SIZE_SUFFIXES[suffix])
+
+    return int(size)
+
+
+class DumpWriter:
+    def __init__(self, stats_file: TextIO, generator: random.Random):
+        self.stats_file = stats_file
+        self.generator = generator
+        self.written_bytes: int = 0
+
+    def write_line(self, line: str) -> None:
+        self.stats_file.write(line)
+        self.stats_file.write("\n")
+        self.written_bytes += len(line) + 1
+
+    def scalar(self, name: str, value: str, description: str, unit: str) -> None:
+        self.write_line(f"{name:<40} {value:>12}{' ' * 23}# {description} ({unit})")
+
+    def counter(self, name: str, maximum: int, description: str, unit: str = "Count") -> int:
+        value: int = self.generator.randint(0, maximum)
+        self.scalar(name, str(value), description, unit)
+        return value
+
+    def ratio(self, name: str, low: float, high: float, description: str, unit: str = "Ratio") -> None:
+        self.scalar(name, f"{self.generator.uniform(low, high):.6f}", description, unit)
+
+    def bucket_rows(self, name: str, counts: List[int], bucket_size: int, description: str) -> None:
+        """
+        A histogram printed with one "::<low>-<high>" row per bucket.
+        """
+
+        total: int = max(sum(counts), 1)
+        cumulative: int = 0
+
+        for bucket_index, count in enumerate(counts):
+            cumulative += count
+            low: int = bucket_index * bucket_size
+
+            self.write_line(
+                f"{name}::{low}-{low + bucket_size - 1:<10} {count:>12} {count / total:>10.2%} "
+                f"{cumulative / total:>10.2%} # {description} (Unspecified)"
+            )
+
+    def compact_distribution(self, name: str, counts: List[int], bucket_size: int, description: str) -> None:
+        """
+        A distribution printed in gem5's compact form: summary rows plus one "|" row with all buckets.
+        """
+
+        samples: int = sum(counts)
+        mean: float = sum((index + 0.5) * bucket_size * count for index, count in enumerate(counts)) / max(samples, 1)
+        comment: str = f"# {description} (Unspecified)"
+
+        self.write_line(f"{name}::bucket_size {bucket_size:>12}{' ' * 23}{comment}")
+        self.write_line(f"{name}::min_bucket {0:>12}{' ' * 23}{comment}")
+        self.write_line(f"{name}::max_bucket {bucket_size * len(counts) - 1:>12}{' ' * 23}{comment}")
+        self.write_line(f"{name}::samples {samples:>12}{' ' * 23}{comment}")
+        self.write_line(f"{name}::mean {mean:>12.6f}{' ' * 23}{comment}")
+        self.write_line(f"{name}::underflows {0:>12} {0:>10.2%} {0:>10.2%} {comment}")
+
+        cumulative: int = 0
+        columns: List[str] = []
+        for count in counts:
+            cumulative += count
+            columns.append(f"{count:>12} {count / max(samples, 1):>10.2%} {cumulative / max(samples, 1):>10.2%} |")
+
+        self.write_line(f"{name:<40} |" + "".join(columns) + f" {comment}")
+        self.write_line(f"{name}::overflows {0:>12} {0:>10.2%} {1:>10.2%} {comment}")
+        self.write_line(f"{name}::total {samples:>12}{' ' * 23}{comment}")
+
+
+def get_core_prefix(profile: str, core_index: int) -> str:
+    if profile == "gpu":
+        return f"system.cpu3.CUs{core_index}"
+
+    return f"board.processor.cores{core_index}.core"
+
+
+def write_header(dump_writer: DumpWriter) -> None:
+    sim_ticks: int = dump_writer.generator.randint(10 ** 8, 10 ** 11)
+
+    dump_writer.scalar("simSeconds", f"{sim_ticks / 10 ** 12:.6f}", "Number of seconds simulated", "Second")
+    dump_writer.scalar("simTicks", str(sim_ticks), "Number of ticks simulated", "Tick")
+    dump_writer.scalar("finalTick", str(sim_ticks), "Number of ticks from beginning of simulation", "Tick")
+    dump_writer.scalar("simFreq", "1000000000000", "The number of ticks per simulated second", "(Tick/Second)")
+    dump_writer.ratio("hostSeconds", 1, 10000, "Real time elapsed on the host", "Second")
+    dump_writer.counter("hostMemory", 10 ** 8, "Number of bytes of host memory used", "Byte")
+    dump_writer.counter("simInsts", 10 ** 10, "Number of instructions simulated")
+    dump_writer.counter("simOps", 10 ** 10, "Number of ops (including micro ops) simulated")
+
+
+def write_core_statistics(dump_writer: DumpWriter, profile: str, number_of_cores: int) -> None:
+    for core_index in range(number_of_cores):
+        core_prefix: str = get_core_prefix(profile, core_index)
+
+        if profile == "gpu":
+            for statistic_name in COMPUTE_UNIT_STATISTICS:
+                if statistic_name in ("vpc", "ipc"):
+                    dump_writer.ratio(f"{core_prefix}.{statistic_name}", 0, 64, f"{statistic_name} of the compute unit")
+                else:
+                    dump_writer.counter(f"{core_prefix}.{statistic_name}", 10 ** 7, f"{statistic_name} of the compute unit")
+            continue
+
+        dump_writer.counter(f"{core_prefix}.numCycles", 10 ** 9, "Number of cpu cycles simulated", "Cycle")
+        dump_writer.ratio(f"{core_prefix}.cpi", 0.5, 8, "CPI: cycles per instruction (core level)", "(Cycle/Count)")
+        dump_writer.ratio(f"{core_prefix}.ipc", 0.1, 2, "IPC: instructions per cycle (core level)", "(Count/Cycle)")
+
+
+def write_memory_system_statistics(dump_writer: DumpWriter, profile: str, number_of_cores: int) -> None:
+    generator = dump_writer.generator
+
+    if profile == "classic":
+        for core_index in range(number_of_cores):
+            cluster_prefix: str = f"board.cache_hierarchy.clusters{core_index}"
+
+            for cache_name in ("l1d_cache", "l1i_cache", "l2_cache"):
+                dump_writer.counter(f"{cluster_prefix}.{cache_name}.overallHits::total", 10 ** 8, "number of overall hits")
+                dump_writer.counter(f"{cluster_prefix}.{cache_name}.overallMisses::total", 10 ** 6, "number of overall misses")
+                dump_writer.ratio(f"{cluster_prefix}.{cache_name}.overallMissRate::total", 0, 0.2, "miss rate for overall accesses")
+
+            dump_writer.counter(f"{cluster_prefix}.l2_bus.snoopTraffic", 10 ** 7, "Total snoop traffic", "Byte")
+
+        for transaction_type in CLASSIC_TRANSACTION_TYPES:
+            dump_writer.counter(f"board.cache_hierarchy.l3_bus.transDist::{transaction_type}", 10 ** 7, "Transaction distribution")
+
+        dump_writer.counter("board.cache_hierarchy.l3_bus.snoopTraffic", 10 ** 8, "Total snoop traffic", "Byte")
+
+    elif profile == "ruby":
+        dump_writer.compact_distribution(
+            f"{RUBY_SYSTEM_PREFIX}.delayHistogram",
+            [generator.randint(0, 10 ** 6) // (bucket + 1) for bucket in range(10)],
+            bucket_size=8,
+            description="delay histogram for all message"
+        )
+
+        for state in ("Inv", "I.Load", "S.Load", "E.Load", "M.Load", "I.Store", "S.Store", "M.Store"):
+            dump_writer.counter(f"{RUBY_SYSTEM_PREFIX}.L1Cache_Controller.{state}::total", 10 ** 6, "")
+
+        for request_type in ("L1_GETS", "L1_GETX", "L1_UPGRADE", "L1_PUTX"):
+            dump_writer.counter(f"{RUBY_SYSTEM_PREFIX}.L2Cache_Controller.{request_type}", 10 ** 6, "")
+
+        for core_index in range(number_of_cores):
+            dump_writer.bucket_rows(
+                f"{RUBY_SYSTEM_PREFIX}.l1_controllers{core_index}.delayHistogram",
+                [generator.randint(0, 10 ** 6) // (bucket + 1) ** 2 for bucket in range(16)],
+                bucket_size=2,
+                description="delay_histogram"
+            )
+
+        for message_type in RUBY_MESSAGE_TYPES:
+            dump_writer.counter(f"{RUBY_SYSTEM_PREFIX}.network.msg_count.{message_type}", 10 ** 7, "")
+            dump_writer.counter(f"{RUBY_SYSTEM_PREFIX}.network.msg_byte.{message_type}", 10 ** 9, "", "Byte")
+
+    elif profile == "gpu":
+        dump_writer.compact_distribution(
+            "system.cpu3.loadLatencyDist",
+            [generator.randint(0, 1000) for _ in range(160)],
+            bucket_size=10000,
+            description="delay distribution for loads"
+        )
+
+
+def write_padding(dump_writer: DumpWriter, profile: str, number_of_cores: int, target_bytes: int) -> None:
+    """
+    Adds per-core commit counters (the bulk of a real O3 dump) until the dump reaches `target_bytes`.
+    """
+
+    group_index: int = 0
+
+    while dump_writer.written_bytes < target_bytes:
+        for core_index in range(number_of_cores):
+            core_prefix: str = get_core_prefix(profile, core_index)
+
+            for op_class in OP_CLASSES:
+                dump_writer.counter(
+                    f"{core_prefix}.commitStats{group_index}.committedInstType::{op_class}",
+                    10 ** 8,
+                    "Class of committed instruction."
+                )
+
+            if dump_writer.written_bytes >= target_bytes:
+                return
+
+        group_index += 1
+
+
+def write_synthetic_stats_txt(
+    stats_file: TextIO,
+    profile: str,
+    number_of_cores: int,
+    number_of_dumps: int,
+    target_bytes: int,
+    seed: int,
+) -> None:
+    if profile not in PROFILES:
+        raise ValueError(f"Invalid profile: {profile} (expected one of {PROFILES})")
+
+    generator = random.Random(seed)
+    dump_writer = DumpWriter(stats_file, generator)
+
+    for dump_number in range(number_of_dumps):
+        dump_target_bytes: int = target_bytes * (dump_number + 1) // number_of_dumps
+
+        # gem5 separates consecutive dumps with an empty line.
+        if dump_number > 0:
+            dump_writer.write_line("")
+
+        dump_writer.write_line(SIMULATION_BEGIN_MARKER)
+
+        write_header(dump_writer)
+        write_core_statistics(dump_writer, profile, number_of_cores)
+        write_memory_system_statistics(dump_writer, profile, number_of_cores)
+        write_padding(dump_writer, profile, number_of_cores, dump_target_bytes)
+
+        dump_writer.write_line("")
+        dump_writer.write_line(SIMULATION_END_MARKER)
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--output-directory-path",
+        required=True,
+        dest="output_directory_path"
+    )
+
+    argument_parser.add_argument(
+        "--profile",
+        dest="profile",
+        choices=PROFILES,
+        default="classic"
+    )
+
+    argument_parser.add_argument(
+        "--cores",
+        dest="cores",
+        type=int,
+        default=8,
+        help="Number of cores (compute units for the \"gpu\" profile)."
+    )
+
+    argument_parser.add_argument(
+        "--dumps",
+        dest="dumps",
+        type=int,
+        default=1
+    )
+
+    argument_parser.add_argument(
+        "--size",
+        dest="size",
+        default="1M",
+        help="Approximate size of each stats.txt, e.g. 100K, 50M or 1G."
+    )
+
+    argument_parser.add_argument(
+        "--runs",
+        dest="runs",
+        type=int,
+        default=1,
+        help="Number of run directories (each with one stats.txt) to generate."
+    )
+
+    argument_parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=0
+    )
+
+    arguments = argument_parser.parse_args()
+
+    if arguments.cores < 1 or arguments.dumps < 1 or arguments.runs < 1:
+        print("--cores, --dumps and --runs must be at least 1.")
+        exit(1)
+
+    output_directory_path = Path(str(arguments.output_directory_path))
+    target_bytes: int = parse_size(str(arguments.size))
+
+    for run_index in range(arguments.runs):
+        run_directory_path = output_directory_path.joinpath(f"run-{run_index:04d}")
+        run_directory_path.mkdir(parents=True, exist_ok=True)
+
+        stats_txt_path = run_directory_path.joinpath(STATS_TXT_FILE_NAME)
+        with stats_txt_path.open(mode="w", encoding="utf-8") as stats_file:
+            write_synthetic_stats_txt(
+                stats_file,
+                profile=arguments.profile,
+                number_of_cores=arguments.cores,
+                number_of_dumps=arguments.dumps,
+                target_bytes=target_bytes,
+                seed=arguments.seed + run_index
+            )
+
+        print(f"Wrote {stats_txt_path.as_posix()} ({stats_txt_path.stat().st_size / (1024 * 1024):.1f} MiB).")
+
+
+if __name__ == "__main__":
+    main()
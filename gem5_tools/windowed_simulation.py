@@ -0,0 +1,533 @@
+"""
+Instruction-windowed gem5 simulation that stops once its metrics converge.
+
+By default the config scripts run their workload to completion. With
+`--window_insts`, they instead simulate in windows of that many instructions
+(counted on the first core). At the end of every window, the statistics are
+dumped and reset, and the window's IPC and the miss rate of every cache go into
+`windows.json` next to stats.txt. The simulation stops when one of these happens:
+- the 95% confidence interval of every metric is within `--convergence_tolerance`
+  of its mean. The windows are treated as batch means, leaving out the first
+  (cold-cache) window and needing at least `--min_windows`.
+- `--max_insts` instructions are spent.
+- the workload exits.
+
+stats.txt then holds one dump per window. `results_store.load_stats_index` merges
+them back into totals for the analyzers. `WindowSeries.load` gives the window
+series, its totals and confidence intervals.
+
+Only the standard library is used here, since this module also runs inside gem5's
+interpreter (the config scripts import it); gem5 itself is imported where it is used.
+
+Show the window series of a gem5 output directory with:
+
+> python -m gem5_tools.windowed_simulation --run-directory-path <gem5 output directory>
+"""
+
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass, field
+import json
+import math
+import os
+from pathlib import Path
+import re
+from typing import Dict, List, Optional, Self, Tuple
+
+from gem5_tools.stats_index import StatsIndex, parse_float_token
+
+
+WINDOW_SERIES_FILE_NAME: str = "windows.json"
+
+STOP_REASON_CONVERGED: str = "converged"
+STOP_REASON_MAX_INSTRUCTIONS: str = "max_insts"
+STOP_REASON_COMPLETED: str = "completed"
+
+# Leading windows left out of convergence and confidence intervals (caches and predictors are still cold).
+WARMUP_WINDOWS: int = 1
+
+DEFAULT_CONVERGENCE_TOLERANCE: float = 0.02
+DEFAULT_MIN_WINDOWS: int = 4
+
+# Two-sided 95% quantiles of Student's t distribution for 1..30 degrees of freedom (normal beyond).
+STUDENT_T_95_QUANTILES: List[float] = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+NORMAL_95_QUANTILE: float = 1.96
+
+# Per-core statistics: cycles, and committed instructions under the names different CPU models use.
+CORE_CYCLES_PATTERN = re.compile(r"^(board\.processor\.[\w.]+)\.numCycles$")
+CORE_INSTRUCTION_STATISTIC_SUFFIXES: List[str] = [
+    ".commitStats0.numInsts",
+    ".committedInsts",
+    ".exec_context.thread_0.numInsts",
+]
+
+CACHE_MISSES_PATTERN = re.compile(r"^(board\.cache_hierarchy\.[\w.]+)\.overallMisses::total$")
+
+# Statistics that resetting the statistics leaves alone (settings and totals since the start): the last window's value is the run's.
+NON_RESETTING_STATISTIC_NAMES: List[str] = ["finalTick", "simFreq", "simInsts", "simOps", "hostMemory"]
+NON_RESETTING_STATISTIC_SUFFIXES: List[str] = [".clock"]
+
+
+def get_student_t_95_quantile(degrees_of_freedom: int) -> float:
+    if degrees_of_freedom <= len(STUDENT_T_95_QUANTILES):
+        return STUDENT_T_95_QUANTILES[degrees_of_freedom - 1]
+
+    return NORMAL_95_QUANTILE
+
+
+@dataclass(frozen=True, kw_only=True)
+class MetricEstimate:
+    mean: float
+    # Half-width of the 95% confidence interval of the mean.
+    half_width: float
+    number_of_windows: int
+
+    @classmethod
+    def from_values(cls, values: List[float]) -> Optional[Self]:
+        if len(values) < 2:
+            return None
+
+        mean: float = sum(values) / len(values)
+        variance: float = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+
+        return cls(
+            mean=mean,
+            half_width=get_student_t_95_quantile(len(values) - 1) * math.sqrt(variance / len(values)),
+            number_of_windows=len(values)
+        )
+
+    def get_relative_half_width(self) -> float:
+        if self.mean == 0:
+            return 0.0 if self.half_width == 0 else math.inf
+
+        return self.half_width / abs(self.mean)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SimulationWindow:
+    index: int
+    end_tick: int
+    # Committed instructions of all cores.
+    instructions: float
+    # Cycles of the core that ran longest (the window's length in cycles).
+    cycles: float
+    cache_misses: Dict[str, float]
+    cache_accesses: Dict[str, float]
+
+    @classmethod
+    def from_stats_index(cls, index: int, end_tick: int, stats_index: StatsIndex) -> Self:
+        instructions: float = 0.0
+        cycles: float = 0.0
+
+        for name, raw_value in stats_index.raw_values.items():
+            core_match = CORE_CYCLES_PATTERN.match(name)
+            if core_match is None:
+                continue
+
+            core_cycles: float = parse_float_token(raw_value)
+            if not core_cycles > 0:
+                # A switched-out core of a switchable processor.
+                continue
+
+            core_name: str = core_match.group(1)
+            core_instructions: Optional[float] = next(
+                (
+                    parse_float_token(stats_index.get_raw(core_name + suffix))
+                    for suffix in CORE_INSTRUCTION_STATISTIC_SUFFIXES if core_name + suffix in stats_index
+                ),
+                None
+            )
+
+            if core_instructions is None and f"{core_name}.ipc" in stats_index:
+                core_instructions = parse_float_token(stats_index.get_raw(f"{core_name}.ipc")) * core_cycles
+
+            if core_instructions is not None and math.isfinite(core_instructions):
+                instructions += core_instructions
+                cycles = max(cycles, core_cycles)
+
+        cache_misses: Dict[str, float] = {}
+        cache_accesses: Dict[str, float] = {}
+
+        for name, raw_value in stats_index.raw_values.items():
+            cache_match = CACHE_MISSES_PATTERN.match(name)
+            if cache_match is None or f"{cache_match.group(1)}.overallAccesses::total" not in stats_index:
+                continue
+
+            cache_name: str = cache_match.group(1).removeprefix("board.cache_hierarchy.")
+            cache_misses[cache_name] = parse_float_token(raw_value)
+            cache_accesses[cache_name] = stats_index.get_float(f"{cache_match.group(1)}.overallAccesses::total")
+
+        return cls(
+            index=index,
+            end_tick=end_tick,
+            instructions=instructions,
+            cycles=cycles,
+            cache_misses=cache_misses,
+            cache_accesses=cache_accesses
+        )
+
+    @classmethod
+    def from_dict(cls, window: Dict) -> Self:
+        return cls(
+            index=window["index"],
+            end_tick=window["end_tick"],
+            instructions=window["instructions"],
+            cycles=window["cycles"],
+            cache_misses=window["cache_misses"],
+            cache_accesses=window["cache_accesses"]
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "index": self.index,
+            "end_tick": self.end_tick,
+            "instructions": self.instructions,
+            "cycles": self.cycles,
+            "cache_misses": self.cache_misses,
+            "cache_accesses": self.cache_accesses,
+            # Derived, for reading the file by eye.
+            "metrics": self.get_metrics(),
+        }
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        IPC and the miss rate of every cache that was accessed in the window.
+        """
+
+        metrics: Dict[str, float] = {}
+
+        if self.cycles > 0:
+            metrics["ipc"] = self.instructions / self.cycles
+
+        for cache_name, accesses in self.cache_accesses.items():
+            if accesses > 0:
+                metrics[f"{cache_name}.miss_rate"] = self.cache_misses[cache_name] / accesses
+
+        return metrics
+
+
+@dataclass(kw_only=True)
+class WindowSeries:
+    window_instructions: int
+    # 0 for no budget.
+    max_instructions: int
+    convergence_tolerance: float
+    min_windows: int
+    windows: List[SimulationWindow] = field(default_factory=list)
+    stop_reason: Optional[str] = None
+
+    @classmethod
+    def load(cls, run_directory_path: Path) -> Optional[Self]:
+        """
+        The window series of a gem5 output directory, or `None` if it ran without windows.
+        """
+
+        series_file_path = run_directory_path.joinpath(WINDOW_SERIES_FILE_NAME)
+        if not series_file_path.is_file():
+            return None
+
+        series: Dict = json.loads(series_file_path.read_text(encoding="utf-8"))
+
+        return cls(
+            window_instructions=series["window_instructions"],
+            max_instructions=series["max_instructions"],
+            convergence_tolerance=series["convergence_tolerance"],
+            min_windows=series["min_windows"],
+            windows=[SimulationWindow.from_dict(window) for window in series["windows"]],
+            stop_reason=series["stop_reason"]
+        )
+
+    def save(self, run_directory_path: Path) -> None:
+        series_file_path = run_directory_path.joinpath(WINDOW_SERIES_FILE_NAME)
+
+        series: Dict = {
+            "window_instructions": self.window_instructions,
+            "max_instructions": self.max_instructions,
+            "convergence_tolerance": self.convergence_tolerance,
+            "min_windows": self.min_windows,
+            "stop_reason": self.stop_reason,
+            "totals": self.get_totals(),
+            "estimates": {
+                name: {"mean": estimate.mean, "half_width": estimate.half_width, "windows": estimate.number_of_windows}
+                for name, estimate in self.estimate_metrics().items()
+            },
+            "windows": [window.to_dict() for window in self.windows],
+        }
+
+        # Replaced as a whole, so a simulation killed mid-write leaves the previous windows readable.
+        temporary_file_path = series_file_path.with_suffix(".json.tmp")
+        temporary_file_path.write_text(json.dumps(series, indent=2), encoding="utf-8")
+        os.replace(temporary_file_path, series_file_path)
+
+    def estimate_metrics(self) -> Dict[str, MetricEstimate]:
+        """
+        Mean and 95% confidence interval of every metric over the windows after the warm-up.
+        """
+
+        metric_values: Dict[str, List[float]] = {}
+        for window in self.windows[WARMUP_WINDOWS:]:
+            for name, value in window.get_metrics().items():
+                metric_values.setdefault(name, []).append(value)
+
+        estimates: Dict[str, MetricEstimate] = {}
+        for name, values in metric_values.items():
+            estimate: Optional[MetricEstimate] = MetricEstimate.from_values(values)
+            if estimate is not None:
+                estimates[name] = estimate
+
+        return estimates
+
+    def has_converged(self) -> bool:
+        if len(self.windows) - WARMUP_WINDOWS < max(2, self.min_windows):
+            return False
+
+        estimates: Dict[str, MetricEstimate] = self.estimate_metrics()
+
+        return "ipc" in estimates and all(
+            estimate.get_relative_half_width() <= self.convergence_tolerance for estimate in estimates.values()
+        )
+
+    def get_totals(self) -> Dict[str, float]:
+        """
+        The metrics over all windows together, as a run to completion would report them.
+        """
+
+        instructions: float = sum(window.instructions for window in self.windows)
+        cycles: float = sum(window.cycles for window in self.windows)
+
+        totals: Dict[str, float] = {"instructions": instructions, "cycles": cycles}
+        if cycles > 0:
+            totals["ipc"] = instructions / cycles
+
+        for cache_name in sorted({cache_name for window in self.windows for cache_name in window.cache_accesses}):
+            accesses: float = sum(window.cache_accesses.get(cache_name, 0.0) for window in self.windows)
+            if accesses > 0:
+                misses: float = sum(window.cache_misses.get(cache_name, 0.0) for window in self.windows)
+                totals[f"{cache_name}.miss_rate"] = misses / accesses
+
+        return totals
+
+
+def read_appended_stats_dump(stats_txt_path: Path, offset: int) -> Tuple[StatsIndex, int]:
+    """
+    The statistics gem5 appended to stats.txt after `offset`, and the new end of the file.
+    """
+
+    with stats_txt_path.open(mode="r", encoding="utf-8") as stats_file:
+        stats_file.seek(offset)
+        stats_text: str = stats_file.read()
+        return StatsIndex.from_text(stats_text), stats_file.tell()
+
+
+def schedule_window_end(board, instructions: int, instantiated: bool) -> None:
+    # On the first core only: scheduling on every core would leave the other cores' events pending.
+    core = board.get_processor().get_cores()[0].core
+
+    if instantiated:
+        core.scheduleInstStopAnyThread(instructions)
+    else:
+        core.max_insts_any_thread = instructions
+
+
+def run_simulation(
+    board,
+    arguments: Namespace,
+    on_exit_event: Optional[Dict] = None,
+    checkpoint_path: Optional[Path] = None
+) -> None:
+    """
+    Runs the simulation of a config script: to completion, or in instruction windows
+    if `arguments.window_insts` is set (with the `--window_insts`, `--max_insts`,
+    `--convergence_tolerance` and `--min_windows` options of the config scripts).
+    `on_exit_event` handlers of the script are kept, except for the MAX_INSTS and
+    EXIT events a windowed simulation handles itself. With `checkpoint_path`, the
+    simulation starts from that checkpoint (see gem5_tools.checkpoints).
+    """
+
+    import m5
+    from gem5.simulate.exit_event import ExitEvent
+    from gem5.simulate.simulator import Simulator
+
+    if arguments.window_insts <= 0:
+        Simulator(board=board, on_exit_event=on_exit_event, checkpoint_path=checkpoint_path).run()
+        return
+
+    output_directory_path = Path(m5.options.outdir)
+    stats_txt_path = output_directory_path.joinpath(m5.options.stats_file)
+
+    window_series = WindowSeries(
+        window_instructions=arguments.window_insts,
+        max_instructions=max(0, arguments.max_insts),
+        convergence_tolerance=arguments.convergence_tolerance,
+        min_windows=arguments.min_windows
+    )
+
+    stats_offset: int = 0
+    executed_instructions: int = 0
+
+    def end_window() -> None:
+        nonlocal stats_offset
+
+        m5.stats.dump()
+        m5.stats.reset()
+
+        stats_index, stats_offset = read_appended_stats_dump(stats_txt_path, stats_offset)
+        window: SimulationWindow = SimulationWindow.from_stats_index(len(window_series.windows), m5.curTick(), stats_index)
+        window_series.windows.append(window)
+
+        metrics: str = ", ".join(f"{name} {value:.4f}" for name, value in window.get_metrics().items())
+        print(f"Window {window.index}: {window.instructions:.0f} instructions, {metrics}")
+
+    def get_next_window_instructions() -> int:
+        if window_series.max_instructions <= 0:
+            return window_series.window_instructions
+
+        return min(window_series.window_instructions, window_series.max_instructions - executed_instructions)
+
+    def on_window_end():
+        nonlocal executed_instructions
+
+        while True:
+            executed_instructions += get_next_window_instructions()
+            end_window()
+
+            if window_series.has_converged():
+                window_series.stop_reason = STOP_REASON_CONVERGED
+            elif window_series.max_instructions > 0 and executed_instructions >= window_series.max_instructions:
+                window_series.stop_reason = STOP_REASON_MAX_INSTRUCTIONS
+
+            window_series.save(output_directory_path)
+
+            if window_series.stop_reason is not None:
+                print(f"Stopping after {len(window_series.windows)} windows: {window_series.stop_reason}")
+                yield True
+            else:
+                schedule_window_end(board, get_next_window_instructions(), instantiated=True)
+                yield False
+
+    def on_workload_exit():
+        end_window()
+        window_series.stop_reason = STOP_REASON_COMPLETED
+        window_series.save(output_directory_path)
+        yield True
+
+    exit_event_handlers: Dict = dict(on_exit_event or {})
+    exit_event_handlers[ExitEvent.MAX_INSTS] = on_window_end()
+    exit_event_handlers[ExitEvent.EXIT] = on_workload_exit()
+
+    schedule_window_end(board, get_next_window_instructions(), instantiated=False)
+    Simulator(board=board, on_exit_event=exit_event_handlers, checkpoint_path=checkpoint_path).run()
+
+
+def merge_window_stats_indexes(stats_indexes: List[StatsIndex]) -> StatsIndex:
+    """
+    One index with the totals of the per-window dumps of a windowed simulation:
+    - statistics that are never reset (`finalTick`, `simInsts`, clock periods, ...) are the last window's.
+    - integer counters are summed.
+    - other values are averaged over the windows where they are defined, weighted by
+      `simSeconds`. That is exact for per-cycle and per-second rates such as IPC and bandwidths.
+    - `cpi` becomes 1 / `ipc`.
+    - miss rates are recomputed from the summed misses and accesses.
+    """
+
+    if len(stats_indexes) == 1:
+        return stats_indexes[0]
+
+    weights: List[float] = [
+        parse_float_token(stats_index.raw_values.get("simSeconds", "0")) for stats_index in stats_indexes
+    ]
+
+    names: List[str] = list(dict.fromkeys(name for stats_index in stats_indexes for name in stats_index.raw_values))
+    raw_values: Dict[str, str] = {}
+
+    for name in names:
+        window_values: List[Tuple[str, float]] = [
+            (stats_index.raw_values[name], weight)
+            for stats_index, weight in zip(stats_indexes, weights) if name in stats_index.raw_values
+        ]
+
+        if name in NON_RESETTING_STATISTIC_NAMES or name.endswith(tuple(NON_RESETTING_STATISTIC_SUFFIXES)):
+            raw_values[name] = window_values[-1][0]
+            continue
+
+        if all(re.fullmatch(r"-?\d+", raw_value) for raw_value, _ in window_values):
+            raw_values[name] = str(sum(int(raw_value) for raw_value, _ in window_values))
+            continue
+
+        # NaN in windows without activity, e.g. the IPC of a window that committed nothing.
+        finite_values: List[Tuple[float, float]] = []
+        for raw_value, weight in window_values:
+            value: float = parse_float_token(raw_value)
+            if math.isfinite(value) and math.isfinite(weight):
+                finite_values.append((value, weight))
+        finite_weight: float = sum(weight for _, weight in finite_values)
+
+        if name in ["simSeconds", "simTicks", "hostSeconds"]:
+            raw_values[name] = repr(sum(value for value, _ in finite_values))
+        elif finite_weight > 0:
+            raw_values[name] = repr(sum(value * weight for value, weight in finite_values) / finite_weight)
+        else:
+            # Distributions and values defined in no weighted window: the last window's.
+            raw_values[name] = window_values[-1][0]
+
+    for name in names:
+        if name.endswith(".cpi") and f"{name[:-4]}.ipc" in raw_values:
+            ipc: float = parse_float_token(raw_values[f"{name[:-4]}.ipc"])
+            raw_values[name] = repr(1 / ipc) if ipc > 0 else "nan"
+
+        miss_rate_match = re.fullmatch(r"(.+)MissRate(::.+)", name)
+        if miss_rate_match is not None:
+            misses_name: str = f"{miss_rate_match.group(1)}Misses{miss_rate_match.group(2)}"
+            accesses_name: str = f"{miss_rate_match.group(1)}Accesses{miss_rate_match.group(2)}"
+
+            if misses_name in raw_values and accesses_name in raw_values:
+                accesses: float = parse_float_token(raw_values[accesses_name])
+                raw_values[name] = repr(parse_float_token(raw_values[misses_name]) / accesses) if accesses > 0 else "nan"
+
+    return StatsIndex(raw_values=raw_values)
+
+
+def print_window_series(window_series: WindowSeries) -> None:
+    print(
+        f"{len(window_series.windows)} windows of {window_series.window_instructions} instructions, "
+        f"stopped: {window_series.stop_reason or 'still running'}"
+    )
+
+    for name, value in window_series.get_totals().items():
+        estimate: Optional[MetricEstimate] = window_series.estimate_metrics().get(name)
+        confidence_interval: str = f" (windows: {estimate.mean:.4f} +- {estimate.half_width:.4f})" if estimate is not None else ""
+
+        print(f"  > {name}: {value:.6g}{confidence_interval}")
+
+
+def main() -> None:
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument(
+        "--run-directory-path",
+        required=True,
+        dest="run_directory_path",
+        help="gem5 output directory of a simulation run with --window_insts."
+    )
+
+    arguments = argument_parser.parse_args()
+
+    run_directory_path = Path(str(arguments.run_directory_path))
+    window_series: Optional[WindowSeries] = WindowSeries.load(run_directory_path)
+
+    if window_series is None:
+        print(f"No {WINDOW_SERIES_FILE_NAME} in {run_directory_path}")
+        exit(1)
+
+    print_window_series(window_series)
+
+    for window in window_series.windows:
+        metrics: str = ", ".join(f"{name} {value:.4f}" for name, value in window.get_metrics().items())
+        print(f"  window {window.index}: {window.instructions:.0f} instructions, {metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,10 @@
 from gem5.components.boards.simple_board import SimpleBoard
 from gem5.components.memory.multi_channel import DualChannelDDR4_2400
 from gem5.components.processors.cpu_types import CPUTypes
-from gem5.components.processors.simple_switchable_processor import (
-    SimpleSwitchableProcessor
-)
-from gem5.components.processors.simple_processor import SimpleProcessor
 from gem5.isas import ISA
 from gem5.resources.resource import obtain_resource
-from gem5.simulate.exit_event import ExitEvent
-from gem5.simulate.simulator import Simulator
 from gem5.resources.resource import CustomResource
 from gem5.components.memory.single_channel import SingleChannelDDR3_1600
-from gem5.simulate.exit_event import ExitEvent
 
 
 
@@ -20,15 +13,30 @@ from three_level import PrivateL1PrivateL2SharedL3CacheHierarchy
 
 import m5
 import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.fast_forward import build_fast_forward_exit_handlers, create_processor
+from gem5_tools.windowed_simulation import DEFAULT_CONVERGENCE_TOLERANCE, DEFAULT_MIN_WINDOWS, run_simulation
 
 parser = argparse.ArgumentParser(description="Configure simulation parameters.")
 parser.add_argument("--num_cores", type=int, default=4, help="Number of CPU cores.")
 parser.add_argument("--l1_size", type=str, default="32KiB", help="L1 cache size.")
 parser.add_argument("--l2_size", type=str, default="256KiB", help="L2 cache size.")
 parser.add_argument("--l3_size", type=str, default="2MiB", help="L3 cache size.")
+parser.add_argument("--fast_forward", "--fast-forward", action="store_true", help="Run functional cores until the region of interest (m5_work_begin), then switch to the detailed cores.")
+parser.add_argument("--fast_forward_insts", type=int, default=0, help="With --fast_forward, also switch after this many instructions (for workloads without m5_work_begin).")
+parser.add_argument("--window_insts", type=int, default=0, help="Instructions per statistics window (0 runs to completion without windows)")
+parser.add_argument("--max_insts", type=int, default=0, help="With --window_insts, stop after this many instructions (0 for no budget)")
+parser.add_argument("--convergence_tolerance", type=float, default=DEFAULT_CONVERGENCE_TOLERANCE, help="With --window_insts, stop once the 95%% confidence interval of IPC and every miss rate is within this fraction of the mean")
+parser.add_argument("--min_windows", type=int, default=DEFAULT_MIN_WINDOWS, help="With --window_insts, windows needed (after the first) before stopping early")
 
 args = parser.parse_args()
 
+if args.fast_forward and args.window_insts > 0:
+    parser.error("--window_insts cannot be combined with --fast_forward (both use instruction count exits)")
+
 
 cache_hierarchy = PrivateL1PrivateL2SharedL3CacheHierarchy(
     l1d_size=args.l1_size,
@@ -41,26 +49,18 @@ cache_hierarchy = PrivateL1PrivateL2SharedL3CacheHierarchy(
     l3_assoc=16,
 )
 
-processor = SimpleProcessor(
+processor = create_processor(
+        args,
         cpu_type=CPUTypes.MINOR,
         num_cores=args.num_cores,
         isa=ISA.X86,
+        fast_forward_cpu_type=CPUTypes.ATOMIC,
     )
 
 
 memory = SingleChannelDDR3_1600(size="4GiB")
 
 
-# def roi_begin_handler():
-#     m5.stats.reset()  
-# 
-# def roi_end_handler():
-#     m5.stats.dump()  
-#     print("stats have been dumped!")
-
-
-
-
 #add board 
 board = SimpleBoard(
     clk_freq="3GHz",
@@ -77,11 +77,9 @@ binary = CustomResource("./workload/cholesky/cholesky.bin")
 
 board.set_se_binary_workload(binary)
 
-simulator = Simulator(
-            board=board,
-            # on_exit_event={
-            #     ExitEvent.WORKBEGIN : roi_begin_handler,
-            #     ExitEvent.WORKEND : roi_end_handler,
-            # }     
+run_simulation(
+            board,
+            args,
+            on_exit_event=build_fast_forward_exit_handlers(processor, args),
             )
-simulator.run()
+
@@ -16,3 +16,13 @@ PROGRAM_NAME=$(basename "$PROGRAM")
 
 echo "Running with processor count: $NUM_CORES and program $PROGRAM_NAME"
 srun apptainer exec $GEM5_WORKSPACE/gem5.sif $GEM_PATH/gem5.opt --outdir=out/out_${PROGRAM_NAME}_${NUM_CORES} ruby_benchmark.py --program $PROGRAM --num_cores $NUM_CORES
+
+# Optionally compress the text outputs (COMPRESS_RESULTS=gzip|zstd sbatch job.sh ...).
+for OUTPUT_FILE in out/out_${PROGRAM_NAME}_${NUM_CORES}/stats.txt out/out_${PROGRAM_NAME}_${NUM_CORES}/config.ini; do
+    if [ -f "$OUTPUT_FILE" ]; then
+        case "${COMPRESS_RESULTS:-none}" in
+            gzip) gzip -9 "$OUTPUT_FILE" ;;
+            zstd) zstd -q --rm -19 "$OUTPUT_FILE" ;;
+        esac
+    fi
+done
@@ -1,7 +1,14 @@
 import os
 import re
+import sys
 import argparse
 from collections import defaultdict
+from functools import lru_cache, partial
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.compressed_stats import find_stats_txt_path, is_stats_txt_file_name, read_stats_bytes
+from gem5_tools.parallel_ingest import IngestThroughput, map_in_order, resolve_number_of_jobs
 
 BASE_KEYS = [
     "simSeconds",
@@ -17,48 +24,111 @@ BASE_KEYS = [
     "board.cache_hierarchy.ruby_system.network.msg_count.Writeback_Data"
 ]
 
-def find_stats_files(root_folder):
+def find_stats_files(root_folder, recursive=True):
     for dirpath, _, filenames in os.walk(root_folder):
-        for filename in filenames:
-            if filename == "stats.txt":
-                yield os.path.join(dirpath, filename)
-
-def extract_all_core_cpis(file_path):
-    cpi_pattern = re.compile(r'board\.processor\.cores(\d+)\.core\.cpi')
-    core_cpis = {}
-    with open(file_path, 'r') as file:
-        for line in file:
-            match = cpi_pattern.match(line.strip())
-            if match:
-                parts = re.split(r'\s{2,}', line.strip())
-                if len(parts) >= 2:
-                    try:
-                        core_cpis[line.strip().split()[0]] = float(parts[1])
-                    except ValueError:
-                        core_cpis[line.strip().split()[0]] = parts[1]
-    return core_cpis
+        # stats.txt, or its stats.txt.zst / stats.txt.gz archive.
+        if any(is_stats_txt_file_name(filename) for filename in filenames):
+            yield find_stats_txt_path(Path(dirpath)).as_posix()
+        if not recursive:
+            break
+
+CORE_CPI_PATTERN = r'board\.processor\.cores\d+\.core\.cpi'
+
+DEFAULT_FIELDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "read_fields.txt")
+
+def load_field_keys(fields_path):
+    if not os.path.isfile(fields_path):
+        return BASE_KEYS
+    with open(fields_path, 'r') as file:
+        return [line.strip() for line in file if line.strip()]
+
+def build_trie_pattern(keys):
+    # Renders the keys as a regex trie (shared prefixes factored out), so matching a line
+    # walks its name once instead of trying every key in turn.
+    trie = {}
+    for key in keys:
+        node = trie
+        for character in key:
+            node = node.setdefault(character, {})
+        node[None] = {}
+
+    def render(node):
+        branches = [re.escape(character) + render(child) for character, child in sorted(node.items(), key=lambda item: item[0] or '') if character is not None]
+        if not branches:
+            return ''
+        if None in node:
+            return '(?:' + '|'.join(branches) + ')?'
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return render(trie)
+
+@lru_cache(maxsize=None)
+def build_stats_matcher(keys):
+    """
+    One anchored multi-pattern matcher for all requested keys plus the per-core CPI family.
+    Every line is matched at most once against it, so a file is scanned in O(file size)
+    no matter how many keys are requested.
+    """
+    matcher = re.compile(
+        r'^(?:(?P<field>' + build_trie_pattern(keys) + r')|(?P<core_cpi>' + CORE_CPI_PATTERN + r'))[^\n]*',
+        re.MULTILINE
+    )
+    # The trie matches the longest key; a line also counts for every shorter key that prefixes it.
+    covering_keys = {key: [other for other in keys if key.startswith(other)] for key in keys}
+    return matcher, covering_keys
+
+def parse_value(line):
+    parts = re.split(r'\s{2,}', line.strip())
+    if len(parts) < 2:
+        return None
+    try:
+        return float(parts[1])
+    except ValueError:
+        return parts[1]
 
 def extract_stats(file_path, base_keys):
+    matcher, covering_keys = build_stats_matcher(tuple(base_keys))
+    content = read_stats_bytes(Path(file_path)).decode("utf-8")
+
     stats = {}
-    with open(file_path, 'r') as file:
-        for line in file:
-            for key in base_keys:
-                if line.strip().startswith(key):
-                    parts = re.split(r'\s{2,}', line.strip())
-                    if len(parts) >= 2:
-                        try:
-                            stats[key] = float(parts[1])
-                        except ValueError:
-                            stats[key] = parts[1]
-    stats.update(extract_all_core_cpis(file_path))
+    for match in matcher.finditer(content):
+        value = parse_value(match.group(0))
+        if value is None:
+            continue
+        if match.group('core_cpi') is not None:
+            stats[match.group(0).split()[0]] = value
+        else:
+            for key in covering_keys[match.group('field')]:
+                stats[key] = value
     return stats
 
-def aggregate_stats(folder_path, base_keys):
+def extract_stats_in_folder(folder_task, base_keys):
+    # Runs in a --jobs worker: discovers and parses the stats.txt files of one subfolder.
+    folder_path, recursive = folder_task
+    return [
+        (file_path, extract_stats(file_path, base_keys), os.path.getsize(file_path))
+        for file_path in find_stats_files(folder_path, recursive)
+    ]
+
+def aggregate_stats(folder_path, base_keys, jobs=1):
     aggregated = defaultdict(dict)
-    for file_path in find_stats_files(folder_path):
-        run_name = os.path.basename(os.path.dirname(file_path))
-        stats = extract_stats(file_path, base_keys)
-        aggregated[run_name].update(stats)
+    throughput = IngestThroughput()
+
+    # Same order as a single os.walk: the root folder itself first, then each subfolder tree.
+    _, subfolder_names, _ = next(os.walk(folder_path))
+    folder_tasks = [(folder_path, False)] + [
+        (os.path.join(folder_path, subfolder_name), True) for subfolder_name in subfolder_names
+    ]
+
+    for folder_results in map_in_order(partial(extract_stats_in_folder, base_keys=base_keys), folder_tasks, jobs):
+        for file_path, stats, file_size in folder_results:
+            run_name = os.path.basename(os.path.dirname(file_path))
+            aggregated[run_name].update(stats)
+            throughput.record(file_size)
+
+    print(throughput.describe())
     return aggregated
 
 def save_data(aggregated_data, output_path, all_keys):
@@ -75,16 +145,25 @@ def main():
         description="Aggregate simulation stats from multiple stats.txt files in subfolders"
     )
     parser.add_argument("folder", help="Path to the root folder containing stats.txt files")
+    parser.add_argument(
+        "--fields", default=DEFAULT_FIELDS_FILE,
+        help="File with one stat name (prefix) per line to extract, besides the per-core CPIs"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of worker processes used to parse the stats.txt files (0 = one per CPU)"
+    )
     args = parser.parse_args()
 
-    all_keys = set(BASE_KEYS)
-    for file_path in find_stats_files(args.folder):
-        cpi_keys = extract_all_core_cpis(file_path).keys()
-        all_keys.update(cpi_keys)
+    base_keys = load_field_keys(args.fields)
+    aggregated_data = aggregate_stats(args.folder, base_keys, resolve_number_of_jobs(args.jobs))
 
-    all_keys = sorted(all_keys)
+    # Per-core CPI keys are whatever cores the runs had, collected during the same pass.
+    all_keys = set(base_keys)
+    for data in aggregated_data.values():
+        all_keys.update(data.keys())
 
-    aggregated_data = aggregate_stats(args.folder, BASE_KEYS)
+    all_keys = sorted(all_keys)
 
     for run, data in aggregated_data.items():
         print(f"\n[{run}]")
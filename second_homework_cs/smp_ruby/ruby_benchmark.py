@@ -2,13 +2,8 @@
 from gem5.components.boards.simple_board import SimpleBoard
 from gem5.components.memory.multi_channel import DualChannelDDR4_2400
 from gem5.components.processors.cpu_types import CPUTypes
-from gem5.components.processors.simple_switchable_processor import (
-    SimpleSwitchableProcessor
-)
-from gem5.components.processors.simple_processor import SimpleProcessor
 from gem5.isas import ISA
 from gem5.resources.resource import obtain_resource
-from gem5.simulate.exit_event import ExitEvent
 from gem5.simulate.simulator import Simulator
 from gem5.resources.resource import CustomResource
 from gem5.components.memory.single_channel import SingleChannelDDR3_1600
@@ -18,6 +13,11 @@ from mesi_two_level import MESITwoLevelCacheHierarchy
 import m5
 
 import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).resolve().parents[2].as_posix())
+from gem5_tools.fast_forward import build_fast_forward_exit_handlers, create_processor
 
 
 parser = argparse.ArgumentParser(description="Configure simulation parameters.")
@@ -26,6 +26,8 @@ parser.add_argument("--l1_size", type=str, default="32KiB", help="L1 cache size.
 parser.add_argument("--l2_size", type=str, default="256KiB", help="L2 cache size.")
 
 parser.add_argument("--program", type=str)
+parser.add_argument("--fast_forward", "--fast-forward", action="store_true", help="Run functional cores until the region of interest (m5_work_begin), then switch to the detailed cores.")
+parser.add_argument("--fast_forward_insts", type=int, default=0, help="With --fast_forward, also switch after this many instructions (for workloads without m5_work_begin).")
 
 args = parser.parse_args()
 
@@ -39,10 +41,13 @@ cache_hiearchy = MESITwoLevelCacheHierarchy(
     num_l2_banks=1,
 )
 
-processor = SimpleProcessor(
+# Ruby cannot serve atomic accesses, so fast-forwarding uses TIMING cores.
+processor = create_processor(
+    args,
     cpu_type=CPUTypes.MINOR,
     num_cores=args.num_cores,
     isa=ISA.X86,
+    fast_forward_cpu_type=CPUTypes.TIMING,
 )
 
 memory = SingleChannelDDR3_1600(size="2GiB")
@@ -58,5 +63,5 @@ board = SimpleBoard(
 binary = CustomResource(args.program)
 board.set_se_binary_workload(binary)
 
-simulator = Simulator(board=board)
+simulator = Simulator(board=board, on_exit_event=build_fast_forward_exit_handlers(processor, args))
 simulator.run()
@@ -3,76 +3,21 @@ from dataclasses import dataclass
 import os
 from pathlib import Path
 import re
-from typing import List, Optional, Self, Tuple
-
-
-SIMULATION_BEGIN_MARKER: str = "---------- Begin Simulation Statistics ----------"
-
-def select_simulation_statistic(full_log_file: str, selected_nth_simulation: int) -> str:
-    """
-    Some stats.txt files contain more than one
-
-    ---------- Begin Simulation Statistics ----------
-    [...]
-    ---------- End Simulation Statistics   ----------
-
-    block, i.e. more than one set of simulation statistics.
-
-    Given a full log file with one or more of those sections, this function returns 
-    a matching subset of the log file (the `nth_simulation`, starting at index 0).
-    """
-
-    valid_selected_lines: List[str] = []
-
-    current_simulation_index: Optional[int] = None
-    for line in full_log_file.splitlines(keepends=True):
-        if line.startswith(SIMULATION_BEGIN_MARKER):
-            if current_simulation_index is None:
-                current_simulation_index = 0
-            else:
-                current_simulation_index += 1
-        
-        if current_simulation_index == selected_nth_simulation:
-            valid_selected_lines.append(line)
-
-    # No need for manual newlines, as we used keepends=True when splitting lines.
-    return "".join(valid_selected_lines)
-
-
-
-
-def find_and_extract_int_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> int:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return int(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
-
-
-def find_and_extract_float_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> float:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return float(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
+import sys
+from typing import List, Self, Tuple
 
+import numpy as np
 
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.stat_arrays import get_indexed_vectors
+from gem5_tools.stats_index import StatsIndex
 
 
+CORE_CPI_TEMPLATE: str = "board.processor.cores{}.core.cpi"
+L1_OVERALL_MISSES_TEMPLATE: str = "board.cache_hierarchy.clusters{}.l1d_cache.overallMisses::total"
+L1_OVERALL_HITS_TEMPLATE: str = "board.cache_hierarchy.clusters{}.l1d_cache.overallHits::total"
 
 DIRECTORY_NAME_REGEX: re.Pattern = re.compile(r"(.+)-cpus")
 
@@ -94,11 +39,11 @@ class RunParameters:
 
 @dataclass(frozen=True, kw_only=True)
 class RunResults:
-    cycles_per_instruction_per_core: List[float]
+    cycles_per_instruction_per_core: np.ndarray
 
-    l1_overall_misses_per_core: List[int]
+    l1_overall_misses_per_core: np.ndarray
 
-    l1_overall_hits_per_core: List[int]
+    l1_overall_hits_per_core: np.ndarray
 
     l3_upgrade_requests: int
 
@@ -110,58 +55,36 @@ class RunResults:
         run_results_directory_path: Path,
         number_of_cpus: int
     ) -> Self:
-        stats_txt_path = run_results_directory_path.joinpath("stats.txt")
-        if not stats_txt_path.is_file():
+        stats_txt_path = find_stats_txt_path(run_results_directory_path)
+        if stats_txt_path is None:
             raise FileNotFoundError(f"No stats.txt in {run_results_directory_path}!")
 
-        with stats_txt_path.open(mode="r", encoding="utf-8") as stats_file:
-            stats_file_contents = stats_file.read()
-            return cls.from_stats_txt(
-                stats_txt=stats_file_contents,
-                number_of_cpus=number_of_cpus
-            )
+        return cls.from_stats_index(
+            selected_sim=load_stats_index(stats_txt_path, selected_nth_simulation=0),
+            number_of_cpus=number_of_cpus
+        )
     
     @classmethod
-    def from_stats_txt(cls, stats_txt: str, number_of_cpus: int) -> Self:
-        selected_sim = select_simulation_statistic(stats_txt, selected_nth_simulation=0)
-
+    def from_stats_index(cls, selected_sim: StatsIndex, number_of_cpus: int) -> Self:
 
-        cycles_per_instruction_per_core: List[float] = []
-        for cpu_index in range(number_of_cpus):
-            cpi_value: float = find_and_extract_float_statistic(
-                selected_sim,
-                f"board.processor.cores{cpu_index}.core.cpi"
-            )
-
-            cycles_per_instruction_per_core.append(cpi_value)
-
-
-        l1_overall_misses_per_core: List[int] = []
-        for cpu_index in range(number_of_cpus):
-            l1_hit_value: int = find_and_extract_int_statistic(
-                selected_sim,
-                f"board.cache_hierarchy.clusters{cpu_index}.l1d_cache.overallMisses::total"
-            )
 
-            l1_overall_misses_per_core.append(l1_hit_value)
-            
-        l1_overall_hits_per_core: List[int] = []
-        for cpu_index in range(number_of_cpus):
-            l1_hit_value: int = find_and_extract_int_statistic(
-                selected_sim,
-                f"board.cache_hierarchy.clusters{cpu_index}.l1d_cache.overallHits::total"
-            )
+        # Per-core families, decoded into arrays indexed by core in one pass.
+        per_core = get_indexed_vectors(
+            selected_sim,
+            [CORE_CPI_TEMPLATE, L1_OVERALL_MISSES_TEMPLATE, L1_OVERALL_HITS_TEMPLATE],
+            expected_length=number_of_cpus
+        )
 
-            l1_overall_hits_per_core.append(l1_hit_value)
+        cycles_per_instruction_per_core: np.ndarray = per_core[CORE_CPI_TEMPLATE]
+        l1_overall_misses_per_core: np.ndarray = per_core[L1_OVERALL_MISSES_TEMPLATE]
+        l1_overall_hits_per_core: np.ndarray = per_core[L1_OVERALL_HITS_TEMPLATE]
 
 
-        l3_upgrade_requests: int = find_and_extract_int_statistic(
-            selected_sim,
+        l3_upgrade_requests: int = selected_sim.get_int(
             "board.cache_hierarchy.l3_bus.transDist::UpgradeReq"
         )
 
-        snoop_traffic: int = find_and_extract_int_statistic(
-            selected_sim,
+        snoop_traffic: int = selected_sim.get_int(
             "board.cache_hierarchy.l3_bus.snoopTraffic"
         )
         
@@ -175,25 +98,15 @@ class RunResults:
 
 
     def average_cpi(self) -> float:
-        return sum(self.cycles_per_instruction_per_core) / len(self.cycles_per_instruction_per_core)
+        return float(np.mean(self.cycles_per_instruction_per_core))
 
-    def l1_miss_ratio_per_core(self) -> List[float]:
+    def l1_miss_ratio_per_core(self) -> np.ndarray:
         assert len(self.l1_overall_misses_per_core) == len(self.l1_overall_hits_per_core)
 
-
-        l1_miss_ratio_per_core: List[float] = []
-        for index in range(len(self.l1_overall_misses_per_core)):
-            l1_miss_count_for_core: int = self.l1_overall_misses_per_core[index]
-            l1_hit_count_for_core: int = self.l1_overall_hits_per_core[index]
-
-            l1_miss_ratio_per_core.append(l1_miss_count_for_core / (l1_miss_count_for_core + l1_hit_count_for_core))
-        
-        return l1_miss_ratio_per_core
+        return self.l1_overall_misses_per_core / (self.l1_overall_misses_per_core + self.l1_overall_hits_per_core)
 
     def average_l1_miss_ratio(self) -> float:
-        l1_miss_ratio_per_core = self.l1_miss_ratio_per_core()
-
-        return sum(l1_miss_ratio_per_core) / len(l1_miss_ratio_per_core)
+        return float(np.mean(self.l1_miss_ratio_per_core()))
 
 
 @dataclass(frozen=True, kw_only=True)
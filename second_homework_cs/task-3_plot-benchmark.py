@@ -13,40 +13,17 @@ import matplotlib.ticker
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 
-def find_and_extract_int_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> int:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return int(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
-
-
-def find_and_extract_float_statistic(
-    stats_txt_content: str,
-    statistic_name: str,
-) -> float:
-    for line in stats_txt_content.splitlines(keepends=False):
-        if line.startswith(statistic_name):
-            line_without_property_name: str = line.removeprefix(statistic_name).lstrip(" ").lstrip("\t")
-            statistic_value_str = line_without_property_name.split(" ", maxsplit=1)[0]
-
-            return float(statistic_value_str)
-
-    
-    raise ValueError(f"No such statistic: {statistic_name}")
-
-
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from gem5_tools.compressed_stats import find_stats_txt_path
+from gem5_tools.results_store import load_stats_index
+from gem5_tools.stats_index import StatsIndex
 
 
 DIRECTORY_NAME_REGEX: re.Pattern = re.compile(r"(.+)-cpus_(.+)-network")
 
+# Only the network message counters are needed, the rest of the (large) Ruby dump is not loaded.
+NETWORK_MESSAGE_COUNT_PREFIX: str = "board.cache_hierarchy.ruby_system.network.msg_count."
+
 @dataclass(frozen=True, kw_only=True)
 class RunParameters:
     number_of_processors: int
@@ -86,33 +63,35 @@ class RunResults:
         run_results_directory_path: Path,
         number_of_cpus: int
     ) -> Self:
-        stats_txt_path = run_results_directory_path.joinpath("stats.txt")
-        if not stats_txt_path.is_file():
+        stats_txt_path = find_stats_txt_path(run_results_directory_path)
+        if stats_txt_path is None:
             raise FileNotFoundError(f"No stats.txt in {run_results_directory_path}!")
 
-        with stats_txt_path.open(mode="r", encoding="utf-8") as stats_file:
-            stats_file_contents = stats_file.read()
-            return cls.from_stats_txt(
-                stats_txt=stats_file_contents,
-                number_of_cpus=number_of_cpus
-            )
+        return cls.from_stats_index(
+            stats_index=load_stats_index(stats_txt_path, prefixes=[NETWORK_MESSAGE_COUNT_PREFIX]),
+            number_of_cpus=number_of_cpus
+        )
     
     @classmethod
     def from_stats_txt(cls, stats_txt: str, number_of_cpus: int) -> Self:
+        return cls.from_stats_index(
+            stats_index=StatsIndex.from_text(stats_txt),
+            number_of_cpus=number_of_cpus
+        )
+
+    @classmethod
+    def from_stats_index(cls, stats_index: StatsIndex, number_of_cpus: int) -> Self:
         # TODO
 
-        request_control_messages: int = find_and_extract_int_statistic(
-            stats_txt, 
+        request_control_messages: int = stats_index.get_int(
             "board.cache_hierarchy.ruby_system.network.msg_count.Request_Control"
         )
 
-        response_data_messages: int = find_and_extract_int_statistic(
-            stats_txt, 
+        response_data_messages: int = stats_index.get_int(
             "board.cache_hierarchy.ruby_system.network.msg_count.Response_Data"
         )
 
-        writeback_data_messages: int = find_and_extract_int_statistic(
-            stats_txt, 
+        writeback_data_messages: int = stats_index.get_int(
             "board.cache_hierarchy.ruby_system.network.msg_count.Writeback_Data"
         )
         
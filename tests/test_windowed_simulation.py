@@ -0,0 +1,111 @@
+"""
+Merging the per-window dumps of a windowed simulation back into totals.
+
+> python -m pytest tests
+"""
+
+import json
+import math
+from pathlib import Path
+import sys
+from typing import Dict
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from gem5_tools import results_store
+from gem5_tools.stats_index import StatsIndex, parse_float_token
+from gem5_tools.windowed_simulation import (
+    NON_RESETTING_STATISTIC_NAMES,
+    WINDOW_SERIES_FILE_NAME,
+    merge_window_stats_indexes
+)
+
+
+REAL_STATS_TXT_PATH: Path = Path(__file__).resolve().parents[1].joinpath(
+    "first_homework_cs/cache_benchmark/task-1_results/run_2025-03-22_23-45-12/benchmarks/L1-1 KiB-16_L2-32 KiB-16_1/stats.txt"
+)
+
+IPC_NAME: str = "board.processor.cores.core.ipc"
+
+
+def build_empty_dump(real_dump: StatsIndex) -> StatsIndex:
+    """
+    The dump gem5 adds at exit after the last window: nothing happened since the
+    last reset, so counters are 0, rates NaN, and settings and running totals unchanged.
+    """
+
+    raw_values: Dict[str, str] = {}
+
+    for name, raw_value in real_dump.raw_values.items():
+        if name in NON_RESETTING_STATISTIC_NAMES or name.endswith(".clock"):
+            raw_values[name] = raw_value
+        elif name.endswith((".ipc", ".cpi")) or "Rate" in name:
+            raw_values[name] = "nan"
+        else:
+            raw_values[name] = "0"
+
+    return StatsIndex(raw_values=raw_values)
+
+
+def format_dump(stats_index: StatsIndex) -> str:
+    lines = "\n".join(f"{name} {raw_value} # x" for name, raw_value in stats_index.raw_values.items())
+    return f"\n---------- Begin Simulation Statistics ----------\n{lines}\n---------- End Simulation Statistics   ----------\n"
+
+
+def test_non_resetting_statistics_are_not_summed():
+    real_dump: StatsIndex = StatsIndex.from_file_path(REAL_STATS_TXT_PATH)
+    merged: StatsIndex = merge_window_stats_indexes([real_dump, real_dump])
+
+    assert merged.get_raw("simFreq") == real_dump.get_raw("simFreq")
+    assert merged.get_raw("board.clk_domain.clock") == real_dump.get_raw("board.clk_domain.clock")
+    assert merged.get_raw("finalTick") == real_dump.get_raw("finalTick")
+    assert merged.get_raw("simInsts") == real_dump.get_raw("simInsts")
+    assert merged.get_raw("hostMemory") == real_dump.get_raw("hostMemory")
+
+    assert parse_float_token(merged.get_raw("simSeconds")) == 2 * parse_float_token(real_dump.get_raw("simSeconds"))
+    assert math.isclose(parse_float_token(merged.get_raw(IPC_NAME)), parse_float_token(real_dump.get_raw(IPC_NAME)))
+
+
+def test_trailing_empty_dump_keeps_the_ipc():
+    real_dump: StatsIndex = StatsIndex.from_file_path(REAL_STATS_TXT_PATH)
+    merged: StatsIndex = merge_window_stats_indexes([real_dump, build_empty_dump(real_dump)])
+
+    assert math.isclose(parse_float_token(merged.get_raw(IPC_NAME)), parse_float_token(real_dump.get_raw(IPC_NAME)))
+    assert merged.get_raw("simInsts") == real_dump.get_raw("simInsts")
+
+
+def test_load_stats_index_merges_only_the_recorded_windows(tmp_path, monkeypatch):
+    real_dump: StatsIndex = StatsIndex.from_file_path(REAL_STATS_TXT_PATH)
+
+    run_directory_path: Path = tmp_path.joinpath("run")
+    run_directory_path.mkdir()
+    run_directory_path.joinpath("stats.txt").write_text(
+        format_dump(real_dump) + format_dump(build_empty_dump(real_dump)),
+        encoding="utf-8"
+    )
+    run_directory_path.joinpath(WINDOW_SERIES_FILE_NAME).write_text(json.dumps({
+        "window_instructions": 1000,
+        "max_instructions": 0,
+        "convergence_tolerance": 0.02,
+        "min_windows": 4,
+        "stop_reason": "completed",
+        "windows": [{
+            "index": 0,
+            "end_tick": 1,
+            "instructions": 1.0,
+            "cycles": 1.0,
+            "cache_misses": {},
+            "cache_accesses": {},
+        }],
+    }), encoding="utf-8")
+
+    monkeypatch.setenv(results_store.RESULTS_STORE_PATH_ENVIRONMENT_VARIABLE, tmp_path.joinpath("store.sqlite").as_posix())
+    results_store.get_default_results_store.cache_clear()
+
+    try:
+        merged: StatsIndex = results_store.load_stats_index(run_directory_path.joinpath("stats.txt"))
+    finally:
+        results_store.get_default_results_store().close()
+        results_store.get_default_results_store.cache_clear()
+
+    assert math.isclose(parse_float_token(merged.get_raw(IPC_NAME)), parse_float_token(real_dump.get_raw(IPC_NAME)))
+    assert merged.get_raw("simSeconds") == real_dump.get_raw("simSeconds")
@@ -4,9 +4,22 @@ from dataclasses import dataclass
 import datetime
 import hashlib
 from pathlib import Path
-import subprocess
 import sys
-from typing import List, Literal, Union
+from typing import Dict, List, Literal, Optional, Union
+
+sys.path.insert(0, Path(__file__).resolve().parents[3].as_posix())
+from gem5_tools.async_submission import AsyncSubmitter, add_async_submission_arguments
+from gem5_tools.executors import JobExecutor, add_executor_arguments, create_executor
+from gem5_tools.job_array import JobArray
+from gem5_tools.runtime_model import RUNTIME_RECORD_SUFFIX, RuntimePredictor, build_runtime_record_shell_commands
+from gem5_tools.sweep_ledger import SweepLedger, record_array_submission, record_async_submission
+
+
+# Jobs of this sweep share a runtime history, which predicts their --time (see gem5_tools.runtime_model).
+RUNTIME_SWEEP_NAME: str = "mlp"
+
+# Requested while the history is too short to predict from.
+DEFAULT_TIME_LIMIT: str = "00:20:00"
 
 
 def hash_job_parameters(precision: Union[Literal["float"], Literal["double"]], hidden_layer_size: int) -> str:
@@ -29,6 +42,7 @@ def prepare_and_save_job_script(
     repetition_index: int,
     mlp_src_directory_path: Path,
     job_output_directory_path: Path,
+    time_limit: str = DEFAULT_TIME_LIMIT,
 ) -> Path:
     print("  > generating job details")
 
@@ -46,7 +60,14 @@ def prepare_and_save_job_script(
     
     job_log_file_path: Path = job_output_directory_path.joinpath(f"{job_file_name}.log")
     job_script_file_path = job_output_directory_path.joinpath(f"{job_file_name}.sh")
+    runtime_record_file_path: Path = job_output_directory_path.resolve().joinpath(f"{job_file_name}{RUNTIME_RECORD_SUFFIX}")
 
+    # Repetitions of a configuration are observations of the same runtime.
+    job_parameters: Dict[str, Union[str, int]] = {
+        "precision": precision,
+        "implementation": implementation,
+        "hidden_layer_size": hidden_layer_size,
+    }
 
     job_script = f"""#!/bin/bash
 #SBATCH --ntasks=1
@@ -54,13 +75,20 @@ def prepare_and_save_job_script(
 #SBATCH --reservation=fri
 #SBATCH --job-name=rs-hw3_t1-{job_parameter_hash}
 #SBATCH --output=\"{job_log_file_path.as_posix()}\"
-#SBATCH --time=00:20:00
+#SBATCH --time={time_limit}
 
 set -e
+{build_runtime_record_shell_commands(runtime_record_file_path, RUNTIME_SWEEP_NAME, job_parameters, time_limit, "started")}
 cd "{mlp_src_directory_path.resolve().as_posix()}"
 
 echo "Running main_test_{precision}_{implementation}.c"
-./main_test_{precision}_{implementation} {hidden_layer_size}
+# Not stopped by set -e, so the finished record carries the exit code (the record reads it from GEM5_EXIT_CODE).
+GEM5_EXIT_CODE=0
+./main_test_{precision}_{implementation} {hidden_layer_size} || GEM5_EXIT_CODE=$?
+{build_runtime_record_shell_commands(runtime_record_file_path, RUNTIME_SWEEP_NAME, job_parameters, time_limit, "finished")}
+if [ "$GEM5_EXIT_CODE" != "0" ]; then
+    exit $GEM5_EXIT_CODE
+fi
 
 echo "Done!"
 """
@@ -82,12 +110,28 @@ def prepare_and_queue_job(
     repetition_index: int,
     mlp_src_directory_path: Path,
     job_output_directory_path: Path,
+    executor: JobExecutor,
+    # Collects the job into this array instead of submitting it on its own.
+    job_array: Optional[JobArray] = None,
+    time_limit: str = DEFAULT_TIME_LIMIT,
+    # Tracks the job for status and resume (see gem5_tools.sweep_ledger).
+    sweep_ledger: Optional[SweepLedger] = None,
+    # Collects the job for concurrent submission once every job script is written.
+    async_submitter: Optional[AsyncSubmitter] = None,
 ) -> None:
     print("Preparing job:")
     print(f"  > precision: {precision}")
     print(f"  > implementation: {implementation}")
     print(f"  > hidden layers: {hidden_layer_size}")
     print(f"  > repetition: {repetition_index}")
+    print(f"  > time limit: {time_limit}")
+
+    job_configuration: Dict[str, Union[str, int, float]] = {
+        "precision": precision,
+        "implementation": implementation,
+        "hidden_layer_size": hidden_layer_size,
+        "repetition_index": repetition_index,
+    }
 
     job_script_file_path = prepare_and_save_job_script(
         precision=precision,
@@ -95,22 +139,36 @@ def prepare_and_queue_job(
         hidden_layer_size=hidden_layer_size,
         repetition_index=repetition_index,
         mlp_src_directory_path=mlp_src_directory_path,
-        job_output_directory_path=job_output_directory_path
+        job_output_directory_path=job_output_directory_path,
+        time_limit=time_limit
     )
 
-    print("  > submitting via sbatch")
+    if sweep_ledger is not None:
+        sweep_ledger.add_job(job_configuration, job_script_file_path)
 
-    submission_process = subprocess.run(
-        args=["sbatch", job_script_file_path.resolve().as_posix()],
-        capture_output=True,
-        encoding="utf-8"
-    )
+    if job_array is not None:
+        task_id: int = job_array.add_job_script(
+            job_script_file_path,
+            parameters=job_configuration
+        )
 
-    submission_process_stdout = str(submission_process.stdout)
-    if not submission_process_stdout.startswith("Submitted batch job") or submission_process.returncode != 0:
-        raise RuntimeError(f"failed to submit (code {submission_process.returncode}): {submission_process_stdout}")
-    
-    job_id = int(submission_process_stdout.rsplit(" ", maxsplit=1)[1])
+        print(f"  > added to job array as task {task_id}")
+        print()
+        return
+
+    if async_submitter is not None:
+        task_id = async_submitter.add_job_script(job_script_file_path)
+
+        print(f"  > added to concurrent submission as job {task_id}")
+        print()
+        return
+
+    print(f"  > submitting via {executor.name}")
+
+    job_id: int = executor.submit(job_script_file_path)
+
+    if sweep_ledger is not None:
+        sweep_ledger.mark_submitted(job_script_file_path, job_id, executor.kind)
 
     print(f"  > submitted as job {job_id}")
     print()
@@ -121,6 +179,13 @@ def prepare_and_queue_job(
 class CLIArguments:
     mlp_src_directory_path: Path
     output_directory_path: Path
+    use_job_array: bool
+    array_max_concurrent_tasks: int
+    submit_concurrency: int
+    watch_jobs: bool
+    poll_interval_seconds: float
+    executor: JobExecutor
+    runtime_predictor: RuntimePredictor
 
 def parse_cli_arguments() -> CLIArguments:
     argument_parser = ArgumentParser()
@@ -137,14 +202,65 @@ def parse_cli_arguments() -> CLIArguments:
         dest="mlp_src_directory_path"
     )
 
+    argument_parser.add_argument(
+        "--array",
+        required=False,
+        action="store_true",
+        dest="use_job_array",
+        help="Submit all configurations as one SLURM job array instead of one job each."
+    )
+
+    argument_parser.add_argument(
+        "--array-max-concurrent",
+        required=False,
+        type=int,
+        default=0,
+        dest="array_max_concurrent_tasks",
+        help="With --array, run at most this many configurations at the same time (0 for no limit)."
+    )
+
+    argument_parser.add_argument(
+        "--no-runtime-model",
+        required=False,
+        action="store_false",
+        dest="use_runtime_model",
+        help=f"Request --time={DEFAULT_TIME_LIMIT} for every job instead of predicting it from earlier runs."
+    )
+
+    add_executor_arguments(argument_parser)
+    add_async_submission_arguments(argument_parser)
+
     arguments = argument_parser.parse_args()
 
     output_directory_path: Path = Path(str(arguments.output_directory_path))
     mlp_src_directory_path: Path = Path(str(arguments.mlp_src_directory_path))
 
+    if arguments.use_job_array and arguments.executor_name != "slurm":
+        print("--array needs --executor slurm.")
+        exit(1)
+
+    if arguments.submit_concurrency > 0 and (arguments.use_job_array or arguments.executor_name != "slurm"):
+        print("--submit-concurrency needs --executor slurm and cannot be combined with --array.")
+        exit(1)
+
+    if arguments.watch and arguments.submit_concurrency <= 0:
+        print("--watch needs --submit-concurrency.")
+        exit(1)
+
     return CLIArguments(
         output_directory_path=output_directory_path,
-        mlp_src_directory_path=mlp_src_directory_path
+        mlp_src_directory_path=mlp_src_directory_path,
+        use_job_array=arguments.use_job_array,
+        array_max_concurrent_tasks=arguments.array_max_concurrent_tasks,
+        submit_concurrency=arguments.submit_concurrency,
+        watch_jobs=arguments.watch,
+        poll_interval_seconds=arguments.poll_interval_seconds,
+        executor=create_executor(arguments),
+        runtime_predictor=RuntimePredictor.from_history(
+            sweep_name=RUNTIME_SWEEP_NAME,
+            default_time_limit=DEFAULT_TIME_LIMIT,
+            record_root_directory_path=output_directory_path
+        ) if arguments.use_runtime_model else RuntimePredictor(RUNTIME_SWEEP_NAME, DEFAULT_TIME_LIMIT, None, {})
     )
 
 
@@ -170,6 +286,18 @@ def main() -> None:
     cli_arguments = parse_cli_arguments()
 
     timestamped_output_directory = prepare_timestamped_output_directory(cli_arguments.output_directory_path)
+    sweep_ledger: SweepLedger = SweepLedger.open(timestamped_output_directory)
+
+    job_array: Optional[JobArray] = JobArray(
+        name="rs-hw3_t1",
+        max_concurrent_tasks=cli_arguments.array_max_concurrent_tasks
+    ) if cli_arguments.use_job_array else None
+
+    async_submitter: Optional[AsyncSubmitter] = AsyncSubmitter(
+        name="rs-hw3_t1",
+        max_concurrent_submissions=cli_arguments.submit_concurrency,
+        poll_interval_seconds=cli_arguments.poll_interval_seconds
+    ) if cli_arguments.submit_concurrency > 0 else None
 
 
     HIDDEN_LAYER_SIZES: List[int] = [
@@ -179,21 +307,48 @@ def main() -> None:
         1024
     ]
 
-    for precision in ["float", "double"]:
-        for implementation in ["sca", "avx2"]:
-            for hidden_layer_size in HIDDEN_LAYER_SIZES:
-                for repetition_index in range(10):
-                    prepare_and_queue_job(
-                        precision=precision,
-                        implementation=implementation,
-                        hidden_layer_size=hidden_layer_size,
-                        repetition_index=repetition_index,
-                        mlp_src_directory_path=cli_arguments.mlp_src_directory_path,
-                        job_output_directory_path=timestamped_output_directory
-                    )
+    job_configurations: List[Dict[str, Union[str, int]]] = [
+        {"precision": precision, "implementation": implementation, "hidden_layer_size": hidden_layer_size}
+        for precision in ["float", "double"]
+        for implementation in ["sca", "avx2"]
+        for hidden_layer_size in HIDDEN_LAYER_SIZES
+    ]
+
+    runtime_predictor: RuntimePredictor = cli_arguments.runtime_predictor
+
+    for job_configuration in runtime_predictor.order_longest_first(job_configurations):
+        for repetition_index in range(10):
+            prepare_and_queue_job(
+                **job_configuration, # type: ignore
+                repetition_index=repetition_index,
+                mlp_src_directory_path=cli_arguments.mlp_src_directory_path,
+                job_output_directory_path=timestamped_output_directory,
+                job_array=job_array,
+                executor=cli_arguments.executor,
+                time_limit=runtime_predictor.predict_time_limit(job_configuration),
+                sweep_ledger=sweep_ledger,
+                async_submitter=async_submitter
+            )
+
+    if job_array is not None:
+        record_array_submission(sweep_ledger, job_array, job_array.write_and_submit(timestamped_output_directory))
+
+    if async_submitter is not None:
+        record_async_submission(sweep_ledger, async_submitter.submit_all())
+
+    number_of_failed_jobs: int = cli_arguments.executor.wait()
+
+    if async_submitter is not None:
+        number_of_failed_jobs += async_submitter.wait() if cli_arguments.watch_jobs else len(async_submitter.failed_submissions)
+
+    sweep_ledger.close()
+    print(f"Track and resume with: python -m gem5_tools.sweep_ledger --run-directory-path {timestamped_output_directory.as_posix()}")
 
     print("DONE!")
 
+    if number_of_failed_jobs > 0:
+        exit(1)
+
 
 if __name__ == "__main__":
     main()